@@ -8,10 +8,11 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import require_admin
+from app.core.pagination import InvalidCursorError, estimate_count
 from app.models.core_ats import AuditAction, HHAuditLog
-from app.services.audit_service import AuditService
+from app.services.audit_service import AUDIT_KEYSET, AuditService
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/audit", tags=["Audit"])
@@ -37,10 +38,11 @@ class AuditLogResponse(BaseModel):
 
 class AuditLogListResponse(BaseModel):
     """Respuesta paginada de logs de auditoría."""
-    total: int
+    total: Optional[int] = None  # Estimado; None si no se pidió
     items: List[AuditLogResponse]
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class EntityHistoryResponse(BaseModel):
@@ -74,15 +76,18 @@ async def query_audit_logs(
     start_date: Optional[datetime] = Query(None, description="Fecha inicial"),
     end_date: Optional[datetime] = Query(None, description="Fecha final"),
     days: int = Query(0, description="Filtrar últimos N días (sobreescribe fechas)"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor de la respuesta anterior)"),
+    include_total: bool = Query(True, description="Incluir el total estimado de resultados"),
+    skip: int = Query(0, ge=0, description="Offset (obsoleto, usar cursor)"),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(require_admin),
 ):
     """
     Consultar logs de auditoría (solo administradores).
     
     Permite filtrar por tipo de entidad, acción, usuario, rango de fechas, etc.
+    Pagina por cursor: pasar `next_cursor` de la respuesta para la página siguiente.
     """
     audit_service = AuditService(db)
     
@@ -91,54 +96,44 @@ async def query_audit_logs(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
     
-    # Consultar logs
-    logs = await audit_service.query_audit_logs(
+    filters = dict(
         entity_type=entity_type,
         entity_id=entity_id,
         action=action,
         changed_by=changed_by,
         start_date=start_date,
-        end_date=end_date,
-        skip=skip,
-        limit=limit
+        end_date=end_date
     )
     
-    # Contar total (para paginación)
-    from sqlalchemy import select, func, and_
-    count_query = select(func.count()).select_from(HHAuditLog)
-    
-    filters = []
-    if entity_type:
-        filters.append(HHAuditLog.entity_type == entity_type)
-    if entity_id:
-        filters.append(HHAuditLog.entity_id == entity_id)
-    if action:
-        filters.append(HHAuditLog.action == action)
-    if changed_by:
-        filters.append(HHAuditLog.changed_by == changed_by)
-    if start_date:
-        filters.append(HHAuditLog.changed_at >= start_date)
-    if end_date:
-        filters.append(HHAuditLog.changed_at <= end_date)
-    
-    if filters:
-        count_query = count_query.where(and_(*filters))
+    # Consultar logs
+    try:
+        logs = await audit_service.query_audit_logs(
+            **filters,
+            skip=skip,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    result = await db.execute(count_query)
-    total = result.scalar()
+    # Total estimado (misma query filtrada, ver estimate_count)
+    total = None
+    if include_total:
+        total = await estimate_count(db, audit_service.audit_logs_query(**filters))
     
     return {
         "total": total,
         "items": logs,
         "page": skip // limit + 1 if limit > 0 else 1,
-        "page_size": limit
+        "page_size": limit,
+        "next_cursor": AUDIT_KEYSET.next_cursor(logs, limit)
     }
 
 
 @router.get("/logs/{audit_id}", response_model=AuditLogResponse)
 async def get_audit_log_detail(
     audit_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(require_admin),
 ):
     """
@@ -162,7 +157,7 @@ async def get_entity_audit_history(
     entity_type: str,
     entity_id: UUID,
     limit: int = Query(50, ge=1, le=500),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(require_admin),
 ):
     """
@@ -187,7 +182,7 @@ async def get_entity_audit_history(
 
 @router.get("/stats", response_model=AuditStatsResponse)
 async def get_audit_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(require_admin),
 ):
     """
@@ -281,7 +276,7 @@ async def get_audit_stats(
 async def get_security_events(
     event_type: Optional[str] = Query(None, description="Tipo de evento: login, permission_change, export, pii_access"),
     days: int = Query(7, ge=1, le=90),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(require_admin),
 ):
     """
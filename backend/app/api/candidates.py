@@ -11,7 +11,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.deps import get_current_active_user, require_consultant, require_viewer
 from app.core.llm_rate_limit import get_llm_rate_limiter
+from app.core.pagination import InvalidCursorError
 from app.core.config import settings
+from app.core.extraction_cache import extraction_cache
+from app.core.uploads import UploadSink, UploadTooLargeError
 from app.models import User, CandidateStatus
 from app.schemas import (
     CandidateCreate,
@@ -39,34 +42,43 @@ async def list_candidates(
     status: Optional[str] = Query(None, description="Filtrar por estado del candidato"),
     source: Optional[str] = Query(None, description="Filtrar por fuente"),
     search: Optional[str] = Query(None, description="Buscar por nombre o email"),
-    page: int = Query(1, ge=1, description="Número de página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor de la respuesta anterior)"),
+    include_total: bool = Query(True, description="Incluir el total estimado de resultados"),
+    page: int = Query(1, ge=1, description="Número de página (obsoleto, usar cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Tamaño de página"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),  # VIEWER, CONSULTANT o ADMIN pueden ver
 ):
-    """Listar candidatos con filtros y paginación."""
+    """Listar candidatos con filtros y paginación por cursor."""
     candidate_service = CandidateService(db)
     
     skip = (page - 1) * page_size
-    candidates, total = await candidate_service.list_candidates(
-        job_opening_id=job_opening_id,
-        status=status,
-        source=source,
-        search=search,
-        skip=skip,
-        limit=page_size,
-    )
+    try:
+        result_page = await candidate_service.list_candidates(
+            job_opening_id=job_opening_id,
+            status=status,
+            source=source,
+            search=search,
+            cursor=cursor,
+            skip=skip,
+            limit=page_size,
+            include_total=include_total,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    pages = (total + page_size - 1) // page_size
+    total = result_page.total
+    pages = (total + page_size - 1) // page_size if total is not None else None
     
     return {
-        "items": candidates,
+        "items": result_page.items,
         "total": total,
         "page": page,
         "page_size": page_size,
         "pages": pages,
-        "has_next": page < pages,
-        "has_prev": page > 1,
+        "has_next": result_page.has_next,
+        "has_prev": page > 1 or cursor is not None,
+        "next_cursor": result_page.next_cursor,
     }
 
 
@@ -332,30 +344,25 @@ async def create_candidate_from_cv(
             detail=f"Tipo de archivo no soportado: {cv_file.content_type}. Use PDF, DOCX o DOC.",
         )
     
-    # Validar tamaño (máximo 10MB)
-    contents = await cv_file.read()
-    if len(contents) > 10 * 1024 * 1024:  # 10MB
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Archivo demasiado grande. Máximo 10MB.",
-        )
-    
-    # Guardar archivo temporalmente
+    # Guardar archivo temporalmente (por bloques, máximo 10MB); se borra al salir
     temp_dir = os.path.join(settings.UPLOAD_DIR, 'temp')
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    temp_filename = f"{uuid.uuid4()}{file_extension}"
-    temp_path = os.path.join(temp_dir, temp_filename)
+    sink = UploadSink(temp_dir, max_size=10 * 1024 * 1024, suffix=file_extension)
     
     try:
-        with open(temp_path, 'wb') as f:
-            f.write(contents)
+        try:
+            await sink.receive(cv_file)
+        except UploadTooLargeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Archivo demasiado grande. Máximo 10MB.",
+            )
+        temp_path = str(sink.temp_path)
         
         # Procesar el documento con OCR
         processor = DocumentProcessor(db_session=db)
         
-        # Detectar tipo MIME real
-        detected_mime = processor.detect_mime_type(temp_path, cv_file.filename)
+        # Tipo MIME real (detectado de los primeros bytes al recibir)
+        detected_mime = sink.mime_type
         
         if not processor.is_supported(detected_mime):
             raise HTTPException(
@@ -363,9 +370,13 @@ async def create_candidate_from_cv(
                 detail="Formato de archivo no soportado para extracción de texto.",
             )
         
-        # Extraer texto del CV
-        file_type = processor.get_file_type(detected_mime)
-        extraction_result = await processor._extract_by_type(temp_path, file_type)
+        # Extraer texto del CV (re-subidas del mismo archivo salen del cache)
+        file_hash = sink.sha256
+        extraction_result = await extraction_cache.get("text", processor.VERSION, file_hash)
+        if extraction_result is None:
+            file_type = processor.get_file_type(detected_mime)
+            extraction_result = await processor._extract_by_type(temp_path, file_type)
+            await extraction_cache.set("text", processor.VERSION, file_hash, extraction_result)
         extracted_text = extraction_result.get('text', '')
         
         if not extracted_text or len(extracted_text) < 50:
@@ -378,7 +389,9 @@ async def create_candidate_from_cv(
         resume_parser = ResumeParser()
         
         # Usar el texto extraído para parsear (document_id temporal)
-        parsed_result = await resume_parser.parse_resume(str(uuid.uuid4()), extracted_text)
+        parsed_result = await resume_parser.parse_resume(
+            str(uuid.uuid4()), extracted_text, file_hash=file_hash
+        )
         parsed_data = parsed_result.get('parsed_data', {})
         
         # Extraer datos del parseo
@@ -429,5 +442,4 @@ async def create_candidate_from_cv(
         )
     finally:
         # Limpiar archivo temporal
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        sink.discard()
@@ -9,8 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.pagination import InvalidCursorError
 from app.schemas import MessageResponse
-from app.services.communication_service import CommunicationService
+from app.services.communication_service import COMMUNICATIONS_KEYSET, CommunicationService
 from app.services.whatsapp_service import WhatsAppService, get_whatsapp_service
 from app.models.communication import (
     CommunicationChannel,
@@ -85,6 +86,7 @@ class CommunicationListResponse(BaseModel):
     """Response de lista de comunicaciones."""
     items: List[CommunicationResponse]
     total: int
+    next_cursor: Optional[str] = None
 
 
 class RetryMessageResponse(BaseModel):
@@ -187,12 +189,13 @@ async def list_communications(
     candidate_id: Optional[UUID] = Query(None, description="Filtrar por candidato"),
     status: Optional[str] = Query(None, description="Filtrar por estado"),
     channel: Optional[str] = Query(None, description="Filtrar por canal"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor de la respuesta anterior)"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Offset (obsoleto, usar cursor)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Lista comunicaciones con filtros opcionales."""
+    """Lista comunicaciones con filtros opcionales, paginadas por cursor."""
     try:
         comm_service = CommunicationService(db)
         
@@ -223,7 +226,8 @@ async def list_communications(
             status=status_enum,
             channel=channel_enum,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         # Convertir a response
@@ -254,11 +258,14 @@ async def list_communications(
         
         return CommunicationListResponse(
             items=items,
-            total=len(items)
+            total=len(items),
+            next_cursor=COMMUNICATIONS_KEYSET.next_cursor(communications, limit)
         )
         
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listando comunicaciones: {e}")
         raise HTTPException(
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.deps import get_current_active_user, require_consultant, require_viewer
+from app.core.uploads import UploadSink, UploadTooLargeError
 from app.models import User
 from app.schemas import (
     JobOpeningCreate, 
@@ -261,26 +262,31 @@ async def upload_job_description(
             detail=f"Tipo de archivo no permitido. Permitidos: {', '.join(ALLOWED_JD_EXTENSIONS)}"
         )
     
-    # Leer contenido
-    contents = await file.read()
-    
-    if len(contents) > MAX_JD_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Archivo demasiado grande. Máximo: {MAX_JD_FILE_SIZE / 1024 / 1024}MB"
-        )
-    
     # Generar nombre único
     file_ext = get_file_extension(file.filename)
     stored_filename = f"jd_{uuid_lib.uuid4()}{file_ext}"
-    
-    # Guardar archivo
     upload_dir = os.environ.get("UPLOAD_DIR", "./uploads")
-    os.makedirs(upload_dir, exist_ok=True)
     
-    file_path = os.path.join(upload_dir, stored_filename)
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    # Recibir archivo por bloques (hash y MIME en la misma pasada)
+    async with UploadSink(upload_dir, max_size=MAX_JD_FILE_SIZE, suffix=file_ext) as sink:
+        try:
+            await sink.receive(file)
+        except UploadTooLargeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Archivo demasiado grande. Máximo: {MAX_JD_FILE_SIZE / 1024 / 1024}MB"
+            )
+        
+        # El mismo JD ya asociado al job: no se guarda ni se reprocesa
+        if job.job_description_file_id:
+            current = await db.get(Document, job.job_description_file_id)
+            if current is not None and current.checksum == sink.sha256:
+                return MessageResponse(
+                    message=f"El Job Description no cambió. Documento ID: {current.id}",
+                    success=True
+                )
+        
+        file_path = str(sink.persist(stored_filename))
     
     # Crear documento en BD (sin candidate_id, es un JD de job)
     document = Document(
@@ -288,8 +294,9 @@ async def upload_job_description(
         original_filename=file.filename,
         storage_filename=stored_filename,  # Usar el nombre correcto del campo
         file_path=file_path,
-        mime_type=file.content_type or "application/octet-stream",
-        file_size=len(contents),
+        mime_type=sink.mime_type or file.content_type or "application/octet-stream",
+        file_size=sink.size,
+        checksum=sink.sha256,
         document_type=DocumentType.OTHER.value,  # Job Description
         document_category="job_description",  # Categoría especial para JD
         status=DocumentStatus.PENDING.value,
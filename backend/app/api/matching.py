@@ -2,23 +2,34 @@
 
 Endpoints:
 - POST /matching/analyze - Analizar match entre candidato y job
+- POST /matching/analyze/stream - Análisis con resultados parciales (SSE)
 - GET /matching/candidate/{id}/jobs - Mejores jobs para un candidato
 - GET /matching/job/{id}/candidates - Mejores candidatos para un job
+- GET /matching/candidate/{id}/suggested-jobs - Jobs similares (índice vectorial, sin LLM)
+- GET /matching/job/{id}/suggested-candidates - Candidatos similares (índice vectorial, sin LLM)
 - POST /matching/batch - Análisis batch de múltiples candidatos
+- POST /matching/batch/stream - Análisis batch con resultados parciales (NDJSON)
 """
-from typing import Optional, List
+import asyncio
+import json
+from contextlib import aclosing
+from typing import Awaitable, Callable, Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, async_session_maker
 from app.core.cache import cache
+from app.core.llm_rate_limit import get_llm_rate_limiter
+from app.core.sse import SSE_HEADERS, field_events, sse_event
 from app.core.deps import get_current_active_user, require_consultant, require_viewer
 from app.core.rate_limit import RateLimitByUser
 from app.models import User
 from app.services import MatchingService
+from app.services.embedding_index import EmbeddingIndexService
 
 router = APIRouter(prefix="/matching", tags=["Matching"])
 security = HTTPBearer()
@@ -98,10 +109,53 @@ class JobCandidatesResponse(BaseModel):
     candidates: List[CandidateMatchItem]
 
 
+class SuggestedJobItem(BaseModel):
+    """Job sugerido por similitud de skills/texto."""
+    job_id: str
+    job_title: str
+    department: Optional[str]
+    location: Optional[str]
+    similarity: float = Field(..., description="Similitud coseno TF-IDF (0-1)")
+    match_score: Optional[float] = Field(None, description="Score del último análisis IA, si existe")
+    recommendation: Optional[str] = None
+
+
+class SuggestedCandidateItem(BaseModel):
+    """Candidato sugerido por similitud de skills/texto."""
+    candidate_id: str
+    full_name: Optional[str]
+    email: Optional[str]
+    similarity: float = Field(..., description="Similitud coseno TF-IDF (0-1)")
+    match_score: Optional[float] = Field(None, description="Score del último análisis IA, si existe")
+    recommendation: Optional[str] = None
+
+
+class SuggestedJobsResponse(BaseModel):
+    """Jobs sugeridos para un candidato."""
+    candidate_id: str
+    total: int
+    jobs: List[SuggestedJobItem]
+
+
+class SuggestedCandidatesResponse(BaseModel):
+    """Candidatos sugeridos para un job."""
+    job_id: str
+    total: int
+    candidates: List[SuggestedCandidateItem]
+
+
 class BatchAnalyzeRequest(BaseModel):
     """Request para análisis batch."""
     candidate_ids: List[str] = Field(..., max_length=100)
     job_id: str = Field(..., max_length=50)
+    top_k: Optional[int] = Field(
+        None, ge=0, le=100,
+        description="Candidatos que pasan al LLM tras el pre-filtro (0 = todos)"
+    )
+    min_prefilter_score: Optional[float] = Field(
+        None, ge=0, le=100,
+        description="Score mínimo del pre-filtro de skills/experiencia"
+    )
     
     @field_validator('candidate_ids')
     @classmethod
@@ -129,18 +183,26 @@ class BatchAnalyzeRequest(BaseModel):
 
 class BatchAnalyzeItem(BaseModel):
     """Item de resultado batch."""
+    position: int = Field(..., description="Posición del candidato en candidate_ids")
     candidate_id: str
     success: bool
+    skipped: bool = Field(False, description="Descartado por el pre-filtro, sin llamada al LLM")
+    prefilter_score: Optional[float] = None
     result: Optional[MatchResultResponse] = None
     error: Optional[str] = None
 
 
 class BatchAnalyzeResponse(BaseModel):
-    """Respuesta de análisis batch."""
+    """Respuesta de análisis batch.
+    
+    `results` mantiene siempre el orden de `candidate_ids` del request,
+    aunque los análisis terminen en otro orden.
+    """
     job_id: str
     total_processed: int
     successful: int
     failed: int
+    skipped: int = 0
     results: List[BatchAnalyzeItem]
 
 
@@ -218,26 +280,91 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-# ============== ENDPOINTS ==============
+def build_batch_item(position: int, raw: dict) -> BatchAnalyzeItem:
+    """Convierte un resultado de MatchingService.batch_analyze al schema de respuesta."""
+    item = BatchAnalyzeItem(
+        position=position,
+        candidate_id=raw["candidate_id"],
+        success=raw["success"],
+        skipped=raw.get("skipped", False),
+        prefilter_score=raw.get("prefilter_score")
+    )
+    if raw["success"]:
+        item.result = MatchResultResponse(**raw["result"])
+    else:
+        item.error = raw.get("error", "Error desconocido")
+    return item
 
-@router.post("/analyze", response_model=MatchResultResponse)
-async def analyze_match(
-    request: Request,
-    data: MatchAnalyzeRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_consultant),
+
+async def stream_batch_items(
+    run_batch: Callable[[Callable[[int, dict], Awaitable[None]]], Awaitable[list]],
+    total: int
 ):
     """
-    Analiza el match entre un candidato y un job usando IA.
+    Corre `run_batch(on_result)` en segundo plano y emite cada item apenas termina.
     
-    - Requiere permisos de consultor o admin
-    - Rate limit: 10 requests/minuto por usuario (costos de IA)
-    - Usa cache por 24 horas (mismo CV + Job = mismo resultado)
-    - Registra auditoría de quién realizó el análisis
-    
-    Returns:
-        MatchResultResponse con score, recomendación y análisis detallado
+    Por cada resultado se encola siempre algo (el item o un error) y, al
+    terminar la tarea, una marca de fin: si el batch falla, el consumidor no
+    queda esperando. Si el consumidor deja de iterar (p.ej. el cliente se
+    desconecta), la tarea del batch se cancela.
     """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def on_result(position: int, raw: dict):
+        try:
+            item = build_batch_item(position, raw)
+        except Exception as e:
+            item = BatchAnalyzeItem(
+                position=position,
+                candidate_id=str(raw.get("candidate_id", "")),
+                success=False,
+                error=f"Resultado inválido: {e}"
+            )
+        await queue.put(item)
+    
+    task = asyncio.create_task(run_batch(on_result))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        for _ in range(total):
+            item = await queue.get()
+            if item is None:
+                break
+            yield item
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def authorize_batch(request: Request, data: BatchAnalyzeRequest, current_user: User, db: AsyncSession):
+    """Aplica rate limit y validación de acceso comunes a los endpoints batch."""
+    # Rate limiting por usuario
+    rate_limit_response = await ai_rate_limit(request)
+    if rate_limit_response:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas solicitudes de análisis. Límite: 10/minuto."
+        )
+    
+    # Validar acceso al job
+    if not await check_job_access(data.job_id, current_user, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para acceder a este job"
+        )
+    
+    # Validar acceso a todos los candidatos
+    for candidate_id in data.candidate_ids:
+        if not await check_candidate_access(candidate_id, current_user, db):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"No tienes permiso para acceder al candidato {candidate_id}"
+            )
+
+
+async def authorize_analyze(request: Request, data: MatchAnalyzeRequest, current_user: User, db: AsyncSession):
+    """Aplica rate limit y validación de acceso comunes a los endpoints de análisis."""
     # Rate limiting por usuario
     rate_limit_response = await ai_rate_limit(request)
     if rate_limit_response:
@@ -258,6 +385,29 @@ async def analyze_match(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para acceder a este job"
         )
+
+
+# ============== ENDPOINTS ==============
+
+@router.post("/analyze", response_model=MatchResultResponse)
+async def analyze_match(
+    request: Request,
+    data: MatchAnalyzeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_consultant),
+):
+    """
+    Analiza el match entre un candidato y un job usando IA.
+    
+    - Requiere permisos de consultor o admin
+    - Rate limit: 10 requests/minuto por usuario (costos de IA)
+    - Usa cache por 24 horas (mismo CV + Job = mismo resultado)
+    - Registra auditoría de quién realizó el análisis
+    
+    Returns:
+        MatchResultResponse con score, recomendación y análisis detallado
+    """
+    await authorize_analyze(request, data, current_user, db)
     
     # Realizar análisis
     matching_service = MatchingService(db, cache=cache)
@@ -289,6 +439,59 @@ async def analyze_match(
         )
 
 
+@router.post("/analyze/stream")
+async def analyze_match_stream(
+    request: Request,
+    data: MatchAnalyzeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_consultant),
+):
+    """
+    Igual que POST /matching/analyze, pero emite el resultado a medida que
+    el LLM lo genera (server-sent events).
+    
+    Eventos:
+    - `field`: `{"field": "score", "value": 82.0}` por cada campo del análisis
+      apenas está completo (score y recommendation llegan primero)
+    - `result`: MatchResultResponse completo, ya guardado en BD y cache
+    - `error`: `{"detail": "..."}` si el análisis falla
+    
+    Un resultado en cache se emite directamente como `result`.
+    """
+    await authorize_analyze(request, data, current_user, db)
+    user_id = str(current_user.id)
+    ip_address = get_client_ip(request)
+    user_agent = request.headers.get("User-Agent")
+    
+    async def event_stream():
+        # Sesión propia: la del dependency se cierra al devolver la respuesta
+        async with async_session_maker() as session:
+            matching_service = MatchingService(session, cache=cache)
+            
+            async def run(on_field):
+                return await matching_service.analyze_match(
+                    candidate_id=data.candidate_id,
+                    job_id=data.job_id,
+                    user_id=user_id,
+                    force_refresh=data.force_refresh,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    on_field=on_field
+                )
+            
+            try:
+                async for event, payload in field_events(run):
+                    if event == "result":
+                        await session.commit()
+                        payload = MatchResultResponse(**payload).model_dump(mode="json")
+                    yield sse_event(event, payload)
+            except Exception as e:
+                await session.rollback()
+                yield sse_event("error", {"detail": f"Error en análisis de matching: {e}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/candidate/{candidate_id}/jobs", response_model=CandidateJobsResponse)
 async def get_best_jobs_for_candidate(
     candidate_id: str,
@@ -389,6 +592,62 @@ async def get_best_candidates_for_job(
     )
 
 
+@router.get("/candidate/{candidate_id}/suggested-jobs", response_model=SuggestedJobsResponse)
+async def get_suggested_jobs_for_candidate(
+    candidate_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """
+    Sugiere jobs activos para un candidato usando el índice vectorial local.
+    
+    A diferencia de /candidate/{id}/jobs no requiere análisis IA previo:
+    incluye jobs nunca evaluados, ordenados por similitud de skills y texto.
+    """
+    if not await check_candidate_access(candidate_id, current_user, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para acceder a este candidato"
+        )
+    
+    jobs = await EmbeddingIndexService(db).suggest_jobs_for_candidate(candidate_id, limit=limit)
+    
+    return SuggestedJobsResponse(
+        candidate_id=candidate_id,
+        total=len(jobs),
+        jobs=[SuggestedJobItem(**job) for job in jobs]
+    )
+
+
+@router.get("/job/{job_id}/suggested-candidates", response_model=SuggestedCandidatesResponse)
+async def get_suggested_candidates_for_job(
+    job_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """
+    Sugiere candidatos para un job usando el índice vectorial local.
+    
+    A diferencia de /job/{id}/candidates no requiere análisis IA previo:
+    los candidatos nuevos aparecen apenas se procesa su CV.
+    """
+    if not await check_job_access(job_id, current_user, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para acceder a este job"
+        )
+    
+    candidates = await EmbeddingIndexService(db).suggest_candidates_for_job(job_id, limit=limit)
+    
+    return SuggestedCandidatesResponse(
+        job_id=job_id,
+        total=len(candidates),
+        candidates=[SuggestedCandidateItem(**c) for c in candidates]
+    )
+
+
 @router.post("/batch", response_model=BatchAnalyzeResponse)
 async def batch_analyze(
     request: Request,
@@ -403,6 +662,7 @@ async def batch_analyze(
     - Requiere permisos de consultor o admin
     - Rate limit: 10 requests/minuto por usuario
     - Máximo 100 candidatos por batch
+    - Pre-filtro de skills/experiencia: solo los top_k mejores pasan al LLM
     - Procesamiento async si toma más de 5 segundos
     
     Args:
@@ -412,56 +672,89 @@ async def batch_analyze(
     Returns:
         Resultados del análisis para cada candidato
     """
-    # Rate limiting por usuario
-    rate_limit_response = await ai_rate_limit(request)
-    if rate_limit_response:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Demasiadas solicitudes de análisis. Límite: 10/minuto."
-        )
-    
-    # Validar acceso al job
-    if not await check_job_access(data.job_id, current_user, db):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para acceder a este job"
-        )
-    
-    # Validar acceso a todos los candidatos
-    for candidate_id in data.candidate_ids:
-        if not await check_candidate_access(candidate_id, current_user, db):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"No tienes permiso para acceder al candidato {candidate_id}"
-            )
+    await authorize_batch(request, data, current_user, db)
     
     matching_service = MatchingService(db, cache=cache)
     
     results = await matching_service.batch_analyze(
         candidate_ids=data.candidate_ids,
         job_id=data.job_id,
-        user_id=str(current_user.id)
+        user_id=str(current_user.id),
+        rate_limiter=get_llm_rate_limiter(),
+        top_k=data.top_k,
+        min_prefilter_score=data.min_prefilter_score,
+        ip_address=get_client_ip(request)
     )
     
-    # Convertir resultados al formato de respuesta
-    response_items = []
-    for r in results:
-        item = BatchAnalyzeItem(
-            candidate_id=r["candidate_id"],
-            success=r["success"]
-        )
-        if r["success"]:
-            item.result = MatchResultResponse(**r["result"])
-        else:
-            item.error = r.get("error", "Error desconocido")
-        response_items.append(item)
+    # Convertir resultados al formato de respuesta (mismo orden que el request)
+    response_items = [build_batch_item(position, r) for position, r in enumerate(results)]
     
     successful = sum(1 for r in results if r["success"])
+    skipped = sum(1 for r in results if r.get("skipped"))
     
     return BatchAnalyzeResponse(
         job_id=data.job_id,
         total_processed=len(results),
         successful=successful,
-        failed=len(results) - successful,
+        failed=len(results) - successful - skipped,
+        skipped=skipped,
         results=response_items
     )
+
+
+@router.post("/batch/stream")
+async def batch_analyze_stream(
+    request: Request,
+    data: BatchAnalyzeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_consultant),
+):
+    """
+    Igual que POST /matching/batch, pero emite cada resultado apenas termina.
+    
+    La respuesta es NDJSON (una línea JSON por candidato, en orden de
+    finalización, con su `position` en el request) seguida de una línea
+    final `{"type": "summary", ...}`.
+    """
+    await authorize_batch(request, data, current_user, db)
+    user_id = str(current_user.id)
+    ip_address = get_client_ip(request)
+    
+    async def event_stream():
+        successful = 0
+        skipped = 0
+        # Sesión propia: la del dependency se cierra al devolver la respuesta
+        async with async_session_maker() as session:
+            matching_service = MatchingService(session, cache=cache)
+            
+            def run_batch(on_result):
+                return matching_service.batch_analyze(
+                    candidate_ids=data.candidate_ids,
+                    job_id=data.job_id,
+                    user_id=user_id,
+                    rate_limiter=get_llm_rate_limiter(),
+                    on_result=on_result,
+                    top_k=data.top_k,
+                    min_prefilter_score=data.min_prefilter_score,
+                    ip_address=ip_address
+                )
+            
+            # aclosing: si el cliente se desconecta, se cancela el batch de inmediato
+            async with aclosing(stream_batch_items(run_batch, len(data.candidate_ids))) as items:
+                async for item in items:
+                    successful += int(item.success)
+                    skipped += int(item.skipped)
+                    yield json.dumps({"type": "item", **item.model_dump()}) + "\n"
+            
+            await session.commit()
+        
+        yield json.dumps({
+            "type": "summary",
+            "job_id": data.job_id,
+            "total_processed": len(data.candidate_ids),
+            "successful": successful,
+            "failed": len(data.candidate_ids) - successful - skipped,
+            "skipped": skipped
+        }) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
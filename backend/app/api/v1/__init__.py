@@ -3,7 +3,7 @@ Core ATS API v1 - Routers
 """
 from fastapi import APIRouter
 
-from app.api.v1 import candidates, clients, roles, applications, documents, assessments, reports
+from app.api.v1 import candidates, clients, roles, applications, documents, assessments, reports, search
 from app.api import message_templates
 
 api_router = APIRouter(prefix="/api/v1")
@@ -50,6 +50,12 @@ api_router.include_router(
     tags=["Reports"]
 )
 
+# Search - router ya tiene prefix="/search"
+api_router.include_router(
+    search.router,
+    tags=["Search"]
+)
+
 # Message Templates - router tiene prefix="/message-templates"
 api_router.include_router(
     message_templates.router,
@@ -3,16 +3,21 @@ Core ATS API - HHApplications Router
 Endpoints para gestión de aplicaciones (ENTIDAD CENTRAL).
 Toda la información del pipeline se conecta aquí.
 """
+import logging
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func, desc, select
+from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, async_session_maker
+from app.core.decryption import deferred_decryption, reveal_all
+from app.core.sse import SSE_HEADERS, field_events, sse_event
 from app.core.deps import get_current_user
+from app.core.pagination import InvalidCursorError, Keyset, estimate_count
 from app.core.authorization import verify_application_access
 from app.models import User
 from app.models.core_ats import (
@@ -31,12 +36,23 @@ from app.schemas.core_ats import (
     ClientResponse, ConsultantDecisionUpdate, ContactStatusUpdate,
     SendMessageRequest
 )
+from app.services.pipeline_stats import ApplicationStatsEntry, PipelineStatsService
 from app.services.scoring_service import scoring_service, ScoringResult
 from pydantic import BaseModel, Field
 from typing import Literal
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/applications", tags=["HHApplications"])
 
+# Órdenes del listado (sort_by); application_id desempata scores y fechas iguales
+APPLICATION_KEYSETS = {
+    "score": Keyset("score", HHApplication.overall_score, HHApplication.application_id),
+    "score_asc": Keyset("score_asc", HHApplication.overall_score, HHApplication.application_id, descending=False),
+    "date": Keyset("date", HHApplication.created_at, HHApplication.application_id),
+    "date_asc": Keyset("date_asc", HHApplication.created_at, HHApplication.application_id, descending=False),
+}
+
 
 @router.post("", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
 async def create_application(
@@ -79,6 +95,10 @@ async def create_application(
     app_data = application.model_dump()
     db_application = HHApplication(**app_data)
     db.add(db_application)
+    await db.flush()
+    await PipelineStatsService(db).record_application(
+        db_application.role_id, None, ApplicationStatsEntry.of(db_application)
+    )
     await db.commit()
     await db.refresh(db_application)
     
@@ -139,12 +159,14 @@ async def list_applications(
     sort_by: Optional[str] = Query(None, description="Ordenar por: 'score' (mayor primero), 'score_asc' (menor primero), 'date' (más reciente), 'date_asc' (más antiguo)"),
     min_score: Optional[float] = Query(None, ge=0, le=100, description="Filtrar por score mínimo"),
     max_score: Optional[float] = Query(None, ge=0, le=100, description="Filtrar por score máximo"),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor de la respuesta anterior)"),
+    include_total: bool = Query(True, description="Incluir el total estimado de resultados"),
+    page: int = Query(1, ge=1, description="Número de página (obsoleto, usar cursor)"),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Listar aplicaciones con filtros, ordenamiento y paginación."""
+    """Listar aplicaciones con filtros, ordenamiento y paginación por cursor."""
     query = select(HHApplication).options(
         joinedload(HHApplication.candidate),
         joinedload(HHApplication.role).joinedload(HHRole.client)
@@ -165,29 +187,22 @@ async def list_applications(
     if max_score is not None:
         query = query.filter(HHApplication.overall_score <= max_score)
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
-    
-    # Aplicar ordenamiento según parámetro
-    if sort_by == "score":
-        # Ordenar por score descendente (mayor primero), nulls al final
-        query = query.order_by(HHApplication.overall_score.desc().nulls_last())
-    elif sort_by == "score_asc":
-        # Ordenar por score ascendente (menor primero), nulls al final
-        query = query.order_by(HHApplication.overall_score.asc().nulls_last())
-    elif sort_by == "date_asc":
-        # Ordenar por fecha ascendente (más antiguo primero)
-        query = query.order_by(HHApplication.created_at.asc())
-    else:
-        # Default: ordenar por fecha descendente (más reciente primero)
-        query = query.order_by(desc(HHApplication.created_at))
+    total = await estimate_count(db, query) if include_total else None
     
-    # Get paginated results
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    applications = result.unique().scalars().all()
+    # Ordenamiento (clave, application_id); score con nulls al final
+    keyset = APPLICATION_KEYSETS.get(sort_by, APPLICATION_KEYSETS["date"])
+    try:
+        with deferred_decryption():
+            result_page = await keyset.fetch(
+                db, query, cursor, page_size,
+                offset=(page - 1) * page_size,
+                unique=True
+            )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    applications = result_page.items
+    # Sólo se muestran email y teléfono (no la cédula)
+    reveal_all([app.candidate for app in applications], "email", "phone")
     
     # Build response items manually to handle relationships
     items = []
@@ -261,7 +276,8 @@ async def list_applications(
         "items": items,
         "total": total,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "next_cursor": result_page.next_cursor
     }
 
 
@@ -328,11 +344,15 @@ async def update_application_stage(
         raise HTTPException(status_code=404, detail="Aplicación no encontrada")
     
     old_stage = application.stage
+    before = ApplicationStatsEntry.of(application)
     application.stage = stage_update.stage
     
     if stage_update.notes:
         application.notes = stage_update.notes
     
+    await PipelineStatsService(db).record_application(
+        application.role_id, before, ApplicationStatsEntry.of(application)
+    )
     await db.commit()
     await db.refresh(application)
     
@@ -369,6 +389,7 @@ async def update_application_decision(
         raise HTTPException(status_code=404, detail="Aplicación no encontrada")
     
     old_hired = application.hired
+    before = ApplicationStatsEntry.of(application)
     application.hired = decision_update.hired
     
     if decision_update.decision_date:
@@ -382,6 +403,9 @@ async def update_application_decision(
     if decision_update.notes:
         application.notes = decision_update.notes
     
+    await PipelineStatsService(db).record_application(
+        application.role_id, before, ApplicationStatsEntry.of(application)
+    )
     await db.commit()
     await db.refresh(application)
     
@@ -593,6 +617,7 @@ async def update_consultant_decision(
         raise HTTPException(status_code=404, detail="Aplicación no encontrada")
     
     old_stage = application.stage
+    before = ApplicationStatsEntry.of(application)
     
     if decision_update.decision == "continue":
         # Verificar si el candidato tiene datos de contacto
@@ -614,6 +639,9 @@ async def update_consultant_decision(
     else:
         raise HTTPException(status_code=400, detail="Decisión inválida")
     
+    await PipelineStatsService(db).record_application(
+        application.role_id, before, ApplicationStatsEntry.of(application)
+    )
     await db.commit()
     await db.refresh(application)
     
@@ -654,6 +682,7 @@ async def update_contact_status(
         raise HTTPException(status_code=404, detail="Aplicación no encontrada")
     
     old_stage = application.stage
+    before = ApplicationStatsEntry.of(application)
     
     # Mapear status a ApplicationStage
     status_mapping = {
@@ -676,6 +705,9 @@ async def update_contact_status(
     if status_update.status in ["interested", "not_interested", "no_response"]:
         application.candidate_response_date = datetime.utcnow()
     
+    await PipelineStatsService(db).record_application(
+        application.role_id, before, ApplicationStatsEntry.of(application)
+    )
     await db.commit()
     await db.refresh(application)
     
@@ -737,8 +769,12 @@ async def send_message_to_candidate(
     
     # Actualizar estado si es el primer contacto
     if application.stage == ApplicationStage.CONTACT_PENDING:
+        before = ApplicationStatsEntry.of(application)
         application.stage = ApplicationStage.CONTACTED
         application.initial_contact_date = datetime.utcnow()
+        await PipelineStatsService(db).record_application(
+            application.role_id, before, ApplicationStatsEntry.of(application)
+        )
         await db.commit()
     
     # Crear registro de auditoría
@@ -786,6 +822,29 @@ class ScoringRequest(BaseModel):
     force_recalculate: bool = Field(default=False, description="Forzar recálculo incluso si ya existe score")
 
 
+class RoleScoringRequest(BaseModel):
+    """Request para scoring masivo de una vacante con pre-filtro."""
+    required_skills: List[str] = Field(default_factory=list, description="Skills requeridas por la vacante")
+    min_years_experience: float = Field(default=0, ge=0, description="Años mínimos de experiencia")
+    top_k: Optional[int] = Field(default=None, ge=0, le=500, description="Aplicaciones que pasan al LLM (0 = todas)")
+    min_prefilter_score: Optional[float] = Field(default=None, ge=0, le=100, description="Score mínimo del pre-filtro")
+    force_recalculate: bool = Field(default=False, description="Incluir aplicaciones que ya tienen score")
+
+
+class PrefilteredApplication(BaseModel):
+    """Aplicación seleccionada por el pre-filtro."""
+    application_id: UUID
+    prefilter_score: float
+
+
+class RoleScoringResponse(BaseModel):
+    """Resultado del pre-filtro; el scoring con IA corre en background."""
+    role_id: UUID
+    total_applications: int
+    selected: List[PrefilteredApplication]
+    skipped: int
+
+
 # =============================================================================
 # ENDPOINTS DE SCORING CON IA
 # =============================================================================
@@ -855,6 +914,78 @@ async def score_application_with_ai(
         )
 
 
+@router.post("/{application_id}/score/stream")
+async def score_application_with_ai_stream(
+    application_id: UUID,
+    request: Optional[ScoringRequest] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Igual que POST /applications/{id}/score, pero emite la evaluación a
+    medida que el LLM la genera (server-sent events).
+    
+    Eventos: `field` (`{"field": "score", "value": 78}`) por cada campo apenas
+    está completo, `result` con el ScoringResponse final y `error` si falla.
+    Si ya existe score y no se fuerza el recálculo, solo se emite `result`.
+    """
+    result = await db.execute(
+        select(HHApplication).filter(HHApplication.application_id == application_id)
+    )
+    application = result.scalar_one_or_none()
+    
+    if not application:
+        raise HTTPException(status_code=404, detail="Aplicación no encontrada")
+    
+    force = bool(request and request.force_recalculate)
+    existing_score = application.overall_score
+    evaluated_at = application.updated_at or datetime.utcnow()
+    changed_by = getattr(current_user, "email", "system")
+    
+    async def event_stream():
+        if existing_score is not None and not force:
+            yield sse_event("result", ScoringResponse(
+                application_id=application_id,
+                score=float(existing_score),
+                justification="Score previamente calculado. Use force_recalculate=true para recalcular.",
+                skill_match={},
+                experience_match={},
+                seniority_match={},
+                evaluated_at=evaluated_at
+            ).model_dump(mode="json"))
+            return
+        
+        # Sesión propia: la del dependency se cierra al devolver la respuesta
+        async with async_session_maker() as session:
+            async def run(on_field):
+                return await scoring_service.score_application(
+                    application_id=str(application_id),
+                    db=session,
+                    current_user=changed_by,
+                    on_field=on_field
+                )
+            
+            try:
+                async for event, payload in field_events(run):
+                    if event == "result":
+                        payload = ScoringResponse(
+                            application_id=application_id,
+                            score=payload.score,
+                            justification=payload.justification,
+                            skill_match=payload.skill_match,
+                            experience_match=payload.experience_match,
+                            seniority_match=payload.seniority_match,
+                            industry_match=payload.industry_match,
+                            recommendations=payload.recommendations,
+                            evaluated_at=datetime.utcnow()
+                        ).model_dump(mode="json")
+                    yield sse_event(event, payload)
+            except Exception as e:
+                yield sse_event("error", {"detail": f"Error al evaluar con IA: {str(e)}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/{application_id}/score", response_model=ScoringResponse)
 async def get_application_score(
     application_id: UUID,
@@ -891,6 +1022,65 @@ async def get_application_score(
     )
 
 
+@router.post("/score/by-role/{role_id}", response_model=RoleScoringResponse, status_code=status.HTTP_202_ACCEPTED)
+async def score_role_applications(
+    role_id: UUID,
+    request: RoleScoringRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Evalúa con IA las mejores aplicaciones de una vacante.
+    
+    Un pre-filtro vectorizado (skills + años de experiencia de la última
+    extracción de CV) rankea todas las aplicaciones pendientes y solo las
+    top_k se envían al LLM, en background. El resto queda pendiente.
+    """
+    result = await db.execute(
+        select(HHRole).filter(HHRole.role_id == role_id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Vacante no encontrada")
+    
+    selected, prefilter_scores = await scoring_service.prefilter_role_applications(
+        role_id=str(role_id),
+        db=db,
+        required_skills=request.required_skills,
+        min_years_experience=request.min_years_experience,
+        top_k=request.top_k,
+        min_score=request.min_prefilter_score,
+        include_scored=request.force_recalculate
+    )
+    changed_by = getattr(current_user, "email", "system")
+    
+    async def run_scoring():
+        """Scoring secuencial de las aplicaciones seleccionadas."""
+        for application_id in selected:
+            try:
+                async with async_session_maker() as scoring_db:
+                    await scoring_service.score_application(
+                        application_id=application_id,
+                        db=scoring_db,
+                        current_user=changed_by
+                    )
+            except Exception:
+                logger.exception(f"Role scoring failed for application {application_id}")
+    
+    if selected:
+        background_tasks.add_task(run_scoring)
+    
+    return RoleScoringResponse(
+        role_id=role_id,
+        total_applications=len(prefilter_scores),
+        selected=[
+            PrefilteredApplication(application_id=app_id, prefilter_score=prefilter_scores[app_id])
+            for app_id in selected
+        ],
+        skipped=len(prefilter_scores) - len(selected)
+    )
+
+
 # =============================================================================
 # RANKING DE CANDIDATOS POR VACANTE
 # =============================================================================
@@ -924,7 +1114,7 @@ async def get_candidate_ranking(
     role_id: UUID,
     min_score: Optional[float] = Query(None, ge=0, le=100, description="Score mínimo para incluir"),
     max_results: int = Query(50, ge=1, le=100, description="Máximo número de resultados"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -954,9 +1144,10 @@ async def get_candidate_ranking(
     # Ordenar por score descendente (nulls al final)
     query = query.order_by(HHApplication.overall_score.desc().nulls_last())
     
-    # Ejecutar query
-    result = await db.execute(query)
-    applications = result.unique().scalars().all()
+    # Ejecutar query (el ranking no usa datos cifrados del candidato)
+    with deferred_decryption():
+        result = await db.execute(query)
+        applications = result.unique().scalars().all()
     
     # Separar candidatos con y sin score
     ranked_apps = [app for app in applications if app.overall_score is not None]
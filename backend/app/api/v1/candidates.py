@@ -2,14 +2,18 @@
 Core ATS API - HHCandidates Router
 Endpoints para gestión de candidatos.
 """
+import re
 from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import or_, select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.blind_index import blind_equals, blind_prefix
 from app.core.deps import get_current_user, validate_uuid
+from app.core.pagination import InvalidCursorError, Keyset, estimate_count
+from app.core.search import matches
 from app.core.authorization import verify_candidate_access
 from app.models import User
 from app.models.core_ats import HHCandidate, HHApplication, HHRole, HHClient
@@ -21,6 +25,31 @@ from app.schemas.core_ats import (
 
 router = APIRouter(prefix="/candidates", tags=["HHCandidates"])
 
+# Búsqueda que parece un teléfono: dígitos y separadores, al menos 7 dígitos
+PHONE_SEARCH = re.compile(r"\+?[\d\s().-]{7,}")
+
+CANDIDATES_KEYSET = Keyset("date", HHCandidate.created_at, HHCandidate.candidate_id)
+
+
+def _search_filter(search: str):
+    """Email (exacto o inicio) y teléfono van por blind index; el resto por search_text."""
+    term = search.strip()
+    if "@" in term:
+        return or_(blind_equals(HHCandidate, "email", term), blind_prefix(HHCandidate, "email", term))
+    if PHONE_SEARCH.fullmatch(term):
+        return blind_equals(HHCandidate, "phone", term)
+    return matches(HHCandidate.search_text, term)
+
+
+async def _national_id_owner(db: AsyncSession, national_id: str) -> Optional[UUID]:
+    """Candidato que ya tiene la cédula/RUT, o None."""
+    result = await db.execute(
+        select(HHCandidate.candidate_id)
+        .where(blind_equals(HHCandidate, "national_id", national_id))
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
 
 @router.post("", response_model=CandidateResponse, status_code=status.HTTP_201_CREATED)
 async def create_candidate(
@@ -29,6 +58,9 @@ async def create_candidate(
     current_user: dict = Depends(get_current_user)
 ):
     """Crear un nuevo candidato."""
+    if candidate.national_id and await _national_id_owner(db, candidate.national_id):
+        raise HTTPException(status_code=400, detail="Ya existe un candidato con esa cédula")
+    
     db_candidate = HHCandidate(**candidate.model_dump())
     db.add(db_candidate)
     await db.commit()
@@ -38,41 +70,59 @@ async def create_candidate(
 
 @router.get("", response_model=CandidateListResponse)
 async def list_candidates(
-    search: Optional[str] = Query(None, description="Buscar por nombre, email o teléfono"),
-    page: int = Query(1, ge=1, description="Número de página"),
+    search: Optional[str] = Query(None, description="Buscar por nombre, ubicación, email (o su inicio) o teléfono"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor de la respuesta anterior)"),
+    include_total: bool = Query(True, description="Incluir el total estimado de resultados"),
+    page: int = Query(1, ge=1, description="Número de página (obsoleto, usar cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Tamaño de página"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Listar candidatos con paginación y búsqueda."""
+    """Listar candidatos (más recientes primero) con paginación por cursor y búsqueda."""
     query = select(HHCandidate)
     
     if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (HHCandidate.full_name.ilike(search_filter)) |
-            (HHCandidate.email.ilike(search_filter)) |
-            (HHCandidate.phone.ilike(search_filter))
-        )
+        query = query.where(_search_filter(search))
     
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total = await estimate_count(db, query) if include_total else None
     
-    # Get paginated results
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    candidates = result.scalars().all()
+    try:
+        result_page = await CANDIDATES_KEYSET.fetch(
+            db, query, cursor, page_size, offset=(page - 1) * page_size
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return CandidateListResponse(
-        items=[CandidateResponse.model_validate(c) for c in candidates],
+        items=[CandidateResponse.model_validate(c) for c in result_page.items],
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=result_page.next_cursor
     )
 
 
+@router.get("/duplicates", response_model=List[CandidateResponse])
+async def find_duplicate_candidates(
+    email: Optional[str] = Query(None, description="Email a verificar"),
+    phone: Optional[str] = Query(None, description="Teléfono a verificar"),
+    national_id: Optional[str] = Query(None, description="Cédula/RUT a verificar"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Candidatos con el mismo email, teléfono o cédula (consulta indexada por blind index)."""
+    filters = [
+        blind_equals(HHCandidate, field, value)
+        for field, value in (("email", email), ("phone", phone), ("national_id", national_id))
+        if value
+    ]
+    if not filters:
+        raise HTTPException(status_code=400, detail="Indicar email, phone o national_id")
+    
+    result = await db.execute(select(HHCandidate).where(or_(*filters)).limit(50))
+    return result.scalars().all()
+
+
 @router.get("/{candidate_id}", response_model=CandidateResponse)
 async def get_candidate(
     candidate_id: str,
@@ -117,6 +167,11 @@ async def update_candidate(
         raise HTTPException(status_code=404, detail="Candidato no encontrado")
     
     update_data = candidate_update.model_dump(exclude_unset=True)
+    if update_data.get("national_id"):
+        owner = await _national_id_owner(db, update_data["national_id"])
+        if owner and owner != candidate_uuid:
+            raise HTTPException(status_code=400, detail="Ya existe un candidato con esa cédula")
+    
     for field, value in update_data.items():
         setattr(db_candidate, field, value)
     
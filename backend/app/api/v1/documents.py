@@ -4,8 +4,6 @@ Endpoints para gestión de documentos/evidencia RAW.
 """
 from typing import Optional
 from uuid import UUID
-import hashlib
-import shutil
 from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
 from fastapi.responses import FileResponse
@@ -15,6 +13,7 @@ from sqlalchemy import select
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.core.config import settings
+from app.core.uploads import UploadSink, UploadTooLargeError
 from app.models.core_ats import HHDocument, HHApplication, HHRole, HHCandidate
 from app.schemas.core_ats import DocumentResponse, DocumentUploadRequest
 
@@ -25,15 +24,6 @@ UPLOAD_DIR = Path(settings.UPLOAD_DIR) if hasattr(settings, 'UPLOAD_DIR') else P
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def compute_sha256(file_path: Path) -> str:
-    """Calcular hash SHA256 de un archivo."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
-
-
 @router.post("/upload", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_document(
     file: UploadFile = File(..., description="Archivo a subir"),
@@ -77,32 +67,56 @@ async def upload_document(
         if not result.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="Candidato no encontrado")
     
-    # Guardar archivo
+    # Recibir archivo: escritura por bloques con hash en la misma pasada
     from datetime import datetime
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     safe_filename = f"{timestamp}_{file.filename.replace(' ', '_')}"
-    file_path = UPLOAD_DIR / safe_filename
-    
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al guardar archivo: {str(e)}")
-    finally:
-        file.file.close()
     
-    # Calcular hash
-    sha256_hash = compute_sha256(file_path)
+    async with UploadSink(UPLOAD_DIR, suffix=Path(safe_filename).suffix) as sink:
+        try:
+            await sink.receive(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Archivo demasiado grande. Máximo: {e.max_size / 1024 / 1024:.0f}MB"
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al guardar archivo: {str(e)}")
+        finally:
+            await file.close()
+        
+        # Duplicados por hash (único en hh_documents), antes de persistir el archivo
+        entity_ids = (
+            UUID(application_id) if application_id else None,
+            UUID(role_id) if role_id else None,
+            UUID(candidate_id) if candidate_id else None,
+        )
+        result = await db.execute(
+            select(HHDocument).where(HHDocument.sha256_hash == sink.sha256)
+        )
+        existing = result.scalar_one_or_none()
+        if existing:
+            # Re-subida del mismo archivo para las mismas entidades: idempotente
+            if existing.doc_type == doc_type and (
+                existing.application_id, existing.role_id, existing.candidate_id
+            ) == entity_ids:
+                return existing
+            raise HTTPException(
+                status_code=409,
+                detail=f"El archivo ya existe como documento {existing.document_id}"
+            )
+        
+        storage_uri = str(sink.persist(safe_filename))
     
     # Crear registro en BD
     db_document = HHDocument(
-        application_id=UUID(application_id) if application_id else None,
-        role_id=UUID(role_id) if role_id else None,
-        candidate_id=UUID(candidate_id) if candidate_id else None,
+        application_id=entity_ids[0],
+        role_id=entity_ids[1],
+        candidate_id=entity_ids[2],
         doc_type=doc_type,
         original_filename=file.filename,
-        storage_uri=str(file_path),
-        sha256_hash=sha256_hash,
+        storage_uri=storage_uri,
+        sha256_hash=sink.sha256,
         uploaded_by=current_user.get("email", "system")
     )
     
@@ -11,7 +11,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.decryption import deferred_decryption
 from app.core.deps import get_current_user
 from app.core.authorization import verify_role_access
 from app.models import User
@@ -59,7 +60,7 @@ async def list_roles(
     seniority: Optional[str] = Query(None, description="Filtrar por seniority"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Listar vacantes con filtros y paginación."""
@@ -221,7 +222,7 @@ async def delete_role(
 async def get_role_applications(
     role_id: UUID,
     stage: Optional[str] = Query(None, description="Filtrar por etapa"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Obtener vacante con todas sus aplicaciones."""
@@ -243,8 +244,10 @@ async def get_role_applications(
     if stage:
         apps_query = apps_query.where(HHApplication.stage == stage)
     
-    apps_result = await db.execute(apps_query)
-    applications = apps_result.scalars().all()
+    # El tablero sólo usa IDs y scores: los datos cifrados no se descifran
+    with deferred_decryption():
+        apps_result = await db.execute(apps_query)
+        applications = apps_result.scalars().all()
     
     # Construir respuesta
     role_data = RoleResponse.model_validate(role)
@@ -273,7 +276,7 @@ async def get_role_applications(
 async def get_role_terna(
     role_id: UUID,
     candidate_ids: Optional[List[UUID]] = Query(None, description="IDs de candidatos a comparar"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -306,8 +309,9 @@ async def get_role_terna(
             HHApplication.stage.in_(['terna', 'interview', 'offer'])
         ).order_by(HHApplication.overall_score.desc().nullslast())
     
-    apps_result = await db.execute(apps_query.limit(5))
-    applications = apps_result.scalars().all()
+    with deferred_decryption():
+        apps_result = await db.execute(apps_query.limit(5))
+        applications = apps_result.scalars().all()
     
     # Construir comparación
     candidates_comparison = []
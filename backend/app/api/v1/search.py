@@ -0,0 +1,37 @@
+"""
+Core ATS API - Search Router
+Búsqueda unificada de candidatos, vacantes y ofertas.
+
+Resultados rankeados por relevancia desde los índices trigram de
+search_text (ver SearchService).
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.core.deps import get_current_user
+from app.core.search import MIN_QUERY_LENGTH
+from app.schemas.core_ats import SearchResponse
+from app.services.search_service import DEFAULT_SEARCH_LIMIT, SearchService
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=200, description="Texto a buscar"),
+    types: Optional[List[str]] = Query(None, description="Tipos a incluir: candidate, role, job (todos por defecto)"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Búsqueda por nombre, cargo, ubicación o departamento.
+    Tolera tildes, mayúsculas y errores de tipeo menores.
+    """
+    try:
+        items = await SearchService(db).search(q, types, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SearchResponse(query=q, items=items)
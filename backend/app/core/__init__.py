@@ -11,7 +11,14 @@ from app.core.auth import (
     get_password_hash,
 )
 from app.core.security_logging import SecurityLogger
-from app.core.cache import cache, cached, invalidate_config_cache, invalidate_job_cache, invalidate_candidate_cache
+from app.core.cache import (
+    cache,
+    cached,
+    invalidate_config_cache,
+    invalidate_job_cache,
+    invalidate_candidate_cache,
+    CANDIDATES_LIST_TAG,
+)
 
 __all__ = [
     "settings",
@@ -35,4 +42,5 @@ __all__ = [
     "invalidate_config_cache",
     "invalidate_job_cache",
     "invalidate_candidate_cache",
+    "CANDIDATES_LIST_TAG",
 ]
@@ -0,0 +1,181 @@
+"""
+Blind index para columnas cifradas (EncryptedType).
+
+Fernet es aleatorizado: el mismo email cifrado dos veces da textos
+distintos, así que sobre la columna cifrada no se puede comparar por
+igualdad, indexar ni imponer unicidad, y cada verificación de duplicados
+terminaba descifrando filas en Python. Junto a cada columna cifrada
+buscable se guarda `<campo>_bidx`: HMAC-SHA256 (con clave propia y
+separada por tabla/campo) del valor normalizado. La igualdad se resuelve
+con un índice B-tree sobre ese hash sin exponer el valor.
+
+Para búsquedas por prefijo (autocompletar) un campo puede guardar además
+`<campo>_bidx_prefixes`: el HMAC de cada prefijo desde `prefix_min`
+caracteres, consultado por contención con un índice GIN.
+
+Las columnas se mantienen en cada INSERT/UPDATE del ORM
+(register_blind_index); las escrituras con insert()/update() de Core deben
+usar blind_index_values.
+"""
+import hashlib
+import hmac
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, false
+
+from app.core.config import settings
+
+BLIND_INDEX_SUFFIX = "_bidx"
+PREFIX_SUFFIX = "_bidx_prefixes"
+
+# Dígitos finales que identifican un teléfono (número nacional chileno);
+# así +56 9 1234 5678 y 912345678 comparten blind index
+PHONE_MATCH_DIGITS = 9
+
+# Largo máximo de prefijo indexado
+MAX_PREFIX_LENGTH = 32
+
+
+# =============================================================================
+# NORMALIZACIÓN
+# =============================================================================
+
+def normalize_email(value: str) -> str:
+    return value.strip().lower()
+
+
+def normalize_phone(value: str) -> str:
+    digits = "".join(c for c in value if c.isdigit())
+    return digits[-PHONE_MATCH_DIGITS:]
+
+
+def normalize_national_id(value: str) -> str:
+    """RUT/cédula sin puntos, guiones ni espacios y con K mayúscula."""
+    return re.sub(r"[\s.\-]", "", value).upper()
+
+
+# =============================================================================
+# HMAC
+# =============================================================================
+
+def _master_key() -> bytes:
+    """Clave de los blind index; separada de la de cifrado si se configura."""
+    key = settings.BLIND_INDEX_KEY or settings.ENCRYPTION_KEY or settings.SECRET_KEY
+    return hmac.new(key.encode(), b"blind-index", hashlib.sha256).digest()
+
+
+def _field_key(scope: str) -> bytes:
+    # Clave distinta por tabla.campo: el mismo valor no coincide entre columnas
+    return hmac.new(_master_key(), scope.encode(), hashlib.sha256).digest()
+
+
+def compute_blind_index(scope: str, normalized: str) -> str:
+    """HMAC-SHA256 hex de un valor ya normalizado."""
+    return hmac.new(_field_key(scope), normalized.encode(), hashlib.sha256).hexdigest()
+
+
+# =============================================================================
+# REGISTRO POR MODELO
+# =============================================================================
+
+@dataclass(frozen=True)
+class BlindIndex:
+    """Blind index de un campo cifrado."""
+    scope: str
+    normalizer: Callable[[str], str]
+    prefix_min: Optional[int] = None
+
+    def token(self, value: Optional[str]) -> Optional[str]:
+        """Hash del valor completo (None si está vacío tras normalizar)."""
+        if value is None:
+            return None
+        normalized = self.normalizer(str(value))
+        return compute_blind_index(self.scope, normalized) if normalized else None
+
+    def prefix_token(self, prefix: str) -> Optional[str]:
+        """Hash de un prefijo de búsqueda (None si es demasiado corto)."""
+        normalized = self.normalizer(prefix)[:MAX_PREFIX_LENGTH]
+        if not self.prefix_min or len(normalized) < self.prefix_min:
+            return None
+        return compute_blind_index(f"{self.scope}:prefix", normalized)
+
+    def prefix_tokens(self, value: Optional[str]) -> Optional[List[str]]:
+        """Hashes de todos los prefijos indexables del valor."""
+        if value is None or not self.prefix_min:
+            return None
+        normalized = self.normalizer(str(value))[:MAX_PREFIX_LENGTH]
+        return [
+            compute_blind_index(f"{self.scope}:prefix", normalized[:length])
+            for length in range(self.prefix_min, len(normalized) + 1)
+        ] or None
+
+
+_BLIND_INDEXES: Dict[Tuple[type, str], BlindIndex] = {}
+
+
+def get_blind_index(model, field: str) -> BlindIndex:
+    try:
+        return _BLIND_INDEXES[(model, field)]
+    except KeyError:
+        raise ValueError(f"{model.__name__}.{field} no tiene blind index") from None
+
+
+def blind_index_values(model, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Columnas blind index de un dict de valores (para insert() de Core)."""
+    extra = {}
+    for (registered, field), index in _BLIND_INDEXES.items():
+        if registered is model and field in values:
+            extra[field + BLIND_INDEX_SUFFIX] = index.token(values[field])
+            if index.prefix_min:
+                extra[field + PREFIX_SUFFIX] = index.prefix_tokens(values[field])
+    return extra
+
+
+def register_blind_index(
+    model,
+    field: str,
+    normalizer: Callable[[str], str],
+    prefix_min: Optional[int] = None
+) -> None:
+    """Mantiene `<field>_bidx` (y los prefijos si prefix_min) en cada flush.
+
+    El modelo debe declarar las columnas; se valida aquí.
+    """
+    columns = [field + BLIND_INDEX_SUFFIX] + ([field + PREFIX_SUFFIX] if prefix_min else [])
+    for column in columns:
+        if column not in model.__table__.c:
+            raise ValueError(f"{model.__name__} no declara la columna {column}")
+
+    index = BlindIndex(f"{model.__tablename__}.{field}", normalizer, prefix_min)
+    _BLIND_INDEXES[(model, field)] = index
+
+    def update_blind_index(mapper, connection, target):
+        value = getattr(target, field)
+        setattr(target, field + BLIND_INDEX_SUFFIX, index.token(value))
+        if prefix_min:
+            setattr(target, field + PREFIX_SUFFIX, index.prefix_tokens(value))
+
+    event.listen(model, "before_insert", update_blind_index)
+    event.listen(model, "before_update", update_blind_index)
+
+
+# =============================================================================
+# CONSULTAS
+# =============================================================================
+
+def blind_equals(model, field: str, value: Optional[str]):
+    """Predicado de igualdad sobre un campo cifrado (índice B-tree)."""
+    token = get_blind_index(model, field).token(value)
+    if token is None:
+        return false()
+    return getattr(model, field + BLIND_INDEX_SUFFIX) == token
+
+
+def blind_prefix(model, field: str, prefix: Optional[str]):
+    """Predicado "empieza por" sobre un campo cifrado (índice GIN)."""
+    token = get_blind_index(model, field).prefix_token(prefix or "")
+    if token is None:
+        return false()
+    return getattr(model, field + PREFIX_SUFFIX).contains([token])
@@ -1,17 +1,38 @@
-"""Sistema de caching con Redis."""
+"""Sistema de caching con Redis (con L1 en memoria por proceso)."""
 import json
+import uuid
 import redis.asyncio as redis
-from typing import Optional, Any, Union
+from redis.exceptions import ResponseError
+from typing import Optional, Any, Union, List, Iterable
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.core.local_cache import MISSING, create_local_cache, get_invalidation_bus
+from app.metrics import track_cache_lookup, cache_l1_entries
 
 
 class Cache:
-    """Cliente de cache Redis para la aplicación."""
+    """
+    Cliente de cache Redis para la aplicación.
+    
+    Las lecturas pasan primero por un L1 en memoria (LRU + TTL corto);
+    las escrituras y borrados se propagan al L1 de los demás workers
+    mediante Redis pub/sub.
+    
+    Las claves pueden registrarse en uno o más tags (sets de Redis) para
+    invalidarlas en bloque sin recorrer el keyspace.
+    """
     
-    def __init__(self):
+    # Prefijo de los sets de Redis que agrupan claves por tag
+    TAG_PREFIX = "cache:tag:"
+    
+    # Claves borradas por round-trip al invalidar
+    INVALIDATION_BATCH_SIZE = 500
+    
+    def __init__(self, name: str = "app"):
+        self.name = name
         self._redis: Optional[redis.Redis] = None
+        self._l1 = create_local_cache(name)
     
     async def _get_redis(self) -> redis.Redis:
         """Obtener o crear conexión Redis lazy."""
@@ -21,16 +42,41 @@ class Cache:
                 encoding="utf-8",
                 decode_responses=True
             )
+        if self._l1 is not None:
+            get_invalidation_bus().ensure_started()
         return self._redis
     
+    def _l1_store(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Guarda en L1 y actualiza el gauge de tamaño."""
+        if self._l1 is None:
+            return
+        self._l1.set(key, value, ttl)
+        cache_l1_entries.labels(cache=self.name).set(len(self._l1))
+    
+    async def _publish_invalidation(self, r: redis.Redis, op: str, arg: Any = ""):
+        """Avisa a los demás workers que descarten su copia L1."""
+        if self._l1 is None:
+            return
+        bus = get_invalidation_bus()
+        await r.publish(bus.channel, bus.message(self.name, op, arg))
+    
     async def get(self, key: str) -> Optional[Any]:
-        """Obtener valor del cache."""
+        """Obtener valor del cache (L1 primero, luego Redis)."""
+        if self._l1 is not None:
+            value = self._l1.get(key)
+            track_cache_lookup(self.name, "l1", value is not MISSING)
+            if value is not MISSING:
+                return value
+        
         try:
             r = await self._get_redis()
             value = await r.get(key)
+            track_cache_lookup(self.name, "redis", value is not None)
             if value is None:
                 return None
-            return json.loads(value)
+            decoded = json.loads(value)
+            self._l1_store(key, decoded)
+            return decoded
         except Exception:
             # Fallback: si Redis falla, retornar None (cache miss)
             return None
@@ -40,7 +86,8 @@ class Cache:
         key: str, 
         value: Any, 
         ttl: int = 300,
-        nx: bool = False
+        nx: bool = False,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
         """
         Guardar valor en cache.
@@ -50,34 +97,123 @@ class Cache:
             value: Valor a guardar (debe ser JSON serializable)
             ttl: Tiempo de vida en segundos (default: 5 minutos)
             nx: Solo setear si no existe
+            tags: Tags a los que se asocia la clave (ver invalidate_tags)
         """
         try:
             r = await self._get_redis()
             serialized = json.dumps(value, default=str)
-            await r.set(key, serialized, ex=ttl, nx=nx)
+            if self._l1 is None and not tags:
+                await r.set(key, serialized, ex=ttl, nx=nx)
+                return True
+            
+            pipe = r.pipeline(transaction=False)
+            pipe.set(key, serialized, ex=ttl, nx=nx)
+            for tag in tags or ():
+                tag_key = f"{self.TAG_PREFIX}{tag}"
+                pipe.sadd(tag_key, key)
+                # El set vive al menos tanto como la clave más longeva
+                pipe.expire(tag_key, ttl, nx=True)
+                pipe.expire(tag_key, ttl, gt=True)
+            await self._publish_invalidation(pipe, "key", key)
+            written = (await pipe.execute())[0]
+            if self._l1 is None:
+                return True
+            if written:
+                # Guardamos la versión serializada para que el L1 no comparta
+                # referencias con el objeto del caller.
+                self._l1_store(key, json.loads(serialized), ttl)
             return True
         except Exception:
             return False
     
     async def delete(self, key: str) -> bool:
         """Eliminar una clave del cache."""
+        if self._l1 is not None:
+            self._l1.delete(key)
         try:
             r = await self._get_redis()
-            await r.delete(key)
+            if self._l1 is None:
+                await r.delete(key)
+                return True
+            
+            pipe = r.pipeline(transaction=False)
+            pipe.delete(key)
+            await self._publish_invalidation(pipe, "key", key)
+            await pipe.execute()
             return True
         except Exception:
             return False
     
+    async def _unlink_batch(self, r: redis.Redis, keys: List[str]) -> int:
+        """Elimina un lote de claves en un solo round-trip y avisa a los L1."""
+        if self._l1 is not None:
+            for key in keys:
+                self._l1.delete(key)
+        pipe = r.pipeline(transaction=False)
+        pipe.unlink(*keys)
+        await self._publish_invalidation(pipe, "keys", keys)
+        return (await pipe.execute())[0]
+    
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Eliminar todas las claves registradas en los tags indicados.
+        
+        El set del tag se renombra antes de recorrerlo, así las claves que se
+        cacheen durante la invalidación quedan en un set nuevo y no se pierden.
+        El coste es proporcional al número de claves afectadas.
+        
+        Returns:
+            Número de claves eliminadas
+        """
+        deleted = 0
+        try:
+            r = await self._get_redis()
+            for tag in tags:
+                tag_key = f"{self.TAG_PREFIX}{tag}"
+                draining_key = f"{tag_key}:invalidating:{uuid.uuid4().hex}"
+                try:
+                    await r.rename(tag_key, draining_key)
+                except ResponseError:
+                    # El tag no existe: nada que invalidar
+                    continue
+                
+                batch: List[str] = []
+                async for key in r.sscan_iter(draining_key, count=self.INVALIDATION_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= self.INVALIDATION_BATCH_SIZE:
+                        deleted += await self._unlink_batch(r, batch)
+                        batch = []
+                if batch:
+                    deleted += await self._unlink_batch(r, batch)
+                await r.unlink(draining_key)
+            return deleted
+        except Exception:
+            return deleted
+    
     async def delete_pattern(self, pattern: str) -> int:
-        """Eliminar todas las claves que coincidan con el patrón."""
+        """
+        Eliminar todas las claves que coincidan con el patrón.
+        
+        Usa SCAN (no bloquea Redis), pero su coste sigue siendo proporcional
+        al tamaño del keyspace: preferir invalidate_tags cuando sea posible.
+        """
+        if self._l1 is not None:
+            self._l1.delete_pattern(pattern)
+        deleted = 0
         try:
             r = await self._get_redis()
-            keys = await r.keys(pattern)
-            if keys:
-                return await r.delete(*keys)
-            return 0
+            await self._publish_invalidation(r, "pattern", pattern)
+            batch: List[str] = []
+            async for key in r.scan_iter(match=pattern, count=self.INVALIDATION_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= self.INVALIDATION_BATCH_SIZE:
+                    deleted += await r.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await r.unlink(*batch)
+            return deleted
         except Exception:
-            return 0
+            return deleted
     
     async def exists(self, key: str) -> bool:
         """Verificar si una clave existe en el cache."""
@@ -89,9 +225,18 @@ class Cache:
     
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """Incrementar contador atómico."""
+        if self._l1 is not None:
+            self._l1.delete(key)
         try:
             r = await self._get_redis()
-            return await r.incrby(key, amount)
+            if self._l1 is None:
+                return await r.incrby(key, amount)
+            
+            pipe = r.pipeline(transaction=False)
+            pipe.incrby(key, amount)
+            await self._publish_invalidation(pipe, "key", key)
+            value, _ = await pipe.execute()
+            return value
         except Exception:
             return None
     
@@ -123,7 +268,7 @@ cache = Cache()
 
 
 # Helper decorators para uso común
-def cached(ttl: int = 300, key_prefix: str = ""):
+def cached(ttl: int = 300, key_prefix: str = "", tags: Optional[List[str]] = None):
     """
     Decorator para cachear resultados de funciones async.
     
@@ -131,6 +276,10 @@ def cached(ttl: int = 300, key_prefix: str = ""):
         @cached(ttl=600, key_prefix="user")
         async def get_user(user_id: str):
             return await db.get_user(user_id)
+        
+        @cached(ttl=60, key_prefix="candidates:list", tags=[CANDIDATES_LIST_TAG])
+        async def list_candidates_page(...):
+            ...
     """
     def decorator(func):
         async def wrapper(*args, **kwargs):
@@ -144,12 +293,16 @@ def cached(ttl: int = 300, key_prefix: str = ""):
             
             # Ejecutar función y cachear resultado
             result = await func(*args, **kwargs)
-            await cache.set(cache_key, result, ttl=ttl)
+            await cache.set(cache_key, result, ttl=ttl, tags=tags)
             return result
         return wrapper
     return decorator
 
 
+# Tag de los totales cacheados del listado de candidatos (ver estimate_count)
+CANDIDATES_LIST_TAG = "candidates:list"
+
+
 # Helpers para invalidación de cache
 async def invalidate_config_cache(category: str, key: str):
     """Invalidar cache de configuración específica."""
@@ -157,14 +310,13 @@ async def invalidate_config_cache(category: str, key: str):
 
 
 async def invalidate_job_cache(job_id: str = None):
-    """Invalidar cache de jobs."""
+    """Invalidar cache de jobs (los listados de jobs no se cachean)."""
     if job_id:
         await cache.delete(f"job:{job_id}")
-    await cache.delete_pattern("jobs:list:*")
 
 
 async def invalidate_candidate_cache(candidate_id: str = None):
     """Invalidar cache de candidatos."""
     if candidate_id:
         await cache.delete(f"candidate:{candidate_id}")
-    await cache.delete_pattern("candidates:list:*")
+    await cache.invalidate_tags(CANDIDATES_LIST_TAG)
@@ -1,52 +1,180 @@
 """Base de datos y sesiones."""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import TypeDecorator, Text
-from typing import Optional
+from sqlalchemy import TypeDecorator, Text, text
+from typing import Awaitable, Callable, List, Optional
 
 from app.core.config import settings
+from app.core.decryption import LazyDecrypted, decrypt, is_deferred
 from app.core.security import encryption_manager
+from app.metrics import track_read_routing, track_replica_lag
+
+logger = logging.getLogger(__name__)
 
 # Convertir URL sync a async
-DATABASE_URL = settings.DATABASE_URL
-if DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
-
-# Configurar conexiones SSL/TLS
-# El parámetro ssl=require fuerza conexiones cifradas
-connect_args = {}
-if "?ssl=require" in DATABASE_URL or "&ssl=require" in DATABASE_URL:
-    # ssl=require ya está en la URL
-    pass
-else:
-    # Añadir parámetros SSL por defecto en producción
-    if settings.ENVIRONMENT == "production":
-        if "?" in DATABASE_URL:
-            DATABASE_URL = f"{DATABASE_URL}&ssl=require"
-        else:
-            DATABASE_URL = f"{DATABASE_URL}?ssl=require"
-
-engine = create_async_engine(
-    DATABASE_URL,
-    pool_size=10,              # Conexiones mantenidas permanentemente
-    max_overflow=20,           # Conexiones adicionales bajo carga
-    pool_timeout=30,           # Segundos esperando conexión disponible
-    pool_recycle=1800,         # Reciclar conexiones cada 30 minutos
-    echo=settings.DEBUG,
-    future=True,
-    # Configuración de SSL solo en producción
-    connect_args={
-        "ssl": True,
-        "server_settings": {
-            "jit": "off",  # Desactivar JIT para evitar problemas de compatibilidad
-        }
-    } if settings.ENVIRONMENT == "production" else {}
-)
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    
+    # Configurar conexiones SSL/TLS
+    # El parámetro ssl=require fuerza conexiones cifradas
+    if "?ssl=require" in url or "&ssl=require" in url:
+        # ssl=require ya está en la URL
+        pass
+    elif settings.ENVIRONMENT == "production" and url.startswith("postgresql"):
+        # Añadir parámetros SSL por defecto en producción
+        url = f"{url}&ssl=require" if "?" in url else f"{url}?ssl=require"
+    return url
+
+
+def _create_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    pool_args = {}
+    if url.startswith("postgresql"):
+        pool_args = dict(
+            pool_size=pool_size,        # Conexiones mantenidas permanentemente
+            max_overflow=max_overflow,  # Conexiones adicionales bajo carga
+            pool_timeout=30,            # Segundos esperando conexión disponible
+            pool_recycle=1800,          # Reciclar conexiones cada 30 minutos
+        )
+    return create_async_engine(
+        url,
+        **pool_args,
+        echo=settings.DEBUG,
+        future=True,
+        # Configuración de SSL solo en producción
+        connect_args={
+            "ssl": True,
+            "server_settings": {
+                "jit": "off",  # Desactivar JIT para evitar problemas de compatibilidad
+            }
+        } if settings.ENVIRONMENT == "production" and url.startswith("postgresql") else {}
+    )
+
+
+DATABASE_URL = _async_url(settings.DATABASE_URL)
+
+engine = _create_engine(DATABASE_URL, pool_size=10, max_overflow=20)
 
 async_session_maker = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+# =============================================================================
+# RÉPLICAS DE LECTURA
+# =============================================================================
+
+# Lag de replicación en segundos (0 si la réplica está al día o si no es una
+# réplica en recuperación)
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Timeout de la consulta de lag (una réplica caída no debe frenar requests)
+REPLICA_CHECK_TIMEOUT = 2.0
+
+
+async def replica_lag(replica_engine: AsyncEngine) -> float:
+    """Lag de replicación de una réplica, en segundos."""
+    async with replica_engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            # Stand-in sin replicación (SQLite en desarrollo/tests)
+            return 0.0
+        result = await conn.execute(text(REPLICA_LAG_SQL))
+        return float(result.scalar() or 0)
+
+
+@dataclass
+class Replica:
+    """Réplica de lectura y su último lag medido."""
+    name: str
+    engine: AsyncEngine
+    session_maker: sessionmaker
+    lag: Optional[float] = None       # None = inalcanzable o sin medir
+    checked_at: float = float("-inf")
+
+
+class ReplicaRouter:
+    """Reparte lecturas entre réplicas con lag aceptable.
+
+    El lag de cada réplica se mide como máximo cada `check_interval`
+    segundos; una réplica atrasada más de `max_lag` o inalcanzable queda
+    fuera hasta la siguiente medición. Sin réplicas sanas se usa la
+    primaria.
+    """
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        max_lag: float,
+        check_interval: float,
+        probe: Callable[[AsyncEngine], Awaitable[float]] = replica_lag
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._probe = probe
+        self._turn = itertools.count()
+
+    async def _check(self, replica: Replica) -> None:
+        # Marcar antes de medir: requests concurrentes usan la medición previa
+        replica.checked_at = time.monotonic()
+        try:
+            replica.lag = await asyncio.wait_for(self._probe(replica.engine), REPLICA_CHECK_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Réplica {replica.name} no disponible: {e}")
+            replica.lag = None
+        track_replica_lag(replica.name, replica.lag)
+
+    async def healthy_replicas(self) -> List[Replica]:
+        now = time.monotonic()
+        for replica in self.replicas:
+            if now - replica.checked_at >= self.check_interval:
+                await self._check(replica)
+        return [r for r in self.replicas if r.lag is not None and r.lag <= self.max_lag]
+
+    async def session_maker(self) -> sessionmaker:
+        """Sesiones de una réplica sana (round-robin) o de la primaria."""
+        healthy = await self.healthy_replicas()
+        if not healthy:
+            track_read_routing("primary")
+            return async_session_maker
+        replica = healthy[next(self._turn) % len(healthy)]
+        track_read_routing(replica.name)
+        return replica.session_maker
+
+
+def _create_replicas() -> List[Replica]:
+    replicas = []
+    for index, url in enumerate(settings.get_replica_urls(), start=1):
+        replica_engine = _create_engine(
+            _async_url(url),
+            pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+            max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+        )
+        replicas.append(Replica(
+            name=f"replica{index}",
+            engine=replica_engine,
+            session_maker=sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False),
+        ))
+    return replicas
+
+
+read_router = ReplicaRouter(
+    _create_replicas(),
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL,
+)
+
 Base = declarative_base()
 
 
@@ -57,6 +185,9 @@ class EncryptedType(TypeDecorator):
     Uso:
         email = Column(EncryptedType)
         phone = Column(EncryptedType)
+    
+    Dentro de deferred_decryption() los valores leídos son LazyDecrypted
+    (ver app/core/decryption.py).
     """
     impl = Text
     cache_ok = True
@@ -65,17 +196,18 @@ class EncryptedType(TypeDecorator):
         """Encriptar antes de guardar en BD."""
         if value is None:
             return None
+        if isinstance(value, LazyDecrypted):
+            # Valor leído y no modificado: se reescribe el mismo texto cifrado
+            return value.ciphertext
         return encryption_manager.encrypt(str(value))
     
     def process_result_value(self, value: Optional[str], dialect) -> Optional[str]:
         """Desencriptar al leer de BD."""
         if value is None:
             return None
-        try:
-            return encryption_manager.decrypt(str(value))
-        except Exception:
-            # Si falla el desencriptado, podría ser un valor plano (migración)
-            return value
+        if is_deferred():
+            return LazyDecrypted(str(value))
+        return decrypt(str(value))
 
 
 class EncryptedJSON(TypeDecorator):
@@ -120,9 +252,24 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Dependency de sólo lectura (reportes, auditoría, listados).
+
+    Usa una réplica sana si hay réplicas configuradas; los datos pueden
+    atrasarse hasta DATABASE_REPLICA_MAX_LAG_SECONDS respecto de la
+    primaria. La sesión nunca hace commit.
+    """
+    session_maker = await read_router.session_maker()
+    async with session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
+
+
 async def check_db_connection():
     """Verificar conexión a la base de datos."""
-    from sqlalchemy import text
     async with async_session_maker() as session:
         result = await session.execute(text("SELECT 1"))
         return result.scalar() == 1
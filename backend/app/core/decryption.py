@@ -0,0 +1,195 @@
+"""
+Descifrado diferido de columnas EncryptedType.
+
+Por defecto EncryptedType descifra (Fernet) cada valor al leer la fila,
+aunque la respuesta sólo use el ID y el score (ranking, tablero de
+postulaciones). Dentro de `deferred_decryption()` las columnas cifradas se
+cargan como LazyDecrypted, que descifra en el primer acceso al valor; las
+filas que nunca se leen no pagan el descifrado.
+
+Cada request HTTP tiene un cache de descifrado (decryption_scope, ver el
+middleware en main.py): el mismo texto cifrado se descifra una sola vez
+aunque se cargue en varias consultas. Para páginas que sí necesitan el
+texto plano está reveal_all, que descifra de una vez los campos indicados.
+
+Las llamadas a Fernet se exportan en ats_decryptions_total.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Annotated, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import BeforeValidator
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.security import encryption_manager
+from app.metrics import track_decryption
+
+_deferred: ContextVar[bool] = ContextVar("deferred_decryption", default=False)
+_cache: ContextVar[Optional[Dict[str, str]]] = ContextVar("decryption_cache", default=None)
+
+
+def decrypt(ciphertext: str, mode: str = "eager") -> str:
+    """Descifra un valor usando el cache del request si hay uno activo.
+
+    Args:
+        ciphertext: Texto cifrado tal como está en la BD
+        mode: Origen del descifrado para la métrica (eager, lazy, bulk)
+    """
+    cache = _cache.get()
+    if cache is not None and ciphertext in cache:
+        track_decryption(mode, cached=True)
+        return cache[ciphertext]
+
+    try:
+        plaintext = encryption_manager.decrypt(ciphertext)
+    except Exception:
+        # Si falla el desencriptado, podría ser un valor plano (migración)
+        plaintext = ciphertext
+    track_decryption(mode)
+
+    if cache is not None:
+        cache[ciphertext] = plaintext
+    return plaintext
+
+
+class LazyDecrypted:
+    """Valor cifrado que se descifra en el primer acceso.
+
+    Se comporta como el str descifrado (comparación, hash, len, métodos de
+    str); bool() no descifra porque un texto vacío se guarda vacío.
+    """
+    __slots__ = ("ciphertext", "_plaintext")
+
+    def __init__(self, ciphertext: str):
+        self.ciphertext = ciphertext
+        self._plaintext: Optional[str] = None
+
+    @property
+    def plaintext(self) -> str:
+        if self._plaintext is None:
+            self._plaintext = decrypt(self.ciphertext, "lazy")
+        return self._plaintext
+
+    @property
+    def is_decrypted(self) -> bool:
+        return self._plaintext is not None
+
+    def __str__(self) -> str:
+        return self.plaintext
+
+    def __repr__(self) -> str:
+        # Sin el valor: estos objetos terminan en logs
+        return "LazyDecrypted(...)"
+
+    def __bool__(self) -> bool:
+        return bool(self.ciphertext)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyDecrypted):
+            other = other.plaintext
+        return self.plaintext == other
+
+    def __hash__(self) -> int:
+        return hash(self.plaintext)
+
+    def __len__(self) -> int:
+        return len(self.plaintext)
+
+    def __contains__(self, item) -> bool:
+        return item in self.plaintext
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.plaintext)
+
+    def __getitem__(self, key):
+        return self.plaintext[key]
+
+    def __add__(self, other):
+        return self.plaintext + other
+
+    def __radd__(self, other):
+        return other + self.plaintext
+
+    def __format__(self, spec: str) -> str:
+        return format(self.plaintext, spec)
+
+    def __getattr__(self, name: str):
+        # Métodos de str (lower, strip, ...); nunca atributos privados, que
+        # copy/pickle buscan antes de __init__
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.plaintext, name)
+
+
+def reveal(value):
+    """Texto plano de un LazyDecrypted; cualquier otro valor tal cual."""
+    return value.plaintext if isinstance(value, LazyDecrypted) else value
+
+
+# str en schemas de respuesta que pueden recibir un valor diferido
+DecryptedStr = Annotated[str, BeforeValidator(reveal)]
+
+
+def is_deferred() -> bool:
+    return _deferred.get()
+
+
+@contextmanager
+def deferred_decryption():
+    """Las columnas cifradas leídas dentro del bloque se cargan diferidas.
+
+    El descifrado ocurre al convertir las filas, así que el resultado debe
+    materializarse (scalars().all(), keyset.fetch, ...) dentro del bloque.
+    """
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+@contextmanager
+def decryption_scope():
+    """Cache de descifrado para un request o una tarea (reutiliza el activo)."""
+    if _cache.get() is not None:
+        yield
+        return
+    token = _cache.set({})
+    try:
+        yield
+    finally:
+        _cache.reset(token)
+
+
+def decrypt_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Descifra una lista de textos cifrados, una vez por valor distinto."""
+    seen: Dict[str, str] = {}
+    result = []
+    for value in values:
+        if value is None:
+            result.append(None)
+            continue
+        if value not in seen:
+            seen[value] = decrypt(value, "bulk")
+        result.append(seen[value])
+    return result
+
+
+def reveal_all(instances: Iterable, *fields: str) -> None:
+    """Descifra de una vez los campos diferidos de una página de instancias.
+
+    Reemplaza los LazyDecrypted por el texto plano como valor ya cargado
+    (no marca las instancias como modificadas).
+    """
+    pending = [
+        (instance, field, value)
+        for instance in instances if instance is not None
+        for field in fields
+        for value in [instance.__dict__.get(field)]
+        if isinstance(value, LazyDecrypted)
+    ]
+    plaintexts = decrypt_many(
+        None if value.is_decrypted else value.ciphertext for _, _, value in pending
+    )
+    for (instance, field, value), plaintext in zip(pending, plaintexts):
+        set_committed_value(instance, field, value.plaintext if value.is_decrypted else plaintext)
@@ -0,0 +1,68 @@
+"""
+Cache de extracción direccionado por contenido (SHA-256 del archivo).
+
+El mismo CV se sube una y otra vez (distintas vacantes, distintos
+clientes) y cada subida repetía extracción de texto, OCR y parseo con LLM.
+Aquí los resultados se guardan por hash del archivo:
+
+    extraction:{tipo}:{versión global}:{versión del extractor}:{sha256}
+
+- tipo: "parse" (ParseResult), "data:{document_type}" (datos estructurados),
+  "text" (DocumentProcessor) o "resume" (ResumeParser).
+- versión del extractor: constante VERSION de cada extractor. Al cambiar la
+  lógica se sube y las entradas viejas dejan de leerse (expiran por TTL).
+- versión global (EXTRACTION_CACHE_VERSION): invalida todo de una vez.
+
+Las versiones en la clave son la única invalidación: no se mantienen tags
+(un set por tipo crecería sin límite). Como las entradas contienen datos
+personales de CVs, el TTL es corto (EXTRACTION_CACHE_TTL_SECONDS). Los fallos
+de Redis sólo cuentan como miss: el cache nunca rompe una extracción.
+"""
+import hashlib
+import logging
+from typing import Any, Optional
+
+from app.core.cache import cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 de un archivo, leído por bloques."""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ExtractionCache:
+    """Resultados de extracción por (tipo, versión del extractor, hash del archivo)."""
+
+    PREFIX = "extraction"
+
+    def _key(self, kind: str, version: str, file_hash: str) -> str:
+        return f"{self.PREFIX}:{kind}:{settings.EXTRACTION_CACHE_VERSION}:{version}:{file_hash}"
+
+    async def get(self, kind: str, version: str, file_hash: Optional[str]) -> Optional[Any]:
+        """Resultado cacheado o None (sin hash o con el cache desactivado)."""
+        if not file_hash or not settings.EXTRACTION_CACHE_ENABLED:
+            return None
+        value = await cache.get(self._key(kind, version, file_hash))
+        if value is not None:
+            logger.info(f"Extraction cache hit: {kind} {file_hash[:12]}")
+        return value
+
+    async def set(self, kind: str, version: str, file_hash: Optional[str], value: Any) -> bool:
+        """Guarda un resultado (debe ser serializable a JSON)."""
+        if not file_hash or not settings.EXTRACTION_CACHE_ENABLED:
+            return False
+        return await cache.set(
+            self._key(kind, version, file_hash),
+            value,
+            ttl=settings.EXTRACTION_CACHE_TTL_SECONDS
+        )
+
+
+extraction_cache = ExtractionCache()
@@ -0,0 +1,300 @@
+"""
+Pool de procesos compartido para extracción de texto (PDF, DOCX, OCR).
+
+pdfplumber, python-docx y Tesseract son síncronos y CPU-bound: llamados
+desde un `async def` bloquean el event loop, y un PDF escaneado de 40
+páginas frena todas las requests del worker de uvicorn. Aquí se ejecutan
+en un ProcessPoolExecutor compartido:
+
+- Un proceso por núcleo (EXTRACTION_POOL_WORKERS, 0 = os.cpu_count()).
+- Timeout por documento: SIGALRM dentro del proceso corta la extracción
+  sin matar al worker. Si aun así no responde (bloqueado en código
+  nativo), se terminan los procesos y el pool se recrea.
+- A lo sumo un trabajo en vuelo por proceso: el resto espera su turno en
+  el event loop. Además cada proceso avisa cuándo empieza un trabajo y el
+  plazo para darlo por colgado corre desde ahí: ni la espera en cola ni el
+  arranque o reciclaje de un proceso (que reimporta la app) cuentan.
+- Límite de memoria por proceso (RLIMIT_AS): un documento patológico
+  termina en MemoryError en lugar de tumbar el nodo.
+- Reciclaje: cada proceso se reemplaza tras EXTRACTION_POOL_MAX_TASKS_PER_CHILD
+  documentos, para acotar fugas de las librerías nativas.
+
+Los procesos se crean con "spawn" (hacer fork de un proceso con event
+loop e hilos no es seguro), así que las funciones enviadas deben ser de
+nivel de módulo y sus argumentos/resultados serializables con pickle.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Margen sobre el timeout del documento antes de dar el proceso por colgado
+_HANG_GRACE_SECONDS = 5.0
+
+
+class ExtractionTimeoutError(TimeoutError):
+    """La extracción de un documento superó su timeout."""
+    pass
+
+
+# Cola por la que el proceso avisa (job_id, time.time()) al empezar un trabajo
+_started_queue = None
+
+
+def _init_worker(memory_limit_mb: int, started_queue=None) -> None:
+    """Inicializa un proceso del pool: límite de memoria, señales y aviso de inicio."""
+    global _started_queue
+    _started_queue = started_queue
+    # Ctrl+C lo maneja el proceso principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit_mb > 0:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Could not set extraction worker memory limit: {e}")
+
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeoutError("Extraction timed out")
+
+
+def _run_with_alarm(
+    func: Callable,
+    timeout: Optional[float],
+    args: tuple,
+    kwargs: dict,
+    job_id: Optional[int] = None
+) -> Any:
+    """Ejecuta func dentro del proceso con un SIGALRM como timeout."""
+    if _started_queue is not None and job_id is not None:
+        _started_queue.put((job_id, time.time()))
+    if not timeout or not hasattr(signal, "setitimer"):
+        return func(*args, **kwargs)
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class ExtractionPool:
+    """
+    Ejecuta extracciones bloqueantes en procesos sin bloquear el event loop.
+
+    El pool se crea de forma perezosa en el primer uso y es compartido por
+    todos los servicios del proceso (ver get_extraction_pool).
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None
+    ):
+        self.workers = workers or settings.EXTRACTION_POOL_WORKERS or os.cpu_count() or 1
+        self.timeout = settings.EXTRACTION_TIMEOUT_SECONDS if timeout is None else timeout
+        self.memory_limit_mb = (
+            settings.EXTRACTION_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+        )
+        self.max_tasks_per_child = (
+            settings.EXTRACTION_POOL_MAX_TASKS_PER_CHILD if max_tasks_per_child is None else max_tasks_per_child
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_queue = None
+        # Inicio (time.time() del proceso) de los trabajos en vuelo; None = aún no empieza
+        self._started: Dict[int, Optional[float]] = {}
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        # Un semáforo por event loop (asyncio.Semaphore queda atado a su loop)
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _slots_for(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.workers)
+            return slots
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        return self._acquire()[0]
+
+    def _acquire(self) -> Tuple[ProcessPoolExecutor, Any]:
+        """Executor actual y su cola de avisos de inicio (se crean juntos)."""
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context("spawn")
+                kwargs = {}
+                if self.max_tasks_per_child > 0:
+                    kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+                self._started_queue = context.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb, self._started_queue),
+                    **kwargs
+                )
+                logger.info(f"Extraction pool started with {self.workers} workers")
+            return self._executor, self._started_queue
+
+    def _started_at(self, started_queue, job_id: int) -> Optional[float]:
+        """Lee los avisos pendientes y devuelve cuándo empezó job_id (o None)."""
+        with self._lock:
+            while True:
+                try:
+                    started_id, started = started_queue.get_nowait()
+                except (queue.Empty, OSError, ValueError):
+                    break
+                # Los avisos de trabajos ya terminados se descartan
+                if started_id in self._started:
+                    self._started[started_id] = started
+            return self._started.get(job_id)
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        """Descarta un pool roto o colgado; el próximo uso crea uno nuevo."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        # _processes es interno, pero es la única forma de matar un proceso colgado
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(
+        self,
+        func: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """Ejecuta func(*args, **kwargs) en el pool.
+
+        Args:
+            func: Función de nivel de módulo
+            timeout: Segundos por documento (por defecto EXTRACTION_TIMEOUT_SECONDS; 0 = sin límite)
+
+        Raises:
+            ExtractionTimeoutError: Si la extracción supera el timeout
+            MemoryError: Si el proceso supera su límite de memoria
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        async with self._slots_for(loop):
+            return await self._run_now(loop, func, timeout, args, kwargs)
+
+    async def _run_now(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        func: Callable,
+        timeout: Optional[float],
+        args: tuple,
+        kwargs: dict
+    ) -> Any:
+        """Envía el trabajo con un proceso libre y espera su resultado."""
+        executor, started_queue = self._acquire()
+        job_id = next(self._job_ids)
+        with self._lock:
+            self._started[job_id] = None
+        future = loop.run_in_executor(executor, _run_with_alarm, func, timeout, args, kwargs, job_id)
+        try:
+            if not timeout:
+                return await future
+            return await self._wait_started(future, started_queue, job_id, timeout + _HANG_GRACE_SECONDS)
+        except ExtractionTimeoutError:
+            # Cortada por SIGALRM dentro del proceso: el worker sigue sano
+            raise
+        except asyncio.TimeoutError:
+            # SIGALRM no alcanzó a cortar la extracción: el proceso sigue ocupado
+            logger.error(f"Extraction worker hung in {getattr(func, '__name__', func)}; restarting pool")
+            self._reset(executor)
+            raise ExtractionTimeoutError(f"Extraction timed out after {timeout}s")
+        except BrokenProcessPool:
+            # Un proceso murió (p. ej. OOM killer): recrear el pool
+            logger.error("Extraction pool broken; restarting")
+            self._reset(executor)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            # Consume el aviso de este trabajo para que la cola no se acumule
+            self._started_at(started_queue, job_id)
+            with self._lock:
+                self._started.pop(job_id, None)
+
+    async def _wait_started(
+        self,
+        future: "asyncio.Future",
+        started_queue,
+        job_id: int,
+        limit: float
+    ) -> Any:
+        """Espera el resultado; el plazo `limit` corre desde que el proceso empezó el trabajo.
+
+        Raises:
+            asyncio.TimeoutError: Si el trabajo sigue corriendo `limit` segundos después de empezar
+        """
+        while True:
+            started = self._started_at(started_queue, job_id)
+            if started is None:
+                # Sin aviso todavía (proceso arrancando o reciclándose): volver a mirar luego
+                wait = min(limit, 1.0)
+            else:
+                wait = started + limit - time.time()
+                if wait <= 0:
+                    raise asyncio.TimeoutError()
+            done, _ = await asyncio.wait({future}, timeout=wait)
+            if done:
+                return future.result()
+
+    def shutdown(self) -> None:
+        """Detiene los procesos (al apagar la aplicación)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Pool de extracción compartido del proceso."""
+    global _pool
+    if _pool is None:
+        _pool = ExtractionPool()
+    return _pool
+
+
+async def run_extraction(func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """Atajo para get_extraction_pool().run(...).
+
+    Con EXTRACTION_POOL_ENABLED=false se ejecuta en un hilo (tests, entornos
+    sin multiprocessing): no bloquea el loop pero comparte el GIL.
+    """
+    if not settings.EXTRACTION_POOL_ENABLED:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return await get_extraction_pool().run(func, *args, timeout=timeout, **kwargs)
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.local_cache import MISSING, create_local_cache, get_invalidation_bus
+from app.metrics import track_cache_lookup, cache_l1_entries
 
 
 class LLMCache:
@@ -19,7 +21,7 @@ class LLMCache:
     - Caché por contenido (hash del prompt + job)
     - TTL configurable (default: 24 horas)
     - Invalidación manual por force=True
-    - Tracking de hits/misses
+    - Tracking de hits/misses por nivel (L1 en memoria y Redis)
     """
     
     def __init__(
@@ -32,13 +34,22 @@ class LLMCache:
         self.default_ttl = default_ttl
         self.prefix = prefix
         self._redis: Optional[redis.Redis] = None
+        self._l1 = create_local_cache(prefix)
     
     async def get_redis(self) -> redis.Redis:
         """Obtiene o crea conexión Redis."""
         if self._redis is None:
             self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        if self._l1 is not None:
+            get_invalidation_bus().ensure_started()
         return self._redis
     
+    def _with_cache_metadata(self, data: Dict[str, Any], key: str) -> Dict[str, Any]:
+        """Marca un resultado como proveniente de caché."""
+        data["_cached"] = True
+        data["_cache_key"] = key
+        return data
+    
     def _generate_key(
         self,
         candidate_data: Dict[str, Any],
@@ -98,15 +109,24 @@ class LLMCache:
             Dict con el resultado cacheado o None si no existe
         """
         try:
-            r = await self.get_redis()
             key = self._generate_key(candidate_data, job_data, provider, model)
             
+            if self._l1 is not None:
+                data = self._l1.get(key)
+                track_cache_lookup(self.prefix, "l1", data is not MISSING)
+                if data is not MISSING:
+                    return self._with_cache_metadata(data, key)
+            
+            r = await self.get_redis()
             cached = await r.get(key)
+            track_cache_lookup(self.prefix, "redis", bool(cached))
             if cached:
                 data = json.loads(cached)
-                data["_cached"] = True
-                data["_cache_key"] = key
-                return data
+                if self._l1 is not None:
+                    self._l1.set(key, data)
+                    cache_l1_entries.labels(cache=self.prefix).set(len(self._l1))
+                    data = self._l1.get(key)
+                return self._with_cache_metadata(data, key)
             
             return None
             
@@ -138,12 +158,19 @@ class LLMCache:
             result_to_cache["_cached_at"] = datetime.utcnow().isoformat()
             result_to_cache["_cache_ttl"] = ttl or self.default_ttl
             
-            await r.setex(
-                key,
-                ttl or self.default_ttl,
-                json.dumps(result_to_cache, default=str)
-            )
+            serialized = json.dumps(result_to_cache, default=str)
+            if self._l1 is None:
+                await r.setex(key, ttl or self.default_ttl, serialized)
+                return True
+            
+            bus = get_invalidation_bus()
+            pipe = r.pipeline(transaction=False)
+            pipe.setex(key, ttl or self.default_ttl, serialized)
+            pipe.publish(bus.channel, bus.message(self.prefix, "key", key))
+            await pipe.execute()
             
+            self._l1.set(key, json.loads(serialized), ttl or self.default_ttl)
+            cache_l1_entries.labels(cache=self.prefix).set(len(self._l1))
             return True
             
         except Exception as e:
@@ -160,10 +187,15 @@ class LLMCache:
         """
         Invalida una entrada de caché específica.
         """
+        key = self._generate_key(candidate_data, job_data, provider, model)
+        if self._l1 is not None:
+            self._l1.delete(key)
         try:
             r = await self.get_redis()
-            key = self._generate_key(candidate_data, job_data, provider, model)
             await r.delete(key)
+            if self._l1 is not None:
+                bus = get_invalidation_bus()
+                await r.publish(bus.channel, bus.message(self.prefix, "key", key))
             return True
         except Exception:
             return False
@@ -178,9 +210,14 @@ class LLMCache:
         Returns:
             Número de entradas eliminadas
         """
+        pattern = pattern or f"{self.prefix}:*"
+        if self._l1 is not None:
+            self._l1.delete_pattern(pattern)
         try:
             r = await self.get_redis()
-            pattern = pattern or f"{self.prefix}:*"
+            if self._l1 is not None:
+                bus = get_invalidation_bus()
+                await r.publish(bus.channel, bus.message(self.prefix, "pattern", pattern))
             
             # Buscar keys
             keys = []
@@ -210,6 +247,7 @@ class LLMCache:
             
             return {
                 "cached_entries": count,
+                "l1_entries": len(self._l1) if self._l1 is not None else 0,
                 "prefix": self.prefix,
                 "default_ttl": self.default_ttl
             }
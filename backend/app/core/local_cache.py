@@ -0,0 +1,236 @@
+"""
+Cache en memoria de proceso (L1) delante de Redis.
+
+Cada worker de uvicorn mantiene un LRU acotado con TTL corto para las
+claves más leídas (resultados de matching, evaluaciones LLM). La coherencia
+entre workers se mantiene con Redis pub/sub: cada escritura o borrado
+publica un mensaje de invalidación y los demás workers descartan su copia.
+"""
+import asyncio
+import copy
+import fnmatch
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Canal de Redis para invalidaciones entre workers
+INVALIDATION_CHANNEL = "cache:l1:invalidate"
+
+# Sentinel para distinguir "no está en cache" de un valor None cacheado
+MISSING = object()
+
+
+class LocalCache:
+    """
+    LRU en memoria con TTL por entrada.
+
+    Los valores se guardan ya deserializados para evitar json.loads en cada
+    lectura. Para dicts/lists se devuelve una copia superficial, así los
+    callers pueden añadir claves sin alterar la entrada cacheada.
+    """
+
+    def __init__(self, name: str, max_entries: int = 2048, default_ttl: int = 30):
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Obtiene un valor o MISSING si no existe o expiró."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+
+        self._entries.move_to_end(key)
+        if isinstance(value, (dict, list)):
+            return copy.copy(value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Guarda un valor; el TTL nunca supera el default_ttl del L1."""
+        ttl = min(ttl or self.default_ttl, self.default_ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """Elimina una clave (no falla si no existe)."""
+        self._entries.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Elimina las claves que coinciden con un patrón glob estilo Redis."""
+        keys = [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        """Vacía el cache."""
+        self._entries.clear()
+
+
+class InvalidationBus:
+    """
+    Propaga invalidaciones de L1 entre workers vía Redis pub/sub.
+
+    Cada proceso tiene un node_id propio para ignorar sus propios mensajes.
+    El listener se arranca de forma lazy la primera vez que un cache
+    registrado toca Redis desde un event loop.
+    """
+
+    def __init__(self, redis_url: str = None, channel: str = INVALIDATION_CHANNEL):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.channel = channel
+        self.node_id = uuid.uuid4().hex
+        self._caches: Dict[str, LocalCache] = {}
+        self._redis: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, local_cache: LocalCache):
+        """Registra un LocalCache para recibir invalidaciones remotas."""
+        self._caches[local_cache.name] = local_cache
+
+    def message(self, cache_name: str, op: str, arg: Any = "") -> str:
+        """Serializa un mensaje de invalidación (op: key, keys, pattern, clear)."""
+        return json.dumps({"node": self.node_id, "cache": cache_name, "op": op, "arg": arg})
+
+    def apply(self, raw: str) -> bool:
+        """
+        Aplica un mensaje recibido por el canal.
+
+        Returns:
+            True si el mensaje invalidó algo en este proceso
+        """
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            return False
+
+        if data.get("node") == self.node_id:
+            return False
+
+        local_cache = self._caches.get(data.get("cache"))
+        if local_cache is None:
+            return False
+
+        op, arg = data.get("op"), data.get("arg", "")
+        if op == "key":
+            local_cache.delete(arg)
+        elif op == "keys":
+            for key in arg:
+                local_cache.delete(key)
+        elif op == "pattern":
+            local_cache.delete_pattern(arg)
+        elif op == "clear":
+            local_cache.clear()
+        else:
+            return False
+        return True
+
+    async def publish(self, cache_name: str, op: str, arg: Any = ""):
+        """Publica una invalidación para los demás workers."""
+        try:
+            if self._redis is None:
+                self._redis = redis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.publish(self.channel, self.message(cache_name, op, arg))
+        except Exception as e:
+            logger.warning(f"Error publishing L1 invalidation: {e}")
+
+    def ensure_started(self):
+        """Arranca el listener si hay un event loop activo y no está corriendo."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._listen())
+
+    async def _listen(self):
+        """Consume el canal de invalidación hasta que se cancele la tarea."""
+        while True:
+            client = None
+            try:
+                client = redis.from_url(self.redis_url, decode_responses=True)
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.apply(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Si perdemos la suscripción no podemos garantizar coherencia:
+                # vaciamos los L1 y reintentamos.
+                logger.warning(f"L1 invalidation listener error: {e}")
+                for local_cache in self._caches.values():
+                    local_cache.clear()
+                await asyncio.sleep(1)
+            finally:
+                if client is not None:
+                    try:
+                        await client.close()
+                    except Exception:
+                        pass
+
+    async def stop(self):
+        """Detiene el listener y cierra conexiones."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Singleton por proceso
+_invalidation_bus: Optional[InvalidationBus] = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Obtiene el bus de invalidación del proceso."""
+    global _invalidation_bus
+    if _invalidation_bus is None:
+        _invalidation_bus = InvalidationBus()
+    return _invalidation_bus
+
+
+def create_local_cache(name: str) -> Optional[LocalCache]:
+    """
+    Crea y registra un L1 según la configuración.
+
+    Returns:
+        LocalCache o None si CACHE_L1_ENABLED es False
+    """
+    if not settings.CACHE_L1_ENABLED:
+        return None
+    local_cache = LocalCache(
+        name=name,
+        max_entries=settings.CACHE_L1_MAX_ENTRIES,
+        default_ttl=settings.CACHE_L1_TTL_SECONDS,
+    )
+    get_invalidation_bus().register(local_cache)
+    return local_cache
@@ -0,0 +1,286 @@
+"""
+Paginación keyset (por cursor) para los listados.
+
+Con OFFSET la base de datos recorre y descarta todas las filas previas, así
+que las páginas profundas son cada vez más lentas y, si entran filas nuevas
+entre request y request, se repiten u omiten resultados. Aquí cada página
+continúa "después" de la última fila vista: el cursor guarda el valor de la
+clave de orden y la PK de esa fila, y la siguiente query filtra con
+(clave, pk) < (valor, id), que un índice compuesto resuelve sin recorrer lo
+anterior. La PK desempata claves repetidas (mismo score o misma fecha), así
+que el orden es total y estable.
+
+Los cursores son opacos (JSON en base64 url-safe) e incluyen el nombre del
+orden con que se generaron: un cursor de `score` no sirve para `date`.
+
+El total deja de ser obligatorio: `estimate_count` usa la estimación del
+planner (pg_class.reltuples) cuando no hay filtros y un COUNT exacto
+cacheado unos segundos cuando los hay.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Table, and_, func, or_, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.cache import cache
+
+T = TypeVar("T")
+
+# Segundos que se cachea un COUNT exacto de un listado filtrado
+COUNT_CACHE_TTL = 60
+
+
+class InvalidCursorError(ValueError):
+    """El cursor está mal formado o pertenece a otro orden."""
+    pass
+
+
+# =============================================================================
+# CURSORES
+# =============================================================================
+
+def _dump_value(value: Any) -> Any:
+    """Serializa un valor de clave conservando su tipo."""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"u": str(value)}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _load_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        (tag, raw), = value.items()
+        if tag == "dt":
+            return datetime.fromisoformat(raw)
+        if tag == "d":
+            return date.fromisoformat(raw)
+        if tag == "u":
+            return UUID(raw)
+        if tag == "n":
+            return Decimal(raw)
+        raise ValueError(f"Tipo de cursor desconocido: {tag}")
+    return value
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Codifica el orden y los valores de clave de una fila como cursor."""
+    data = {"s": sort, "k": [_dump_value(v) for v in values]}
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """Decodifica un cursor validando que se generó con el orden `sort`.
+
+    Raises:
+        InvalidCursorError: Si el cursor no se puede leer o es de otro orden
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort:
+            raise InvalidCursorError("El cursor pertenece a otro ordenamiento")
+        return [_load_value(v) for v in data["k"]]
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+
+# =============================================================================
+# KEYSET
+# =============================================================================
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """Una página de resultados y el cursor de la siguiente (si hay)."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+@dataclass(frozen=True)
+class Keyset:
+    """Orden total (clave, pk) de un listado y su paginación por cursor.
+
+    Args:
+        name: Nombre del orden; viaja en el cursor
+        column: Columna de la clave de orden (score, fecha...)
+        pk: Columna de la clave primaria (desempate)
+        descending: Orden descendente (la pk sigue el mismo sentido)
+        nullable: La clave admite NULL; los NULL van al final. Por defecto
+            se toma de la definición de la columna.
+    """
+    name: str
+    column: Any
+    pk: Any
+    descending: bool = True
+    nullable: Optional[bool] = None
+
+    @property
+    def _nullable(self) -> bool:
+        if self.nullable is not None:
+            return self.nullable
+        return bool(getattr(self.column, "nullable", False))
+
+    def order_by(self) -> Tuple[Any, Any]:
+        """Cláusulas ORDER BY (clave, pk) consistentes con `after`."""
+        if self.descending:
+            key, pk = self.column.desc(), self.pk.desc()
+        else:
+            key, pk = self.column.asc(), self.pk.asc()
+        if self._nullable:
+            key = key.nulls_last()
+        return key, pk
+
+    def after(self, value: Any, pk_value: Any):
+        """Predicado "fila posterior a (value, pk_value)" en este orden.
+
+        Sin NULL es una comparación de tuplas, que PostgreSQL resuelve como
+        un rango sobre el índice (clave, pk). Con NULL al final:
+        la clave NULL va después de cualquier valor, y entre NULL solo
+        desempata la pk.
+        """
+        beyond = (lambda a, b: a < b) if self.descending else (lambda a, b: a > b)
+
+        if not self._nullable:
+            return beyond(tuple_(self.column, self.pk), tuple_(value, pk_value))
+        if value is None:
+            return and_(self.column.is_(None), beyond(self.pk, pk_value))
+        return or_(
+            beyond(self.column, value),
+            and_(self.column == value, beyond(self.pk, pk_value)),
+            self.column.is_(None),
+        )
+
+    def values_of(self, item: Any) -> Tuple[Any, Any]:
+        """Valores (clave, pk) de una fila u objeto ORM."""
+        return getattr(item, self.column.key), getattr(item, self.pk.key)
+
+    def cursor_for(self, item: Any) -> str:
+        """Cursor que continúa después de `item`."""
+        return encode_cursor(self.name, self.values_of(item))
+
+    def apply(self, query: Select, cursor: Optional[str], limit: int) -> Select:
+        """Ordena la query, la posiciona después del cursor y la limita.
+
+        Raises:
+            InvalidCursorError: Si el cursor no es de este orden
+        """
+        query = query.order_by(None).order_by(*self.order_by())
+        if cursor:
+            values = decode_cursor(cursor, self.name)
+            if len(values) != 2:
+                raise InvalidCursorError("Cursor inválido")
+            value, pk_value = values
+            query = query.where(self.after(value, pk_value))
+        return query.limit(limit)
+
+    def next_cursor(self, items: Sequence[Any], limit: int) -> Optional[str]:
+        """Cursor de la siguiente página para servicios que devuelven listas.
+
+        Sin pedir una fila extra no se sabe si quedan más: una página
+        completa devuelve cursor y, en el peor caso, la siguiente viene vacía.
+        """
+        if items and len(items) >= limit:
+            return self.cursor_for(items[-1])
+        return None
+
+    async def fetch(
+        self,
+        db: AsyncSession,
+        query: Select,
+        cursor: Optional[str],
+        limit: int,
+        offset: int = 0,
+        unique: bool = False,
+    ) -> KeysetPage:
+        """Ejecuta una página pidiendo limit + 1 filas para saber si hay más.
+
+        Args:
+            offset: Solo para clientes que aún paginan por número de página;
+                se ignora si viene cursor.
+            unique: Deduplicar entidades (queries con joinedload de colecciones)
+        """
+        query = self.apply(query, cursor, limit + 1)
+        if offset and not cursor:
+            query = query.offset(offset)
+
+        result = await db.execute(query)
+        if unique:
+            result = result.unique()
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            # La siguiente página continúa después del último item devuelto
+            next_cursor = self.cursor_for(items[-1])
+        return KeysetPage(items=items, next_cursor=next_cursor)
+
+
+# =============================================================================
+# TOTALES
+# =============================================================================
+
+def _count_cache_key(query: Select) -> str:
+    compiled = query.compile(dialect=postgresql.dialect())
+    params = json.dumps(compiled.params, sort_keys=True, default=str)
+    digest = hashlib.sha1(f"{compiled}|{params}".encode()).hexdigest()
+    return f"count:{digest}"
+
+
+async def estimate_count(
+    db: AsyncSession,
+    query: Select,
+    ttl: int = COUNT_CACHE_TTL,
+    tags: Optional[Iterable[str]] = None,
+) -> int:
+    """Total aproximado de filas de un listado.
+
+    - Sin filtros: pg_class.reltuples (estimación del último ANALYZE, O(1)).
+    - Con filtros: COUNT exacto, cacheado `ttl` segundos por query y
+      parámetros, así que puede atrasarse unos segundos. Con `tags`, los
+      totales se invalidan antes al escribir (p. ej. CANDIDATES_LIST_TAG).
+    """
+    query = query.order_by(None).limit(None).offset(None)
+
+    froms = query.get_final_froms()
+    if query.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": froms[0].fullname},
+        )
+        estimate = result.scalar()
+        # -1 / 0: la tabla nunca se analizó, se cuenta de verdad
+        if estimate and estimate > 0:
+            return int(estimate)
+
+    key = _count_cache_key(query)
+    cached_total = await cache.get(key)
+    if cached_total is not None:
+        return int(cached_total)
+
+    result = await db.execute(select(func.count()).select_from(query.subquery()))
+    total = result.scalar() or 0
+    await cache.set(key, total, ttl=ttl, tags=tags)
+    return total
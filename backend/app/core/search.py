@@ -0,0 +1,96 @@
+"""
+Columna de búsqueda normalizada (search_text) e índice trigram.
+
+Los listados buscaban con ilike('%término%') sobre varias columnas, lo que
+siempre es un sequential scan (y sobre columnas cifradas nunca coincide).
+Cada entidad buscable guarda ahora en `search_text` sus campos de texto
+no sensibles normalizados (minúsculas, sin tildes, espacios colapsados), con
+un índice GIN pg_trgm que resuelve tanto LIKE '%término%' como la
+similitud de palabras usada para rankear.
+
+`search_text` se recalcula en cada INSERT/UPDATE del ORM (register_search_text).
+Las escrituras con insert()/update() de Core no pasan por el mapper y deben
+usar search_text_values.
+"""
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, literal, true
+
+# Largo mínimo de la búsqueda; con menos no hay trigramas que indexar
+MIN_QUERY_LENGTH = 2
+
+
+def normalize_search_text(*parts: Any) -> Optional[str]:
+    """Minúsculas, sin tildes y con espacios colapsados.
+
+    Debe coincidir con lower(unaccent(...)) de la migración que pobló la
+    columna.
+    """
+    text = " ".join(str(part) for part in parts if part)
+    if not text:
+        return None
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split()) or None
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Términos normalizados de una búsqueda."""
+    normalized = normalize_search_text(query)
+    return normalized.split() if normalized else []
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def matches(column, query: Optional[str]):
+    """Predicado "contiene todos los términos" sobre una columna search_text.
+
+    Cada LIKE '%término%' lo resuelve el índice GIN trigram.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return true()
+    return and_(*(column.like(f"%{_escape_like(term)}%", escape="\\") for term in terms))
+
+
+def fuzzy_matches(column, query: Optional[str]):
+    """Coincidencia aproximada (errores de tipeo) por similitud de palabras.
+
+    Operador <% de pg_trgm, umbral pg_trgm.word_similarity_threshold.
+    """
+    return literal(normalize_search_text(query) or "").op("<%")(column)
+
+
+def rank(column, query: Optional[str]):
+    """Relevancia 0..1 de una fila para la búsqueda (word_similarity)."""
+    return func.word_similarity(normalize_search_text(query) or "", column)
+
+
+_SEARCH_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def search_text_values(model, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Columna search_text de un dict de valores (para insert() de Core)."""
+    fields = _SEARCH_FIELDS.get(model)
+    if not fields:
+        return {}
+    return {"search_text": normalize_search_text(*(values.get(f) for f in fields))}
+
+
+def search_text_fields(model) -> Tuple[str, ...]:
+    """Campos de los que se calcula `model.search_text` (vacío si no tiene)."""
+    return _SEARCH_FIELDS.get(model, ())
+
+
+def register_search_text(model, *fields: str) -> None:
+    """Mantiene `model.search_text` a partir de `fields` en cada flush."""
+    _SEARCH_FIELDS[model] = fields
+
+    def update_search_text(mapper, connection, target):
+        target.search_text = normalize_search_text(*(getattr(target, f) for f in fields))
+
+    event.listen(model, "before_insert", update_search_text)
+    event.listen(model, "before_update", update_search_text)
@@ -0,0 +1,214 @@
+"""
+Coalescencia de llamadas idénticas en vuelo (single-flight) para LLM.
+
+Cuando varios recruiters abren el mismo par candidato/vacante a la vez,
+todos fallan la caché y disparan la misma llamada al LLM. SingleFlight
+garantiza que, para una misma clave de contenido, solo un caller ejecute
+la llamada y el resto espere su resultado:
+
+- Dentro del proceso: los callers concurrentes comparten un Future.
+- Entre workers: lock en Redis (SET NX EX) + notificación por pub/sub;
+  el resultado se deja en Redis unos segundos para los que esperan.
+
+Si Redis no está disponible, o el líder falla o desaparece, los que
+esperaban ejecutan la llamada ellos mismos (fail open).
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Libera el lock solo si sigue siendo nuestro
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+else
+    return 0
+end
+"""
+
+# Mensajes publicados al terminar el líder
+_DONE = "done"
+_FAILED = "failed"
+
+
+class SingleFlight:
+    """
+    Ejecuta una sola vez cada llamada en vuelo por clave.
+
+    Los resultados deben ser JSON serializables: los que esperan reciben una
+    copia deserializada, nunca el mismo objeto que el líder.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = None,
+        prefix: str = "singleflight",
+        lock_ttl: int = None,
+        wait_timeout: float = None,
+        result_ttl: int = 60,
+        poll_interval: float = 1.0
+    ):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl or settings.SINGLE_FLIGHT_LOCK_TTL
+        self.wait_timeout = wait_timeout or settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._redis: Optional[redis.Redis] = None
+        self._local: Dict[str, asyncio.Future] = {}
+
+    async def get_redis(self) -> redis.Redis:
+        """Obtiene o crea conexión Redis."""
+        if self._redis is None:
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.prefix}:lock:{key}"
+
+    def _result_key(self, key: str) -> str:
+        return f"{self.prefix}:result:{key}"
+
+    def _channel(self, key: str) -> str:
+        return f"{self.prefix}:done:{key}"
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta fn una sola vez para todos los callers concurrentes de `key`.
+
+        Args:
+            key: Clave de contenido (p.ej. hash de CV + job + modelo)
+            fn: Corrutina sin argumentos que realiza la llamada costosa
+
+        Returns:
+            Resultado de fn (propio o del líder)
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await fn()
+
+        # 1. Coalescencia dentro del proceso
+        pending = self._local.get(key)
+        if pending is not None:
+            serialized = await asyncio.shield(pending)
+            if serialized is not None:
+                return json.loads(serialized)
+            # El líder local falló: ejecutamos nosotros
+            return await fn()
+
+        future = asyncio.get_running_loop().create_future()
+        self._local[key] = future
+        serialized = None
+        try:
+            result = await self._do_distributed(key, fn)
+            serialized = json.dumps(result, default=str)
+            return result
+        finally:
+            self._local.pop(key, None)
+            future.set_result(serialized)
+
+    async def _do_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Coalescencia entre workers vía Redis."""
+        token = uuid.uuid4().hex
+        try:
+            r = await self.get_redis()
+            acquired = await r.set(self._lock_key(key), token, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            logger.warning(f"Single-flight unavailable, running call directly: {e}")
+            return await fn()
+
+        if acquired:
+            return await self._lead(r, key, token, fn)
+
+        found, result = await self._wait_for_leader(r, key)
+        if found:
+            logger.info(f"Single-flight: reused in-flight result for {key}")
+            return result
+
+        # El líder falló o no respondió a tiempo: ejecutamos nosotros
+        return await fn()
+
+    async def _lead(self, r: redis.Redis, key: str, token: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Ejecuta fn como líder y notifica a los que esperan."""
+        try:
+            result = await fn()
+        except BaseException:
+            await self._finish(r, key, token, None, _FAILED)
+            raise
+
+        await self._finish(r, key, token, json.dumps(result, default=str), _DONE)
+        return result
+
+    async def _finish(self, r: redis.Redis, key: str, token: str, serialized: Optional[str], status: str):
+        """Publica el resultado y libera el lock."""
+        try:
+            pipe = r.pipeline(transaction=False)
+            if serialized is not None:
+                pipe.set(self._result_key(key), serialized, ex=self.result_ttl)
+            pipe.eval(_RELEASE_LOCK_SCRIPT, 1, self._lock_key(key), token)
+            pipe.publish(self._channel(key), status)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Single-flight: error publishing result for {key}: {e}")
+
+    async def _wait_for_leader(self, r: redis.Redis, key: str):
+        """
+        Espera a que el líder publique el resultado.
+
+        Returns:
+            Tupla (encontrado, resultado)
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        pubsub = r.pubsub()
+        try:
+            await pubsub.subscribe(self._channel(key))
+            while True:
+                # Se revisa tras suscribirse para no perder un resultado
+                # publicado justo antes de la suscripción.
+                cached = await r.get(self._result_key(key))
+                if cached is not None:
+                    return True, json.loads(cached)
+                if not await r.exists(self._lock_key(key)):
+                    # Sin resultado y sin líder: falló, expiró o nunca escribió
+                    return False, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Single-flight: timed out waiting for {key}")
+                    return False, None
+
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=min(self.poll_interval, remaining)
+                )
+                if message and message.get("data") == _FAILED:
+                    return False, None
+        except Exception as e:
+            logger.warning(f"Single-flight: error waiting for {key}: {e}")
+            return False, None
+        finally:
+            try:
+                await pubsub.unsubscribe(self._channel(key))
+                await pubsub.close()
+            except Exception:
+                pass
+
+
+# Singleton
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Obtiene instancia singleton de SingleFlight."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,65 @@
+"""
+Server-sent events para resultados parciales de LLM.
+
+Los servicios que soportan streaming aceptan un callback `on_field(campo,
+valor)`. `field_events` ejecuta el servicio en una task y convierte esos
+callbacks en un iterador asíncrono de eventos, que los endpoints formatean
+con `sse_event`:
+
+    event: field    {"field": "score", "value": 82}   (uno por campo)
+    event: result   resultado completo del servicio
+    event: error    {"detail": "..."} si el servicio falla
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Tuple
+
+FieldCallback = Callable[[str, Any], Awaitable[None]]
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Nginx no debe bufferizar el stream
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Formatea un evento SSE con payload JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def field_events(
+    run: Callable[[FieldCallback], Awaitable[Any]]
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Ejecuta `run(on_field)` y emite sus campos a medida que llegan.
+
+    Args:
+        run: Corrutina que recibe el callback on_field y devuelve el resultado
+
+    Yields:
+        ("field", {"field": nombre, "value": valor}) por cada campo y, al
+        final, ("result", resultado). Las excepciones de `run` se propagan.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_field(name: str, value: Any):
+        await queue.put({"field": name, "value": value})
+
+    task = asyncio.create_task(run(on_field))
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield "field", getter.result()
+                continue
+            getter.cancel()
+            break
+
+        while not queue.empty():
+            yield "field", queue.get_nowait()
+
+        yield "result", task.result()
+    finally:
+        # El cliente cerró la conexión antes de terminar
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,190 @@
+"""
+Recepción de uploads en streaming.
+
+Los endpoints de subida copiaban el archivo a disco (o lo leían entero en
+memoria con `await file.read()`) y después lo volvían a leer para calcular
+el SHA-256. UploadSink lo hace en una sola pasada por bloques:
+
+- Cada bloque se escribe en un archivo temporal del directorio destino y
+  se suma al hash, fuera del event loop.
+- El tipo MIME se detecta con los primeros bytes del mismo stream.
+- Al superar el tamaño máximo se corta la lectura y se descarta lo escrito.
+
+Con el hash disponible antes de persistir, el endpoint puede detectar un
+duplicado y descartar el temporal; si no, persist() lo renombra a su nombre
+final (mismo filesystem: sin segunda copia). Lo que no se persiste se
+borra al salir del bloque `async with`.
+"""
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bytes leídos del upload por iteración
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bytes iniciales usados para detectar el tipo MIME
+SNIFF_BYTES = 8192
+
+# Firmas de los formatos que aceptan los endpoints (fallback sin python-magic)
+_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"{\\rtf", "text/rtf"),
+)
+
+_DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class UploadTooLargeError(ValueError):
+    """El upload supera el tamaño máximo permitido."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"Upload exceeds {max_size} bytes")
+
+
+def sniff_mime(head: bytes, filename: Optional[str] = None, declared: Optional[str] = None) -> str:
+    """Tipo MIME a partir de los primeros bytes del archivo.
+
+    Usa python-magic si está instalado; si no, las firmas conocidas. Sin
+    coincidencia, cae al tipo por extensión y por último al declarado por
+    el cliente.
+    """
+    try:
+        import magic
+        detected = magic.from_buffer(head, mime=True)
+        if detected and detected not in ("application/octet-stream", "application/zip"):
+            return detected
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.debug(f"magic.from_buffer failed: {e}")
+
+    for signature, mime_type in _SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    if head.startswith(b"PK\x03\x04"):
+        # DOCX es un ZIP; sus entradas word/ suelen estar en los primeros KB
+        if b"word/" in head or (filename or "").lower().endswith(".docx"):
+            return _DOCX_MIME
+        return "application/zip"
+
+    guessed, _ = mimetypes.guess_type(filename or "")
+    if guessed:
+        return guessed
+    if head and b"\x00" not in head:
+        return "text/plain"
+    return declared or "application/octet-stream"
+
+
+def _write_chunk(out, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    out.write(chunk)
+
+
+class UploadSink:
+    """Recibe un UploadFile en streaming con hash, MIME y límite de tamaño.
+
+    Uso:
+        async with UploadSink(UPLOAD_DIR, suffix=".pdf") as sink:
+            await sink.receive(file)
+            if await find_duplicate(sink.sha256):
+                return ...               # el temporal se descarta
+            path = sink.persist("nombre_final.pdf")
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_size: Optional[int] = None,
+        suffix: str = ""
+    ):
+        self.directory = Path(directory)
+        self.max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+        self.suffix = suffix
+        self.size = 0
+        self.sha256: Optional[str] = None
+        self.mime_type: Optional[str] = None
+        # Ruta final, una vez persistido
+        self.path: Optional[Path] = None
+        self._temp_path: Optional[Path] = None
+
+    async def __aenter__(self) -> "UploadSink":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self.discard()
+        return False
+
+    @property
+    def temp_path(self) -> Optional[Path]:
+        """Archivo recibido aún sin persistir."""
+        return self._temp_path
+
+    async def receive(self, upload: UploadFile) -> "UploadSink":
+        """Lee el upload por bloques: escribe, hashea y detecta el MIME en una pasada.
+
+        Raises:
+            UploadTooLargeError: Si el upload supera max_size (lo escrito se borra)
+        """
+        declared_size = getattr(upload, "size", None)
+        if declared_size is not None and declared_size > self.max_size:
+            raise UploadTooLargeError(self.max_size)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=".upload-", suffix=self.suffix)
+        self._temp_path = Path(temp_name)
+        hasher = hashlib.sha256()
+        head = b""
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.size += len(chunk)
+                if self.size > self.max_size:
+                    raise UploadTooLargeError(self.max_size)
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                await asyncio.to_thread(_write_chunk, out, hasher, chunk)
+
+        self.sha256 = hasher.hexdigest()
+        self.mime_type = sniff_mime(head, upload.filename, upload.content_type)
+        return self
+
+    def persist(self, filename: str) -> Path:
+        """Mueve el archivo recibido a su nombre final dentro del directorio."""
+        if self._temp_path is None:
+            raise RuntimeError("Nothing received to persist")
+        final_path = self.directory / filename
+        os.replace(self._temp_path, final_path)
+        self._temp_path = None
+        self.path = final_path
+        return final_path
+
+    def discard(self) -> None:
+        """Borra el archivo recibido si no se persistió."""
+        if self._temp_path is None:
+            return
+        try:
+            self._temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove upload temp file {self._temp_path}: {e}")
+        self._temp_path = None
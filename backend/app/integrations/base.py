@@ -62,6 +62,8 @@ class SyncResult:
     items_processed: int = 0
     items_created: int = 0
     items_updated: int = 0
+    items_unchanged: int = 0            # Sin cambios desde la última sync (mismo hash)
+    items_deleted: int = 0              # Borrados en el origen (ver integrations/delta.py)
     items_failed: int = 0
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
@@ -76,6 +78,8 @@ class SyncResult:
             items_processed=self.items_processed + other.items_processed,
             items_created=self.items_created + other.items_created,
             items_updated=self.items_updated + other.items_updated,
+            items_unchanged=self.items_unchanged + other.items_unchanged,
+            items_deleted=self.items_deleted + other.items_deleted,
             items_failed=self.items_failed + other.items_failed,
             errors=self.errors + other.errors,
             warnings=self.warnings + other.warnings,
@@ -0,0 +1,220 @@
+"""Sync delta por huellas de registro.
+
+La sync incremental sólo filtraba por fecha de modificación, así que una
+full_sync volvía a mapear y escribir todo, y el desfase de reloj con el
+origen obligaba a solapamientos conservadores. Aquí cada registro externo
+sincronizado deja una huella en sync_fingerprints (ID externo, fecha de
+modificación en el origen y SHA-256 de los campos mapeados):
+
+- Antes de cualquier trabajo de BD, los registros cuya huella no cambió se
+  saltan (se cuentan en items_unchanged).
+- Si el origen permite listar (id, fecha) sin leer el registro (Odoo), sólo
+  se descargan los IDs cuya fecha cambió.
+- Los borrados remotos salen de un diff de conjuntos de IDs: huellas
+  conocidas menos IDs vistos en el origen.
+
+Así el costo de una sync depende de cuántos registros cambiaron, no del
+tamaño del dataset, y ampliar la ventana de solapamiento cuesta poco.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.integrations.base import SyncResult
+from app.integrations.upsert import ExternalKey, content_hash, parse_external_datetime
+from app.models import Candidate, CandidateStatus, JobOpening, JobStatus, SyncFingerprint
+
+logger = logging.getLogger(__name__)
+
+# Campo mapeado con la fecha de modificación del origen (Modified_Time / write_date)
+MODIFIED_FIELD = "updated_at"
+
+# IDs por sentencia al aplicar borrados
+DELETE_CHUNK_SIZE = 1000
+
+# Un diff que borraría más de esta fracción de lo conocido se asume un listado
+# incompleto y no se aplica (sólo con al menos DELETE_GUARD_MIN huellas)
+MAX_DELETE_RATIO = 0.5
+DELETE_GUARD_MIN = 20
+
+# Cómo queda un registro borrado en el origen (igual que los webhooks de delete).
+# sync_hash se limpia para que, si el registro reaparece, el upsert lo reescriba.
+DELETED_VALUES = {
+    "jobs": (JobOpening, {"is_active": False, "status": JobStatus.CLOSED.value, "sync_hash": None}),
+    "candidates": (Candidate, {"status": CandidateStatus.REJECTED.value, "sync_hash": None}),
+}
+
+
+class DeltaEngine:
+    """Huellas de una entidad ("jobs", "candidates") de un origen durante una sync.
+
+    Se carga una vez por sync con load() y se comparte entre páginas; save()
+    recibe la sesión de cada página, así que sirve con escritura concurrente.
+    """
+
+    def __init__(self, entity: str, key: ExternalKey):
+        self.entity = entity
+        self.key = key
+        # external_id -> (modified_at, content_hash)
+        self.known: Dict[str, Tuple[Optional[datetime], str]] = {}
+        # IDs vistos en el origen durante esta sync (para el diff de borrados)
+        self.seen: Set[str] = set()
+        self._pending: Dict[str, Tuple[Optional[datetime], str]] = {}
+
+    async def load(self, db: AsyncSession) -> "DeltaEngine":
+        """Carga las huellas conocidas en una sola consulta."""
+        rows = await db.execute(
+            select(
+                SyncFingerprint.external_id,
+                SyncFingerprint.modified_at,
+                SyncFingerprint.content_hash,
+            ).where(
+                SyncFingerprint.source == self.key.source,
+                SyncFingerprint.entity == self.entity,
+            )
+        )
+        self.known = {external_id: (modified_at, hashed) for external_id, modified_at, hashed in rows.all()}
+        return self
+
+    def stale_ids(self, listing: Iterable[Tuple[Any, Any]]) -> List[str]:
+        """IDs de un listado (id, fecha de modificación) que hay que descargar.
+
+        Un ID es stale si no tiene huella o si su fecha difiere de la guardada.
+        """
+        stale = []
+        for external_id, modified in listing:
+            external_id = str(external_id)
+            self.seen.add(external_id)
+            known = self.known.get(external_id)
+            modified = parse_external_datetime(modified)
+            if known is None or modified is None or known[0] != modified:
+                stale.append(external_id)
+        return stale
+
+    def is_unchanged(self, record: Dict[str, Any]) -> bool:
+        """True si el registro mapeado coincide con su huella.
+
+        Los registros sin ID externo nunca se saltan (upsert_page los cuenta
+        como fallidos).
+        """
+        external_id = record.get(self.key.column)
+        if external_id is None:
+            return False
+        external_id = str(external_id)
+        self.seen.add(external_id)
+        hashed = content_hash(record)
+        known = self.known.get(external_id)
+        if known and known[1] == hashed:
+            return True
+        self._pending[external_id] = (parse_external_datetime(record.get(MODIFIED_FIELD)), hashed)
+        return False
+
+    async def save(self, db: AsyncSession, records: List[Dict[str, Any]]) -> None:
+        """Guarda las huellas de registros ya escritos y hace commit.
+
+        Un fallo sólo se registra: sin huella, el registro se vuelve a
+        procesar en la próxima sync.
+        """
+        now = datetime.utcnow()
+        rows: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            external_id = record.get(self.key.column)
+            fingerprint = self._pending.get(str(external_id)) if external_id is not None else None
+            if fingerprint is None:
+                continue
+            rows[str(external_id)] = {
+                "source": self.key.source,
+                "entity": self.entity,
+                "external_id": str(external_id),
+                "modified_at": fingerprint[0],
+                "content_hash": fingerprint[1],
+                "synced_at": now,
+            }
+        if not rows:
+            return
+
+        stmt = insert(SyncFingerprint)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SyncFingerprint.source, SyncFingerprint.entity, SyncFingerprint.external_id],
+            set_={
+                "modified_at": stmt.excluded.modified_at,
+                "content_hash": stmt.excluded.content_hash,
+                "synced_at": stmt.excluded.synced_at,
+            },
+        )
+        try:
+            await db.execute(stmt, list(rows.values()))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Saving {len(rows)} {self.key.source} {self.entity} fingerprints failed: {e}")
+            return
+
+        for external_id, row in rows.items():
+            self.known[external_id] = (row["modified_at"], row["content_hash"])
+            self._pending.pop(external_id, None)
+
+    def deleted_ids(self, remote_ids: Optional[Iterable[Any]] = None) -> Set[str]:
+        """Huellas conocidas que ya no existen en el origen.
+
+        Sin remote_ids usa los IDs vistos en esta sync: sólo vale si se
+        listó la entidad completa (full_sync sin filtros).
+        """
+        remote = self.seen if remote_ids is None else {str(external_id) for external_id in remote_ids}
+        return set(self.known) - remote
+
+    async def apply_deletes(
+        self,
+        db: AsyncSession,
+        remote_ids: Optional[Iterable[Any]] = None
+    ) -> SyncResult:
+        """Marca como borrados los registros que desaparecieron del origen."""
+        result = SyncResult(success=True)
+        remote = self.seen if remote_ids is None else {str(external_id) for external_id in remote_ids}
+        deleted = self.deleted_ids(remote)
+        if not deleted:
+            return result
+
+        if not remote or (
+            len(self.known) >= DELETE_GUARD_MIN and len(deleted) > len(self.known) * MAX_DELETE_RATIO
+        ):
+            result.warnings.append(
+                f"{len(deleted)} de {len(self.known)} {self.entity} de {self.key.source} ausentes "
+                "en el origen; se asume un listado incompleto y no se marcan como borrados"
+            )
+            return result
+
+        model, values = DELETED_VALUES[self.entity]
+        column = getattr(model, self.key.column)
+        ids = sorted(deleted)
+        try:
+            for i in range(0, len(ids), DELETE_CHUNK_SIZE):
+                chunk = ids[i:i + DELETE_CHUNK_SIZE]
+                await db.execute(
+                    update(model)
+                    .where(column.in_(chunk), model.source == self.key.source)
+                    .values(**values, updated_at=datetime.utcnow())
+                )
+                await db.execute(
+                    delete(SyncFingerprint).where(
+                        SyncFingerprint.source == self.key.source,
+                        SyncFingerprint.entity == self.entity,
+                        SyncFingerprint.external_id.in_(chunk),
+                    )
+                )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Applying {len(ids)} {self.key.source} {self.entity} deletes failed: {e}")
+            result.success = False
+            result.errors.append(str(e))
+            return result
+
+        for external_id in ids:
+            self.known.pop(external_id, None)
+        result.items_deleted = len(ids)
+        return result
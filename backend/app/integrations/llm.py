@@ -1,7 +1,7 @@
 """Integración con LLM (OpenAI/Anthropic) para evaluación de candidatos."""
 import logging
 import json
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable, AsyncIterator
 from dataclasses import dataclass
 
 import httpx
@@ -26,6 +26,128 @@ class EvaluationResult:
     raw_response: Optional[str] = None
 
 
+@dataclass
+class StreamedCompletion:
+    """Resultado de una llamada al LLM en modo streaming."""
+    text: str
+    data: Any
+    tokens_prompt: int = 0
+    tokens_completion: int = 0
+
+
+# Callback invocado con (campo, valor) apenas un campo del JSON está completo
+FieldCallback = Callable[[str, Any], Awaitable[None]]
+
+
+class IncrementalJSONParser:
+    """Parser incremental del objeto JSON que genera el LLM.
+    
+    Recibe el texto por fragmentos y devuelve cada campo de primer nivel en
+    cuanto su valor está completo, sin esperar al cierre del objeto. Así el
+    `score` (que los prompts piden primero) está disponible tras los primeros
+    tokens. Ignora el texto previo al primer "{" (p. ej. bloques ```json).
+    """
+    
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: Optional[str] = None
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Agrega un fragmento y devuelve los campos completados con él."""
+        self._buffer += chunk
+        buf = self._buffer
+        completed: List[Tuple[str, Any]] = []
+        
+        while self._pos < len(buf) and self._state != "done":
+            ch = buf[self._pos]
+            state = self._state
+            
+            if state == "start":
+                if ch == "{":
+                    self._state = "key"
+            elif state == "key":
+                if ch == '"':
+                    self._start = self._pos
+                    self._state = "key_string"
+                elif ch == "}":
+                    self._state = "done"
+            elif state == "key_string":
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._key = json.loads(buf[self._start:self._pos + 1])
+                    self._state = "colon"
+            elif state == "colon":
+                if ch == ":":
+                    self._state = "value_start"
+            elif state == "value_start":
+                if not ch.isspace():
+                    self._start = self._pos
+                    self._depth = 0
+                    self._in_string = False
+                    self._state = "value"
+                    continue  # Procesar este carácter como parte del valor
+            elif state == "value":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                        if self._depth == 0:
+                            self._emit(self._pos + 1, completed)
+                elif ch == '"':
+                    self._in_string = True
+                elif ch in "[{":
+                    self._depth += 1
+                elif ch in "]}":
+                    if self._depth == 0:
+                        # Cierre del objeto tras un número/bool/null
+                        self._emit(self._pos, completed)
+                        self._state = "done"
+                    else:
+                        self._depth -= 1
+                        if self._depth == 0:
+                            self._emit(self._pos + 1, completed)
+                elif ch == "," and self._depth == 0:
+                    self._emit(self._pos, completed)
+                    self._state = "key"
+            elif state == "after":
+                if ch == ",":
+                    self._state = "key"
+                elif ch == "}":
+                    self._state = "done"
+            
+            self._pos += 1
+        
+        return completed
+    
+    def _emit(self, end: int, completed: List[Tuple[str, Any]]):
+        raw = self._buffer[self._start:end].strip()
+        self._state = "after"
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping unparseable streamed field {self._key}: {raw[:50]}")
+            return
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+
+
 class LLMClient:
     """Cliente para interactuar con proveedores de LLM."""
     
@@ -276,6 +398,135 @@ Respond ONLY with a valid JSON object:
         data = response.json()
         return data["content"][0]["text"]
     
+    async def _stream_openai(
+        self,
+        prompt: str,
+        system: Optional[str],
+        usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """Llama a la API de OpenAI en modo streaming y emite los fragmentos de texto.
+        
+        Sin reintentos: un stream ya iniciado no se puede repetir sin duplicar
+        los campos emitidos.
+        """
+        if not self._client:
+            raise RuntimeError("Client not initialized")
+        
+        url = "https://api.openai.com/v1/chat/completions"
+        payload = {
+            "model": self.config.model or "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": system or "You are a helpful assistant that responds only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.config.temperature or 0.0,
+            "max_tokens": self.config.max_tokens or 2000,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        
+        async with self._client.stream("POST", url, headers=self._get_headers(), json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage["prompt"] = chunk["usage"].get("prompt_tokens", 0)
+                    usage["completion"] = chunk["usage"].get("completion_tokens", 0)
+                for choice in chunk.get("choices") or []:
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        yield text
+    
+    async def _stream_anthropic(
+        self,
+        prompt: str,
+        system: Optional[str],
+        usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """Llama a la API de Anthropic en modo streaming y emite los fragmentos de texto."""
+        if not self._client:
+            raise RuntimeError("Client not initialized")
+        
+        url = "https://api.anthropic.com/v1/messages"
+        payload = {
+            "model": self.config.model or "claude-3-haiku-20240307",
+            "max_tokens": self.config.max_tokens or 2000,
+            "temperature": self.config.temperature or 0.0,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "stream": True
+        }
+        if system:
+            payload["system"] = system
+        
+        async with self._client.stream("POST", url, headers=self._get_headers(), json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                
+                event = json.loads(line[5:].strip())
+                event_type = event.get("type")
+                if event_type == "message_start":
+                    usage["prompt"] = event.get("message", {}).get("usage", {}).get("input_tokens", 0)
+                elif event_type == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif event_type == "message_delta":
+                    usage["completion"] = event.get("usage", {}).get("output_tokens", 0)
+                elif event_type == "message_stop":
+                    break
+    
+    async def stream_json(
+        self,
+        prompt: str,
+        on_field: FieldCallback,
+        system: Optional[str] = None
+    ) -> StreamedCompletion:
+        """Llama al LLM en modo streaming parseando el JSON de forma incremental.
+        
+        Args:
+            prompt: Prompt que pide una respuesta JSON (objeto)
+            on_field: Callback con (campo, valor) por cada campo de primer
+                nivel, apenas el LLM termina de generarlo
+            system: Mensaje de sistema opcional
+            
+        Returns:
+            StreamedCompletion con el texto completo y el JSON final
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        if self.config.provider == self.PROVIDER_ANTHROPIC:
+            stream = self._stream_anthropic
+        else:
+            stream = self._stream_openai
+        
+        parser = IncrementalJSONParser()
+        usage = {"prompt": 0, "completion": 0}
+        parts: List[str] = []
+        
+        async for text in stream(prompt, system, usage):
+            parts.append(text)
+            for name, value in parser.feed(text):
+                await on_field(name, value)
+        
+        raw = "".join(parts)
+        return StreamedCompletion(
+            text=raw,
+            data=self._extract_json_from_response(raw),
+            tokens_prompt=usage["prompt"],
+            tokens_completion=usage["completion"]
+        )
+    
     async def _call_llm(self, prompt: str) -> str:
         """Llama al LLM según el proveedor configurado."""
         if not self._initialized:
@@ -306,13 +557,16 @@ Respond ONLY with a valid JSON object:
     async def evaluate_candidate(
         self, 
         candidate_data: Dict[str, Any], 
-        job_data: Dict[str, Any]
+        job_data: Dict[str, Any],
+        on_field: Optional[FieldCallback] = None
     ) -> EvaluationResult:
         """Evalúa un candidato contra un job opening.
         
         Args:
             candidate_data: Datos del candidato
             job_data: Datos del job opening
+            on_field: Si se indica, usa streaming y notifica cada campo
+                (score, decision, ...) apenas el LLM lo genera
             
         Returns:
             EvaluationResult con el score y análisis
@@ -322,9 +576,12 @@ Respond ONLY with a valid JSON object:
         
         try:
             prompt = self._build_evaluate_prompt(candidate_data, job_data)
-            response = await self._call_llm(prompt)
-            
-            result_data = self._extract_json_from_response(response)
+            if on_field:
+                streamed = await self.stream_json(prompt, on_field)
+                response, result_data = streamed.text, streamed.data
+            else:
+                response = await self._call_llm(prompt)
+                result_data = self._extract_json_from_response(response)
             
             # Validar y normalizar el resultado
             score = float(result_data.get("score", 0))
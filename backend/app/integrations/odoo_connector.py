@@ -3,7 +3,7 @@ import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import httpx
 from sqlalchemy import select
@@ -17,11 +17,18 @@ from app.integrations.base import (
     WebhookHandler,
     with_retry,
 )
+from app.integrations.delta import DeltaEngine
+from app.integrations.upsert import ExternalKey, lookup_ids, upsert_page
+from app.integrations.zoho_recruit import ZOHO_CANDIDATE_KEY
 from app.models import Candidate, JobOpening, CandidateStatus, JobStatus
 from app.schemas import OdooConfig
 
 logger = logging.getLogger(__name__)
 
+# Claves de upsert (índices únicos parciales por source)
+ODOO_JOB_KEY = ExternalKey("external_id", "odoo")
+ODOO_CANDIDATE_KEY = ExternalKey("external_id", "odoo")
+
 
 @dataclass
 class OdooRateLimits:
@@ -68,6 +75,9 @@ class OdooConnector(BaseConnector[OdooConfig]):
         "hr_recruitment.group_hr_recruitment_user",  # Usuario de reclutamiento
     ]
     
+    # Claves de upsert por entidad (también las huellas de app/integrations/delta.py)
+    SYNC_KEYS = {"jobs": ODOO_JOB_KEY, "candidates": ODOO_CANDIDATE_KEY}
+    
     # Mapeo de campos Odoo hr.job -> ATS Platform
     DEFAULT_JOB_MAPPING = {
         "id": "external_id",
@@ -344,7 +354,8 @@ class OdooConnector(BaseConnector[OdooConfig]):
         self,
         modified_since: Optional[datetime] = None,
         full_sync: bool = False,
-        domain: Optional[List] = None
+        domain: Optional[List] = None,
+        delta: Optional[DeltaEngine] = None
     ) -> SyncResult:
         """Sincronizar jobs (hr.job) desde Odoo.
         
@@ -352,6 +363,7 @@ class OdooConnector(BaseConnector[OdooConfig]):
             modified_since: Solo jobs modificados después de esta fecha
             full_sync: Si True, sincronizar todos
             domain: Filtro de dominio adicional de Odoo
+            delta: Huellas de jobs; sólo se leen los que cambiaron de write_date
             
         Returns:
             Resultado de la sincronización
@@ -366,12 +378,7 @@ class OdooConnector(BaseConnector[OdooConfig]):
                 search_domain.append(("write_date", ">=", modified_since.isoformat()))
             
             # Buscar IDs
-            job_ids = await self._execute_kw(
-                self.config.job_model,
-                "search",
-                [search_domain],
-                {"order": "write_date desc"}
-            )
+            job_ids = await self._search_ids(self.config.job_model, search_domain, delta, result)
             
             if not job_ids:
                 logger.info("No jobs to sync from Odoo")
@@ -389,7 +396,7 @@ class OdooConnector(BaseConnector[OdooConfig]):
                     {"fields": list(self.job_mapping.keys())}
                 )
                 
-                batch_result = await self._process_jobs_batch(jobs_data)
+                batch_result = await self._process_jobs_batch(jobs_data, delta)
                 result = result.merge(batch_result)
             
             result.success = True
@@ -402,54 +409,71 @@ class OdooConnector(BaseConnector[OdooConfig]):
         result.duration_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
         return result
     
-    async def _process_jobs_batch(self, jobs_data: List[Dict]) -> SyncResult:
-        """Procesar un batch de jobs de Odoo."""
+    async def _search_ids(
+        self,
+        model: str,
+        search_domain: List,
+        delta: Optional[DeltaEngine],
+        result: SyncResult
+    ) -> List[int]:
+        """IDs a leer: todos los del dominio o, con delta, sólo los que cambiaron.
+        
+        Con delta se listan (id, write_date) sin leer los registros y los
+        que coinciden con su huella se cuentan en result.items_unchanged.
+        """
+        if delta is None:
+            return await self._execute_kw(
+                model,
+                "search",
+                [search_domain],
+                {"order": "write_date desc"}
+            )
+        
+        listing = await self._execute_kw(
+            model,
+            "search_read",
+            [search_domain],
+            {"fields": ["write_date"], "order": "write_date desc"}
+        )
+        stale = set(delta.stale_ids((record["id"], record.get("write_date")) for record in listing))
+        result.items_unchanged += len(listing) - len(stale)
+        return [record["id"] for record in listing if str(record["id"]) in stale]
+    
+    async def list_remote_ids(self, entity: str) -> Set[str]:
+        """IDs de todos los registros de una entidad ("jobs", "candidates").
+        
+        Un solo search sin leer campos, para el diff de borrados de DeltaEngine.
+        """
+        model = self.config.job_model if entity == "jobs" else self.config.applicant_model
+        ids = await self._execute_kw(model, "search", [[]])
+        return {str(odoo_id) for odoo_id in ids}
+    
+    async def _process_jobs_batch(
+        self,
+        jobs_data: List[Dict],
+        delta: Optional[DeltaEngine] = None
+    ) -> SyncResult:
+        """Procesar un batch de jobs de Odoo (un solo upsert para la página)."""
         result = SyncResult(success=True)
+        records = []
         
         for job_data in jobs_data:
             try:
-                odoo_job_id = str(job_data.get("id"))
-                if not odoo_job_id:
-                    result.warnings.append(f"Job without ID: {job_data}")
-                    result.items_failed += 1
-                    continue
-                
-                # Buscar job existente (por external_id o zoho_job_id si existe campo personalizado)
-                existing = await self.db.execute(
-                    select(JobOpening).where(
-                        (JobOpening.zoho_job_id == odoo_job_id) |
-                        (JobOpening.external_id == odoo_job_id)
-                    )
-                )
-                job = existing.scalar_one_or_none()
-                
-                # Mapear campos
                 mapped_data = self._map_job_fields(job_data)
-                mapped_data["external_id"] = odoo_job_id
-                
-                if job:
-                    # Actualizar
-                    for key, value in mapped_data.items():
-                        if hasattr(job, key) and value is not None:
-                            setattr(job, key, value)
-                    job.updated_at = datetime.utcnow()
-                    result.items_updated += 1
-                else:
-                    # Crear nuevo
-                    mapped_data["source"] = "odoo"
-                    job = JobOpening(**mapped_data)
-                    self.db.add(job)
-                    result.items_created += 1
-                
-                result.items_processed += 1
-                
+                mapped_data["external_id"] = self._odoo_id(job_data)
+                if delta and delta.is_unchanged(mapped_data):
+                    result.items_unchanged += 1
+                    continue
+                records.append(mapped_data)
             except Exception as e:
-                logger.error(f"Failed to process Odoo job {job_data.get('id')}: {e}")
+                logger.error(f"Failed to map Odoo job {job_data.get('id')}: {e}")
                 result.items_failed += 1
                 result.errors.append(str(e))
         
-        await self.db.commit()
-        return result
+        written = await upsert_page(self.db, JobOpening, records, ODOO_JOB_KEY)
+        if delta and written.items_processed:
+            await delta.save(self.db, records)
+        return result.merge(written)
     
     def _map_job_fields(self, odoo_data: Dict) -> Dict[str, Any]:
         """Mapear campos de Odoo hr.job a nuestro modelo."""
@@ -481,7 +505,8 @@ class OdooConnector(BaseConnector[OdooConfig]):
         modified_since: Optional[datetime] = None,
         full_sync: bool = False,
         job_id: Optional[int] = None,
-        domain: Optional[List] = None
+        domain: Optional[List] = None,
+        delta: Optional[DeltaEngine] = None
     ) -> SyncResult:
         """Sincronizar candidatos (hr.applicant) desde Odoo.
         
@@ -490,6 +515,7 @@ class OdooConnector(BaseConnector[OdooConfig]):
             full_sync: Si True, sincronizar todos
             job_id: Filtrar por ID de job en Odoo
             domain: Filtro de dominio adicional
+            delta: Igual que en sync_jobs
             
         Returns:
             Resultado de la sincronización
@@ -506,12 +532,7 @@ class OdooConnector(BaseConnector[OdooConfig]):
                 search_domain.append(("job_id", "=", job_id))
             
             # Buscar IDs
-            candidate_ids = await self._execute_kw(
-                self.config.applicant_model,
-                "search",
-                [search_domain],
-                {"order": "write_date desc"}
-            )
+            candidate_ids = await self._search_ids(self.config.applicant_model, search_domain, delta, result)
             
             if not candidate_ids:
                 logger.info("No candidates to sync from Odoo")
@@ -529,7 +550,7 @@ class OdooConnector(BaseConnector[OdooConfig]):
                     {"fields": list(self.candidate_mapping.keys())}
                 )
                 
-                batch_result = await self._process_candidates_batch(candidates_data)
+                batch_result = await self._process_candidates_batch(candidates_data, delta)
                 result = result.merge(batch_result)
             
             result.success = True
@@ -542,75 +563,87 @@ class OdooConnector(BaseConnector[OdooConfig]):
         result.duration_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
         return result
     
-    async def _process_candidates_batch(self, candidates_data: List[Dict]) -> SyncResult:
-        """Procesar un batch de candidatos de Odoo."""
+    async def _process_candidates_batch(
+        self,
+        candidates_data: List[Dict],
+        delta: Optional[DeltaEngine] = None
+    ) -> SyncResult:
+        """Procesar un batch de candidatos de Odoo (un upsert por destino).
+        
+        Si un hr.applicant trae x_zoho_candidate_id de un candidato de Zoho ya
+        sincronizado, actualiza ese registro (una persona, una fila); si no,
+        es un candidato propio (source="odoo").
+        """
         result = SyncResult(success=True)
+        mapped = []
         
         for candidate_data in candidates_data:
             try:
-                odoo_candidate_id = str(candidate_data.get("id"))
-                if not odoo_candidate_id:
-                    result.warnings.append(f"Candidate without ID: {candidate_data}")
-                    result.items_failed += 1
-                    continue
-                
-                # Buscar candidato existente
-                zoho_id = candidate_data.get("x_zoho_candidate_id")
-                
-                if zoho_id:
-                    existing = await self.db.execute(
-                        select(Candidate).where(Candidate.zoho_candidate_id == zoho_id)
-                    )
-                else:
-                    existing = await self.db.execute(
-                        select(Candidate).where(Candidate.external_id == odoo_candidate_id)
-                    )
-                
-                candidate = existing.scalar_one_or_none()
-                
-                # Mapear campos
                 mapped_data = self._map_candidate_fields(candidate_data)
-                mapped_data["external_id"] = odoo_candidate_id
-                
-                # Buscar job relacionado
-                job_odoo_id = candidate_data.get("job_id")
-                if job_odoo_id and isinstance(job_odoo_id, list):
-                    job_odoo_id = job_odoo_id[0]  # ID es el primer elemento
-                    
-                    job_result = await self.db.execute(
-                        select(JobOpening).where(
-                            (JobOpening.external_id == str(job_odoo_id)) |
-                            (JobOpening.zoho_job_id == str(job_odoo_id))
-                        )
-                    )
-                    job = job_result.scalar_one_or_none()
-                    if job:
-                        mapped_data["job_opening_id"] = job.id
-                
-                if candidate:
-                    # Actualizar
-                    for key, value in mapped_data.items():
-                        if hasattr(candidate, key) and value is not None:
-                            setattr(candidate, key, value)
-                    candidate.updated_at = datetime.utcnow()
-                    result.items_updated += 1
-                else:
-                    # Crear nuevo
-                    mapped_data["source"] = "odoo"
-                    candidate = Candidate(**mapped_data)
-                    self.db.add(candidate)
-                    result.items_created += 1
-                
-                result.items_processed += 1
-                
+                mapped_data["external_id"] = self._odoo_id(candidate_data)
+                zoho_id = self._odoo_id(mapped_data.pop("zoho_candidate_id", None))
+                if zoho_id:
+                    mapped_data["zoho_candidate_id"] = zoho_id
+                # La huella incluye raw_data (y con él job_id)
+                if delta and delta.is_unchanged(mapped_data):
+                    result.items_unchanged += 1
+                    continue
+                mapped.append((candidate_data, mapped_data))
             except Exception as e:
-                logger.error(f"Failed to process Odoo candidate {candidate_data.get('id')}: {e}")
+                logger.error(f"Failed to map Odoo candidate {candidate_data.get('id')}: {e}")
                 result.items_failed += 1
                 result.errors.append(str(e))
         
-        await self.db.commit()
+        # Jobs relacionados de los candidatos a escribir en una consulta
+        job_ids = await lookup_ids(
+            self.db, JobOpening,
+            (self._odoo_id(candidate_data.get("job_id")) for candidate_data, _ in mapped),
+            JobOpening.external_id, JobOpening.zoho_job_id
+        )
+        
+        zoho_ids = await self._existing_zoho_candidate_ids(
+            mapped_data.get("zoho_candidate_id") for _, mapped_data in mapped
+        )
+        
+        records: Dict[ExternalKey, List[Dict[str, Any]]] = {ODOO_CANDIDATE_KEY: [], ZOHO_CANDIDATE_KEY: []}
+        for candidate_data, mapped_data in mapped:
+            job_id = job_ids.get(self._odoo_id(candidate_data.get("job_id")))
+            if job_id:
+                mapped_data["job_opening_id"] = job_id
+            key = ZOHO_CANDIDATE_KEY if mapped_data.get("zoho_candidate_id") in zoho_ids else ODOO_CANDIDATE_KEY
+            records[key].append(mapped_data)
+        
+        for key, key_records in records.items():
+            if not key_records:
+                continue
+            written = await upsert_page(self.db, Candidate, key_records, key)
+            if delta and written.items_processed:
+                await delta.save(self.db, key_records)
+            result = result.merge(written)
         return result
     
+    async def _existing_zoho_candidate_ids(self, zoho_ids: Iterable[Optional[str]]) -> Set[str]:
+        """IDs de Zoho (de una página) que ya tienen su candidato de Zoho, en una consulta."""
+        zoho_ids = {zoho_id for zoho_id in zoho_ids if zoho_id}
+        if not zoho_ids:
+            return set()
+        existing = await self.db.execute(
+            select(Candidate.zoho_candidate_id).where(
+                Candidate.zoho_candidate_id.in_(zoho_ids),
+                Candidate.source == ZOHO_CANDIDATE_KEY.source
+            )
+        )
+        return set(existing.scalars().all())
+    
+    @staticmethod
+    def _odoo_id(value: Any) -> Optional[str]:
+        """ID de Odoo como string desde un registro, un campo relación [id, name] o un int."""
+        if isinstance(value, dict):
+            value = value.get("id")
+        elif isinstance(value, list):
+            value = value[0] if value else None
+        return str(value) if value not in (None, False) else None
+    
     def _map_candidate_fields(self, odoo_data: Dict) -> Dict[str, Any]:
         """Mapear campos de Odoo hr.applicant a nuestro modelo."""
         result = {}
@@ -691,8 +724,9 @@ class OdooConnector(BaseConnector[OdooConfig]):
                     "create",
                     [values]
                 )
-                # Actualizar referencia
+                # Actualizar referencia (la próxima sync lo actualiza en lugar de duplicarlo)
                 job.external_id = str(odoo_id)
+                job.source = ODOO_JOB_KEY.source
                 await self.db.commit()
                 return True, odoo_id
                 
@@ -819,7 +853,10 @@ class OdooWebhookHandler(WebhookHandler):
                     odoo_id = str(record_data.get("id"))
                     if odoo_id:
                         result = await connector.db.execute(
-                            select(JobOpening).where(JobOpening.external_id == odoo_id)
+                            select(JobOpening).where(
+                                JobOpening.external_id == odoo_id,
+                                JobOpening.source == ODOO_JOB_KEY.source
+                            )
                         )
                         job = result.scalar_one_or_none()
                         if job:
@@ -836,7 +873,10 @@ class OdooWebhookHandler(WebhookHandler):
                     odoo_id = str(record_data.get("id"))
                     if odoo_id:
                         result = await connector.db.execute(
-                            select(Candidate).where(Candidate.external_id == odoo_id)
+                            select(Candidate).where(
+                                Candidate.external_id == odoo_id,
+                                Candidate.source == ODOO_CANDIDATE_KEY.source
+                            )
                         )
                         candidate = result.scalar_one_or_none()
                         if candidate:
@@ -853,6 +893,7 @@ class OdooWebhookHandler(WebhookHandler):
                 "processed": result.items_processed,
                 "created": result.items_created,
                 "updated": result.items_updated,
+                "unchanged": result.items_unchanged,
                 "errors": result.errors
             }
             
@@ -0,0 +1,115 @@
+"""Pipeline de páginas para la sincronización con ATS externos.
+
+La sync descargaba una página, la escribía en la BD y recién entonces pedía
+la siguiente: el tiempo de red y el de BD se sumaban. Aquí un productor
+descarga páginas a una cola acotada (`prefetch` páginas por delante; cada
+request sigue pasando por el RateLimiter del conector) mientras
+`consumers` tareas las escriben en paralelo.
+
+Las páginas pueden terminar fuera de orden; `checkpoint` se llama con los
+registros de cada página sólo cuando todas las anteriores terminaron con
+éxito, así que el último checkpoint guardado es un punto seguro para
+reanudar. Desde la primera página fallida no se guardan más checkpoints:
+al reanudar se vuelve a pedir desde ella.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.integrations.base import SyncResult
+
+logger = logging.getLogger(__name__)
+
+Page = List[Dict[str, Any]]
+
+
+async def run_page_pipeline(
+    fetch_page: Callable[[int], Awaitable[Page]],
+    process_page: Callable[[Page], Awaitable[SyncResult]],
+    per_page: int,
+    prefetch: int = 2,
+    consumers: int = 1,
+    checkpoint: Optional[Callable[[Page], Awaitable[None]]] = None,
+) -> SyncResult:
+    """Descarga y procesa páginas (1, 2, ...) solapando red y BD.
+
+    Args:
+        fetch_page: Descarga la página N; una lista vacía o más corta que
+            per_page es la última
+        process_page: Escribe una página; cada tarea consumidora necesita su
+            propia sesión si consumers > 1
+        per_page: Tamaño de página pedido
+        prefetch: Páginas descargadas en espera como máximo
+        consumers: Páginas escribiéndose a la vez
+        checkpoint: Se llama en orden con cada página completada, hasta la
+            primera que falle (success=False)
+
+    Returns:
+        Resultado combinado. Si la descarga falla se procesan las páginas ya
+        descargadas y el resultado queda con success=False.
+    """
+    consumers = max(consumers, 1)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(prefetch, 1))
+    results: Dict[int, SyncResult] = {}
+    completed: Dict[int, Page] = {}
+    checkpoint_lock = asyncio.Lock()
+    next_checkpoint = 1
+    checkpoint_stopped = False
+    fetch_error: Optional[Exception] = None
+
+    async def produce():
+        nonlocal fetch_error
+        number = 1
+        try:
+            while True:
+                records = await fetch_page(number)
+                if not records:
+                    break
+                await queue.put((number, records))
+                if len(records) < per_page:
+                    break
+                number += 1
+        except Exception as e:
+            logger.error(f"Fetching page {number} failed: {e}")
+            fetch_error = e
+        for _ in range(consumers):
+            await queue.put(None)
+
+    async def consume():
+        nonlocal next_checkpoint, checkpoint_stopped
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            number, records = item
+            results[number] = await process_page(records)
+
+            async with checkpoint_lock:
+                completed[number] = records
+                while not checkpoint_stopped and next_checkpoint in completed:
+                    page = completed.pop(next_checkpoint)
+                    if not results[next_checkpoint].success:
+                        checkpoint_stopped = True
+                        break
+                    next_checkpoint += 1
+                    if checkpoint:
+                        await checkpoint(page)
+
+    tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(consume()) for _ in range(consumers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # Si un consumidor falla, no dejar al productor bloqueado en la cola
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    result = SyncResult(success=True)
+    for number in sorted(results):
+        result = result.merge(results[number])
+    if fetch_error:
+        result.success = False
+        result.errors.append(str(fetch_error))
+    result.metadata["pages"] = len(results)
+    return result
@@ -0,0 +1,208 @@
+"""Upsert por página de registros sincronizados desde ATS externos.
+
+Los conectores (Zoho, Odoo) buscaban cada registro por su ID externo y lo
+insertaban o actualizaban uno a uno (dos o tres round-trips por fila).
+Ahora cada página se mapea entera a filas y se escribe con un solo
+INSERT ... ON CONFLICT DO UPDATE sobre el índice único parcial
+(columna de ID externo) WHERE source = <origen>.
+
+Cada fila lleva `sync_hash`, SHA-256 de sus valores mapeados: el UPDATE
+sólo se aplica si el hash cambió, así que re-sincronizar registros sin
+cambios no escribe nada. RETURNING (xmax = 0) distingue filas creadas de
+actualizadas.
+
+insert() de Core no pasa por el mapper: search_text se calcula aquí. Si a
+la fila le falta alguno de sus campos de origen, search_text sólo se usa al
+insertar: al actualizar se conserva el calculado con los datos completos.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.search import search_text_fields, search_text_values
+from app.integrations.base import SyncResult
+
+logger = logging.getLogger(__name__)
+
+# Columnas que el upsert nunca sobrescribe en un registro existente
+PRESERVED_COLUMNS = {"id", "source", "created_at"}
+
+# Columnas que calcula el upsert (no vienen del registro externo)
+COMPUTED_COLUMNS = {"id", "updated_at", "sync_hash", "search_text"}
+
+
+@dataclass(frozen=True)
+class ExternalKey:
+    """Clave de un registro externo: columna de ID y valor de `source`.
+
+    Debe existir un índice único (column) WHERE source = '<source>'.
+    """
+    column: str
+    source: str
+
+
+def content_hash(values: Dict[str, Any]) -> str:
+    """SHA-256 de los valores mapeados (independiente del orden de claves)."""
+    payload = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def parse_external_datetime(value: Any) -> Optional[datetime]:
+    """Fecha ISO de un ATS externo como datetime UTC sin zona (None si no se entiende)."""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def prepare_rows(model, records: Iterable[Dict[str, Any]], key: ExternalKey) -> List[Dict[str, Any]]:
+    """Filas para upsert_page a partir de registros ya mapeados.
+
+    Descarta campos que el modelo no tiene, agrega source, sync_hash,
+    search_text y updated_at, y deja una fila por ID externo (la última:
+    ON CONFLICT no puede actualizar dos veces la misma fila).
+    """
+    columns = model.__table__.c
+    now = datetime.utcnow()
+    rows: Dict[str, Dict[str, Any]] = {}
+
+    for record in records:
+        values = {
+            name: value for name, value in record.items()
+            if name in columns and name not in COMPUTED_COLUMNS
+        }
+        if values.get(key.column) is None:
+            continue
+        if "created_at" in values:
+            values["created_at"] = parse_external_datetime(values["created_at"])
+            if values["created_at"] is None:
+                del values["created_at"]
+        values["source"] = key.source
+        values["sync_hash"] = content_hash(values)
+        values.update(search_text_values(model, values))
+        values["updated_at"] = now
+        rows[str(values[key.column])] = values
+    return list(rows.values())
+
+
+def has_search_fields(model, row: Dict[str, Any]) -> bool:
+    """La fila trae todos los campos de los que se calcula search_text."""
+    return all(row.get(name) for name in search_text_fields(model))
+
+
+def upsert_statement(model, columns: Iterable[str], key: ExternalKey, update_search_text: bool = True):
+    """INSERT ... ON CONFLICT DO UPDATE de una página (RETURNING inserted).
+
+    Con update_search_text=False el search_text de las filas sólo se usa al
+    insertar (ver has_search_fields).
+    """
+    table = model.__table__
+    stmt = insert(table)
+    # Un valor externo vacío no borra el existente (igual que la sync fila a fila)
+    update_columns = {
+        name: func.coalesce(stmt.excluded[name], table.c[name])
+        for name in columns
+        if name not in PRESERVED_COLUMNS and name != key.column
+        and (update_search_text or name != "search_text")
+    }
+    update_columns["sync_hash"] = stmt.excluded.sync_hash
+    update_columns["updated_at"] = stmt.excluded.updated_at
+
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[key.column]],
+        # Literal (no parámetro) para que Postgres infiera el índice parcial
+        index_where=text(f"source = '{key.source}'"),
+        set_=update_columns,
+        where=table.c.sync_hash.is_distinct_from(stmt.excluded.sync_hash),
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+
+async def upsert_page(
+    db: AsyncSession,
+    model,
+    records: List[Dict[str, Any]],
+    key: ExternalKey
+) -> SyncResult:
+    """Escribe una página de registros mapeados en un upsert y hace commit.
+
+    executemany exige las mismas columnas en todas las filas, así que hay
+    una sentencia por combinación de campos presentes (normalmente una): un
+    campo ausente toma el default al insertar y no se toca al actualizar.
+    Las filas con campos de búsqueda incompletos van aparte para no pisar
+    search_text al actualizar.
+
+    Los registros sin ID externo se cuentan como fallidos. Si la escritura
+    falla, la página entera se cuenta como fallida y el resultado queda con
+    success=False: la sync sigue con las demás páginas pero no avanza su
+    marca de última sincronización, así que la página se vuelve a pedir.
+    """
+    result = SyncResult(success=True)
+    rows = prepare_rows(model, records, key)
+    missing = sum(1 for record in records if record.get(key.column) is None)
+    if missing:
+        result.items_failed += missing
+        result.warnings.append(f"{missing} registros sin {key.column}")
+    if not rows:
+        return result
+
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault((frozenset(row), has_search_fields(model, row)), []).append(row)
+
+    inserted: List[bool] = []
+    try:
+        for (columns, complete), group in groups.items():
+            written = await db.execute(upsert_statement(model, columns, key, complete), group)
+            inserted.extend(written.scalars().all())
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Upsert of {len(rows)} {model.__tablename__} failed: {e}")
+        result.success = False
+        result.items_failed += len(rows)
+        result.errors.append(str(e))
+        return result
+
+    result.items_processed = len(rows)
+    result.items_created = sum(1 for flag in inserted if flag)
+    result.items_updated = len(inserted) - result.items_created
+    result.items_unchanged = len(rows) - len(inserted)
+    return result
+
+
+async def lookup_ids(db: AsyncSession, model, values: Iterable[Any], *columns) -> Dict[str, Any]:
+    """`model.id` por ID externo, en una sola consulta.
+
+    Si un valor coincide en varias columnas gana la primera indicada.
+    """
+    values = {str(value) for value in values if value is not None}
+    if not values:
+        return {}
+    result = await db.execute(
+        select(model.id, *columns).where(or_(*(column.in_(values) for column in columns)))
+    )
+    by_column: List[Dict[str, Any]] = [{} for _ in columns]
+    for row in result.all():
+        for position, external in enumerate(row[1:]):
+            if external in values:
+                by_column[position][external] = row[0]
+
+    ids: Dict[str, Any] = {}
+    for matches in reversed(by_column):
+        ids.update(matches)
+    return ids
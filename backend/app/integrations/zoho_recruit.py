@@ -3,7 +3,7 @@ import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlencode
 
 import httpx
@@ -19,11 +19,18 @@ from app.integrations.base import (
     WebhookHandler,
     with_retry,
 )
+from app.integrations.delta import DeltaEngine
+from app.integrations.pipeline import run_page_pipeline
+from app.integrations.upsert import ExternalKey, lookup_ids, parse_external_datetime, upsert_page
 from app.models import Candidate, JobOpening, CandidateStatus, JobStatus
 from app.schemas import ZohoConfig
 
 logger = logging.getLogger(__name__)
 
+# Claves de upsert (índices únicos parciales por source)
+ZOHO_JOB_KEY = ExternalKey("zoho_job_id", "zoho")
+ZOHO_CANDIDATE_KEY = ExternalKey("zoho_candidate_id", "zoho")
+
 
 @dataclass
 class ZohoRateLimits:
@@ -35,6 +42,10 @@ class ZohoRateLimits:
     
     # Batch limits
     MAX_BATCH_SIZE = 200  # Máximo de registros por batch
+    
+    # Pipeline de sync: páginas descargadas por delante y escritas a la vez
+    PREFETCH_PAGES = 2
+    UPSERT_CONSUMERS = 2
 
 
 @dataclass
@@ -61,6 +72,12 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
     AUTH_URL = "https://accounts.zoho.com/oauth/v2"
     API_BASE_URL = "https://recruit.zoho.com/recruit/v2"
     
+    # Módulo de Zoho por entidad de sync
+    MODULES = {"jobs": "JobOpenings", "candidates": "Candidates"}
+    
+    # Claves de upsert por entidad (también las huellas de app/integrations/delta.py)
+    SYNC_KEYS = {"jobs": ZOHO_JOB_KEY, "candidates": ZOHO_CANDIDATE_KEY}
+    
     # Scopes mínimos necesarios
     SCOPES = [
         "ZohoRecruit.modules.all",  # Acceso a todos los módulos
@@ -109,6 +126,7 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
         config: ZohoConfig,
         job_mapping: Optional[Dict[str, str]] = None,
         candidate_mapping: Optional[Dict[str, str]] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
     ):
         rate_config = RateLimitConfig(
             requests_per_second=ZohoRateLimits.REQUESTS_PER_SECOND,
@@ -128,6 +146,9 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
         self.tokens: Optional[ZohoTokens] = None
         self.job_mapping = job_mapping or self.DEFAULT_JOB_MAPPING.copy()
         self.candidate_mapping = candidate_mapping or self.DEFAULT_CANDIDATE_MAPPING.copy()
+        # Con session_factory cada página se escribe en su propia sesión y
+        # varias páginas pueden escribirse a la vez; sin ella, de a una en self.db
+        self.session_factory = session_factory
     
     async def __aenter__(self):
         await super().__aenter__()
@@ -296,13 +317,21 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
     async def sync_jobs(
         self,
         modified_since: Optional[datetime] = None,
-        full_sync: bool = False
+        full_sync: bool = False,
+        checkpoint: Optional[Callable[[datetime], Awaitable[None]]] = None,
+        delta: Optional[DeltaEngine] = None
     ) -> SyncResult:
         """Sincronizar jobs desde Zoho.
         
+        Las páginas se descargan por delante mientras se escriben las
+        anteriores (ver app/integrations/pipeline.py).
+        
         Args:
             modified_since: Solo sincronizar jobs modificados después de esta fecha
             full_sync: Si True, sincronizar todos los jobs (ignorar modified_since)
+            checkpoint: Recibe, página a página, un modified_since desde el que
+                reanudar si la sync se interrumpe
+            delta: Huellas de jobs; los que no cambiaron no se escriben
             
         Returns:
             Resultado de la sincronización
@@ -316,24 +345,14 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
             if not full_sync and modified_since:
                 criteria = f"(Modified_Time:after:{modified_since.isoformat()})"
             
-            # Paginación
-            page = 1
             per_page = ZohoRateLimits.MAX_BATCH_SIZE
-            has_more = True
-            
-            while has_more:
-                jobs_data = await self._fetch_jobs_page(page, per_page, criteria)
-                
-                if not jobs_data:
-                    break
-                
-                batch_result = await self._process_jobs_batch(jobs_data)
-                result = result.merge(batch_result)
-                
-                has_more = len(jobs_data) == per_page
-                page += 1
-            
-            result.success = True
+            result = await self._run_sync_pipeline(
+                lambda page: self._fetch_jobs_page(page, per_page, criteria),
+                self._process_jobs_batch,
+                per_page,
+                checkpoint,
+                delta
+            )
             
         except Exception as e:
             logger.error(f"Job sync failed: {e}")
@@ -354,7 +373,7 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
             "page": page,
             "per_page": per_page,
             "sort_by": "Modified_Time",
-            "sort_order": "desc"
+            "sort_order": "asc"  # El checkpoint avanza con las páginas
         }
         
         if criteria:
@@ -370,49 +389,68 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
         data = response.json()
         return data.get("data", [])
     
-    async def _process_jobs_batch(self, jobs_data: List[Dict]) -> SyncResult:
-        """Procesar un batch de jobs."""
+    async def _run_sync_pipeline(
+        self,
+        fetch_page: Callable[[int], Awaitable[List[Dict]]],
+        process_batch: Callable[..., Awaitable[SyncResult]],
+        per_page: int,
+        checkpoint: Optional[Callable[[datetime], Awaitable[None]]],
+        delta: Optional[DeltaEngine] = None
+    ) -> SyncResult:
+        """Descargar y escribir páginas solapando red y BD."""
+        async def process_page(records: List[Dict]) -> SyncResult:
+            if self.session_factory is None:
+                return await process_batch(records, None, delta)
+            async with self.session_factory() as db:
+                return await process_batch(records, db, delta)
+        
+        async def save_checkpoint(records: List[Dict]):
+            modified = [
+                parsed for parsed in (parse_external_datetime(r.get("Modified_Time")) for r in records)
+                if parsed
+            ]
+            if modified:
+                # "after" es estricto: un segundo antes para no saltar registros
+                # con la misma fecha en la página siguiente
+                await checkpoint(max(modified) - timedelta(seconds=1))
+        
+        return await run_page_pipeline(
+            fetch_page,
+            process_page,
+            per_page,
+            prefetch=ZohoRateLimits.PREFETCH_PAGES,
+            consumers=ZohoRateLimits.UPSERT_CONSUMERS if self.session_factory else 1,
+            checkpoint=save_checkpoint if checkpoint else None
+        )
+    
+    async def _process_jobs_batch(
+        self,
+        jobs_data: List[Dict],
+        db: Optional[AsyncSession] = None,
+        delta: Optional[DeltaEngine] = None
+    ) -> SyncResult:
+        """Procesar un batch de jobs (un solo upsert para la página)."""
+        db = db or self.db
         result = SyncResult(success=True)
+        records = []
         
         for job_data in jobs_data:
             try:
-                zoho_job_id = job_data.get("id") or job_data.get(self.config.job_id_field)
-                if not zoho_job_id:
-                    result.warnings.append(f"Job without ID: {job_data}")
-                    result.items_failed += 1
-                    continue
-                
-                # Buscar job existente
-                existing = await self.db.execute(
-                    select(JobOpening).where(JobOpening.zoho_job_id == zoho_job_id)
-                )
-                job = existing.scalar_one_or_none()
-                
-                # Mapear campos
                 mapped_data = self._map_job_fields(job_data)
-                
-                if job:
-                    # Actualizar
-                    for key, value in mapped_data.items():
-                        if hasattr(job, key) and value is not None:
-                            setattr(job, key, value)
-                    job.updated_at = datetime.utcnow()
-                    result.items_updated += 1
-                else:
-                    # Crear nuevo
-                    job = JobOpening(**mapped_data)
-                    self.db.add(job)
-                    result.items_created += 1
-                
-                result.items_processed += 1
-                
+                mapped_data["zoho_job_id"] = job_data.get("id") or job_data.get(self.config.job_id_field)
+                if delta and delta.is_unchanged(mapped_data):
+                    result.items_unchanged += 1
+                    continue
+                records.append(mapped_data)
             except Exception as e:
-                logger.error(f"Failed to process job {job_data.get('id')}: {e}")
+                logger.error(f"Failed to map job {job_data.get('id')}: {e}")
                 result.items_failed += 1
                 result.errors.append(str(e))
         
-        await self.db.commit()
-        return result
+        written = await upsert_page(db, JobOpening, records, ZOHO_JOB_KEY)
+        if delta and written.items_processed:
+            await delta.save(db, records)
+        return result.merge(written)
     
     def _map_job_fields(self, zoho_data: Dict) -> Dict[str, Any]:
         """Mapear campos de Zoho a nuestro modelo."""
@@ -438,7 +476,9 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
         self,
         modified_since: Optional[datetime] = None,
         full_sync: bool = False,
-        job_opening_id: Optional[str] = None
+        job_opening_id: Optional[str] = None,
+        checkpoint: Optional[Callable[[datetime], Awaitable[None]]] = None,
+        delta: Optional[DeltaEngine] = None
     ) -> SyncResult:
         """Sincronizar candidatos desde Zoho.
         
@@ -446,6 +486,8 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
             modified_since: Solo candidatos modificados después de esta fecha
             full_sync: Si True, sincronizar todos
             job_opening_id: Filtrar por job específico
+            checkpoint: Igual que en sync_jobs
+            delta: Igual que en sync_jobs
             
         Returns:
             Resultado de la sincronización
@@ -463,24 +505,14 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
             
             criteria = "and".join(criteria_parts) if criteria_parts else None
             
-            # Paginación
-            page = 1
             per_page = ZohoRateLimits.MAX_BATCH_SIZE
-            has_more = True
-            
-            while has_more:
-                candidates_data = await self._fetch_candidates_page(page, per_page, criteria)
-                
-                if not candidates_data:
-                    break
-                
-                batch_result = await self._process_candidates_batch(candidates_data)
-                result = result.merge(batch_result)
-                
-                has_more = len(candidates_data) == per_page
-                page += 1
-            
-            result.success = True
+            result = await self._run_sync_pipeline(
+                lambda page: self._fetch_candidates_page(page, per_page, criteria),
+                self._process_candidates_batch,
+                per_page,
+                checkpoint,
+                delta
+            )
             
         except Exception as e:
             logger.error(f"Candidate sync failed: {e}")
@@ -501,7 +533,7 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
             "page": page,
             "per_page": per_page,
             "sort_by": "Modified_Time",
-            "sort_order": "desc"
+            "sort_order": "asc"  # El checkpoint avanza con las páginas
         }
         
         if criteria:
@@ -517,60 +549,51 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
         data = response.json()
         return data.get("data", [])
     
-    async def _process_candidates_batch(self, candidates_data: List[Dict]) -> SyncResult:
-        """Procesar un batch de candidatos."""
+    async def _process_candidates_batch(
+        self,
+        candidates_data: List[Dict],
+        db: Optional[AsyncSession] = None,
+        delta: Optional[DeltaEngine] = None
+    ) -> SyncResult:
+        """Procesar un batch de candidatos (un solo upsert para la página)."""
+        db = db or self.db
         result = SyncResult(success=True)
+        mapped = []
         
         for candidate_data in candidates_data:
             try:
-                zoho_candidate_id = candidate_data.get("id") or candidate_data.get(self.config.candidate_id_field)
-                if not zoho_candidate_id:
-                    result.warnings.append(f"Candidate without ID: {candidate_data}")
-                    result.items_failed += 1
-                    continue
-                
-                # Buscar candidato existente
-                existing = await self.db.execute(
-                    select(Candidate).where(Candidate.zoho_candidate_id == zoho_candidate_id)
-                )
-                candidate = existing.scalar_one_or_none()
-                
-                # Mapear campos
                 mapped_data = self._map_candidate_fields(candidate_data)
-                
-                # Buscar job relacionado
-                job_opening_id = candidate_data.get("Job_Opening_ID")
-                if job_opening_id:
-                    job_result = await self.db.execute(
-                        select(JobOpening).where(JobOpening.zoho_job_id == job_opening_id)
-                    )
-                    job = job_result.scalar_one_or_none()
-                    if job:
-                        mapped_data["job_opening_id"] = job.id
-                
-                if candidate:
-                    # Actualizar
-                    for key, value in mapped_data.items():
-                        if hasattr(candidate, key) and value is not None:
-                            setattr(candidate, key, value)
-                    candidate.updated_at = datetime.utcnow()
-                    result.items_updated += 1
-                else:
-                    # Crear nuevo
-                    mapped_data["source"] = "zoho"
-                    candidate = Candidate(**mapped_data)
-                    self.db.add(candidate)
-                    result.items_created += 1
-                
-                result.items_processed += 1
-                
+                mapped_data["zoho_candidate_id"] = (
+                    candidate_data.get("id") or candidate_data.get(self.config.candidate_id_field)
+                )
+                # La huella incluye raw_data (y con él Job_Opening_ID)
+                if delta and delta.is_unchanged(mapped_data):
+                    result.items_unchanged += 1
+                    continue
+                mapped.append((candidate_data, mapped_data))
             except Exception as e:
-                logger.error(f"Failed to process candidate {candidate_data.get('id')}: {e}")
+                logger.error(f"Failed to map candidate {candidate_data.get('id')}: {e}")
                 result.items_failed += 1
                 result.errors.append(str(e))
         
-        await self.db.commit()
-        return result
+        # Jobs relacionados de los candidatos a escribir en una consulta
+        job_ids = await lookup_ids(
+            db, JobOpening,
+            (candidate_data.get("Job_Opening_ID") for candidate_data, _ in mapped),
+            JobOpening.zoho_job_id
+        )
+        
+        records = []
+        for candidate_data, mapped_data in mapped:
+            job_id = job_ids.get(str(candidate_data.get("Job_Opening_ID")))
+            if job_id:
+                mapped_data["job_opening_id"] = job_id
+            records.append(mapped_data)
+        
+        written = await upsert_page(db, Candidate, records, ZOHO_CANDIDATE_KEY)
+        if delta and written.items_processed:
+            await delta.save(db, records)
+        return result.merge(written)
     
     def _map_candidate_fields(self, zoho_data: Dict) -> Dict[str, Any]:
         """Mapear campos de Zoho a nuestro modelo."""
@@ -614,6 +637,27 @@ class ZohoRecruitConnector(BaseConnector[ZohoConfig]):
         
         return result
     
+    async def list_remote_ids(self, entity: str) -> Set[str]:
+        """IDs de todos los registros de una entidad ("jobs", "candidates").
+        
+        Sólo pide el campo id, para el diff de borrados de DeltaEngine.
+        """
+        per_page = ZohoRateLimits.MAX_BATCH_SIZE
+        ids: Set[str] = set()
+        page = 1
+        while True:
+            response = await self._make_request(
+                "GET",
+                f"{self.API_BASE_URL}/{self.MODULES[entity]}",
+                headers=self._get_auth_headers(),
+                params={"page": page, "per_page": per_page, "fields": "id"}
+            )
+            records = response.json().get("data", [])
+            ids.update(str(record["id"]) for record in records if record.get("id"))
+            if len(records) < per_page:
+                return ids
+            page += 1
+    
     # ==================== WEBHOOK HANDLING ====================
     
     def get_webhook_handler(self) -> 'ZohoWebhookHandler':
@@ -661,7 +705,10 @@ class ZohoWebhookHandler(WebhookHandler):
                     if zoho_id:
                         from sqlalchemy import select
                         result = await connector.db.execute(
-                            select(JobOpening).where(JobOpening.zoho_job_id == zoho_id)
+                            select(JobOpening).where(
+                                JobOpening.zoho_job_id == zoho_id,
+                                JobOpening.source == ZOHO_JOB_KEY.source
+                            )
                         )
                         job = result.scalar_one_or_none()
                         if job:
@@ -679,7 +726,10 @@ class ZohoWebhookHandler(WebhookHandler):
                     zoho_id = record.get("id")
                     if zoho_id:
                         result = await connector.db.execute(
-                            select(Candidate).where(Candidate.zoho_candidate_id == zoho_id)
+                            select(Candidate).where(
+                                Candidate.zoho_candidate_id == zoho_id,
+                                Candidate.source == ZOHO_CANDIDATE_KEY.source
+                            )
                         )
                         candidate = result.scalar_one_or_none()
                         if candidate:
@@ -696,6 +746,7 @@ class ZohoWebhookHandler(WebhookHandler):
                 "processed": result.items_processed,
                 "created": result.items_created,
                 "updated": result.items_updated,
+                "unchanged": result.items_unchanged,
                 "errors": result.errors
             }
             
@@ -16,6 +16,7 @@ from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.decryption import decryption_scope
 from app.core.rate_limit import RateLimitMiddleware
 from app.core.csrf import CSRFMiddleware
 from app.core.security_logging import SecurityLogger
@@ -158,6 +159,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("🛑 Shutting down...")
     logger.info("Deteniendo ATS Platform...")
+    from app.core.local_cache import get_invalidation_bus
+    await get_invalidation_bus().stop()
+    from app.core.extraction_pool import get_extraction_pool
+    get_extraction_pool().shutdown()
     await engine.dispose()
 
 
@@ -255,6 +260,13 @@ async def metrics_middleware(request: Request, call_next):
         )
         raise
 
+# Cache de descifrado por request (columnas EncryptedType)
+@app.middleware("http")
+async def decryption_cache_middleware(request: Request, call_next):
+    """Cada texto cifrado se descifra una sola vez por request."""
+    with decryption_scope():
+        return await call_next(request)
+
 # Security Headers Middleware
 @app.middleware("http")
 async def security_headers_middleware(request: Request, call_next):
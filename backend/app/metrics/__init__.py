@@ -6,7 +6,7 @@ Incluye métricas de negocio, auditoría y trazas distribuidas.
 from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest, REGISTRY
 from functools import wraps
 import time
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 
 # Métricas de sistema - usadas por health checks
 db_connections_active = Gauge(
@@ -187,6 +187,45 @@ llm_tokens_used_total = Counter(
     ['model', 'token_type']  # prompt, completion
 )
 
+llm_prompt_tokens_saved_total = Counter(
+    'ats_llm_prompt_tokens_saved_total',
+    'Tokens de prompt ahorrados por el presupuesto de tokens',
+    ['model', 'operation']
+)
+
+# Métricas de cache (L1 en memoria + Redis)
+cache_requests_total = Counter(
+    'ats_cache_requests_total',
+    'Lookups de cache por nivel',
+    ['cache', 'tier', 'result']  # tier: l1, redis; result: hit, miss
+)
+
+cache_l1_entries = Gauge(
+    'ats_cache_l1_entries',
+    'Entradas actuales en el cache L1 del proceso',
+    ['cache']
+)
+
+# Réplicas de lectura
+db_replica_lag_seconds = Gauge(
+    'ats_db_replica_lag_seconds',
+    'Último lag de replicación medido (-1 = inalcanzable)',
+    ['replica']
+)
+
+db_read_routing_total = Counter(
+    'ats_db_read_routing_total',
+    'Sesiones de sólo lectura por destino',
+    ['target']  # replicaN o primary (sin réplicas sanas)
+)
+
+# Métricas de cifrado (columnas EncryptedType)
+decryptions_total = Counter(
+    'ats_decryptions_total',
+    'Valores cifrados descifrados',
+    ['mode', 'result']  # mode: eager, lazy, bulk; result: decrypted, cache_hit
+)
+
 # Métricas de Celery
 celery_tasks_total = Counter(
     'ats_celery_tasks_total',
@@ -291,7 +330,7 @@ def track_security_event(event_type: str, labels: dict = None):
     elif event_type == 'http_error':
         http_errors_total.labels(**labels).inc()
 
-def track_llm_request(model: str, operation: str, duration: float, tokens_prompt: int = 0, tokens_completion: int = 0, success: bool = True):
+def track_llm_request(model: str, operation: str, duration: float, tokens_prompt: int = 0, tokens_completion: int = 0, success: bool = True, tokens_saved: int = 0):
     """Registra una llamada a LLM.
     
     Args:
@@ -301,6 +340,7 @@ def track_llm_request(model: str, operation: str, duration: float, tokens_prompt
         tokens_prompt: Tokens de prompt
         tokens_completion: Tokens de completado
         success: Si fue exitoso
+        tokens_saved: Tokens de prompt ahorrados al comprimir el CV
     """
     status = 'success' if success else 'failed'
     llm_requests_total.labels(model=model, operation=operation, status=status).inc()
@@ -310,6 +350,35 @@ def track_llm_request(model: str, operation: str, duration: float, tokens_prompt
         llm_tokens_used_total.labels(model=model, token_type='prompt').inc(tokens_prompt)
     if tokens_completion > 0:
         llm_tokens_used_total.labels(model=model, token_type='completion').inc(tokens_completion)
+    if tokens_saved > 0:
+        llm_prompt_tokens_saved_total.labels(model=model, operation=operation).inc(tokens_saved)
+
+def track_cache_lookup(cache: str, tier: str, hit: bool):
+    """Registra un lookup de cache.
+    
+    Args:
+        cache: Nombre del cache (app, llm)
+        tier: Nivel consultado (l1, redis)
+        hit: Si se encontró el valor
+    """
+    cache_requests_total.labels(cache=cache, tier=tier, result='hit' if hit else 'miss').inc()
+
+def track_replica_lag(replica: str, lag: Optional[float]):
+    """Registra el lag medido de una réplica (None si no respondió)."""
+    db_replica_lag_seconds.labels(replica=replica).set(-1 if lag is None else lag)
+
+def track_read_routing(target: str):
+    """Registra a dónde se envió una sesión de sólo lectura."""
+    db_read_routing_total.labels(target=target).inc()
+
+def track_decryption(mode: str, cached: bool = False):
+    """Registra el descifrado de un valor.
+    
+    Args:
+        mode: Cuándo se descifró (eager al cargar, lazy en el primer acceso, bulk)
+        cached: Si se resolvió desde el cache del request sin llamar a Fernet
+    """
+    decryptions_total.labels(mode=mode, result='cache_hit' if cached else 'decrypted').inc()
 
 def track_celery_task(task_name: str, status: str, duration: float):
     """Registra una tarea de Celery.
@@ -85,6 +85,7 @@ from app.models.evaluation import Evaluation
 from app.models.match_result import MatchResult, MatchRecommendation, MatchingAuditLog
 from app.models.rhtools import Document, DocumentTextExtraction, ResumeParse
 from app.models.message_templates import MessageTemplate, TemplateVariable, MessageChannel
+from app.models.sync_fingerprint import SyncFingerprint
 
 # Importar modelo de comunicaciones (nuevo modelo completo)
 from app.models.communication import (
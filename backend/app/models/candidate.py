@@ -2,12 +2,13 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Boolean, Index
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Boolean, Index, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
 
 from app.core.database import Base
+from app.core.search import register_search_text
 
 
 class CandidateStatus(str, Enum):
@@ -28,8 +29,12 @@ class Candidate(Base):
     # Índices compuestos para queries frecuentes
     __table_args__ = (
         Index('idx_candidates_job_status', 'job_opening_id', 'status'),
-        Index('idx_candidates_created_at', 'created_at'),
+        Index('idx_candidates_created_at', 'created_at', 'id'),
         Index('idx_candidates_status_source', 'status', 'source'),
+        Index('idx_candidates_search', 'search_text', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}),
+        # Claves de upsert de la sincronización (app/integrations/upsert.py)
+        Index('uix_candidates_zoho_id', 'zoho_candidate_id', unique=True, postgresql_where=text("source = 'zoho'")),
+        Index('uix_candidates_odoo_id', 'external_id', unique=True, postgresql_where=text("source = 'odoo'")),
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -42,6 +47,8 @@ class Candidate(Base):
     # Normalización para anti-duplicados
     email_normalized = Column(String(255), index=True)
     phone_normalized = Column(String(50), index=True)
+    # Nombre normalizado para búsqueda (el email se busca por email_normalized)
+    search_text = Column(Text, nullable=True)
     
     # Datos extraídos del CV
     raw_data = Column(JSON)  # Datos JSON del CV original
@@ -61,13 +68,14 @@ class Candidate(Base):
     external_id = Column(String(100), index=True)  # ID genérico para cualquier ATS externo
     linkedin_url = Column(String(500))
     source = Column(String(50), default="manual")  # manual, zoho, odoo, linkedin, api
+    sync_hash = Column(String(64), nullable=True)  # Hash del último registro externo sincronizado
     
     # Anti-duplicados
     duplicate_of_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"))
     is_duplicate = Column(Boolean, default=False)
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relations
@@ -76,3 +84,6 @@ class Candidate(Base):
     # communications = relationship("Communication", back_populates="candidate")  # Usar nuevo sistema HHCandidate
     documents = relationship("Document", back_populates="candidate")
     match_results = relationship("MatchResult", back_populates="candidate", cascade="all, delete-orphan")
+
+
+register_search_text(Candidate, "full_name")
@@ -65,7 +65,7 @@ class Communication(Base):
         Index('idx_communications_candidate', 'candidate_id'),
         Index('idx_communications_status', 'status'),
         Index('idx_communications_whatsapp_id', 'whatsapp_message_id'),
-        Index('idx_communications_created', 'created_at'),
+        Index('idx_communications_created', 'created_at', 'communication_id'),
         Index('idx_communications_phone', 'recipient_phone'),
     )
     
@@ -12,13 +12,17 @@ from typing import Optional, List
 from sqlalchemy import (
     Column, String, Integer, Boolean, DateTime, Text, ForeignKey, 
     Numeric, JSON, Date, Enum as SQLEnum, UniqueConstraint, CheckConstraint,
-    Index
+    Index, text
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
 
 from app.core.database import Base, EncryptedType
+from app.core.blind_index import (
+    normalize_email, normalize_national_id, normalize_phone, register_blind_index
+)
+from app.core.search import register_search_text
 
 
 # =============================================================================
@@ -122,11 +126,14 @@ class HHCandidate(Base):
     __tablename__ = "hh_candidates"
     
     __table_args__ = (
-        Index('idx_hh_candidates_email', 'email'),
-        Index('idx_hh_candidates_national_id', 'national_id'),
+        # Las columnas cifradas se indexan por su blind index (ver app/core/blind_index.py)
+        Index('idx_hh_candidates_email', 'email_bidx'),
+        Index('idx_hh_candidates_email_prefix', 'email_bidx_prefixes', postgresql_using='gin'),
+        Index('idx_hh_candidates_phone', 'phone_bidx'),
         Index('idx_hh_candidates_name', 'full_name'),
-        Index('idx_hh_candidates_created', 'created_at'),
-        UniqueConstraint('national_id', name='uix_hh_candidates_national_id'),
+        Index('idx_hh_candidates_created', 'created_at', 'candidate_id'),
+        Index('idx_hh_candidates_search', 'search_text', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}),
+        UniqueConstraint('national_id_bidx', name='uix_hh_candidates_national_id'),
     )
     
     candidate_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -137,8 +144,15 @@ class HHCandidate(Base):
     email = Column(EncryptedType, nullable=True)
     # PII ENCRYPTED: Teléfono - cifrado en reposo
     phone = Column(EncryptedType, nullable=True)
+    # Blind index (HMAC del valor normalizado) para igualdad/prefijo sobre PII cifrada
+    national_id_bidx = Column(String(64), nullable=True)
+    email_bidx = Column(String(64), nullable=True)
+    email_bidx_prefixes = Column(ARRAY(String(64)), nullable=True)
+    phone_bidx = Column(String(64), nullable=True)
     location = Column(Text, nullable=True)
     linkedin_url = Column(Text, nullable=True)
+    # Nombre y ubicación normalizados para búsqueda (sin PII cifrada), ver app/core/search.py
+    search_text = Column(Text, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -189,6 +203,7 @@ class HHRole(Base):
         Index('idx_hh_roles_client', 'client_id'),
         Index('idx_hh_roles_status', 'status'),
         Index('idx_hh_roles_title', 'role_title'),
+        Index('idx_hh_roles_search', 'search_text', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}),
     )
     
     role_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -200,6 +215,8 @@ class HHRole(Base):
     date_opened = Column(Date, default=datetime.utcnow().date)
     date_closed = Column(Date, nullable=True)
     role_description_doc_id = Column(UUID(as_uuid=True), ForeignKey("hh_documents.document_id"), nullable=True)
+    # Cargo, ubicación y seniority normalizados para búsqueda
+    search_text = Column(Text, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -229,6 +246,12 @@ class HHApplication(Base):
         Index('idx_hh_applications_hired', 'hired'),
         Index('idx_hh_applications_score', 'overall_score'),
         Index('idx_hh_applications_scoring_status', 'scoring_status'),
+        # Paginación keyset: (clave de orden, pk) de los listados
+        Index('idx_hh_applications_created', 'created_at', 'application_id'),
+        Index(
+            'idx_hh_applications_role_score', 'role_id',
+            text('overall_score DESC NULLS LAST'), text('application_id DESC')
+        ),
         UniqueConstraint('candidate_id', 'role_id', name='uix_hh_applications_candidate_role'),
     )
     
@@ -425,7 +448,7 @@ class HHAuditLog(Base):
     
     __table_args__ = (
         Index('idx_hh_audit_entity', 'entity_type', 'entity_id'),
-        Index('idx_hh_audit_changed_at', 'changed_at'),
+        Index('idx_hh_audit_changed_at', 'changed_at', 'audit_id'),
     )
     
     audit_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -666,6 +689,39 @@ class HHCVExtraction(Base):
     document = relationship("HHDocument", back_populates="cv_extraction", uselist=False)
 
 
+# =============================================================================
+# MODELO 15: HH_ROLE_STAGE_STATS - Estadísticas precalculadas por vacante
+# =============================================================================
+
+class HHRoleStageStats(Base):
+    """
+    Agregados del pipeline por vacante y etapa.
+
+    Se mantienen incrementalmente en cada cambio de etapa/decisión
+    (ver PipelineStatsService) y se reconcilian periódicamente desde
+    hh_applications. Los dashboards leen a lo sumo una fila por etapa,
+    sin importar cuántas aplicaciones tenga la vacante.
+    """
+    __tablename__ = "hh_role_stage_stats"
+
+    __table_args__ = (
+        Index('idx_hh_role_stage_stats_client', 'client_id'),
+    )
+
+    role_id = Column(UUID(as_uuid=True), ForeignKey("hh_roles.role_id", ondelete="CASCADE"), primary_key=True)
+    stage = Column(SQLEnum(ApplicationStage), primary_key=True)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("hh_clients.client_id", ondelete="CASCADE"), nullable=False)
+
+    application_count = Column(Integer, default=0, nullable=False)
+    hired_count = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Numeric(14, 2), default=0, nullable=False)
+    score_count = Column(Integer, default=0, nullable=False)
+    hire_days_sum = Column(Integer, default=0, nullable=False)   # Días sourcing -> decisión (contratados)
+    hire_days_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
 # =============================================================================
 # ACTUALIZAR RELACIONSHIPS EN MODELOS EXISTENTES
 # =============================================================================
@@ -678,3 +734,20 @@ HHCandidate.cv_extractions = relationship("HHCVExtraction", back_populates="cand
 # Agregar a HHDocument:
 HHDocument.cv_processing = relationship("HHCVProcessing", back_populates="document", uselist=False)
 HHDocument.cv_extraction = relationship("HHCVExtraction", back_populates="document", uselist=False)
+
+
+# =============================================================================
+# BÚSQUEDA (search_text)
+# =============================================================================
+
+register_search_text(HHCandidate, "full_name", "location")
+register_search_text(HHRole, "role_title", "location", "seniority")
+
+
+# =============================================================================
+# BLIND INDEX (PII cifrada)
+# =============================================================================
+
+register_blind_index(HHCandidate, "national_id", normalize_national_id)
+register_blind_index(HHCandidate, "email", normalize_email, prefix_min=3)
+register_blind_index(HHCandidate, "phone", normalize_phone)
@@ -2,12 +2,13 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Boolean, Integer, JSON
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Boolean, Integer, JSON, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
 
 from app.core.database import Base
+from app.core.search import register_search_text
 
 
 class JobStatus(str, Enum):
@@ -31,6 +32,13 @@ class JobOpening(Base):
     """Oferta laboral."""
     __tablename__ = "job_openings"
     
+    __table_args__ = (
+        Index('idx_job_openings_search', 'search_text', postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}),
+        # Claves de upsert de la sincronización (app/integrations/upsert.py)
+        Index('uix_job_openings_zoho_id', 'zoho_job_id', unique=True, postgresql_where=text("source = 'zoho'")),
+        Index('uix_job_openings_odoo_id', 'external_id', unique=True, postgresql_where=text("source = 'odoo'")),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
     description = Column(Text)  # Job Description (JD)
@@ -69,15 +77,22 @@ class JobOpening(Base):
     zoho_job_id = Column(String(100), index=True)
     external_id = Column(String(100), index=True)  # ID genérico para cualquier ATS externo
     source = Column(String(50), default="manual")  # manual, zoho, odoo, api
+    sync_hash = Column(String(64), nullable=True)  # Hash del último registro externo sincronizado
     
     # Estado
     is_active = Column(Boolean, default=True)
     status = Column(String(50), default=JobStatus.DRAFT.value)
     
+    # Título, departamento y ubicación normalizados para búsqueda
+    search_text = Column(Text, nullable=True)
+    
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relations
     candidates = relationship("Candidate", back_populates="job_opening")
     match_results = relationship("MatchResult", back_populates="job_opening", cascade="all, delete-orphan")
+
+
+register_search_text(JobOpening, "title", "department", "location")
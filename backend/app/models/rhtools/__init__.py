@@ -8,6 +8,7 @@ from app.models.rhtools.pipeline import (
 from app.models.rhtools.submission import (
     Submission,
     SubmissionStageHistory,
+    SubmissionStats,
 )
 from app.models.rhtools.document import (
     Document,
@@ -33,6 +34,7 @@ __all__ = [
     "StageRequiredField",
     "Submission",
     "SubmissionStageHistory",
+    "SubmissionStats",
     "Document",
     "DocumentTextExtraction",
     "DocumentType",
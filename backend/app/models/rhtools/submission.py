@@ -2,7 +2,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, JSON, Boolean, Numeric, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, JSON, Boolean, Numeric, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -120,3 +120,24 @@ class SubmissionStageHistory(Base):
     
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SubmissionStats(Base):
+    """
+    Conteo precalculado de submissions por cliente, posición y estado.
+
+    Mantenido incrementalmente por SubmissionService y reconciliado
+    periódicamente desde rhtools_submissions (ver PipelineStatsService).
+    """
+    __tablename__ = "rhtools_submission_stats"
+
+    __table_args__ = (
+        Index('idx_rhtools_submission_stats_client', 'client_id'),
+    )
+
+    client_id = Column(UUID(as_uuid=True), ForeignKey("rhtools_clients.id", ondelete="CASCADE"), primary_key=True)
+    job_opening_id = Column(UUID(as_uuid=True), ForeignKey("job_openings.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    submission_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
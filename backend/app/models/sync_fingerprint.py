@@ -0,0 +1,24 @@
+"""Huellas de registros sincronizados desde ATS externos."""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime
+
+from app.core.database import Base
+
+
+class SyncFingerprint(Base):
+    """Última versión vista de un registro externo (ver app/integrations/delta.py).
+
+    Una fila por (source, entity, external_id): fecha de modificación en el
+    origen y hash de los campos mapeados. La sync compara contra estas huellas
+    para saltar registros sin cambios y detectar borrados remotos.
+    """
+    __tablename__ = "sync_fingerprints"
+
+    source = Column(String(50), primary_key=True)      # zoho, odoo
+    entity = Column(String(50), primary_key=True)      # jobs, candidates
+    external_id = Column(String(255), primary_key=True)
+
+    modified_at = Column(DateTime, nullable=True)      # Modified_Time / write_date del origen
+    content_hash = Column(String(64), nullable=False)  # SHA-256 de los campos mapeados
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
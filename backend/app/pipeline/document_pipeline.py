@@ -19,6 +19,8 @@ from app.services.extraction.interview_extractor import InterviewExtractor
 from app.validators.data_validator import DataValidator
 from app.validators.data_cleaner import DataCleaner
 from app.models.rhtools import Document, DocumentTextExtraction
+from app.services.embedding_index import refresh_embeddings
+from app.core.extraction_cache import extraction_cache
 
 logger = logging.getLogger(__name__)
 
@@ -79,25 +81,26 @@ class DocumentPipeline:
             existing_id = await self.parser.dedupe_by_hash(document.checksum, self.db)
             if existing_id and existing_id != document_id:
                 logger.info(f"Documento duplicado detectado: {document_id} es igual a {existing_id}")
-                # Podríamos copiar los datos del documento existente
+                # Sus resultados se reutilizan vía el cache de extracción (mismo checksum)
             
             # 3. Update status: parsing
             await self._update_document_status(document_id, ProcessingStatus.PARSING)
             job.status = ProcessingStatus.PARSING
             job.current_step = "parsing"
             
-            # Parsear documento
-            parse_result = await self.parser.parse_document(
-                document_id=document_id,
-                file_path=document.file_path,
-                mime_type=document.mime_type
-            )
-            
-            if parse_result.status == ProcessingStatus.ERROR:
-                raise PipelineError(f"Error en parsing: {parse_result.error_message}")
+            # Mismo archivo ya parseado (re-subida del mismo CV): sin extracción ni OCR
+            cached = await extraction_cache.get("parse", self.parser.VERSION, document.checksum)
+            if cached is not None:
+                parse_result = ParseResult(**{**cached["result"], "document_id": document_id})
+                clean_text = cached["clean_text"]
+            else:
+                parse_result, clean_text = await self._parse(document_id, document)
+                await extraction_cache.set(
+                    "parse", self.parser.VERSION, document.checksum,
+                    {"result": parse_result.dict(), "clean_text": clean_text}
+                )
             
-            # Guardar texto extraído
-            await self._save_text_extraction(document_id, parse_result)
+            await self._save_text_extraction(document_id, parse_result, clean_text=clean_text)
             
             # 4. Update status: extracting
             await self._update_document_status(document_id, ProcessingStatus.EXTRACTING)
@@ -105,10 +108,11 @@ class DocumentPipeline:
             job.current_step = "extracting"
             
             # Extraer datos según el tipo
-            extraction_result = await self._extract_data(
+            extraction_result = await self._extract_data_cached(
                 parse_result.document_type,
                 parse_result.text,
-                document_id
+                document_id,
+                document.checksum
             )
             
             # 5. Update status: validating
@@ -240,6 +244,46 @@ class DocumentPipeline:
             return status_map.get(document.status, ProcessingStatus.UPLOADED)
         return None
     
+    async def _parse(self, document_id: str, document: Document) -> tuple:
+        """Parsea el archivo del documento.
+        
+        En PDFs cada página se limpia apenas llega, mientras el pool extrae
+        las siguientes.
+        
+        Args:
+            document_id: ID del documento
+            document: Documento
+            
+        Returns:
+            Tupla (ParseResult, texto limpio)
+        """
+        clean_pages = []
+        streamed_pages = []
+        
+        async def on_page(number: int, page_text: str):
+            streamed_pages.append(number)
+            cleaned = self.cleaner.clean_text(page_text)
+            if cleaned:
+                clean_pages.append(cleaned)
+        
+        parse_result = await self.parser.parse_document(
+            document_id=document_id,
+            file_path=document.file_path,
+            mime_type=document.mime_type,
+            on_page=on_page
+        )
+        
+        if parse_result.status == ProcessingStatus.ERROR:
+            raise PipelineError(f"Error en parsing: {parse_result.error_message}")
+        
+        # clean_text colapsa espacios: unir las páginas limpias con ' '
+        # equivale a limpiar el texto completo
+        if streamed_pages:
+            clean_text = ' '.join(clean_pages)
+        else:
+            clean_text = self.cleaner.clean_text(parse_result.text)
+        return parse_result, clean_text
+    
     async def _get_document(self, document_id: str) -> Optional[Document]:
         """Obtiene un documento por ID.
         
@@ -286,12 +330,14 @@ class DocumentPipeline:
         )
         await self.db.commit()
     
-    async def _save_text_extraction(self, document_id: str, parse_result: ParseResult):
+    async def _save_text_extraction(self, document_id: str, parse_result: ParseResult,
+                                    clean_text: Optional[str] = None):
         """Guarda la extracción de texto.
         
         Args:
             document_id: ID del documento
             parse_result: Resultado del parsing
+            clean_text: Texto limpio ya calculado (si no, se limpia aquí)
         """
         from uuid import UUID
         
@@ -299,7 +345,10 @@ class DocumentPipeline:
             document_id=UUID(document_id),
             status='completed',
             extracted_text=parse_result.text,
-            extracted_text_clean=self.cleaner.clean_text(parse_result.text),
+            extracted_text_clean=(
+                clean_text if clean_text is not None
+                else self.cleaner.clean_text(parse_result.text)
+            ),
             extracted_metadata=parse_result.metadata,
             extraction_engine='document_parser',
             processed_at=datetime.utcnow()
@@ -307,6 +356,44 @@ class DocumentPipeline:
         
         self.db.add(extraction)
         await self.db.commit()
+        
+        # Mantener al día el índice de candidatos/jobs sugeridos
+        await refresh_embeddings(self.db, document_id=document_id)
+    
+    def _extractor_version(self, document_type: DocumentType) -> str:
+        """Versión de la extracción de datos para un tipo (parser + extractor)."""
+        extractor = {
+            DocumentType.ASSESSMENT: self.assessment_extractor,
+            DocumentType.CV: self.cv_extractor,
+            DocumentType.INTERVIEW: self.interview_extractor,
+        }.get(document_type)
+        if extractor is None:
+            return self.parser.VERSION
+        return f"{self.parser.VERSION}+{extractor.VERSION}"
+    
+    async def _extract_data_cached(self, document_type: DocumentType, text: str,
+                                   document_id: str, file_hash: Optional[str]) -> ExtractionResult:
+        """_extract_data con cache por hash del archivo.
+        
+        Args:
+            document_type: Tipo de documento
+            text: Texto extraído
+            document_id: ID del documento
+            file_hash: SHA-256 del archivo (sin hash no se cachea)
+            
+        Returns:
+            Resultado de extracción
+        """
+        kind = f"data:{document_type.value}"
+        version = self._extractor_version(document_type)
+        cached = await extraction_cache.get(kind, version, file_hash)
+        if cached is not None:
+            return ExtractionResult(**cached)
+        
+        extraction_result = await self._extract_data(document_type, text, document_id)
+        extraction_result.extractor_version = version
+        await extraction_cache.set(kind, version, file_hash, extraction_result.dict())
+        return extraction_result
     
     async def _extract_data(self, document_type: DocumentType, text: str, 
                            document_id: str) -> ExtractionResult:
@@ -874,14 +874,15 @@ class JobListResponse(BaseModel):
 
 
 class CandidateListResponse(BaseModel):
-    """Respuesta paginada de candidatos."""
+    """Respuesta paginada (por cursor) de candidatos."""
     items: List[CandidateResponse]
-    total: int
+    total: Optional[int] = None  # Estimado; None si no se pidió
     page: int = Field(..., ge=1)
     page_size: int = Field(..., ge=1, le=100)
-    pages: int
+    pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 
 class EvaluationListResponse(BaseModel):
@@ -9,6 +9,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.core.decryption import DecryptedStr
+
 
 # =============================================================================
 # BASE SCHEMAS
@@ -34,9 +36,9 @@ class CandidateBase(BaseSchema):
     full_name: str = Field(..., min_length=1, max_length=500)
     first_name: Optional[str] = Field(None, max_length=255)
     last_name: Optional[str] = Field(None, max_length=255)
-    national_id: Optional[str] = Field(None, max_length=100)
-    email: Optional[str] = Field(None, max_length=255)
-    phone: Optional[str] = Field(None, max_length=50)
+    national_id: Optional[DecryptedStr] = Field(None, max_length=100)
+    email: Optional[DecryptedStr] = Field(None, max_length=255)
+    phone: Optional[DecryptedStr] = Field(None, max_length=50)
     location: Optional[str] = Field(None, max_length=255)
     linkedin_url: Optional[str] = Field(None, max_length=500)
     current_company: Optional[str] = Field(None, max_length=255)
@@ -67,9 +69,10 @@ class CandidateResponse(CandidateBase, TimestampMixin):
 class CandidateListResponse(BaseSchema):
     """Schema para lista de candidatos con paginación."""
     items: List[CandidateResponse]
-    total: int
+    total: Optional[int] = None  # Estimado; None si no se pidió
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class CandidateWithApplicationsResponse(CandidateResponse):
@@ -319,9 +322,10 @@ class ApplicationSummaryResponse(BaseSchema):
 class ApplicationListResponse(BaseSchema):
     """Schema para lista de aplicaciones."""
     items: List[ApplicationResponse]
-    total: int
+    total: Optional[int] = None  # Estimado; None si no se pidió
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class ApplicationWithDetailsResponse(ApplicationResponse):
@@ -655,6 +659,25 @@ class AuditLogResponse(BaseSchema):
     diff_json: Optional[Dict[str, Any]]
 
 
+# =============================================================================
+# SEARCH SCHEMAS
+# =============================================================================
+
+class SearchResultItem(BaseSchema):
+    """Resultado de búsqueda unificada."""
+    type: str  # candidate | role | job
+    id: UUID
+    title: str
+    subtitle: Optional[str] = None
+    score: float = Field(..., ge=0, le=1)
+
+
+class SearchResponse(BaseSchema):
+    """Resultados rankeados por relevancia."""
+    query: str
+    items: List[SearchResultItem]
+
+
 # =============================================================================
 # FORWARD REFERENCES RESOLUTION
 # =============================================================================
@@ -10,12 +10,16 @@ from uuid import UUID
 
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
+from sqlalchemy import select, and_
 
+from app.core.pagination import Keyset
 from app.models.core_ats import HHAuditLog, AuditAction
 
 logger = logging.getLogger(__name__)
 
+# Orden de consulta: más recientes primero, audit_id como desempate
+AUDIT_KEYSET = Keyset("changed_at", HHAuditLog.changed_at, HHAuditLog.audit_id)
+
 
 class AuditService:
     """Servicio para gestionar auditoría de operaciones."""
@@ -298,24 +302,17 @@ class AuditService:
         
         return audit_log
     
-    async def query_audit_logs(
+    def audit_logs_query(
         self,
         entity_type: Optional[str] = None,
         entity_id: Optional[UUID] = None,
         action: Optional[AuditAction] = None,
         changed_by: Optional[str] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        skip: int = 0,
-        limit: int = 100
-    ) -> List[HHAuditLog]:
-        """
-        Consulta logs de auditoría con filtros.
-        
-        Returns:
-            Lista de HHAuditLog
-        """
-        query = select(HHAuditLog).order_by(desc(HHAuditLog.changed_at))
+        end_date: Optional[datetime] = None
+    ):
+        """SELECT filtrado de logs de auditoría (sin orden ni paginación)."""
+        query = select(HHAuditLog)
         
         filters = []
         if entity_type:
@@ -333,8 +330,43 @@ class AuditService:
         
         if filters:
             query = query.where(and_(*filters))
+        return query
+    
+    async def query_audit_logs(
+        self,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[UUID] = None,
+        action: Optional[AuditAction] = None,
+        changed_by: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[HHAuditLog]:
+        """
+        Consulta logs de auditoría con filtros, más recientes primero.
+        
+        Args:
+            cursor: Cursor de AUDIT_KEYSET; si viene se ignora `skip`
+        
+        Returns:
+            Lista de HHAuditLog
         
-        query = query.offset(skip).limit(limit)
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        query = self.audit_logs_query(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            action=action,
+            changed_by=changed_by,
+            start_date=start_date,
+            end_date=end_date
+        )
+        query = AUDIT_KEYSET.apply(query, cursor, limit)
+        if skip and not cursor:
+            query = query.offset(skip)
         
         result = await self.db.execute(query)
         return result.scalars().all()
@@ -0,0 +1,576 @@
+"""
+Scoring masivo offline vía Batch API del proveedor LLM.
+
+El re-scoring nocturno de las aplicaciones abiertas no necesita respuesta
+inmediata. En lugar de una chat completion síncrona por aplicación
+(`ScoringService.score_application`), las peticiones se empaquetan en un
+JSONL con el formato de OpenAI Batch, se envían como un único batch job y,
+cuando el proveedor termina, los resultados se escriben en BD en bloque.
+El batch tiene cuota de rate limit propia (no compite con el tráfico
+interactivo) y menor costo por token.
+
+Proveedores:
+- OpenAIBatchProvider: /v1/files + /v1/batches.
+- LocalBatchProvider: stand-in en disco con el mismo formato de entrada y
+  salida, para desarrollo y tests.
+"""
+import json
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.metrics import track_llm_request
+from app.models.core_ats import (
+    ApplicationStage, HHApplication, HHAuditLog, HHCVExtraction, HHRole,
+    RoleStatus, ScoringStatus
+)
+from app.services.pipeline_stats import ApplicationStatsEntry, PipelineStatsService
+from app.services.scoring_service import ScoringService
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Estados finales de un batch (nomenclatura de OpenAI)
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Ventana de completion del batch (24h) con margen
+STALE_PROCESSING_AFTER = timedelta(hours=48)
+
+# Etapas en las que una aplicación ya no se re-evalúa
+CLOSED_STAGES = [ApplicationStage.HIRED, ApplicationStage.DISCARDED]
+
+
+class BatchScoringError(Exception):
+    """Error en el envío o lectura de un batch de scoring."""
+    pass
+
+
+@dataclass
+class BatchJob:
+    """Estado de un batch job en el proveedor."""
+    batch_id: str
+    status: str
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    created_at: Optional[float] = None
+    request_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    @classmethod
+    def from_openai(cls, data: Dict[str, Any]) -> "BatchJob":
+        return cls(
+            batch_id=data["id"],
+            status=data["status"],
+            output_file_id=data.get("output_file_id"),
+            error_file_id=data.get("error_file_id"),
+            created_at=data.get("created_at"),
+            request_counts=data.get("request_counts") or {},
+        )
+
+
+@dataclass
+class BatchItemResult:
+    """Resultado de una petición del batch (una línea del output)."""
+    custom_id: str
+    content: Optional[str] = None
+    error: Optional[str] = None
+    tokens_prompt: int = 0
+    tokens_completion: int = 0
+
+
+def parse_output_line(line: str) -> BatchItemResult:
+    """Parsea una línea del output/error JSONL de un batch."""
+    data = json.loads(line)
+    custom_id = data.get("custom_id")
+    error = data.get("error")
+    response = data.get("response") or {}
+    body = response.get("body") or {}
+
+    if error:
+        return BatchItemResult(custom_id, error=error.get("message") or str(error))
+    if response.get("status_code") != 200:
+        message = (body.get("error") or {}).get("message") or f"HTTP {response.get('status_code')}"
+        return BatchItemResult(custom_id, error=message)
+
+    usage = body.get("usage") or {}
+    try:
+        content = body["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return BatchItemResult(custom_id, error="Respuesta sin contenido")
+    return BatchItemResult(
+        custom_id,
+        content=content,
+        tokens_prompt=usage.get("prompt_tokens", 0),
+        tokens_completion=usage.get("completion_tokens", 0),
+    )
+
+
+def _parse_output(text: str) -> List[BatchItemResult]:
+    return [parse_output_line(line) for line in text.splitlines() if line.strip()]
+
+
+class BatchProvider(ABC):
+    """Proveedor de batch jobs con el formato de OpenAI Batch."""
+
+    @abstractmethod
+    async def submit(self, requests: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> BatchJob:
+        """Envía las peticiones (líneas del JSONL de entrada) como un batch."""
+
+    @abstractmethod
+    async def get(self, batch_id: str) -> BatchJob:
+        """Consulta el estado de un batch."""
+
+    @abstractmethod
+    async def results(self, job: BatchJob) -> List[BatchItemResult]:
+        """Descarga los resultados (y errores) de un batch terminado."""
+
+    async def close(self):
+        """Libera los recursos del proveedor."""
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """Batch API de OpenAI."""
+
+    BASE_URL = "https://api.openai.com/v1"
+
+    def __init__(self, api_key: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self._client = client
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=120.0,
+            )
+        return self._client
+
+    async def close(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def submit(self, requests: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> BatchJob:
+        content = "\n".join(json.dumps(r, ensure_ascii=False) for r in requests).encode()
+        client = self._http()
+
+        response = await client.post(
+            "/files",
+            data={"purpose": "batch"},
+            files={"file": ("scoring_batch.jsonl", content, "application/jsonl")},
+        )
+        response.raise_for_status()
+        input_file_id = response.json()["id"]
+
+        response = await client.post("/batches", json={
+            "input_file_id": input_file_id,
+            "endpoint": CHAT_COMPLETIONS_ENDPOINT,
+            "completion_window": "24h",
+            "metadata": metadata or {},
+        })
+        response.raise_for_status()
+        return BatchJob.from_openai(response.json())
+
+    async def get(self, batch_id: str) -> BatchJob:
+        response = await self._http().get(f"/batches/{batch_id}")
+        response.raise_for_status()
+        return BatchJob.from_openai(response.json())
+
+    async def results(self, job: BatchJob) -> List[BatchItemResult]:
+        items: List[BatchItemResult] = []
+        for file_id in (job.output_file_id, job.error_file_id):
+            if not file_id:
+                continue
+            response = await self._http().get(f"/files/{file_id}/content")
+            response.raise_for_status()
+            items.extend(_parse_output(response.text))
+        return items
+
+
+# Recibe el body de una chat completion y devuelve el contenido del mensaje
+LocalHandler = Callable[[Dict[str, Any]], Awaitable[str]]
+
+
+async def default_local_handler(body: Dict[str, Any]) -> str:
+    """Respuesta neutral del stand-in local (no llama a ningún LLM)."""
+    return json.dumps({
+        "score": 50,
+        "justification": "Evaluación generada por el proveedor batch local (sin LLM).",
+        "skill_match": {},
+        "experience_match": {},
+        "seniority_match": {},
+        "industry_match": {},
+        "recommendations": [],
+    })
+
+
+class LocalBatchProvider(BatchProvider):
+    """Stand-in local de la Batch API.
+
+    Guarda el JSONL de entrada en disco y, en la primera consulta de estado,
+    procesa cada línea con `handler` y escribe un output JSONL idéntico en
+    formato al de OpenAI. Permite probar el flujo completo (envío, polling,
+    escritura en BD) sin red.
+    """
+
+    def __init__(self, directory: Optional[str] = None, handler: Optional[LocalHandler] = None):
+        self.directory = directory or settings.BATCH_SCORING_LOCAL_DIR
+        self.handler = handler or default_local_handler
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_state(self, batch_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(f"{batch_id}.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise BatchScoringError(f"Batch {batch_id} no encontrado")
+
+    def _write_state(self, state: Dict[str, Any]):
+        tmp_path = self._path(f"{state['id']}.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path(f"{state['id']}.json"))
+
+    async def submit(self, requests: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> BatchJob:
+        batch_id = f"batch_local_{uuid.uuid4().hex}"
+        with open(self._path(f"{batch_id}.input.jsonl"), "w") as f:
+            for request in requests:
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+        state = {
+            "id": batch_id,
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "metadata": metadata or {},
+            "request_counts": {"total": len(requests), "completed": 0, "failed": 0},
+        }
+        self._write_state(state)
+        return BatchJob.from_openai(state)
+
+    async def get(self, batch_id: str) -> BatchJob:
+        state = self._read_state(batch_id)
+        if state["status"] == "in_progress":
+            state = await self._process(state)
+        return BatchJob.from_openai(state)
+
+    async def _process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = state["id"]
+        output, errors = [], []
+
+        with open(self._path(f"{batch_id}.input.jsonl")) as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+
+        for request in requests:
+            line_id = f"batch_req_{uuid.uuid4().hex[:12]}"
+            try:
+                content = await self.handler(request["body"])
+                output.append({
+                    "id": line_id,
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "model": request["body"].get("model"),
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                            "usage": {"prompt_tokens": 0, "completion_tokens": 0},
+                        },
+                    },
+                    "error": None,
+                })
+            except Exception as e:
+                errors.append({
+                    "id": line_id,
+                    "custom_id": request["custom_id"],
+                    "response": None,
+                    "error": {"code": "local_error", "message": str(e)},
+                })
+
+        for suffix, lines in (("output", output), ("errors", errors)):
+            if lines:
+                with open(self._path(f"{batch_id}.{suffix}.jsonl"), "w") as f:
+                    f.write("\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\n")
+
+        state.update(
+            status="completed",
+            output_file_id=f"{batch_id}.output.jsonl" if output else None,
+            error_file_id=f"{batch_id}.errors.jsonl" if errors else None,
+            request_counts={"total": len(requests), "completed": len(output), "failed": len(errors)},
+        )
+        self._write_state(state)
+        return state
+
+    async def results(self, job: BatchJob) -> List[BatchItemResult]:
+        items: List[BatchItemResult] = []
+        for file_id in (job.output_file_id, job.error_file_id):
+            if file_id:
+                with open(self._path(file_id)) as f:
+                    items.extend(_parse_output(f.read()))
+        return items
+
+
+def get_batch_provider() -> BatchProvider:
+    """Proveedor configurado en BATCH_SCORING_PROVIDER."""
+    if settings.BATCH_SCORING_PROVIDER == "local":
+        return LocalBatchProvider()
+    return OpenAIBatchProvider()
+
+
+class BatchScoringService:
+    """Re-scoring masivo de aplicaciones abiertas vía batch jobs."""
+
+    def __init__(
+        self,
+        provider: Optional[BatchProvider] = None,
+        scoring: Optional[ScoringService] = None
+    ):
+        self.provider = provider or get_batch_provider()
+        self.scoring = scoring or ScoringService()
+
+    async def collect_applications(
+        self,
+        db: AsyncSession,
+        role_ids: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[HHApplication]:
+        """Aplicaciones abiertas (vacante abierta, etapa no final) a re-evaluar."""
+        query = (
+            select(HHApplication)
+            .join(HHRole, HHRole.role_id == HHApplication.role_id)
+            .options(
+                joinedload(HHApplication.candidate),
+                joinedload(HHApplication.role).joinedload(HHRole.client)
+            )
+            .filter(
+                HHRole.status == RoleStatus.OPEN,
+                HHApplication.stage.notin_(CLOSED_STAGES),
+                # Las que ya están en un batch en vuelo no se reenvían, salvo
+                # que lleven más que la ventana del batch (poll perdido)
+                or_(
+                    HHApplication.scoring_status != ScoringStatus.PROCESSING,
+                    HHApplication.updated_at < datetime.utcnow() - STALE_PROCESSING_AFTER,
+                ),
+            )
+            .order_by(HHApplication.created_at)
+            .limit(limit or settings.BATCH_SCORING_MAX_REQUESTS)
+        )
+        if role_ids:
+            query = query.filter(HHApplication.role_id.in_(role_ids))
+
+        result = await db.execute(query)
+        return list(result.unique().scalars().all())
+
+    async def _latest_extractions(self, db: AsyncSession, candidate_ids: List[Any]) -> Dict[Any, HHCVExtraction]:
+        """Última extracción de CV por candidato, en una sola query."""
+        if not candidate_ids:
+            return {}
+        result = await db.execute(
+            select(HHCVExtraction)
+            .filter(HHCVExtraction.candidate_id.in_(candidate_ids))
+            .distinct(HHCVExtraction.candidate_id)
+            .order_by(HHCVExtraction.candidate_id, HHCVExtraction.created_at.desc())
+        )
+        return {extraction.candidate_id: extraction for extraction in result.scalars().all()}
+
+    async def build_requests(
+        self,
+        db: AsyncSession,
+        applications: List[HHApplication]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Construye las líneas del JSONL de entrada (una por aplicación).
+
+        Usa los mismos datos de la vacante, prompt y presupuesto de tokens que
+        el scoring interactivo (los datos de cada vacante se leen una vez).
+
+        Returns:
+            Tupla (peticiones, tokens ahorrados por el presupuesto)
+        """
+        extractions = await self._latest_extractions(
+            db, list({application.candidate_id for application in applications})
+        )
+
+        role_data_by_id: Dict[Any, Dict[str, Any]] = {}
+        requests, tokens_saved = [], 0
+        for application in applications:
+            candidate, role = application.candidate, application.role
+            extraction = extractions.get(application.candidate_id)
+            if extraction and extraction.extracted_json:
+                cv_data = self.scoring._extraction_cv_data(extraction)
+            else:
+                cv_data = self.scoring._basic_cv_data(candidate)
+            if role.role_id not in role_data_by_id:
+                role_data_by_id[role.role_id] = await self.scoring._get_role_data(role, db)
+            role_data = role_data_by_id[role.role_id]
+
+            cv_budgeted = self.scoring._build_cv_text(cv_data, role_data, role)
+            tokens_saved += cv_budgeted.tokens_saved
+            prompt = self.scoring._build_scoring_prompt(cv_budgeted.text, role_data, candidate, role)
+
+            requests.append({
+                "custom_id": str(application.application_id),
+                "method": "POST",
+                "url": CHAT_COMPLETIONS_ENDPOINT,
+                "body": self.scoring._chat_request_body(prompt),
+            })
+        return requests, tokens_saved
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        role_ids: Optional[List[str]] = None
+    ) -> Tuple[Optional[BatchJob], List[str]]:
+        """Envía un batch con las aplicaciones abiertas y las marca en proceso.
+
+        Returns:
+            Tupla (batch job o None si no hay nada que evaluar, application_ids)
+        """
+        applications = await self.collect_applications(db, role_ids=role_ids)
+        if not applications:
+            return None, []
+
+        requests, tokens_saved = await self.build_requests(db, applications)
+        application_ids = [request["custom_id"] for request in requests]
+
+        job = await self.provider.submit(requests, metadata={"kind": "hh_application_scoring"})
+
+        await db.execute(
+            update(HHApplication)
+            .where(HHApplication.application_id.in_(application_ids))
+            .values(scoring_status=ScoringStatus.PROCESSING, scoring_error=None)
+        )
+        await db.commit()
+
+        logger.info(
+            f"Submitted scoring batch {job.batch_id} with {len(requests)} applications "
+            f"({tokens_saved} prompt tokens saved by budget)"
+        )
+        return job, application_ids
+
+    async def _record_stats(self, db: AsyncSession, completed_rows: List[Dict[str, Any]]) -> None:
+        """Aplica los nuevos scores a hh_role_stage_stats, como el scoring interactivo.
+
+        Lee los snapshots previos en una sola query; debe llamarse antes del UPDATE.
+        """
+        scores = {row["application_id"]: row["overall_score"] for row in completed_rows}
+        result = await db.execute(
+            select(
+                HHApplication.application_id,
+                HHApplication.role_id,
+                HHApplication.stage,
+                HHApplication.hired,
+                HHApplication.overall_score,
+                HHApplication.decision_date,
+                HHApplication.created_at,
+            ).where(HHApplication.application_id.in_(list(scores)))
+        )
+        stats = PipelineStatsService(db)
+        for application in result.all():
+            before = ApplicationStatsEntry.of(application)
+            after = replace(before, overall_score=scores[application.application_id])
+            await stats.record_application(application.role_id, before, after)
+
+    async def apply_results(
+        self,
+        db: AsyncSession,
+        job: BatchJob,
+        application_ids: List[str],
+        changed_by: str = "batch_scoring"
+    ) -> Dict[str, int]:
+        """Escribe en BD, en bloque, los resultados de un batch terminado.
+
+        Las aplicaciones sin resultado (batch fallido, expirado o línea con
+        error) quedan en FAILED con el motivo en scoring_error.
+
+        Returns:
+            Conteos {"completed": n, "failed": m}
+        """
+        items = {item.custom_id: item for item in await self.provider.results(job)}
+
+        rows, audits = [], []
+        completed = 0
+        tokens_prompt = tokens_completion = 0
+
+        for application_id in application_ids:
+            item = items.get(application_id)
+            row = {"application_id": uuid.UUID(application_id)}
+
+            error = None
+            if item is None:
+                error = f"Sin resultado en el batch {job.batch_id} ({job.status})"
+            elif item.error:
+                error = item.error
+            else:
+                tokens_prompt += item.tokens_prompt
+                tokens_completion += item.tokens_completion
+                try:
+                    scoring_result = self.scoring._parse_result(json.loads(item.content))
+                except (ValueError, TypeError, AttributeError) as e:
+                    error = f"Respuesta inválida del LLM: {e}"
+
+            if error:
+                row.update(scoring_status=ScoringStatus.FAILED, scoring_error=error[:500])
+            else:
+                score = max(0.0, min(100.0, scoring_result.score))
+                row.update(
+                    overall_score=Decimal(str(score)),
+                    scoring_status=ScoringStatus.COMPLETED,
+                    scoring_error=None,
+                )
+                audits.append(HHAuditLog(
+                    entity_type="application",
+                    entity_id=application_id,
+                    action="update",
+                    changed_by=changed_by,
+                    diff_json={
+                        "overall_score": {
+                            "new": score,
+                            "justification": scoring_result.justification[:500],
+                            "batch_id": job.batch_id,
+                        }
+                    }
+                ))
+                completed += 1
+            rows.append(row)
+
+        # UPDATE por primary key en bloque (executemany) + auditoría en un solo commit
+        completed_rows = [r for r in rows if r["scoring_status"] == ScoringStatus.COMPLETED]
+        failed_rows = [r for r in rows if r["scoring_status"] == ScoringStatus.FAILED]
+        if completed_rows:
+            await self._record_stats(db, completed_rows)
+        for group in (completed_rows, failed_rows):
+            if group:
+                await db.execute(update(HHApplication), group)
+        db.add_all(audits)
+        await db.commit()
+
+        track_llm_request(
+            model=self.scoring.model,
+            operation="scoring_batch",
+            duration=time.time() - job.created_at if job.created_at else 0.0,
+            tokens_prompt=tokens_prompt,
+            tokens_completion=tokens_completion,
+            success=job.status == "completed",
+        )
+
+        counts = {"completed": completed, "failed": len(rows) - completed}
+        logger.info(f"Applied scoring batch {job.batch_id}: {counts}")
+        return counts
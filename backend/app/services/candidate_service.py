@@ -4,16 +4,25 @@ from datetime import datetime
 import time
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload, joinedload
 
 from app.models import Candidate, CandidateStatus, Evaluation, JobOpening
 from app.schemas import CandidateCreate, CandidateUpdate
 from app.services.evaluation_service import EvaluationService
-from app.core.llm_cache import get_cached_evaluation, cache_evaluation
+from app.core.llm_cache import get_cached_evaluation, cache_evaluation, get_llm_cache
+from app.core.single_flight import get_single_flight
+from app.core.cache import CANDIDATES_LIST_TAG, invalidate_candidate_cache
+from app.core.pagination import Keyset, KeysetPage, estimate_count
+from app.core.search import matches
+from app.services.embedding_index import refresh_embeddings
 from app.integrations.llm import LLMClient, EvaluationResult
 
 
+# Orden del listado: más recientes primero, id como desempate
+CANDIDATES_KEYSET = Keyset("date", Candidate.created_at, Candidate.id)
+
+
 class CandidateService:
     """Servicio para gestionar candidatos."""
     
@@ -43,10 +52,21 @@ class CandidateService:
         status: Optional[str] = None,
         source: Optional[str] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> tuple[List[Candidate], int]:
-        """Listar candidatos con filtros y paginación."""
+        include_total: bool = True,
+    ) -> KeysetPage[Candidate]:
+        """Listar candidatos (más recientes primero) con filtros y paginación por cursor.
+        
+        Args:
+            cursor: Cursor de la página siguiente; si viene se ignora `skip`
+            skip: Offset para clientes que aún paginan por número de página
+            include_total: Calcular el total estimado (ver estimate_count)
+        
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
         query = select(Candidate)
         
         # Aplicar filtros
@@ -58,28 +78,18 @@ class CandidateService:
         if source:
             filters.append(Candidate.source == source)
         if search:
-            search_filter = or_(
-                Candidate.full_name.ilike(f"%{search}%"),
-                Candidate.email.ilike(f"%{search}%"),
-            )
-            filters.append(search_filter)
+            filters.append(or_(
+                matches(Candidate.search_text, search),
+                Candidate.email_normalized == search.strip().lower(),
+            ))
         
         if filters:
             query = query.where(and_(*filters))
         
-        # Contar total
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-        
-        # Ordenar y paginar
-        query = query.order_by(desc(Candidate.created_at))
-        query = query.offset(skip).limit(limit)
-        
-        result = await self.db.execute(query)
-        candidates = result.scalars().all()
-        
-        return candidates, total
+        page = await CANDIDATES_KEYSET.fetch(self.db, query, cursor, limit, offset=skip)
+        if include_total:
+            page.total = await estimate_count(self.db, query, tags=[CANDIDATES_LIST_TAG])
+        return page
     
     async def create_candidate(self, data: CandidateCreate) -> Candidate:
         """Crear nuevo candidato."""
@@ -118,6 +128,8 @@ class CandidateService:
         self.db.add(candidate)
         await self.db.flush()
         await self.db.refresh(candidate)
+        await refresh_embeddings(self.db, candidate_id=candidate.id)
+        await invalidate_candidate_cache(candidate.id)
         
         return candidate
     
@@ -146,6 +158,8 @@ class CandidateService:
         candidate.updated_at = datetime.utcnow()
         await self.db.flush()
         await self.db.refresh(candidate)
+        await refresh_embeddings(self.db, candidate_id=candidate.id)
+        await invalidate_candidate_cache(candidate.id)
         
         return candidate
     
@@ -232,17 +246,18 @@ class CandidateService:
             }
             evaluation_time_ms = int((time.time() - start_time) * 1000)
         else:
-            # Llamar al LLM
-            llm_client = LLMClient(config=None)
-            await llm_client.initialize(self.db)
-            
-            try:
-                eval_result: EvaluationResult = await llm_client.evaluate_candidate(
-                    candidate_data=candidate_data,
-                    job_data=job_data,
-                )
+            async def run_llm_evaluation() -> Dict[str, Any]:
+                llm_client = LLMClient(config=None)
+                await llm_client.initialize(self.db)
+                try:
+                    eval_result: EvaluationResult = await llm_client.evaluate_candidate(
+                        candidate_data=candidate_data,
+                        job_data=job_data,
+                    )
+                finally:
+                    await llm_client.close()
                 
-                result = {
+                llm_result = {
                     "score": eval_result.score,
                     "decision": eval_result.decision.upper(),  # Convertir a nuestro formato
                     "strengths": eval_result.strengths,
@@ -256,11 +271,17 @@ class CandidateService:
                 await cache_evaluation(
                     candidate_data=candidate_data,
                     job_data=job_data,
-                    result=result,
+                    result=llm_result,
                     provider=provider,
                     model=model,
                     ttl=86400,  # 24 horas
                 )
+                return llm_result
+            
+            try:
+                # Evaluaciones idénticas en vuelo comparten una sola llamada al LLM
+                flight_key = get_llm_cache()._generate_key(candidate_data, job_data, provider, model)
+                result = await get_single_flight().do(flight_key, run_llm_evaluation)
                 
             except Exception as e:
                 # Fallback graceful
@@ -274,8 +295,6 @@ class CandidateService:
                     "cached": False,
                     "error": True,
                 }
-            finally:
-                await llm_client.close()
             
             evaluation_time_ms = int((time.time() - start_time) * 1000)
         
@@ -4,7 +4,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select, desc, and_, or_
+from sqlalchemy import select, desc, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.communication import (
@@ -17,9 +17,16 @@ from app.models.communication import (
 )
 from app.services.whatsapp_service import WhatsAppService
 from app.core.config import settings
+from app.core.blind_index import blind_equals
+from app.core.pagination import Keyset
 
 logger = logging.getLogger(__name__)
 
+# Orden de listado: más recientes primero, communication_id como desempate
+COMMUNICATIONS_KEYSET = Keyset(
+    "created_at", Communication.created_at, Communication.communication_id
+)
+
 
 class CommunicationService:
     """Servicio para gestionar comunicaciones con candidatos."""
@@ -229,17 +236,15 @@ class CommunicationService:
         Returns:
             Comunicación creada o None si no se encuentra candidato
         """
-        # Buscar candidato por teléfono
+        # Buscar candidato por teléfono (blind index: el teléfono está cifrado
+        # y se compara por sus últimos dígitos, con o sin código de país)
         from app.models.core_ats import HHCandidate
         
         result = await self.db.execute(
-            select(HHCandidate).where(
-                or_(
-                    HHCandidate.phone == from_phone,
-                    HHCandidate.phone.like(f"%{from_phone}"),
-                    HHCandidate.phone.like(f"{from_phone}%")
-                )
-            )
+            select(HHCandidate)
+            .where(blind_equals(HHCandidate, "phone", from_phone))
+            .order_by(desc(HHCandidate.created_at))
+            .limit(1)
         )
         candidate = result.scalar_one_or_none()
         
@@ -383,9 +388,10 @@ class CommunicationService:
         status: Optional[CommunicationStatus] = None,
         channel: Optional[CommunicationChannel] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Communication]:
-        """Obtiene comunicaciones filtradas.
+        """Obtiene comunicaciones filtradas, más recientes primero.
         
         Args:
             application_id: Filtrar por aplicación
@@ -393,12 +399,16 @@ class CommunicationService:
             status: Filtrar por estado
             channel: Filtrar por canal
             limit: Límite de resultados
-            offset: Offset para paginación
+            offset: Offset para paginación (obsoleto, se ignora si hay cursor)
+            cursor: Cursor de COMMUNICATIONS_KEYSET
             
         Returns:
             Lista de comunicaciones
+            
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
         """
-        query = select(Communication).order_by(desc(Communication.created_at))
+        query = select(Communication)
         
         if application_id:
             query = query.where(Communication.application_id == application_id)
@@ -412,7 +422,9 @@ class CommunicationService:
         if channel:
             query = query.where(Communication.channel == channel)
         
-        query = query.limit(limit).offset(offset)
+        query = COMMUNICATIONS_KEYSET.apply(query, cursor, limit)
+        if offset and not cursor:
+            query = query.offset(offset)
         
         result = await self.db.execute(query)
         return result.scalars().all()
@@ -0,0 +1,756 @@
+"""
+Índice vectorial local para sugerir candidatos ↔ jobs sin pasar por el LLM.
+
+`get_best_candidates_for_job` y `get_best_jobs_for_candidate` solo leen
+MatchResult ya guardados; un candidato nuevo no aparece hasta que alguien
+corre un match completo. Este módulo mantiene un índice de vectores TF-IDF
+hasheados (feature hashing, sin modelo ni vocabulario que entrenar) sobre:
+
+- Candidatos: extracted_skills + texto de sus CVs (DocumentTextExtraction)
+- Jobs: título, descripción, requisitos y texto del JD
+
+Los vectores se guardan en float16 en un archivo memory-mapped por índice;
+las frecuencias de documento (df) y el mapeo id → fila van en un JSON que
+se reemplaza de forma atómica. El IDF se aplica al consultar, así que el
+índice se actualiza de forma incremental a medida que se procesan
+documentos. Entre procesos (workers de uvicorn, Celery) las escrituras se
+serializan con un flock y los lectores recargan cuando cambia el manifiesto.
+
+Desde el event loop el índice solo se usa en hilos: las escrituras pasan por
+IndexWriter, que las agrupa en lotes (un flock y una reescritura del
+manifiesto por lote) y las consultas por asyncio.to_thread.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import threading
+import weakref
+import zlib
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.prefilter import normalize_skill
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9áéíóúüñ][a-z0-9áéíóúüñ+#.]*")
+
+# Texto máximo por documento indexado (los CVs largos no aportan más señal)
+MAX_TEXT_CHARS = 20000
+
+# Los skills estructurados pesan más que una mención suelta en el texto
+SKILL_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Unigramas y bigramas en minúsculas."""
+    words = [w.rstrip(".") for w in TOKEN_RE.findall((text or "").lower())]
+    words = [w for w in words if len(w) > 1 or w in ("c", "r")]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed_text(text: str = "", skills: Iterable[Any] = (), dim: Optional[int] = None) -> np.ndarray:
+    """
+    Vector TF hasheado (sublineal, normalizado L2) de un texto y sus skills.
+
+    Cada skill se agrega como frase completa, así "machine learning" en
+    extracted_skills coincide con el bigrama del texto de un JD.
+    """
+    dim = dim or settings.EMBEDDING_INDEX_DIM
+    counts = Counter(tokenize(text[:MAX_TEXT_CHARS] if text else ""))
+    for skill in skills or []:
+        name = normalize_skill(skill)
+        if not name:
+            continue
+        counts[name] += SKILL_WEIGHT
+        for token in tokenize(name):
+            if token != name:
+                counts[token] += 1
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for token, count in counts.items():
+        h = zlib.crc32(token.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dim] += sign * (1.0 + math.log(count))
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class HashedTfidfIndex:
+    """
+    Índice de vectores hasheados con búsqueda top-K por coseno TF-IDF.
+
+    Las filas liberadas por `remove` se reutilizan en el siguiente `upsert`.
+    """
+
+    def __init__(self, name: str, directory: Optional[str] = None, dim: Optional[int] = None):
+        self.name = name
+        self.dim = dim or settings.EMBEDDING_INDEX_DIM
+        self.directory = Path(directory or settings.EMBEDDING_INDEX_DIR)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._df = np.zeros(self.dim, dtype=np.int64)
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._stamp: Optional[Tuple[int, int]] = None
+        # Estado en memoria compartido entre el hilo escritor y los lectores
+        self._state_lock = threading.RLock()
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / f"{self.name}.meta.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / f"{self.name}.vectors"
+
+    @property
+    def _lock_path(self) -> Path:
+        return self.directory / f"{self.name}.lock"
+
+    def __len__(self) -> int:
+        with self._state_lock:
+            self._ensure_fresh()
+            return len(self._rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._state_lock:
+            self._ensure_fresh()
+            return str(item_id) in self._rows
+
+    # ---------- persistencia ----------
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self._meta_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _ensure_fresh(self):
+        """Recarga desde disco si otro proceso escribió el índice."""
+        stamp = self._current_stamp()
+        if stamp != self._stamp:
+            self._load()
+
+    def _load(self):
+        self._stamp = self._current_stamp()
+        meta = None
+        if self._stamp is not None:
+            try:
+                meta = json.loads(self._meta_path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Embedding index {self.name}: unreadable manifest, starting empty: {e}")
+
+        if not meta or meta.get("dim") != self.dim or not self._vectors_path.exists():
+            self._ids, self._rows = [], {}
+            self._df = np.zeros(self.dim, dtype=np.int64)
+            self._vectors, self._capacity = None, 0
+            return
+
+        self._ids = meta["ids"]
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids) if item_id is not None}
+        self._df = np.asarray(meta["df"], dtype=np.int64)
+        self._capacity = meta["capacity"]
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float16, mode="r+", shape=(self._capacity, self.dim)
+        )
+
+    def _save(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        meta = {
+            "dim": self.dim,
+            "capacity": self._capacity,
+            "ids": self._ids,
+            "df": self._df.tolist(),
+        }
+        tmp_path = self._meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self._meta_path)
+        self._stamp = self._current_stamp()
+
+    def _grow(self, needed: int):
+        """Duplica la capacidad del archivo de vectores."""
+        capacity = max(needed, self._capacity * 2, 256)
+        tmp_path = self._vectors_path.with_suffix(".grow")
+        vectors = np.memmap(tmp_path, dtype=np.float16, mode="w+", shape=(capacity, self.dim))
+        if self._vectors is not None and self._capacity:
+            vectors[:self._capacity] = self._vectors[:self._capacity]
+        vectors.flush()
+        del vectors
+        os.replace(tmp_path, self._vectors_path)
+        self._capacity = capacity
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim)
+        )
+
+    @contextmanager
+    def _write_lock(self):
+        """Serializa escrituras entre procesos y parte del estado más reciente."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with self._state_lock:
+                    self._ensure_fresh()
+                    try:
+                        yield
+                    except BaseException:
+                        # Descarta el estado en memoria: se recarga desde disco
+                        self._stamp = (-1, -1)
+                        raise
+                    self._save()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ---------- escritura ----------
+
+    def upsert(self, item_id: str, vector: np.ndarray):
+        """Inserta o reemplaza el vector de un item."""
+        self.upsert_many([(item_id, vector)])
+
+    def upsert_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> int:
+        """Inserta o reemplaza varios vectores con una sola escritura del manifiesto."""
+        items = [(str(item_id), vector) for item_id, vector in items]
+        self.apply(dict(items))
+        return len(items)
+
+    def apply(self, changes: Dict[str, Optional[np.ndarray]]) -> int:
+        """
+        Aplica upserts (vector) y bajas (None) con una sola escritura del manifiesto.
+
+        Returns:
+            Cantidad de items insertados, reemplazados o eliminados
+        """
+        if not changes:
+            return 0
+
+        applied = 0
+        with self._write_lock():
+            for item_id, vector in changes.items():
+                item_id = str(item_id)
+                if vector is None:
+                    applied += self._remove_row(item_id)
+                    continue
+
+                row = self._rows.get(item_id)
+                if row is not None:
+                    self._df -= (self._vectors[row] != 0)
+                else:
+                    row = self._allocate_row()
+                    self._ids[row] = item_id
+                    self._rows[item_id] = row
+
+                stored = np.asarray(vector, dtype=np.float16)
+                self._vectors[row] = stored
+                self._df += (stored != 0)
+                applied += 1
+        return applied
+
+    def _allocate_row(self) -> int:
+        try:
+            return self._ids.index(None)
+        except ValueError:
+            pass
+        row = len(self._ids)
+        if row >= self._capacity:
+            self._grow(row + 1)
+        self._ids.append(None)
+        return row
+
+    def _remove_row(self, item_id: str) -> bool:
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return False
+        self._df -= (self._vectors[row] != 0)
+        self._vectors[row] = 0
+        self._ids[row] = None
+        return True
+
+    def remove(self, item_id: str) -> bool:
+        """Elimina un item del índice."""
+        if item_id not in self:
+            return False
+        return self.apply({str(item_id): None}) > 0
+
+    def clear(self):
+        """Vacía el índice (para reconstrucción completa)."""
+        with self._write_lock():
+            self._ids, self._rows = [], {}
+            self._df = np.zeros(self.dim, dtype=np.int64)
+            if self._vectors is not None:
+                self._vectors[:] = 0
+
+    # ---------- lectura ----------
+
+    def get_vector(self, item_id: str) -> Optional[np.ndarray]:
+        """Vector guardado de un item (float32) o None."""
+        with self._state_lock:
+            self._ensure_fresh()
+            row = self._rows.get(str(item_id))
+            if row is None:
+                return None
+            return np.asarray(self._vectors[row], dtype=np.float32)
+
+    def _idf(self) -> np.ndarray:
+        n_docs = len(self._rows)
+        return (np.log((1.0 + n_docs) / (1.0 + self._df)) + 1.0).astype(np.float32)
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        exclude: Sequence[str] = (),
+        min_similarity: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-K items por similitud coseno TF-IDF con `query`.
+
+        Returns:
+            Lista de (item_id, similitud) ordenada de mayor a menor
+        """
+        with self._state_lock:
+            return self._search(query, top_k, exclude, min_similarity)
+
+    def _search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        exclude: Sequence[str],
+        min_similarity: float
+    ) -> List[Tuple[str, float]]:
+        self._ensure_fresh()
+        n_rows = len(self._ids)
+        if not self._rows or top_k <= 0:
+            return []
+
+        weights = self._idf()
+        weighted_query = np.asarray(query, dtype=np.float32) * weights
+        query_norm = np.linalg.norm(weighted_query)
+        if query_norm == 0:
+            return []
+
+        matrix = np.asarray(self._vectors[:n_rows], dtype=np.float32)
+        dots = matrix @ (weighted_query * weights)
+        norms = np.sqrt(np.square(matrix) @ np.square(weights))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarities = np.where(norms > 0, dots / (norms * query_norm), -1.0)
+
+        for row, item_id in enumerate(self._ids):
+            if item_id is None:
+                similarities[row] = -1.0
+        for item_id in exclude:
+            row = self._rows.get(str(item_id))
+            if row is not None:
+                similarities[row] = -1.0
+
+        k = min(top_k, n_rows)
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+
+        return [
+            (self._ids[row], round(float(similarities[row]), 4))
+            for row in candidates
+            if similarities[row] > min_similarity
+        ]
+
+
+# Hilos que aplican las escrituras (uno por índice basta)
+_write_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="embedding-index")
+
+
+class IndexWriter:
+    """
+    Escrituras de un índice desde el event loop, fuera del loop y por lotes.
+
+    Los cambios se encolan y un hilo los aplica con `HashedTfidfIndex.apply`.
+    Lo que llega mientras se escribe un lote va junto en el siguiente, así
+    que N altas concurrentes cuestan un flock y una reescritura del
+    manifiesto, no N.
+    """
+
+    def __init__(self, index: HashedTfidfIndex):
+        self.index = index
+        self._mutex = threading.Lock()
+        self._pending: Dict[str, Optional[np.ndarray]] = {}
+        self._waiters: List[Future] = []
+        self._draining = False
+
+    async def write(self, changes: Iterable[Tuple[str, Optional[np.ndarray]]]) -> int:
+        """
+        Encola upserts (vector) y bajas (None) y espera a que se escriban.
+
+        Returns:
+            Cantidad de cambios encolados
+        """
+        changes = [(str(item_id), vector) for item_id, vector in changes]
+        if not changes:
+            return 0
+
+        done: Future = Future()
+        with self._mutex:
+            self._pending.update(changes)
+            self._waiters.append(done)
+            start = not self._draining
+            self._draining = True
+        if start:
+            _write_executor.submit(self._drain)
+        await asyncio.wrap_future(done)
+        return len(changes)
+
+    def _drain(self):
+        """Aplica lotes hasta vaciar la cola (corre en _write_executor)."""
+        while True:
+            with self._mutex:
+                if not self._pending:
+                    self._draining = False
+                    return
+                batch, self._pending = self._pending, {}
+                waiters, self._waiters = self._waiters, []
+            try:
+                self.index.apply(batch)
+            except Exception as e:
+                for waiter in waiters:
+                    waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    waiter.set_result(None)
+
+
+# Singletons por proceso
+_indexes: Dict[str, HashedTfidfIndex] = {}
+_writers: "weakref.WeakKeyDictionary[HashedTfidfIndex, IndexWriter]" = weakref.WeakKeyDictionary()
+_writers_lock = threading.Lock()
+
+
+def get_embedding_index(name: str) -> HashedTfidfIndex:
+    """Obtiene el índice `candidates` o `jobs` del proceso."""
+    if name not in _indexes:
+        _indexes[name] = HashedTfidfIndex(name)
+    return _indexes[name]
+
+
+def get_index_writer(index: HashedTfidfIndex) -> IndexWriter:
+    """Obtiene el IndexWriter (único por proceso) de un índice."""
+    with _writers_lock:
+        writer = _writers.get(index)
+        if writer is None:
+            writer = _writers[index] = IndexWriter(index)
+        return writer
+
+
+class EmbeddingIndexService:
+    """Construye, actualiza y consulta los índices de candidatos y jobs."""
+
+    CANDIDATES = "candidates"
+    JOBS = "jobs"
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.candidates = get_embedding_index(self.CANDIDATES)
+        self.jobs = get_embedding_index(self.JOBS)
+
+    async def _document_texts(self, filters) -> List[Any]:
+        """Textos extraídos de documentos (una sola query)."""
+        from app.models.rhtools import Document, DocumentTextExtraction
+
+        result = await self.db.execute(
+            select(
+                Document.id,
+                Document.candidate_id,
+                DocumentTextExtraction.extracted_text
+            )
+            .join(DocumentTextExtraction, DocumentTextExtraction.document_id == Document.id)
+            .where(and_(DocumentTextExtraction.extracted_text.isnot(None), *filters))
+            .order_by(DocumentTextExtraction.created_at.desc())
+        )
+        return result.all()
+
+    async def index_candidates(self, candidate_ids: Sequence[str]) -> int:
+        """Indexa (o reindexa) candidatos: skills + texto de sus CVs."""
+        from app.models import Candidate
+        from app.models.rhtools import Document
+
+        if not candidate_ids:
+            return 0
+
+        result = await self.db.execute(
+            select(Candidate.id, Candidate.extracted_skills).where(Candidate.id.in_(candidate_ids))
+        )
+        candidates = result.all()
+        if not candidates:
+            return 0
+
+        texts: Dict[str, List[str]] = {}
+        for row in await self._document_texts([
+            Document.candidate_id.in_([c.id for c in candidates]),
+            Document.document_type.in_(["resume", "cv"]),
+        ]):
+            texts.setdefault(str(row.candidate_id), []).append(row.extracted_text)
+
+        items = await asyncio.to_thread(lambda: [
+            (
+                str(candidate.id),
+                embed_text(
+                    "\n".join(texts.get(str(candidate.id), []))[:MAX_TEXT_CHARS],
+                    skills=candidate.extracted_skills or [],
+                )
+            )
+            for candidate in candidates
+        ])
+        return await get_index_writer(self.candidates).write(items)
+
+    async def index_candidate(self, candidate_id: str) -> bool:
+        return await self.index_candidates([candidate_id]) > 0
+
+    async def index_jobs(self, job_ids: Sequence[str]) -> int:
+        """Indexa (o reindexa) jobs: título, descripción, requisitos y JD."""
+        from app.models import JobOpening
+        from app.models.rhtools import Document
+
+        if not job_ids:
+            return 0
+
+        result = await self.db.execute(
+            select(
+                JobOpening.id,
+                JobOpening.title,
+                JobOpening.description,
+                JobOpening.seniority,
+                JobOpening.requirements,
+                JobOpening.job_description_file_id
+            ).where(JobOpening.id.in_(job_ids))
+        )
+        jobs = result.all()
+        if not jobs:
+            return 0
+
+        jd_ids = [job.job_description_file_id for job in jobs if job.job_description_file_id]
+        jd_texts: Dict[Any, str] = {}
+        if jd_ids:
+            for row in await self._document_texts([Document.id.in_(jd_ids)]):
+                jd_texts.setdefault(row.id, row.extracted_text)
+
+        items = await asyncio.to_thread(lambda: [
+            (str(job.id), self._embed_job(job, jd_texts.get(job.job_description_file_id)))
+            for job in jobs
+        ])
+        return await get_index_writer(self.jobs).write(items)
+
+    async def index_job(self, job_id: str) -> bool:
+        return await self.index_jobs([job_id]) > 0
+
+    def _embed_job(self, job: Any, jd_text: Optional[str]) -> np.ndarray:
+        requirements = job.requirements or {}
+        parts = [job.title or "", job.seniority or "", jd_text or job.description or ""]
+        for key in ("education_fields", "certifications"):
+            parts.extend(str(value) for value in requirements.get(key) or [])
+        skills = list(requirements.get("required_skills") or [])
+        skills += list(requirements.get("preferred_skills") or [])
+        return embed_text("\n".join(parts), skills=skills)
+
+    async def index_document(self, document_id: str) -> int:
+        """
+        Reindexa lo que depende de un documento recién procesado:
+        el candidato dueño del CV y/o los jobs que lo usan como JD.
+        """
+        from app.models import JobOpening
+        from app.models.rhtools import Document
+
+        result = await self.db.execute(
+            select(Document.candidate_id, Document.document_type).where(Document.id == document_id)
+        )
+        document = result.one_or_none()
+        if document is None:
+            return 0
+
+        indexed = 0
+        if document.candidate_id and document.document_type in ("resume", "cv"):
+            indexed += await self.index_candidates([document.candidate_id])
+
+        result = await self.db.execute(
+            select(JobOpening.id).where(JobOpening.job_description_file_id == document_id)
+        )
+        job_ids = [row.id for row in result.all()]
+        if job_ids:
+            indexed += await self.index_jobs(job_ids)
+        return indexed
+
+    async def remove_jobs(self, job_ids: Sequence[str]) -> int:
+        return await get_index_writer(self.jobs).write((job_id, None) for job_id in job_ids)
+
+    async def remove_candidates(self, candidate_ids: Sequence[str]) -> int:
+        return await get_index_writer(self.candidates).write(
+            (candidate_id, None) for candidate_id in candidate_ids
+        )
+
+    async def rebuild(self, batch_size: int = 500) -> Dict[str, int]:
+        """Reconstruye ambos índices desde la base de datos."""
+        from app.models import Candidate, JobOpening
+
+        counts = {}
+        for index, model, indexer in (
+            (self.candidates, Candidate, self.index_candidates),
+            (self.jobs, JobOpening, self.index_jobs),
+        ):
+            await asyncio.to_thread(index.clear)
+            result = await self.db.execute(select(model.id).order_by(model.id))
+            ids = [row.id for row in result.all()]
+            total = 0
+            for start in range(0, len(ids), batch_size):
+                total += await indexer(ids[start:start + batch_size])
+            counts[index.name] = total
+            logger.info(f"Embedding index {index.name} rebuilt with {total} items")
+        return counts
+
+    async def suggest_candidates_for_job(self, job_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Candidatos más similares a un job, tengan o no MatchResult.
+
+        Returns:
+            Lista de dicts con similitud y, si existe, el score del último match
+        """
+        from app.models import Candidate, MatchResult
+
+        vector = await asyncio.to_thread(self.jobs.get_vector, job_id)
+        if vector is None:
+            if not await self.index_job(job_id):
+                return []
+            vector = await asyncio.to_thread(self.jobs.get_vector, job_id)
+
+        hits = await asyncio.to_thread(self.candidates.search, vector, limit)
+        if not hits:
+            return []
+        ids = [candidate_id for candidate_id, _ in hits]
+
+        result = await self.db.execute(
+            select(Candidate.id, Candidate.full_name, Candidate.email).where(Candidate.id.in_(ids))
+        )
+        candidates = {str(row.id): row for row in result.all()}
+
+        result = await self.db.execute(
+            select(MatchResult.candidate_id, MatchResult.score, MatchResult.recommendation)
+            .where(and_(MatchResult.job_opening_id == job_id, MatchResult.candidate_id.in_(ids)))
+        )
+        matches = {str(row.candidate_id): row for row in result.all()}
+
+        suggestions = []
+        for candidate_id, similarity in hits:
+            candidate = candidates.get(candidate_id)
+            if candidate is None:
+                continue
+            match = matches.get(candidate_id)
+            suggestions.append({
+                "candidate_id": candidate_id,
+                "full_name": candidate.full_name,
+                "email": candidate.email,
+                "similarity": similarity,
+                "match_score": match.score if match else None,
+                "recommendation": match.recommendation if match else None,
+            })
+        return suggestions
+
+    async def suggest_jobs_for_candidate(self, candidate_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Jobs activos más similares a un candidato."""
+        from app.models import JobOpening, MatchResult
+
+        vector = await asyncio.to_thread(self.candidates.get_vector, candidate_id)
+        if vector is None:
+            if not await self.index_candidate(candidate_id):
+                return []
+            vector = await asyncio.to_thread(self.candidates.get_vector, candidate_id)
+
+        # Se piden más porque los jobs inactivos se descartan después
+        hits = await asyncio.to_thread(self.jobs.search, vector, limit * 3)
+        if not hits:
+            return []
+        ids = [job_id for job_id, _ in hits]
+
+        result = await self.db.execute(
+            select(JobOpening.id, JobOpening.title, JobOpening.department, JobOpening.location)
+            .where(and_(JobOpening.id.in_(ids), JobOpening.is_active.is_(True)))
+        )
+        jobs = {str(row.id): row for row in result.all()}
+
+        result = await self.db.execute(
+            select(MatchResult.job_opening_id, MatchResult.score, MatchResult.recommendation)
+            .where(and_(MatchResult.candidate_id == candidate_id, MatchResult.job_opening_id.in_(ids)))
+        )
+        matches = {str(row.job_opening_id): row for row in result.all()}
+
+        suggestions = []
+        for job_id, similarity in hits:
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            match = matches.get(job_id)
+            suggestions.append({
+                "job_id": job_id,
+                "job_title": job.title,
+                "department": job.department,
+                "location": job.location,
+                "similarity": similarity,
+                "match_score": match.score if match else None,
+                "recommendation": match.recommendation if match else None,
+            })
+            if len(suggestions) == limit:
+                break
+        return suggestions
+
+
+async def refresh_embeddings(db: AsyncSession, document_id: str = None, job_id: str = None, candidate_id: str = None):
+    """
+    Actualiza el índice tras procesar un documento o editar un job/candidato.
+
+    Nunca falla: el índice es una optimización y no debe romper el flujo
+    que lo invoca.
+    """
+    if not settings.EMBEDDING_INDEX_ENABLED:
+        return
+    try:
+        service = EmbeddingIndexService(db)
+        if document_id:
+            await service.index_document(document_id)
+        if job_id:
+            await service.index_job(job_id)
+        if candidate_id:
+            await service.index_candidate(candidate_id)
+    except Exception as e:
+        logger.warning(f"Error updating embedding index: {e}")
+
+
+async def remove_embeddings(job_id: str = None, candidate_ids: Sequence[str] = ()):
+    """Quita jobs/candidatos eliminados o fusionados del índice (nunca falla)."""
+    if not settings.EMBEDDING_INDEX_ENABLED:
+        return
+    try:
+        if job_id:
+            await get_index_writer(get_embedding_index(EmbeddingIndexService.JOBS)).write([(job_id, None)])
+        if candidate_ids:
+            await get_index_writer(get_embedding_index(EmbeddingIndexService.CANDIDATES)).write(
+                (candidate_id, None) for candidate_id in candidate_ids
+            )
+    except Exception as e:
+        logger.warning(f"Error updating embedding index: {e}")
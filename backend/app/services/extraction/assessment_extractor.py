@@ -9,6 +9,43 @@ from app.validators.data_cleaner import DataCleaner
 
 logger = logging.getLogger(__name__)
 
+_TITLE_RES = [
+    re.compile(r'(?:Resultado|Resultados|Reporte|Informe|Informe de)\s+de?\s*[:\-]?\s*([^\n]{3,50})', re.IGNORECASE),
+    re.compile(r'(?:Assessment|Evaluación|Prueba|Test)\s+(?:de|sobre)?\s*[:\-]?\s*([^\n]{3,50})', re.IGNORECASE),
+]
+
+# Filas de scores; los cuatro formatos van en una sola regex y se prueban en
+# este orden. Todos exigen un dígito, así que las líneas sin dígitos se saltan.
+_SCORE_ROW_PATTERNS = [
+    # Patrón: Nombre ... Valor
+    r'^\s*([^\d\n]{2,40})[\.\s]*(?:\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?\s*$',
+    # Patrón: Nombre: Valor
+    r'^\s*([^:\n]{2,40})[:\-]\s*(\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?\s*$',
+    # Patrón en tablas: Valor | Nombre
+    r'(?:^|\|)\s*(\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?\s*(?:\||$)\s*([^\|\n]{2,40})',
+    # Patrón con porcentaje
+    r'^\s*([^\d\n]{2,40})[\.\s]*(\d{1,3})\s*%\s*$',
+]
+_SCORE_ROW_RE = re.compile('|'.join(f'(?:{p})' for p in _SCORE_ROW_PATTERNS), re.IGNORECASE)
+_DIGIT_RE = re.compile(r'\d')
+_TABLE_SCORE_RE = re.compile(r'([^\|]*)\|\s*(\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?')
+
+_SINCERITY_RES = [
+    re.compile(r'(?:sinceridad|sincerity|consistencia|consistency|validación|validation)\s*[:\-]?\s*(\d{1,3}[\.,]?\d*)', re.IGNORECASE),
+    re.compile(r'(?:escala\s+de\s+)?sinceridad\s*(?:\([^)]*\))?\s*[:\-]?\s*(\d{1,3}[\.,]?\d*)', re.IGNORECASE),
+    re.compile(r'(?:indicador\s+de\s+)?validez\s*[:\-]?\s*(\d{1,3}[\.,]?\d*)', re.IGNORECASE),
+]
+_CANDIDATE_NAME_RES = [
+    re.compile(r'(?:candidato|candidata|candidate|persona evaluada|evaluado)[:\s]+([^\n]{2,50})', re.IGNORECASE),
+    re.compile(r'(?:nombre(?:\s+completo)?)[:\s]+([^\n]{2,50})', re.IGNORECASE),
+    re.compile(r'(?:apellido,?\s+nombre|nombre,?\s+apellido)[:\s]+([^\n]{2,50})', re.IGNORECASE),
+]
+_TEST_DATE_RES = [
+    re.compile(r'(?:fecha\s+(?:de\s+)?(?:aplicación|prueba|test|evaluación|assessment))[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', re.IGNORECASE),
+    re.compile(r'(?:fecha)[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', re.IGNORECASE),
+    re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{4})\s*(?:fecha|date)', re.IGNORECASE),
+]
+
 
 class AssessmentExtractorError(Exception):
     """Error en extracción de assessments."""
@@ -18,6 +55,9 @@ class AssessmentExtractorError(Exception):
 class AssessmentExtractor:
     """Extrae datos estructurados de pruebas psicométricas."""
     
+    # Subir al cambiar patrones o reglas de extracción
+    VERSION = "1.1.0"
+    
     # Nombres de pruebas conocidas
     KNOWN_TESTS = {
         'factor oscuro': 'Dark Factor Inventory',
@@ -173,13 +213,8 @@ class AssessmentExtractor:
                 return name
         
         # Buscar patrón genérico de título
-        title_patterns = [
-            r'(?:Resultado|Resultados|Reporte|Informe|Informe de)\s+de?\s*[:\-]?\s*([^\n]{3,50})',
-            r'(?:Assessment|Evaluación|Prueba|Test)\s+(?:de|sobre)?\s*[:\-]?\s*([^\n]{3,50})',
-        ]
-        
-        for pattern in title_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _TITLE_RES:
+            match = pattern.search(text)
             if match:
                 return self.cleaner.clean_text(match.group(1))
         
@@ -221,53 +256,39 @@ class AssessmentExtractor:
         scores = []
         lines = text.split('\n')
         
-        # Patrones para detectar filas de scores
-        score_patterns = [
-            # Patrón: Nombre ... Valor
-            r'^\s*([^\d\n]{2,40})[\.\s]*(?:\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?\s*$',
-            # Patrón: Nombre: Valor
-            r'^\s*([^:\n]{2,40})[:\-]\s*(\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?\s*$',
-            # Patrón en tablas: Valor | Nombre
-            r'(?:^|\|)\s*(\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?\s*(?:\||$)\s*([^\|\n]{2,40})',
-            # Patrón con porcentaje
-            r'^\s*([^\d\n]{2,40})[\.\s]*(\d{1,3})\s*%\s*$',
-        ]
-        
         # Procesar línea por línea
         for line in lines:
             line = line.strip()
-            if not line or len(line) < 5:
+            if not line or len(line) < 5 or not _DIGIT_RE.search(line):
                 continue
             
-            for pattern in score_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    # Determinar cuál grupo es el nombre y cuál el valor
-                    groups = [g for g in match.groups() if g]
-                    if len(groups) >= 2:
-                        # Intentar identificar cuál es el número
-                        name = None
-                        value = None
-                        
-                        for g in groups:
-                            g = g.strip()
-                            # Intentar parsear como número
-                            try:
-                                # Manejar comas y puntos decimales
-                                num_str = g.replace(',', '.')
-                                num = float(num_str)
-                                if 0 <= num <= 100:
-                                    value = num
-                            except ValueError:
-                                # Es texto, posiblemente el nombre
-                                if len(g) > 2 and not name:
-                                    name = g
-                        
-                        if name and value is not None:
-                            dimension = self._create_dimension(name, value)
-                            if dimension:
-                                scores.append(dimension)
-                    break
+            match = _SCORE_ROW_RE.search(line)
+            if match:
+                # Determinar cuál grupo es el nombre y cuál el valor
+                groups = [g for g in match.groups() if g]
+                if len(groups) >= 2:
+                    # Intentar identificar cuál es el número
+                    name = None
+                    value = None
+                    
+                    for g in groups:
+                        g = g.strip()
+                        # Intentar parsear como número
+                        try:
+                            # Manejar comas y puntos decimales
+                            num_str = g.replace(',', '.')
+                            num = float(num_str)
+                            if 0 <= num <= 100:
+                                value = num
+                        except ValueError:
+                            # Es texto, posiblemente el nombre
+                            if len(g) > 2 and not name:
+                                name = g
+                    
+                    if name and value is not None:
+                        dimension = self._create_dimension(name, value)
+                        if dimension:
+                            scores.append(dimension)
         
         # Si no se encontraron scores con patrones, intentar buscar en formato tabla
         if not scores:
@@ -296,8 +317,7 @@ class AssessmentExtractor:
         scores = []
         
         # Buscar patrones de tabla: filas con múltiples columnas
-        table_pattern = r'([^\|]*)\|\s*(\d{1,3}[\.,]?\d*)\s*(?:/\s*100)?'
-        matches = re.findall(table_pattern, text)
+        matches = _TABLE_SCORE_RE.findall(text)
         
         for name, value_str in matches:
             name = name.strip()
@@ -388,14 +408,8 @@ class AssessmentExtractor:
         Returns:
             Score de sinceridad o None
         """
-        patterns = [
-            r'(?:sinceridad|sincerity|consistencia|consistency|validación|validation)\s*[:\-]?\s*(\d{1,3}[\.,]?\d*)',
-            r'(?:escala\s+de\s+)?sinceridad\s*(?:\([^)]*\))?\s*[:\-]?\s*(\d{1,3}[\.,]?\d*)',
-            r'(?:indicador\s+de\s+)?validez\s*[:\-]?\s*(\d{1,3}[\.,]?\d*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _SINCERITY_RES:
+            match = pattern.search(text)
             if match:
                 try:
                     value = float(match.group(1).replace(',', '.'))
@@ -414,14 +428,8 @@ class AssessmentExtractor:
         Returns:
             Nombre del candidato o None
         """
-        patterns = [
-            r'(?:candidato|candidata|candidate|persona evaluada|evaluado)[:\s]+([^\n]{2,50})',
-            r'(?:nombre(?:\s+completo)?)[:\s]+([^\n]{2,50})',
-            r'(?:apellido,?\s+nombre|nombre,?\s+apellido)[:\s]+([^\n]{2,50})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _CANDIDATE_NAME_RES:
+            match = pattern.search(text)
             if match:
                 name = self.cleaner.clean_name(match.group(1))
                 if name and len(name) > 3:
@@ -438,14 +446,8 @@ class AssessmentExtractor:
         Returns:
             Fecha o None
         """
-        patterns = [
-            r'(?:fecha\s+(?:de\s+)?(?:aplicación|prueba|test|evaluación|assessment))[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(?:fecha)[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{4})\s*(?:fecha|date)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _TEST_DATE_RES:
+            match = pattern.search(text)
             if match:
                 date_str = match.group(1)
                 try:
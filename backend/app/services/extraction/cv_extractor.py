@@ -1,14 +1,45 @@
 """Extractor de datos de CVs/Resumes."""
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Union
 from datetime import datetime
 
+from app.services.extraction.matcher import KeywordMatcher, PatternSet
 from app.services.extraction.models import CVData, WorkExperience, Education
 from app.validators.data_cleaner import DataCleaner
 
 logger = logging.getLogger(__name__)
 
+# Patrones compilados al cargar el módulo (se usan en cada CV)
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RES = [
+    re.compile(r'(?:tel[ée]fono|phone|celular|mobile|m[oó]vil)[:\s]+([\d\s\-\(\)\+]{8,20})', re.IGNORECASE),
+    re.compile(r'\b(\+?[\d\s\-\(\)]{8,20})\s*(?:tel[ée]fono|phone|celular)', re.IGNORECASE),
+    re.compile(r'\b(\+\d[\d\s\-\(\)]{7,18})\b', re.IGNORECASE),  # Formato internacional
+]
+_LINKEDIN_RE = re.compile(r'(?:linkedin\.com/in/|linkedin[:\s]+)([\w\-]+)', re.IGNORECASE)
+_LOCATION_RE = re.compile(r'(?:ubicación|location|ciudad|city|dirección|address)[:\s]+([^\n,]{3,50})', re.IGNORECASE)
+_NOT_A_NAME_RE = re.compile(r'\d|@|www|http')
+_BLANK_LINE_RE = re.compile(r'\n\s*\n')
+_EXPERIENCE_DATE_RES = [
+    re.compile(r'(\d{1,2}/\d{4}|\d{4})\s*[-–]\s*(\d{1,2}/\d{4}|\d{4}|present|actual|current)', re.IGNORECASE),
+    re.compile(r'(\d{4})\s*[-–]\s*(\d{4}|present|actual|current)', re.IGNORECASE),
+    re.compile(r'(\w+\s+\d{4})\s*[-–]\s*(\w+\s+\d{4}|present|actual|current)', re.IGNORECASE),
+]
+_TITLE_AT_COMPANY_RE = re.compile(r'(.+?)\s+(?:en|at|@)\s+(.+)', re.IGNORECASE)
+_TITLE_SEPARATOR_RE = re.compile(r'[,|]')
+_DATE_LINE_RE = re.compile(r'^(20\d{2}|19\d{2}|present)', re.IGNORECASE)
+_ENTRY_LOCATION_RE = re.compile(r'(?:ubicación|location|lugar|place)[:\s]+([^\n]+)', re.IGNORECASE)
+_EDUCATION_DATE_RES = [
+    re.compile(r'(\d{4})\s*[-–]\s*(\d{4}|present|actual)', re.IGNORECASE),
+    re.compile(r'(\d{4})\s*[-–]?\s*(\d{4})?', re.IGNORECASE),
+]
+_DEGREE_AT_INSTITUTION_RE = re.compile(r'(.+?)\s+(?:en|at|de)\s+(.+)', re.IGNORECASE)
+_FIELD_OF_STUDY_RE = re.compile(r'(?:carrera|field|major|specialization|especialidad)[:\s]+([^\n]+)', re.IGNORECASE)
+_SKILL_SEPARATOR_RE = re.compile(r'[,;|•\-\*\n]')
+_NOT_A_SKILL_RE = re.compile(r'^(experiencia|education|habilidades|skills)', re.IGNORECASE)
+_CERTIFICATIONS_RE = re.compile(r'(?:certificaciones|certifications)[:\s]*\n(.*?)(?=\n\s*\n|\Z)', re.IGNORECASE | re.DOTALL)
+
 
 class CVExtractorError(Exception):
     """Error en extracción de CVs."""
@@ -18,6 +49,9 @@ class CVExtractorError(Exception):
 class CVExtractor:
     """Extrae datos estructurados de CVs y resumes."""
     
+    # Subir al cambiar patrones o reglas de extracción
+    VERSION = "1.1.0"
+    
     # Secciones comunes en CVs
     SECTION_PATTERNS = {
         'experience': [
@@ -41,9 +75,65 @@ class CVExtractor:
         ],
     }
     
-    def __init__(self):
-        self.cleaner = DataCleaner()
+    _SECTION_RES = {
+        section_type: [re.compile(p, re.IGNORECASE) for p in patterns]
+        for section_type, patterns in SECTION_PATTERNS.items()
+    }
+    # Todos los encabezados en una sola regex: una búsqueda encuentra la siguiente sección
+    _SECTIONS = PatternSet(SECTION_PATTERNS, re.IGNORECASE)
     
+    # Un encabezado de sección es una línea corta; más larga es contenido
+    SECTION_HEADER_MAX_LENGTH = 60
+    
+    # Tecnologías que se buscan en todo el CV (sensible a mayúsculas)
+    TECH_SKILLS = [
+        'Python', 'JavaScript', 'TypeScript', 'Java', 'C++', 'C#', 'Go', 'Rust', 'Ruby', 'PHP', 'Swift', 'Kotlin',
+        'React', 'Angular', 'Vue', 'Node.js', 'Express', 'Django', 'Flask', 'FastAPI', 'Spring',
+        'AWS', 'GCP', 'Azure', 'Docker', 'Kubernetes', 'Terraform', 'CI/CD', 'Jenkins', 'GitHub Actions',
+        'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Elasticsearch', 'DynamoDB',
+        'Machine Learning', 'Deep Learning', 'AI', 'Data Science', 'TensorFlow', 'PyTorch',
+    ]
+    _TECH_SKILLS = KeywordMatcher(TECH_SKILLS, ignore_case=False)
+    
+    LANGUAGES = [
+        'Español', 'Spanish', 'Inglés', 'English', 'Francés', 'French', 'Alemán', 'German',
+        'Portugués', 'Portuguese', 'Italiano', 'Italian', 'Chino', 'Chinese', 'Japonés', 'Japanese',
+    ]
+    _LANGUAGES = KeywordMatcher(LANGUAGES)
+
+    def __init__(self, tech_skills: Optional[Union[Iterable[str], Mapping[str, str]]] = None):
+        """Inicializa el extractor.
+        
+        Args:
+            tech_skills: Diccionario de tecnologías propio (lista, o mapping
+                alias -> nombre canónico); por defecto TECH_SKILLS
+        """
+        self.cleaner = DataCleaner()
+        self.tech_skills = (
+            KeywordMatcher(tech_skills, ignore_case=False) if tech_skills is not None
+            else self._TECH_SKILLS
+        )
+
+    @classmethod
+    def detect_section_header(cls, line: str) -> Optional[str]:
+        """Detecta si una línea es el encabezado de una sección del CV.
+
+        Args:
+            line: Línea de texto
+
+        Returns:
+            Tipo de sección ('experience', 'skills', ...) o None
+        """
+        line = line.strip().strip(':').strip()
+        if not line or len(line) > cls.SECTION_HEADER_MAX_LENGTH:
+            return None
+
+        # Con varias secciones en la línea gana la primera de SECTION_PATTERNS
+        matches = cls._SECTIONS.finditer(line)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: cls._SECTIONS.order[m.name]).name
+
     async def extract_from_text(self, text: str) -> CVData:
         """Extrae datos de CV desde texto.
         
@@ -113,20 +203,13 @@ class CVExtractor:
         info = {}
         
         # Buscar email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        email_match = _EMAIL_RE.search(text)
         if email_match:
             info['email'] = self.cleaner.clean_email(email_match.group(0))
         
         # Buscar teléfono
-        phone_patterns = [
-            r'(?:tel[ée]fono|phone|celular|mobile|m[oó]vil)[:\s]+([\d\s\-\(\)\+]{8,20})',
-            r'\b(\+?[\d\s\-\(\)]{8,20})\s*(?:tel[ée]fono|phone|celular)',
-            r'\b(\+\d[\d\s\-\(\)]{7,18})\b',  # Formato internacional
-        ]
-        
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _PHONE_RES:
+            phone_match = pattern.search(text)
             if phone_match:
                 phone = self.cleaner.clean_phone(phone_match.group(1))
                 if phone:
@@ -134,14 +217,12 @@ class CVExtractor:
                     break
         
         # Buscar LinkedIn
-        linkedin_pattern = r'(?:linkedin\.com/in/|linkedin[:\s]+)([\w\-]+)'
-        linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
+        linkedin_match = _LINKEDIN_RE.search(text)
         if linkedin_match:
             info['linkedin'] = f"https://linkedin.com/in/{linkedin_match.group(1)}"
         
         # Buscar ubicación (patrón simple)
-        location_pattern = r'(?:ubicación|location|ciudad|city|dirección|address)[:\s]+([^\n,]{3,50})'
-        location_match = re.search(location_pattern, text, re.IGNORECASE)
+        location_match = _LOCATION_RE.search(text)
         if location_match:
             info['location'] = self.cleaner.clean_text(location_match.group(1))
         
@@ -151,9 +232,9 @@ class CVExtractor:
             line = line.strip()
             # Buscar línea que parezca un nombre (2-4 palabras, sin números)
             if line and 2 <= len(line.split()) <= 4:
-                if not re.search(r'\d|@|www|http', line):
+                if not _NOT_A_NAME_RE.search(line):
                     # Verificar que no sea una sección
-                    if not any(re.search(p, line, re.IGNORECASE) for patterns in self.SECTION_PATTERNS.values() for p in patterns):
+                    if not self._SECTIONS.search(line):
                         info['name'] = self.cleaner.clean_name(line)
                         break
         
@@ -175,16 +256,8 @@ class CVExtractor:
         if not exp_section:
             return experiences
         
-        # Dividir en entradas de experiencia
-        # Patrones para detectar nuevas entradas
-        entry_patterns = [
-            r'(?:^|\n)\s*•\s*',  # Bullets
-            r'(?:^|\n)\s*[-\*]\s*',  # Guiones
-            r'(?:^|\n)\s*\d{4}',  # Año al inicio
-        ]
-        
-        # Intentar dividir por líneas vacías o patrones
-        entries = re.split(r'\n\s*\n', exp_section)
+        # Dividir en entradas de experiencia por líneas vacías
+        entries = _BLANK_LINE_RE.split(exp_section)
         
         for entry in entries:
             entry = entry.strip()
@@ -219,14 +292,8 @@ class CVExtractor:
         location = None
         
         # Buscar fechas en todo el texto
-        date_patterns = [
-            r'(\d{1,2}/\d{4}|\d{4})\s*[-–]\s*(\d{1,2}/\d{4}|\d{4}|present|actual|current)',
-            r'(\d{4})\s*[-–]\s*(\d{4}|present|actual|current)',
-            r'(\w+\s+\d{4})\s*[-–]\s*(\w+\s+\d{4}|present|actual|current)',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, entry_text, re.IGNORECASE)
+        for pattern in _EXPERIENCE_DATE_RES:
+            match = pattern.search(entry_text)
             if match:
                 start_date = match.group(1)
                 end_raw = match.group(2).lower()
@@ -241,14 +308,13 @@ class CVExtractor:
         first_line = lines[0].strip()
         
         # Buscar patrón: Título en Empresa
-        at_pattern = r'(.+?)\s+(?:en|at|@)\s+(.+)'
-        at_match = re.match(at_pattern, first_line, re.IGNORECASE)
+        at_match = _TITLE_AT_COMPANY_RE.match(first_line)
         if at_match:
             title = self.cleaner.clean_job_title(at_match.group(1))
             company = self.cleaner.clean_company_name(at_match.group(2))
         else:
             # Intentar separar por comas o pipes
-            parts = re.split(r'[,|]', first_line)
+            parts = _TITLE_SEPARATOR_RE.split(first_line)
             if len(parts) >= 2:
                 title = self.cleaner.clean_job_title(parts[0])
                 company = self.cleaner.clean_company_name(parts[1])
@@ -259,12 +325,12 @@ class CVExtractor:
         # Resto del texto es descripción
         for line in lines[1:]:
             line = line.strip()
-            if line and not re.match(r'^(20\d{2}|19\d{2}|present)', line, re.IGNORECASE):
+            if line and not _DATE_LINE_RE.match(line):
                 description.append(line)
         
         # Buscar ubicación en la descripción
         for line in description:
-            loc_match = re.search(r'(?:ubicación|location|lugar|place)[:\s]+([^\n]+)', line, re.IGNORECASE)
+            loc_match = _ENTRY_LOCATION_RE.search(line)
             if loc_match:
                 location = self.cleaner.clean_text(loc_match.group(1))
                 break
@@ -296,7 +362,7 @@ class CVExtractor:
             return educations
         
         # Dividir en entradas
-        entries = re.split(r'\n\s*\n', edu_section)
+        entries = _BLANK_LINE_RE.split(edu_section)
         
         for entry in entries:
             entry = entry.strip()
@@ -330,13 +396,8 @@ class CVExtractor:
         is_current = False
         
         # Buscar fechas
-        date_patterns = [
-            r'(\d{4})\s*[-–]\s*(\d{4}|present|actual)',
-            r'(\d{4})\s*[-–]?\s*(\d{4})?',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, entry_text, re.IGNORECASE)
+        for pattern in _EDUCATION_DATE_RES:
+            match = pattern.search(entry_text)
             if match:
                 start_date = match.group(1)
                 end_raw = match.group(2)
@@ -351,8 +412,7 @@ class CVExtractor:
         first_line = lines[0].strip()
         
         # Buscar patrón: Grado en Institución
-        at_pattern = r'(.+?)\s+(?:en|at|de)\s+(.+)'
-        at_match = re.match(at_pattern, first_line, re.IGNORECASE)
+        at_match = _DEGREE_AT_INSTITUTION_RE.match(first_line)
         if at_match:
             degree = self.cleaner.standardize_degree(at_match.group(1))
             institution = self.cleaner.clean_company_name(at_match.group(2))
@@ -366,7 +426,7 @@ class CVExtractor:
         
         # Buscar campo de estudio en líneas siguientes
         for line in lines[1:]:
-            field_match = re.search(r'(?:carrera|field|major|specialization|especialidad)[:\s]+([^\n]+)', line, re.IGNORECASE)
+            field_match = _FIELD_OF_STUDY_RE.search(line)
             if field_match:
                 field_of_study = self.cleaner.clean_text(field_match.group(1))
                 break
@@ -401,7 +461,8 @@ class CVExtractor:
         tech_skills = self._extract_technical_skills(text)
         
         # Combinar y deduplicar
-        all_skills = skills + [s for s in tech_skills if s.lower() not in [x.lower() for x in skills]]
+        seen = {skill.lower() for skill in skills}
+        all_skills = skills + [s for s in tech_skills if s.lower() not in seen]
         
         return self.cleaner.clean_skills_list(all_skills)
     
@@ -417,13 +478,13 @@ class CVExtractor:
         skills = []
         
         # Separar por comas, bullets o pipes
-        parts = re.split(r'[,;|•\-\*\n]', text)
+        parts = _SKILL_SEPARATOR_RE.split(text)
         
         for part in parts:
             skill = part.strip()
             if skill and len(skill) > 1 and len(skill) < 50:
                 # Evitar cosas que claramente no son skills
-                if not re.match(r'^(experiencia|education|habilidades|skills)', skill, re.IGNORECASE):
+                if not _NOT_A_SKILL_RE.match(skill):
                     skills.append(skill)
         
         return skills
@@ -435,23 +496,9 @@ class CVExtractor:
             text: Texto completo
             
         Returns:
-            Lista de skills técnicas
+            Lista de skills técnicas, en orden de aparición
         """
-        # Lista de tecnologías comunes a buscar
-        tech_patterns = [
-            r'\b(Python|JavaScript|TypeScript|Java|C\+\+|C#|Go|Rust|Ruby|PHP|Swift|Kotlin)\b',
-            r'\b(React|Angular|Vue|Node\.js|Express|Django|Flask|FastAPI|Spring)\b',
-            r'\b(AWS|GCP|Azure|Docker|Kubernetes|Terraform|CI/CD|Jenkins|GitHub Actions)\b',
-            r'\b(PostgreSQL|MySQL|MongoDB|Redis|Elasticsearch|DynamoDB)\b',
-            r'\b(Machine Learning|Deep Learning|AI|Data Science|TensorFlow|PyTorch)\b',
-        ]
-        
-        found_skills = set()
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, text)
-            found_skills.update(matches)
-        
-        return list(found_skills)
+        return self.tech_skills.find_all(text)
     
     def _extract_languages(self, text: str) -> List[str]:
         """Extrae idiomas.
@@ -468,9 +515,7 @@ class CVExtractor:
         lang_section = self._extract_section(text, 'languages')
         if lang_section:
             # Buscar idiomas conocidos
-            lang_pattern = r'\b(Español|Spanish|Inglés|English|Francés|French|Alemán|German|Portugués|Portuguese|Italiano|Italian|Chino|Chinese|Japonés|Japanese)\b'
-            matches = re.findall(lang_pattern, lang_section, re.IGNORECASE)
-            languages = list(set(matches))
+            languages = self._LANGUAGES.find_all(lang_section)
         
         return languages
     
@@ -502,19 +547,14 @@ class CVExtractor:
         certifications = []
         
         # Buscar sección de certificaciones
-        cert_patterns = [
-            r'(?:certificaciones|certifications)[:\s]*\n(.*?)(?=\n\s*\n|\Z)',
-        ]
-        
-        for pattern in cert_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-            if match:
-                cert_text = match.group(1)
-                lines = cert_text.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and len(line) > 5:
-                        certifications.append(self.cleaner.clean_text(line))
+        match = _CERTIFICATIONS_RE.search(text)
+        if match:
+            cert_text = match.group(1)
+            lines = cert_text.split('\n')
+            for line in lines:
+                line = line.strip()
+                if line and len(line) > 5:
+                    certifications.append(self.cleaner.clean_text(line))
         
         return certifications
     
@@ -528,32 +568,14 @@ class CVExtractor:
         Returns:
             Contenido de la sección o None
         """
-        patterns = self.SECTION_PATTERNS.get(section_type, [])
-        
-        for pattern in patterns:
+        for pattern in self._SECTION_RES.get(section_type, []):
             # Buscar el patrón de sección
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
-                # Encontrar el inicio de la sección
+                # La sección termina donde empieza la siguiente (o al final del documento)
                 start = match.end()
-                
-                # Encontrar el final (próxima sección o fin del documento)
-                remaining = text[start:]
-                
-                # Buscar el inicio de la siguiente sección
-                next_section_match = None
-                for other_patterns in self.SECTION_PATTERNS.values():
-                    for other_pattern in other_patterns:
-                        m = re.search(other_pattern, remaining, re.IGNORECASE)
-                        if m:
-                            if next_section_match is None or m.start() < next_section_match.start():
-                                next_section_match = m
-                
-                if next_section_match:
-                    section_text = remaining[:next_section_match.start()]
-                else:
-                    section_text = remaining
-                
-                return section_text.strip()
+                next_section = self._SECTIONS.search(text, start)
+                end = next_section.start if next_section else len(text)
+                return text[start:end].strip()
         
         return None
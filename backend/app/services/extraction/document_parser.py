@@ -1,4 +1,5 @@
 """Parser de documentos - Extrae texto de PDF/DOCX y detecta tipo de documento."""
+import asyncio
 import io
 import logging
 import os
@@ -6,20 +7,25 @@ import re
 import tempfile
 import hashlib
 import time
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Awaitable, Callable, Tuple
 from datetime import datetime
 
 import pdfplumber
 from docx import Document as DocxDocument
 
 from app.core.config import settings
+from app.core.extraction_pool import get_extraction_pool, run_extraction
 from app.services.extraction.models import (
     DocumentType, ProcessingStatus, ParseResult
 )
 
 logger = logging.getLogger(__name__)
 
+# Callback por página de PDF: (número de página, texto)
+PageCallback = Callable[[int, str], Awaitable[None]]
+
 
 class DocumentParserError(Exception):
     """Error en parsing de documentos."""
@@ -39,6 +45,10 @@ class UnsupportedDocumentError(DocumentParserError):
 class DocumentParser:
     """Parser de documentos para extracción de texto y detección de tipo."""
     
+    # Versión de la lógica de extracción: subirla invalida el cache de
+    # extracción (app/core/extraction_cache.py)
+    VERSION = "2.0.0"
+    
     # Extensiones soportadas
     SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.txt', '.rtf'}
     
@@ -87,13 +97,16 @@ class DocumentParser:
         self._ocr_engine = None
     
     async def parse_document(self, document_id: str, file_path: str, 
-                            mime_type: Optional[str] = None) -> ParseResult:
+                            mime_type: Optional[str] = None,
+                            on_page: Optional[PageCallback] = None) -> ParseResult:
         """Parsea un documento y extrae su texto.
         
         Args:
             document_id: ID del documento
             file_path: Ruta al archivo
             mime_type: MIME type del documento (opcional)
+            on_page: Para PDFs, recibe (número de página, texto) a medida
+                que se extraen las páginas
             
         Returns:
             ParseResult con el texto extraído y metadatos
@@ -113,7 +126,7 @@ class DocumentParser:
             file_ext = Path(file_path).suffix.lower()
             
             if file_ext == '.pdf':
-                text, metadata = await self._extract_pdf(file_path)
+                text, metadata = await self._extract_pdf(file_path, on_page)
             elif file_ext in ['.docx', '.doc']:
                 text, metadata = await self._extract_docx(file_path)
             elif file_ext == '.txt':
@@ -171,61 +184,100 @@ class DocumentParser:
         mime_type, _ = mimetypes.guess_type(file_path)
         return mime_type or 'application/octet-stream'
     
-    async def _extract_pdf(self, file_path: str) -> tuple:
-        """Extrae texto de un PDF.
+    async def _extract_pdf(self, file_path: str,
+                           on_page: Optional[PageCallback] = None) -> tuple:
+        """Extrae texto de un PDF por rangos de páginas en el pool de extracción.
         
         Args:
             file_path: Ruta al PDF
+            on_page: Recibe (número de página, texto) en orden, a medida que
+                llegan las páginas
             
         Returns:
             Tuple (texto_extraído, metadatos)
         """
+        metadata: Dict[str, Any] = {}
         text_parts = []
-        metadata = {
-            'pages': 0,
-            'has_images': False,
-            'extraction_method': 'pdfplumber'
-        }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                metadata['pages'] = len(pdf.pages)
-                
-                for i, page in enumerate(pdf.pages):
-                    # Extraer texto
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                    
-                    # Detectar si tiene imágenes
-                    if page.images:
-                        metadata['has_images'] = True
-                    
-                    # Extraer metadatos de la primera página
-                    if i == 0:
-                        meta = pdf.metadata
-                        if meta:
-                            metadata.update({
-                                'author': meta.get('Author'),
-                                'creator': meta.get('Creator'),
-                                'producer': meta.get('Producer'),
-                                'creation_date': meta.get('CreationDate'),
-                            })
-                
-                # Si hay muy poco texto, podría ser un PDF escaneado
-                full_text = '\n\n'.join(text_parts)
-                if len(full_text.strip()) < 100:
-                    metadata['likely_scanned'] = True
-                    logger.warning(f"PDF posiblemente escaneado detectado: {file_path}")
-                
+            async for number, page_text in self.iter_pdf_pages(file_path, metadata):
+                if page_text:
+                    text_parts.append(page_text)
+                if on_page:
+                    await on_page(number, page_text)
         except Exception as e:
             logger.error(f"Error extrayendo PDF: {e}")
             raise
         
         return '\n\n'.join(text_parts), metadata
     
+    async def iter_pdf_pages(self, file_path: str,
+                             metadata: Optional[Dict[str, Any]] = None
+                             ) -> AsyncIterator[Tuple[int, str]]:
+        """Itera (número de página, texto) de un PDF en orden de página.
+        
+        Las páginas se reparten en rangos de PDF_PAGES_PER_SHARD entre los
+        procesos del pool, con a lo sumo un rango en vuelo por proceso: la
+        memoria queda acotada aunque el PDF tenga cientos de páginas. Sólo
+        las páginas sin texto pasan por OCR (PDF_OCR_EMPTY_PAGES).
+        
+        Args:
+            file_path: Ruta al PDF
+            metadata: Dict que se completa con páginas, imágenes, OCR y
+                metadatos del PDF
+        """
+        metadata = metadata if metadata is not None else {}
+        page_count, info = await run_extraction(_read_pdf_info, file_path)
+        metadata.update({
+            'pages': page_count,
+            'has_images': False,
+            'extraction_method': 'pdfplumber',
+            **info,
+        })
+        
+        shard_size = max(settings.PDF_PAGES_PER_SHARD, 1)
+        shards = deque(
+            (start, min(start + shard_size, page_count))
+            for start in range(0, page_count, shard_size)
+        )
+        window = get_extraction_pool().workers if settings.EXTRACTION_POOL_ENABLED else 1
+        ocr_empty = settings.PDF_OCR_EMPTY_PAGES
+        in_flight: deque = deque()
+        
+        def submit():
+            start, end = shards.popleft()
+            in_flight.append(asyncio.ensure_future(
+                run_extraction(_read_pdf_pages, file_path, start, end, ocr_empty)
+            ))
+        
+        ocr_pages = []
+        try:
+            while shards and len(in_flight) < window:
+                submit()
+            while in_flight:
+                shard = await in_flight.popleft()
+                if shards:
+                    submit()
+                if shard['has_images']:
+                    metadata['has_images'] = True
+                for number, page_text, ocr in shard['pages']:
+                    if ocr:
+                        ocr_pages.append(number)
+                    yield number, page_text
+        finally:
+            for task in in_flight:
+                task.cancel()
+        
+        metadata['ocr_pages'] = ocr_pages
+        if ocr_pages:
+            metadata['extraction_method'] = 'pdfplumber+ocr'
+        # Mayoría de páginas sin capa de texto
+        if page_count and len(ocr_pages) * 2 >= page_count:
+            metadata['likely_scanned'] = True
+            logger.warning(f"PDF posiblemente escaneado detectado: {file_path}")
+    
     async def _extract_docx(self, file_path: str) -> tuple:
-        """Extrae texto de un documento Word.
+        """Extrae texto de un documento Word (en el pool de extracción).
         
         Args:
             file_path: Ruta al DOCX
@@ -233,52 +285,11 @@ class DocumentParser:
         Returns:
             Tuple (texto_extraído, metadatos)
         """
-        text_parts = []
-        metadata = {
-            'extraction_method': 'python-docx',
-            'has_tables': False,
-            'paragraphs': 0
-        }
-        
         try:
-            doc = DocxDocument(file_path)
-            
-            # Extraer propiedades del documento
-            if doc.core_properties:
-                metadata.update({
-                    'author': doc.core_properties.author,
-                    'title': doc.core_properties.title,
-                    'created': doc.core_properties.created,
-                    'modified': doc.core_properties.modified,
-                })
-            
-            # Extraer texto de párrafos
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
-            
-            metadata['paragraphs'] = len(doc.paragraphs)
-            
-            # Extraer texto de tablas (importante para assessments)
-            if doc.tables:
-                metadata['has_tables'] = True
-                metadata['table_count'] = len(doc.tables)
-                
-                for table in doc.tables:
-                    table_text = []
-                    for row in table.rows:
-                        row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-                        if row_text:
-                            table_text.append(' | '.join(row_text))
-                    
-                    if table_text:
-                        text_parts.append('\n'.join(table_text))
-        
+            return await run_extraction(_read_docx, file_path)
         except Exception as e:
             logger.error(f"Error extrayendo DOCX: {e}")
             raise
-        
-        return '\n\n'.join(text_parts), metadata
     
     async def _extract_txt(self, file_path: str) -> tuple:
         """Extrae texto de un archivo de texto plano.
@@ -425,3 +436,96 @@ class DocumentParser:
             return str(existing.id)
         
         return None
+
+
+# Extracción bloqueante: se ejecuta en el pool de procesos (app/core/extraction_pool.py)
+
+def _read_pdf_info(file_path: str) -> tuple:
+    """Número de páginas y metadatos de un PDF (sin extraer texto)."""
+    with pdfplumber.open(file_path) as pdf:
+        meta = pdf.metadata or {}
+        return len(pdf.pages), {
+            'author': meta.get('Author'),
+            'creator': meta.get('Creator'),
+            'producer': meta.get('Producer'),
+            'creation_date': meta.get('CreationDate'),
+        }
+
+
+def _ocr_pdf_page(page) -> str:
+    """OCR de una página renderada (vacío si Tesseract no está instalado)."""
+    try:
+        import pytesseract
+    except ImportError:
+        return ""
+    image = page.to_image(resolution=settings.PDF_OCR_RESOLUTION).original
+    return pytesseract.image_to_string(image, config=r'--oem 3 --psm 6')
+
+
+def _read_pdf_pages(file_path: str, start: int, end: int, ocr_empty: bool) -> Dict[str, Any]:
+    """Texto de las páginas [start, end) de un PDF (base 0).
+    
+    Sólo se abren las páginas del rango y cada una se libera tras leerla,
+    así que la memoria del proceso no crece con el tamaño del documento.
+    Las páginas sin texto pasan por OCR si ocr_empty.
+    """
+    pages = []
+    has_images = False
+    with pdfplumber.open(file_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text() or ''
+            ocr = False
+            if page.images:
+                has_images = True
+            if ocr_empty and not page_text.strip():
+                page_text = _ocr_pdf_page(page)
+                ocr = True
+            pages.append((page.page_number, page_text, ocr))
+            # Descartar objetos de layout cacheados de la página
+            (getattr(page, 'close', None) or page.flush_cache)()
+    return {'pages': pages, 'has_images': has_images}
+
+
+def _read_docx(file_path: str) -> tuple:
+    """Texto y metadatos de un DOCX con python-docx (párrafos y tablas)."""
+    text_parts = []
+    metadata = {
+        'extraction_method': 'python-docx',
+        'has_tables': False,
+        'paragraphs': 0
+    }
+    
+    doc = DocxDocument(file_path)
+    
+    # Extraer propiedades del documento
+    if doc.core_properties:
+        metadata.update({
+            'author': doc.core_properties.author,
+            'title': doc.core_properties.title,
+            'created': doc.core_properties.created,
+            'modified': doc.core_properties.modified,
+        })
+    
+    # Extraer texto de párrafos
+    for para in doc.paragraphs:
+        if para.text.strip():
+            text_parts.append(para.text)
+    
+    metadata['paragraphs'] = len(doc.paragraphs)
+    
+    # Extraer texto de tablas (importante para assessments)
+    if doc.tables:
+        metadata['has_tables'] = True
+        metadata['table_count'] = len(doc.tables)
+        
+        for table in doc.tables:
+            table_text = []
+            for row in table.rows:
+                row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+                if row_text:
+                    table_text.append(' | '.join(row_text))
+            
+            if table_text:
+                text_parts.append('\n'.join(table_text))
+    
+    return '\n\n'.join(text_parts), metadata
@@ -1,15 +1,56 @@
 """Extractor de datos de entrevistas."""
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from textblob import TextBlob
 
+from app.services.extraction.matcher import KeywordMatcher
 from app.services.extraction.models import InterviewData, InterviewQuote
 from app.validators.data_cleaner import DataCleaner
 
 logger = logging.getLogger(__name__)
 
+_QUOTE_RE = re.compile(r'["""]([^"""]{20,300})["""]')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Longitud máxima del contexto tras la palabra clave
+_CONTEXT_TAIL = 100
+
+
+def _keyword_contexts(text: str, spans: List[Tuple[int, int]]) -> List[str]:
+    """Contextos de una palabra clave a partir de sus ocurrencias.
+    
+    Equivale a re.findall(r'[^.]*\\bkw\\b[^.]{0,100}', text): desde el
+    inicio de la oración hasta 100 caracteres después de la última
+    ocurrencia de la oración, sin cruzar el punto final.
+    
+    Args:
+        text: Texto (ya en minúsculas)
+        spans: (inicio, fin) de cada ocurrencia, en orden
+        
+    Returns:
+        Lista de contextos sin recortar
+    """
+    contexts = []
+    pos = 0
+    i = 0
+    while i < len(spans):
+        start = spans[i][0]
+        if start < pos:
+            i += 1
+            continue
+        sentence_start = max(pos, text.rfind('.', 0, start) + 1)
+        sentence_end = text.find('.', start)
+        if sentence_end == -1:
+            sentence_end = len(text)
+        while i + 1 < len(spans) and spans[i + 1][0] < sentence_end:
+            i += 1
+        pos = min(sentence_end, spans[i][1] + _CONTEXT_TAIL)
+        contexts.append(text[sentence_start:pos])
+        i += 1
+    return contexts
+
 
 class InterviewExtractorError(Exception):
     """Error en extracción de entrevistas."""
@@ -19,6 +60,9 @@ class InterviewExtractorError(Exception):
 class InterviewExtractor:
     """Extrae datos estructurados de notas de entrevistas."""
     
+    # Subir al cambiar patrones o reglas de extracción
+    VERSION = "1.1.0"
+    
     # Patrones para detectar preguntas comunes
     QUESTION_PATTERNS = [
         r'(?:cuéntame|tell\s+me|háblame|talk\s+to\s+me)\s+(?:sobre|about)',
@@ -66,6 +110,11 @@ class InterviewExtractor:
         'duda', 'doubt', 'incertidumbre', 'uncertainty', 'riesgo', 'risk',
     ]
     
+    # Cada lista en una sola regex; se aplican sobre el texto en minúsculas
+    _RISK_MATCHER = KeywordMatcher(RISK_KEYWORDS['high'] + RISK_KEYWORDS['medium'], ignore_case=False)
+    _STRENGTH_MATCHER = KeywordMatcher(STRENGTH_KEYWORDS, ignore_case=False)
+    _CONCERN_MATCHER = KeywordMatcher(CONCERN_KEYWORDS, ignore_case=False)
+    
     def __init__(self):
         self.cleaner = DataCleaner()
     
@@ -146,18 +195,18 @@ class InterviewExtractor:
         """
         text_lower = text.lower()
         
-        # Patrones para tipos de entrevista
-        if any(re.search(p, text_lower) for p in ['técnica', 'technical', 'coding', 'código']):
+        # Palabras que indican el tipo de entrevista
+        if any(p in text_lower for p in ['técnica', 'technical', 'coding', 'código']):
             return 'technical'
-        elif any(re.search(p, text_lower) for p in ['conductual', 'behavioral', 'situacional', 'situational']):
+        elif any(p in text_lower for p in ['conductual', 'behavioral', 'situacional', 'situational']):
             return 'behavioral'
-        elif any(re.search(p, text_lower) for p in ['cultural', 'cultura', 'fit']):
+        elif any(p in text_lower for p in ['cultural', 'cultura', 'fit']):
             return 'cultural_fit'
-        elif any(re.search(p, text_lower) for p in ['competencias', 'competency', 'competencias']):
+        elif any(p in text_lower for p in ['competencias', 'competency']):
             return 'competency'
-        elif any(re.search(p, text_lower) for p in ['final', 'fin', 'cierre', 'closing']):
+        elif any(p in text_lower for p in ['final', 'fin', 'cierre', 'closing']):
             return 'final'
-        elif any(re.search(p, text_lower) for p in ['inicial', 'initial', 'screening']):
+        elif any(p in text_lower for p in ['inicial', 'initial', 'screening']):
             return 'screening'
         else:
             return 'general'
@@ -174,8 +223,7 @@ class InterviewExtractor:
         quotes = []
         
         # Buscar citas entre comillas
-        quote_pattern = r'["""]([^"""]{20,300})["""]'
-        matches = re.findall(quote_pattern, text)
+        matches = _QUOTE_RE.findall(text)
         
         for match in matches:
             quote_text = match.strip()
@@ -191,7 +239,7 @@ class InterviewExtractor:
         
         # Si no hay citas explícitas, extraer oraciones importantes
         if not quotes:
-            sentences = re.split(r'(?<=[.!?])\s+', text)
+            sentences = _SENTENCE_SPLIT_RE.split(text)
             for sentence in sentences:
                 sentence = sentence.strip()
                 if len(sentence) > 50 and len(sentence) < 300:
@@ -226,9 +274,9 @@ class InterviewExtractor:
             return 'strength'
         elif any(kw in quote_lower for kw in self.CONCERN_KEYWORDS):
             return 'concern'
-        elif any(re.search(p, quote_lower) for p in ['fortaleza', 'strength', 'strong']):
+        elif any(p in quote_lower for p in ['fortaleza', 'strength', 'strong']):
             return 'strength'
-        elif any(re.search(p, quote_lower) for p in ['debilidad', 'weakness', 'weak']):
+        elif any(p in quote_lower for p in ['debilidad', 'weakness', 'weak']):
             return 'weakness'
         
         return 'general'
@@ -244,27 +292,24 @@ class InterviewExtractor:
         """
         flags = []
         text_lower = text.lower()
+        spans = self._keyword_spans(self._RISK_MATCHER, text_lower)
         
         # High risk
         for keyword in self.RISK_KEYWORDS['high']:
-            if keyword in text_lower:
-                # Encontrar contexto
-                pattern = r'[^.]*\b' + re.escape(keyword) + r'\b[^.]{0,100}'
-                match = re.search(pattern, text_lower)
-                if match:
-                    context = match.group(0).strip()
-                    flags.append(f"HIGH RISK: {context[:100]}")
+            if keyword in spans:
+                # Contexto de la primera oración que la menciona
+                context = _keyword_contexts(text_lower, spans[keyword])[0].strip()
+                flags.append(f"HIGH RISK: {context[:100]}")
         
         # Medium risk
         for keyword in self.RISK_KEYWORDS['medium']:
-            if keyword in text_lower:
-                pattern = r'[^.]*\b' + re.escape(keyword) + r'\b[^.]{0,100}'
-                match = re.search(pattern, text_lower)
-                if match:
-                    context = match.group(0).strip()
-                    # Solo agregar si no es muy similar a uno ya agregado
-                    if not any(context[:50] in f for f in flags):
-                        flags.append(f"MEDIUM RISK: {context[:100]}")
+            if len(flags) >= 5:
+                break
+            if keyword in spans:
+                context = _keyword_contexts(text_lower, spans[keyword])[0].strip()
+                # Solo agregar si no es muy similar a uno ya agregado
+                if not any(context[:50] in f for f in flags):
+                    flags.append(f"MEDIUM RISK: {context[:100]}")
         
         return flags[:5]  # Limitar a 5 flags
     
@@ -277,26 +322,7 @@ class InterviewExtractor:
         Returns:
             Lista de fortalezas
         """
-        strengths = []
-        text_lower = text.lower()
-        
-        for keyword in self.STRENGTH_KEYWORDS:
-            if keyword in text_lower:
-                # Encontrar contexto
-                pattern = r'[^.]*\b' + re.escape(keyword) + r'\b[^.]{0,100}'
-                matches = re.findall(pattern, text_lower)
-                for match in matches:
-                    context = match.strip()
-                    if len(context) > 20:
-                        strengths.append(context[:150])
-        
-        # Deduplicar y limitar
-        unique = []
-        for s in strengths:
-            if not any(s[:50] in u for u in unique):
-                unique.append(s)
-        
-        return unique[:5]
+        return self._keyword_findings(self._STRENGTH_MATCHER, self.STRENGTH_KEYWORDS, text)
     
     def _detect_concerns(self, text: str) -> List[str]:
         """Detecta preocupaciones.
@@ -307,25 +333,44 @@ class InterviewExtractor:
         Returns:
             Lista de preocupaciones
         """
-        concerns = []
-        text_lower = text.lower()
+        return self._keyword_findings(self._CONCERN_MATCHER, self.CONCERN_KEYWORDS, text)
+    
+    @staticmethod
+    def _keyword_spans(matcher: KeywordMatcher, text_lower: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Ocurrencias de cada palabra clave, en una sola pasada sobre el texto."""
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        for match in matcher.finditer(text_lower):
+            spans.setdefault(match.keyword, []).append((match.start, match.end))
+        return spans
+    
+    def _keyword_findings(self, matcher: KeywordMatcher, keywords: List[str], text: str) -> List[str]:
+        """Contextos de las palabras clave, en el orden de la lista.
         
-        for keyword in self.CONCERN_KEYWORDS:
-            if keyword in text_lower:
-                pattern = r'[^.]*\b' + re.escape(keyword) + r'\b[^.]{0,100}'
-                matches = re.findall(pattern, text_lower)
-                for match in matches:
-                    context = match.strip()
-                    if len(context) > 20:
-                        concerns.append(context[:150])
+        Args:
+            matcher: Matcher compilado de la lista
+            keywords: Lista de palabras clave
+            text: Texto de la entrevista
+            
+        Returns:
+            Hasta 5 contextos sin repetir
+        """
+        text_lower = text.lower()
+        spans = self._keyword_spans(matcher, text_lower)
         
-        # Deduplicar y limitar
         unique = []
-        for c in concerns:
-            if not any(c[:50] in u for u in unique):
-                unique.append(c)
-        
-        return unique[:5]
+        for keyword in keywords:
+            for context in _keyword_contexts(text_lower, spans.get(keyword, [])):
+                context = context.strip()
+                if len(context) <= 20:
+                    continue
+                context = context[:150]
+                # Deduplicar y limitar
+                if not any(context[:50] in u for u in unique):
+                    unique.append(context)
+                    if len(unique) == 5:
+                        return unique
+        
+        return unique
     
     def _analyze_sentiment(self, text: str) -> str:
         """Analiza el sentimiento del texto.
@@ -0,0 +1,175 @@
+"""
+Matchers precompilados para los extractores.
+
+Los extractores buscaban cada palabra clave (skills, secciones, riesgos)
+con un re.search/re.findall propio: k palabras = k pasadas sobre el texto.
+Aquí el diccionario completo se compila una sola vez, al cargar el módulo,
+en una regex con forma de trie (los prefijos comunes se comparten, como en
+Aho-Corasick), y el texto se recorre en una sola pasada:
+
+    KeywordMatcher({"python": "Python", "node.js": "Node.js"}).find_all(text)
+
+- Entre las palabras que empiezan en la misma posición gana la más larga
+  ("JavaScript" antes que "Java").
+- whole_words exige límites de palabra, igual que \\b...\\b.
+- Los espacios de las palabras clave aceptan cualquier espacio en blanco.
+
+PatternSet hace lo mismo con listas de regex ya escritas (p. ej. los
+encabezados de sección del CV): una alternación con un grupo por patrón.
+"""
+import re
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Marca de fin de palabra dentro del trie
+_END = ""
+
+
+class KeywordMatch(NamedTuple):
+    """Ocurrencia de una palabra clave."""
+    value: object
+    keyword: str
+    start: int
+    end: int
+
+
+def _normalize(keyword: str, ignore_case: bool) -> str:
+    keyword = " ".join(keyword.split())
+    return keyword.lower() if ignore_case else keyword
+
+
+def _build_trie(keywords: Mapping[str, object]) -> dict:
+    """Trie de caracteres; el valor de cada palabra queda bajo la clave _END."""
+    trie: Dict[str, object] = {}
+    for keyword, value in keywords.items():
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[_END] = value
+    return trie
+
+
+def _trie_pattern(trie: dict) -> str:
+    """Regex equivalente a la alternación de las palabras del trie."""
+
+    def build(node: dict) -> str:
+        is_end = _END in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items())
+            if char != _END
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Cuantificador greedy: primero se intenta la palabra más larga
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Diccionario de palabras clave compilado en una sola regex."""
+
+    def __init__(
+        self,
+        keywords: Union[Mapping[str, object], Iterable[str]],
+        ignore_case: bool = True,
+        whole_words: bool = True
+    ):
+        """
+        Args:
+            keywords: Palabras clave, o mapping palabra -> valor devuelto
+                (por defecto el valor es la propia palabra)
+            ignore_case: Coincidencia sin distinguir mayúsculas
+            whole_words: Exigir límites de palabra alrededor
+        """
+        if not isinstance(keywords, Mapping):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.ignore_case = ignore_case
+        self.values: Dict[str, object] = {}
+        for keyword, value in keywords.items():
+            self.values.setdefault(_normalize(keyword, ignore_case), value)
+
+        self._trie = _build_trie(self.values)
+        pattern = _trie_pattern(self._trie) if self.values else r"(?!)"
+        if whole_words:
+            pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+        self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+    def _to_match(self, match: "re.Match") -> KeywordMatch:
+        keyword = _normalize(match.group(0), self.ignore_case)
+        return KeywordMatch(self.values[keyword], keyword, match.start(), match.end())
+
+    def finditer(self, text: str) -> List[KeywordMatch]:
+        """Todas las ocurrencias, en orden de aparición (una pasada por el texto)."""
+        return [self._to_match(match) for match in self.regex.finditer(text)]
+
+    def find_all(self, text: str) -> List[object]:
+        """Valores encontrados, sin repetir, en orden de primera aparición."""
+        return list(dict.fromkeys(match.value for match in self.finditer(text)))
+
+    def search(self, text: str) -> Optional[KeywordMatch]:
+        """Primera ocurrencia o None."""
+        match = self.regex.search(text)
+        return self._to_match(match) if match else None
+
+    def prefixes(self, text: str) -> List[object]:
+        """Valores de todas las palabras clave con las que empieza text."""
+        if self.ignore_case:
+            text = text.lower()
+        found = []
+        node = self._trie
+        for char in text:
+            if char.isspace():
+                char = " "
+            node = node.get(char)
+            if node is None:
+                break
+            if _END in node:
+                found.append(node[_END])
+        return found
+
+
+class PatternMatch(NamedTuple):
+    """Ocurrencia de un patrón de un PatternSet."""
+    name: str
+    priority: int
+    start: int
+    end: int
+
+
+class PatternSet:
+    """Grupos de regex con nombre compilados en una sola alternación.
+
+    priority es la posición del patrón dentro de su grupo, para conservar
+    el orden de preferencia de las listas originales.
+    """
+
+    def __init__(self, groups: Mapping[str, Sequence[str]], flags: int = 0):
+        self._groups: List[Tuple[str, int]] = []
+        branches = []
+        for name, patterns in groups.items():
+            for priority, pattern in enumerate(patterns):
+                branches.append(f"(?P<p{len(self._groups)}>{pattern})")
+                self._groups.append((name, priority))
+        self.order = {name: index for index, name in enumerate(groups)}
+        self.regex = re.compile("|".join(branches) or r"(?!)", flags)
+
+    def _to_match(self, match: "re.Match") -> PatternMatch:
+        name, priority = self._groups[int(match.lastgroup[1:])]
+        return PatternMatch(name, priority, match.start(), match.end())
+
+    def finditer(self, text: str) -> List[PatternMatch]:
+        """Todas las ocurrencias, en orden de aparición (una pasada por el texto)."""
+        return [self._to_match(match) for match in self.regex.finditer(text)]
+
+    def search(self, text: str, pos: int = 0) -> Optional[PatternMatch]:
+        """Primera ocurrencia desde pos, o None.
+
+        Es la de menor inicio entre todos los patrones (a igual inicio, el
+        primero del mapping).
+        """
+        match = self.regex.search(text, pos)
+        return self._to_match(match) if match else None
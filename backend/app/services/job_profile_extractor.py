@@ -7,8 +7,25 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 import logging
 
+from app.services.extraction.matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
+# Limpieza del texto, en el orden en que se aplica
+_CLEAN_STEPS = [
+    (re.compile(r'\r\n?'), '\n'),  # Normalizar saltos de línea
+    (re.compile(r' +'), ' '),  # Quitar múltiples espacios
+    (re.compile(r'\n\s*\d+\s*\n'), '\n'),  # Numeración de página
+    (re.compile(r'\n\s*P[áa]gina\s*\d+\s*\n', re.IGNORECASE), '\n'),
+    (re.compile(r'https?://\S+'), ''),  # URLs de footers
+    (re.compile(r'\S+@\S+\.\S+'), ''),  # Emails de footers
+    (re.compile(r'\n{3,}'), '\n\n'),  # Líneas vacías múltiples
+]
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_BULLET_RE = re.compile(r'^[\s•\-\*\+]+\s*')
+_NUMBERING_RE = re.compile(r'^\d+[\.\)\-]\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
 
 class JobProfileExtractor:
     """Extrae información estructurada de perfiles de cargo en PDF/Word."""
@@ -27,6 +44,13 @@ class JobProfileExtractor:
         "condiciones": ["condiciones", "salario", "beneficios", "ubicación", "conditions", "compensation"]
     }
     
+    # Trie de keywords -> sección, para probar todas las keywords en un recorrido por línea
+    _SECTION_KEYWORDS = KeywordMatcher(
+        {keyword: section_key for section_key, keywords in SECTIONS.items() for keyword in keywords},
+        ignore_case=False
+    )
+    _SECTION_ORDER = {section_key: index for index, section_key in enumerate(SECTIONS)}
+    
     # Patrones para extraer datos estructurados de la sección "Estructura"
     HIERARCHY_PATTERNS = {
         "reports_to": [
@@ -72,6 +96,15 @@ class JobProfileExtractor:
         ],
     }
     
+    _HIERARCHY_RES = {
+        field: [re.compile(p, re.IGNORECASE) for p in patterns]
+        for field, patterns in HIERARCHY_PATTERNS.items()
+    }
+    _REQUIREMENTS_RES = {
+        field: [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in patterns]
+        for field, patterns in REQUIREMENTS_PATTERNS.items()
+    }
+    
     def __init__(self):
         self.errors = []
         self.warnings = []
@@ -222,25 +255,8 @@ class JobProfileExtractor:
     
     def _clean_text(self, text: str) -> str:
         """Limpia el texto de headers, footers y caracteres extraños."""
-        # Normalizar saltos de línea
-        text = re.sub(r'\r\n', '\n', text)
-        text = re.sub(r'\r', '\n', text)
-        
-        # Quitar múltiples espacios
-        text = re.sub(r' +', ' ', text)
-        
-        # Quitar líneas de numeración de página común
-        text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
-        text = re.sub(r'\n\s*P[áa]gina\s*\d+\s*\n', '\n', text, flags=re.IGNORECASE)
-        
-        # Quitar URLs comunes de footers
-        text = re.sub(r'https?://\S+', '', text)
-        
-        # Quitar emails comunes de footers
-        text = re.sub(r'\S+@\S+\.\S+', '', text)
-        
-        # Normalizar líneas vacías múltiples
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        for pattern, replacement in _CLEAN_STEPS:
+            text = pattern.sub(replacement, text)
         
         return text.strip()
     
@@ -294,14 +310,12 @@ class JobProfileExtractor:
             line_lower = line.lower().strip()
             
             # Quitar caracteres especiales para matching
-            line_clean = re.sub(r'[^\w\s]', '', line_lower)
+            line_clean = _PUNCTUATION_RE.sub('', line_lower)
             
-            for section_key, keywords in self.SECTIONS.items():
-                for keyword in keywords:
-                    # Buscar keyword al inicio de línea o como título
-                    if line_clean.startswith(keyword) or re.search(rf'^{keyword}[:\s]', line_clean):
-                        section_boundaries.append((i, section_key, line))
-                        break
+            # Secciones con alguna keyword al inicio de la línea, en el orden de SECTIONS
+            found = set(self._SECTION_KEYWORDS.prefixes(line_clean))
+            for section_key in sorted(found, key=self._SECTION_ORDER.__getitem__):
+                section_boundaries.append((i, section_key, line))
         
         # Ordenar por posición
         section_boundaries.sort(key=lambda x: x[0])
@@ -354,13 +368,13 @@ class JobProfileExtractor:
         if not text:
             return hierarchy
         
-        for field, patterns in self.HIERARCHY_PATTERNS.items():
+        for field, patterns in self._HIERARCHY_RES.items():
             for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+                match = pattern.search(text)
                 if match:
                     value = match.group(1).strip()
                     # Limpiar valor
-                    value = re.sub(r'\s+', ' ', value)
+                    value = _WHITESPACE_RE.sub(' ', value)
                     hierarchy[field] = value
                     break
         
@@ -430,12 +444,12 @@ class JobProfileExtractor:
             return requirements
         
         # Buscar campos específicos
-        for field, patterns in self.REQUIREMENTS_PATTERNS.items():
+        for field, patterns in self._REQUIREMENTS_RES.items():
             for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+                match = pattern.search(text)
                 if match:
                     value = match.group(1).strip()
-                    value = re.sub(r'\s+', ' ', value)
+                    value = _WHITESPACE_RE.sub(' ', value)
                     requirements[field] = value
                     break
         
@@ -576,11 +590,11 @@ class JobProfileExtractor:
         line = line.strip()
         
         # Quitar bullets comunes
-        line = re.sub(r'^[\s•\-\*\+]+\s*', '', line)
-        line = re.sub(r'^\d+[\.\)\-]\s*', '', line)
+        line = _BULLET_RE.sub('', line)
+        line = _NUMBERING_RE.sub('', line)
         
         # Quitar espacios extra
-        line = re.sub(r'\s+', ' ', line)
+        line = _WHITESPACE_RE.sub(' ', line)
         
         return line.strip()
     
@@ -1,32 +1,20 @@
 """Servicio para gestión de ofertas de trabajo."""
 from typing import List, Optional, Tuple
 from datetime import datetime
-import base64
-import json
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, and_, func, desc
 from sqlalchemy.orm import selectinload
 
+from app.core.pagination import Keyset
+from app.core.search import matches
 from app.models import JobOpening, JobStatus, Candidate
 from app.schemas import JobOpeningCreate, JobOpeningUpdate, JobRequirements
+from app.services.embedding_index import refresh_embeddings, remove_embeddings
 
 
-def encode_cursor(created_at: datetime) -> str:
-    """Codificar fecha de creación como cursor base64."""
-    data = {"created_at": created_at.isoformat()}
-    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
-
-
-def decode_cursor(cursor: str) -> datetime:
-    """Decodificar cursor a fecha de creación."""
-    # Agregar padding si es necesario
-    padding = 4 - len(cursor) % 4
-    if padding != 4:
-        cursor += "=" * padding
-    
-    data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
-    return datetime.fromisoformat(data["created_at"])
+# Orden de list_jobs_cursor: más recientes primero, id como desempate
+JOBS_KEYSET = Keyset("created_at", JobOpening.created_at, JobOpening.id)
 
 
 class JobService:
@@ -70,12 +58,7 @@ class JobService:
         if assigned_consultant_id:
             filters.append(JobOpening.assigned_consultant_id == assigned_consultant_id)
         if search:
-            search_filter = or_(
-                JobOpening.title.ilike(f"%{search}%"),
-                JobOpening.department.ilike(f"%{search}%"),
-                JobOpening.location.ilike(f"%{search}%"),
-            )
-            filters.append(search_filter)
+            filters.append(matches(JobOpening.search_text, search))
         
         if filters:
             query = query.where(and_(*filters))
@@ -114,9 +97,11 @@ class JobService:
             
         Returns:
             Tupla de (lista de jobs, siguiente cursor o None)
+            
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
         """
-        # Query base ordenada por created_at descendente
-        query = select(JobOpening).order_by(JobOpening.created_at.desc())
+        query = select(JobOpening)
         
         # Aplicar filtros
         if status:
@@ -124,35 +109,10 @@ class JobService:
         if assigned_consultant_id:
             query = query.where(JobOpening.assigned_consultant_id == assigned_consultant_id)
         if search:
-            search_filter = or_(
-                JobOpening.title.ilike(f"%{search}%"),
-                JobOpening.department.ilike(f"%{search}%"),
-                JobOpening.location.ilike(f"%{search}%"),
-            )
-            query = query.where(search_filter)
-        
-        # Aplicar cursor (paginación)
-        if cursor:
-            try:
-                cursor_date = decode_cursor(cursor)
-                query = query.where(JobOpening.created_at < cursor_date)
-            except Exception:
-                # Cursor inválido, ignorar y retornar primera página
-                pass
-        
-        # Pedir limit + 1 para saber si hay más páginas
-        query = query.limit(limit + 1)
-        
-        result = await self.db.execute(query)
-        jobs = list(result.scalars().all())
-        
-        # Determinar si hay siguiente página
-        next_cursor = None
-        if len(jobs) > limit:
-            next_cursor = encode_cursor(jobs[-1].created_at)
-            jobs = jobs[:limit]
+            query = query.where(matches(JobOpening.search_text, search))
         
-        return jobs, next_cursor
+        page = await JOBS_KEYSET.fetch(self.db, query, cursor, limit)
+        return page.items, page.next_cursor
     
     async def create_job(self, data: JobOpeningCreate) -> JobOpening:
         """Crear nueva oferta de trabajo."""
@@ -180,6 +140,7 @@ class JobService:
         self.db.add(job)
         await self.db.flush()
         await self.db.refresh(job)
+        await refresh_embeddings(self.db, job_id=job.id)
         
         return job
     
@@ -224,6 +185,7 @@ class JobService:
         job.updated_at = datetime.utcnow()
         await self.db.flush()
         await self.db.refresh(job)
+        await refresh_embeddings(self.db, job_id=job.id)
         
         return job
     
@@ -235,6 +197,7 @@ class JobService:
         
         await self.db.delete(job)
         await self.db.flush()
+        await remove_embeddings(job_id=job_id)
         
         return True
     
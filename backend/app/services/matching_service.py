@@ -3,17 +3,18 @@
 Este servicio implementa el core de análisis de match usando IA,
 con cache, manejo de errores graceful, y auditoría completa.
 """
+import asyncio
 import hashlib
 import json
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
 from enum import Enum
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, noload
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -63,6 +64,13 @@ class MatchingService:
     # Timeout para análisis (5 segundos)
     ANALYSIS_TIMEOUT_SECONDS = 5
     
+    # Modelo eficiente para este análisis
+    OPENAI_MODEL = "gpt-4o-mini"
+    SYSTEM_MESSAGE = (
+        "Eres un experto en reclutamiento técnico. Analiza CVs contra requisitos "
+        "de puestos de forma objetiva. Responde SOLO con JSON válido."
+    )
+    
     def __init__(
         self, 
         db: AsyncSession,
@@ -83,6 +91,10 @@ class MatchingService:
         self.cache = cache
         self._openai_client = openai_client
         self._prompt_template = prompt_template or self._get_default_prompt_template()
+        # La sesión async no admite operaciones concurrentes: en batch_analyze
+        # varias tareas comparten self.db, así que serializamos el acceso a BD
+        # y dejamos correr en paralelo solo las llamadas al LLM.
+        self._db_lock = asyncio.Lock()
     
     def _get_openai_client(self):
         """Lazy load del cliente OpenAI."""
@@ -112,16 +124,17 @@ class MatchingService:
         return """Analiza este CV contra los requisitos del puesto y genera un análisis estructurado.
 
 === CV DEL CANDIDATO ===
-{ cv_text }
+{cv_text}
 
 === REQUISITOS DEL PUESTO ===
-Título: { job_title }
-Descripción: { job_description }
-Requisitos: { job_requirements }
+Título: {job_title}
+Descripción: {job_description}
+Requisitos: {job_requirements}
 
 Genera un análisis en formato JSON con la siguiente estructura:
 {{
     "score": 85.5,  // Score general 0-100
+    "recommendation": "PROCEED",  // PROCEED (>75), REVIEW (50-75), REJECT (<50)
     "skills_match": {{
         "required_skills_percentage": 80.0,
         "matched_skills": ["skill1", "skill2"],
@@ -137,7 +150,6 @@ Genera un análisis en formato JSON con la siguiente estructura:
         "match_percentage": 100.0,
         "details": "Descripción"
     }},
-    "recommendation": "PROCEED",  // PROCEED (>75), REVIEW (50-75), REJECT (<50)
     "reasoning": "Explicación detallada del análisis",
     "strengths": ["Fortaleza 1", "Fortaleza 2"],
     "gaps": ["Gap 1", "Gap 2"],
@@ -175,6 +187,35 @@ Instrucciones:
         
         return text.strip()
     
+    def _fit_prompt_inputs(self, cv_text: str, job_requirements: Dict[str, Any]):
+        """
+        Ajusta el texto del CV y de la JD al presupuesto de tokens.
+        
+        Las skills requeridas y deseables del job se usan como keywords para
+        conservar las líneas relevantes al recortar.
+        
+        Returns:
+            Tupla (BudgetedText del CV, BudgetedText de la descripción)
+        """
+        from app.core.config import settings
+        from app.services.prompt_budget import fit_to_budget
+        
+        requirements = job_requirements.get("requirements") or {}
+        keywords = []
+        if isinstance(requirements, dict):
+            keywords = list(requirements.get("required_skills") or []) + list(
+                requirements.get("preferred_skills") or []
+            )
+        
+        return (
+            fit_to_budget(cv_text, settings.LLM_CV_TOKEN_BUDGET, keywords=keywords),
+            fit_to_budget(
+                job_requirements.get("description") or "",
+                settings.LLM_JOB_TOKEN_BUDGET,
+                keywords=keywords
+            ),
+        )
+    
     def _compute_hash(self, data: Dict[str, Any]) -> str:
         """Computa hash SHA-256 de datos para versionado de cache."""
         data_str = json.dumps(data, sort_keys=True, default=str)
@@ -226,10 +267,86 @@ Instrucciones:
         except Exception as e:
             logger.warning(f"Error writing to cache: {e}")
     
+    async def _load_extraction_texts(self, document_ids: List[Any]) -> Dict[str, str]:
+        """
+        Texto extraído más reciente de cada documento, en una sola query.
+        
+        Returns:
+            Dict {document_id: extracted_text} (solo documentos con texto)
+        """
+        from app.models.rhtools import DocumentTextExtraction
+        
+        if not document_ids:
+            return {}
+        
+        result = await self.db.execute(
+            select(DocumentTextExtraction.document_id, DocumentTextExtraction.extracted_text)
+            .where(
+                and_(
+                    DocumentTextExtraction.document_id.in_(document_ids),
+                    DocumentTextExtraction.extracted_text.isnot(None)
+                )
+            )
+            .order_by(desc(DocumentTextExtraction.created_at))
+        )
+        texts: Dict[str, str] = {}
+        for row in result.all():
+            if row.extracted_text:
+                texts.setdefault(str(row.document_id), row.extracted_text)
+        return texts
+    
+    def _cv_document_ids(self, candidate: Any) -> List[Any]:
+        """IDs de los documentos CV del candidato, en orden."""
+        return [
+            doc.id for doc in (candidate.documents or [])
+            if doc.document_type in ['resume', 'cv']
+        ]
+    
+    def _build_cv_text(self, candidate: Any, extraction_texts: Dict[str, str]) -> str:
+        """
+        Construye el texto del CV a partir de datos ya cargados.
+        
+        Prioridad: texto extraído del primer CV con extracción, luego raw_data,
+        y por último los datos estructurados del candidato.
+        """
+        for document_id in self._cv_document_ids(candidate):
+            text = extraction_texts.get(str(document_id))
+            if text:
+                return text
+        
+        # Primero intentar con extracted_data del candidato
+        if candidate.raw_data:
+            return json.dumps(candidate.raw_data, default=str)
+        
+        # Fallback: usar datos estructurados si existen
+        cv_parts = []
+        if candidate.full_name:
+            cv_parts.append(f"Nombre: {candidate.full_name}")
+        if candidate.extracted_skills:
+            cv_parts.append(f"Skills: {', '.join(candidate.extracted_skills)}")
+        if candidate.extracted_experience:
+            cv_parts.append(f"Experiencia: {json.dumps(candidate.extracted_experience)}")
+        if candidate.extracted_education:
+            cv_parts.append(f"Educación: {json.dumps(candidate.extracted_education)}")
+        
+        return "\n".join(cv_parts) if cv_parts else ""
+    
+    def _candidate_query(self):
+        """Query base de candidatos con sus documentos (sin cargar su job)."""
+        from app.models import Candidate
+        
+        return select(Candidate).options(
+            selectinload(Candidate.documents),
+            noload(Candidate.job_opening)
+        )
+    
     async def _get_candidate_with_cv(self, candidate_id: str) -> Tuple[Any, str]:
         """
         Obtiene candidato con su CV parseado.
         
+        Usa un número constante de queries (candidato, documentos y
+        extracciones), sin importar cuántos documentos tenga.
+        
         Args:
             candidate_id: ID del candidato
             
@@ -241,63 +358,62 @@ Instrucciones:
             CVNotParsedError: Si el CV no ha sido parseado
         """
         from app.models import Candidate
-        from app.models.rhtools import DocumentTextExtraction
         
         result = await self.db.execute(
-            select(Candidate)
-            .where(Candidate.id == candidate_id)
-            .options(selectinload(Candidate.documents))
+            self._candidate_query().where(Candidate.id == candidate_id)
         )
         candidate = result.scalar_one_or_none()
         
         if not candidate:
             raise CandidateNotFoundError(f"Candidato {candidate_id} no encontrado")
         
-        # Obtener texto del CV
-        cv_text = ""
+        extraction_texts = await self._load_extraction_texts(self._cv_document_ids(candidate))
+        return self._require_cv(candidate_id, candidate, self._build_cv_text(candidate, extraction_texts))
+    
+    def _require_cv(self, candidate_id: str, candidate: Any, cv_text: str) -> Tuple[Any, str]:
+        """Valida que haya texto de CV para analizar."""
+        if not cv_text:
+            raise CVNotParsedError(f"CV del candidato {candidate_id} no disponible o no parseado")
+        return candidate, cv_text
+    
+    async def _get_candidates_with_cv(self, candidate_ids: List[str]) -> Dict[str, Tuple[Any, str]]:
+        """
+        Carga en bloque candidatos y el texto de sus CVs.
+        
+        Tres queries en total (candidatos, documentos y extracciones),
+        independientemente del número de candidatos.
         
-        # Primero intentar con extracted_data del candidato
-        if candidate.raw_data:
-            cv_text = json.dumps(candidate.raw_data, default=str)
-        
-        # Si hay documentos, buscar el texto extraído
-        if candidate.documents:
-            for doc in candidate.documents:
-                if doc.document_type in ['resume', 'cv']:
-                    # Buscar extracción de texto
-                    extraction_result = await self.db.execute(
-                        select(DocumentTextExtraction)
-                        .where(DocumentTextExtraction.document_id == doc.id)
-                    )
-                    extraction = extraction_result.scalar_one_or_none()
-                    
-                    if extraction and extraction.extracted_text:
-                        cv_text = extraction.extracted_text
-                        break
+        Returns:
+            Dict {candidate_id: (candidato, cv_text)}; los candidatos que no
+            existen no aparecen y cv_text puede ser "" si no hay CV
+        """
+        from app.models import Candidate
         
-        if not cv_text:
-            # Fallback: usar datos estructurados si existen
-            cv_parts = []
-            if candidate.full_name:
-                cv_parts.append(f"Nombre: {candidate.full_name}")
-            if candidate.extracted_skills:
-                cv_parts.append(f"Skills: {', '.join(candidate.extracted_skills)}")
-            if candidate.extracted_experience:
-                cv_parts.append(f"Experiencia: {json.dumps(candidate.extracted_experience)}")
-            if candidate.extracted_education:
-                cv_parts.append(f"Educación: {json.dumps(candidate.extracted_education)}")
-            
-            cv_text = "\n".join(cv_parts) if cv_parts else ""
+        if not candidate_ids:
+            return {}
         
-        if not cv_text:
-            raise CVNotParsedError(f"CV del candidato {candidate_id} no disponible o no parseado")
+        result = await self.db.execute(
+            self._candidate_query().where(Candidate.id.in_(candidate_ids))
+        )
+        candidates = result.scalars().all()
         
-        return candidate, cv_text
+        extraction_texts = await self._load_extraction_texts([
+            document_id
+            for candidate in candidates
+            for document_id in self._cv_document_ids(candidate)
+        ])
+        
+        return {
+            str(candidate.id): (candidate, self._build_cv_text(candidate, extraction_texts))
+            for candidate in candidates
+        }
     
     async def _get_job_with_requirements(self, job_id: str) -> Tuple[Any, Dict[str, Any]]:
         """
         Obtiene job con sus requisitos.
         
+        Como máximo dos queries: el job y, si tiene JD en PDF, su extracción.
+        
         Args:
             job_id: ID del job
             
@@ -312,7 +428,7 @@ Instrucciones:
         result = await self.db.execute(
             select(JobOpening)
             .where(JobOpening.id == job_id)
-            .options(selectinload(JobOpening.job_description_document))
+            .options(noload(JobOpening.job_description_document))
         )
         job = result.scalar_one_or_none()
         
@@ -322,17 +438,13 @@ Instrucciones:
         # Construir requisitos
         requirements = job.requirements or {}
         
-        # Si hay documento PDF del JD, extraer texto
+        # Si hay documento PDF del JD, usar su texto extraído
         job_description_text = job.description or ""
-        if job.job_description_document:
-            from app.models.rhtools import DocumentTextExtraction
-            extraction_result = await self.db.execute(
-                select(DocumentTextExtraction)
-                .where(DocumentTextExtraction.document_id == job.job_description_document.id)
+        if job.job_description_file_id:
+            extraction_texts = await self._load_extraction_texts([job.job_description_file_id])
+            job_description_text = (
+                extraction_texts.get(str(job.job_description_file_id)) or job_description_text
             )
-            extraction = extraction_result.scalar_one_or_none()
-            if extraction and extraction.extracted_text:
-                job_description_text = extraction.extracted_text
         
         return job, {
             "title": job.title,
@@ -360,7 +472,12 @@ Instrucciones:
         user_id: Optional[str] = None,
         force_refresh: bool = False,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
+        user_agent: Optional[str] = None,
+        candidate_data: Optional[Tuple[Any, str]] = None,
+        job_data: Optional[Tuple[Any, Dict[str, Any]]] = None,
+        on_field: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+        rate_limiter=None,
+        llm_timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Analiza el match entre un candidato y un job.
@@ -372,6 +489,15 @@ Instrucciones:
             force_refresh: Si es True, ignora el cache
             ip_address: IP del request (para auditoría)
             user_agent: User agent (para auditoría)
+            candidate_data: (candidato, cv_text) ya cargados, p.ej. por batch_analyze
+            job_data: (job, requirements) ya cargados, p.ej. por batch_analyze
+            on_field: Si se indica, la llamada a OpenAI se hace en streaming y
+                se notifica cada campo (score, recommendation, ...) apenas se
+                genera. Un resultado en cache no emite campos.
+            rate_limiter: LLMRateLimiter a consumir antes de llamar al LLM
+                (un resultado en cache no lo consume)
+            llm_timeout: Timeout en segundos de la llamada al LLM; no incluye
+                la espera por la sesión de BD ni las queries
             
         Returns:
             Dict con el resultado del matching
@@ -380,48 +506,55 @@ Instrucciones:
             CandidateNotFoundError: Si el candidato no existe
             JobNotFoundError: Si el job no existe
             CVNotParsedError: Si el CV no está parseado
-            OpenAIError: Si hay error con OpenAI
+            RateLimitError: Si el rate_limiter no admite otra llamada al LLM
+            OpenAIError: Si hay error con OpenAI (incluido el timeout)
         """
         start_time = time.time()
         
         try:
-            # 1. Obtener datos del candidato y job
-            candidate, cv_text = await self._get_candidate_with_cv(candidate_id)
-            job, job_requirements = await self._get_job_with_requirements(job_id)
-            
-            # 2. Verificar permisos (el job debe ser accesible)
-            # Nota: La validación de permisos se hace en el endpoint
-            
-            # 3. Calcular hashes para cache
-            cv_hash = self._compute_hash({"text": cv_text, "skills": candidate.extracted_skills})
-            job_hash = self._compute_hash(job_requirements)
-            
-            # 4. Verificar cache (si no es force_refresh)
-            if not force_refresh:
-                cached_result = await self._get_cached_result(candidate_id, job_id, cv_hash, job_hash)
-                if cached_result:
-                    # Registrar uso de cache en auditoría
-                    await self._log_audit(
-                        action="ANALYZE_CACHED",
-                        candidate_id=candidate_id,
-                        job_id=job_id,
-                        user_id=user_id,
-                        ip_address=ip_address,
-                        user_agent=user_agent,
-                        success=True,
-                        processing_time_ms=int((time.time() - start_time) * 1000)
-                    )
-                    return cached_result
+            async with self._db_lock:
+                # 1. Obtener datos del candidato y job (si no vienen precargados)
+                if candidate_data is not None:
+                    candidate, cv_text = self._require_cv(candidate_id, *candidate_data)
+                else:
+                    candidate, cv_text = await self._get_candidate_with_cv(candidate_id)
+                job, job_requirements = job_data or await self._get_job_with_requirements(job_id)
+                
+                # 2. Verificar permisos (el job debe ser accesible)
+                # Nota: La validación de permisos se hace en el endpoint
+                
+                # 3. Calcular hashes para cache
+                cv_hash = self._compute_hash({"text": cv_text, "skills": candidate.extracted_skills})
+                job_hash = self._compute_hash(job_requirements)
+                
+                # 4. Verificar cache (si no es force_refresh)
+                if not force_refresh:
+                    cached_result = await self._get_cached_result(candidate_id, job_id, cv_hash, job_hash)
+                    if cached_result:
+                        # Registrar uso de cache en auditoría
+                        await self._log_audit(
+                            action="ANALYZE_CACHED",
+                            candidate_id=candidate_id,
+                            job_id=job_id,
+                            user_id=user_id,
+                            ip_address=ip_address,
+                            user_agent=user_agent,
+                            success=True,
+                            processing_time_ms=int((time.time() - start_time) * 1000)
+                        )
+                        return cached_result
             
-            # 5. Preparar prompt
+            # 5. Preparar prompt (CV y JD ajustados al presupuesto de tokens)
+            cv_budgeted, description_budgeted = self._fit_prompt_inputs(cv_text, job_requirements)
+            tokens_saved = cv_budgeted.tokens_saved + description_budgeted.tokens_saved
             prompt = self._prompt_template.format(
-                cv_text=self._sanitize_input(cv_text, max_length=8000),
+                cv_text=self._sanitize_input(cv_budgeted.text, max_length=8000),
                 job_title=self._sanitize_input(job_requirements["title"]),
-                job_description=self._sanitize_input(job_requirements["description"], max_length=3000),
+                job_description=self._sanitize_input(description_budgeted.text, max_length=3000),
                 job_requirements=self._sanitize_input(json.dumps(job_requirements["requirements"]), max_length=2000)
             )
             
-            # 6. Llamar a OpenAI
+            # 6. Llamar a OpenAI (fuera del lock: es la parte que se paraleliza)
             client = self._get_openai_client()
             
             if not client:
@@ -429,7 +562,24 @@ Instrucciones:
                 logger.warning("OpenAI not available, using fallback analysis")
                 result = await self._fallback_analysis(candidate, job_requirements)
             else:
-                result = await self._call_openai(prompt)
+                if rate_limiter is not None:
+                    await self._acquire_llm_call(rate_limiter, user_id, ip_address)
+                
+                if on_field is not None:
+                    # Streaming: cada consumidor necesita su propio stream
+                    llm_call = self._stream_openai(prompt, on_field, tokens_saved=tokens_saved)
+                else:
+                    # Requests idénticos concurrentes comparten una sola llamada
+                    from app.core.single_flight import get_single_flight
+                    llm_call = get_single_flight().do(
+                        self._get_cache_key(candidate_id, job_id, cv_hash, job_hash),
+                        lambda: self._call_openai(prompt, tokens_saved=tokens_saved)
+                    )
+                
+                try:
+                    result = await asyncio.wait_for(llm_call, timeout=llm_timeout)
+                except asyncio.TimeoutError:
+                    raise OpenAIError(f"Timeout tras {llm_timeout}s")
             
             # 7. Procesar resultado
             result["candidate_id"] = str(candidate_id)
@@ -437,73 +587,97 @@ Instrucciones:
             result["analyzed_at"] = datetime.utcnow().isoformat()
             result["is_cached"] = False
             
-            # 8. Guardar en BD
-            await self._save_match_result(
-                candidate_id=candidate_id,
-                job_id=job_id,
-                result=result,
-                user_id=user_id,
-                cv_hash=cv_hash,
-                job_hash=job_hash
-            )
-            
-            # 9. Guardar en cache
-            await self._cache_result(candidate_id, job_id, cv_hash, job_hash, result)
-            
-            # 10. Registrar auditoría
-            processing_time = int((time.time() - start_time) * 1000)
-            await self._log_audit(
-                action="ANALYZE",
-                candidate_id=candidate_id,
-                job_id=job_id,
-                user_id=user_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                success=True,
-                processing_time_ms=processing_time
-            )
+            async with self._db_lock:
+                # 8. Guardar en BD
+                await self._save_match_result(
+                    candidate_id=candidate_id,
+                    job_id=job_id,
+                    result=result,
+                    user_id=user_id,
+                    cv_hash=cv_hash,
+                    job_hash=job_hash
+                )
+                
+                # 9. Guardar en cache
+                await self._cache_result(candidate_id, job_id, cv_hash, job_hash, result)
+                
+                # 10. Registrar auditoría
+                processing_time = int((time.time() - start_time) * 1000)
+                await self._log_audit(
+                    action="ANALYZE",
+                    candidate_id=candidate_id,
+                    job_id=job_id,
+                    user_id=user_id,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    success=True,
+                    processing_time_ms=processing_time
+                )
             
             return result
             
-        except (CandidateNotFoundError, JobNotFoundError, CVNotParsedError):
+        except (CandidateNotFoundError, JobNotFoundError, CVNotParsedError, RateLimitError):
             raise
         except Exception as e:
             processing_time = int((time.time() - start_time) * 1000)
-            await self._log_audit(
-                action="ANALYZE",
-                candidate_id=candidate_id,
-                job_id=job_id,
-                user_id=user_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                success=False,
-                error_message=str(e),
-                processing_time_ms=processing_time
-            )
+            async with self._db_lock:
+                await self._log_audit(
+                    action="ANALYZE",
+                    candidate_id=candidate_id,
+                    job_id=job_id,
+                    user_id=user_id,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    success=False,
+                    error_message=str(e),
+                    processing_time_ms=processing_time
+                )
             raise OpenAIError(f"Error en análisis de matching: {str(e)}")
     
-    async def _call_openai(self, prompt: str) -> Dict[str, Any]:
+    async def _acquire_llm_call(self, rate_limiter, user_id: Optional[str], ip_address: Optional[str]):
+        """
+        Consume una llamada del presupuesto del LLMRateLimiter.
+        
+        Raises:
+            RateLimitError: Si se excedió alguno de los límites
+        """
+        limits = await rate_limiter.check_rate_limit(user_id or "anonymous", ip_address or "unknown")
+        if not limits["allowed"]:
+            raise RateLimitError(
+                f"Has excedido el límite de {limits['violated']}. "
+                f"Intenta de nuevo en {limits['retry_after']} segundos."
+            )
+    
+    async def _call_openai(self, prompt: str, tokens_saved: int = 0) -> Dict[str, Any]:
         """
         Llama a OpenAI para obtener el análisis.
         
         Args:
             prompt: Prompt completo
+            tokens_saved: Tokens ahorrados por el presupuesto (para métricas)
             
         Returns:
             Dict con el resultado parseado
         """
+        from app.metrics import track_llm_request
+        from app.services.prompt_budget import usage_tokens
+        
         client = self._get_openai_client()
         
         if not client:
             raise OpenAIError("OpenAI client not available")
         
+        model = self.OPENAI_MODEL
+        start_time = time.time()
+        response = None
+        success = False
         try:
             response = await client.chat.completions.create(
-                model="gpt-4o-mini",  # Modelo eficiente para este análisis
+                model=model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "Eres un experto en reclutamiento técnico. Analiza CVs contra requisitos de puestos de forma objetiva. Responde SOLO con JSON válido."
+                        "content": self.SYSTEM_MESSAGE
                     },
                     {
                         "role": "user",
@@ -519,7 +693,9 @@ Instrucciones:
             result = json.loads(content)
             
             # Validar y normalizar resultado
-            return self._normalize_result(result)
+            normalized = self._normalize_result(result)
+            success = True
+            return normalized
             
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON from OpenAI: {e}")
@@ -527,6 +703,66 @@ Instrucciones:
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise OpenAIError(f"Error de OpenAI: {e}")
+        finally:
+            tokens_prompt, tokens_completion = usage_tokens(response)
+            track_llm_request(
+                model=model,
+                operation="matching",
+                duration=time.time() - start_time,
+                tokens_prompt=tokens_prompt,
+                tokens_completion=tokens_completion,
+                success=success,
+                tokens_saved=tokens_saved
+            )
+    
+    async def _stream_openai(
+        self,
+        prompt: str,
+        on_field: Callable[[str, Any], Awaitable[None]],
+        tokens_saved: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Igual que _call_openai, pero en streaming: cada campo del JSON se
+        notifica a on_field apenas OpenAI lo genera.
+        
+        Returns:
+            Dict con el resultado completo normalizado
+        """
+        from app.core.config import settings
+        from app.integrations.llm import LLMClient
+        from app.metrics import track_llm_request
+        from app.schemas import LLMConfig
+        
+        client = LLMClient(LLMConfig(
+            provider=LLMClient.PROVIDER_OPENAI,
+            api_key=settings.OPENAI_API_KEY,
+            model=self.OPENAI_MODEL,
+            temperature=0.0,
+            max_tokens=2000
+        ))
+        start_time = time.time()
+        streamed = None
+        success = False
+        try:
+            await client.initialize()
+            streamed = await client.stream_json(prompt, on_field, system=self.SYSTEM_MESSAGE)
+            normalized = self._normalize_result(streamed.data)
+            success = True
+            return normalized
+        except Exception as e:
+            logger.error(f"OpenAI streaming error: {e}")
+            raise OpenAIError(f"Error de OpenAI: {e}")
+        finally:
+            await client.close()
+            track_llm_request(
+                model=self.OPENAI_MODEL,
+                operation="matching",
+                duration=time.time() - start_time,
+                tokens_prompt=streamed.tokens_prompt if streamed else 0,
+                tokens_completion=streamed.tokens_completion if streamed else 0,
+                success=success,
+                tokens_saved=tokens_saved
+            )
     
     def _normalize_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Normaliza y valida el resultado de OpenAI."""
@@ -773,42 +1009,224 @@ Instrucciones:
             for match in matches
         ]
     
+    def _resolve_batch_concurrency(
+        self,
+        concurrency: Optional[int] = None,
+        rate_limiter=None
+    ) -> int:
+        """
+        Determina cuántos análisis pueden correr a la vez en un batch.
+        
+        Nunca supera el presupuesto por minuto del LLMRateLimiter (si se
+        proporciona), de modo que un batch no pueda por sí solo agotar el
+        límite de llamadas al LLM.
+        """
+        from app.core.config import settings
+        
+        limit = concurrency or settings.MATCHING_BATCH_CONCURRENCY
+        if rate_limiter is not None:
+            limit = min(limit, rate_limiter.requests_per_minute)
+        return max(1, limit)
+    
+    async def _prefilter_candidates(
+        self,
+        candidate_ids: List[str],
+        job_requirements: Dict[str, Any],
+        top_k: int,
+        min_score: float
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Ranking barato de skills/experiencia antes de llamar al LLM.
+        
+        Carga skills y experiencia de todos los candidatos en una sola query
+        y los puntúa con SkillPrefilter.
+        
+        Returns:
+            Tupla (ids que pasan al LLM, {id: score del pre-filtro})
+        """
+        from app.models import Candidate
+        from app.services.prefilter import SkillPrefilter, estimate_years
+        
+        requirements = job_requirements.get("requirements") or {}
+        
+        result = await self.db.execute(
+            select(Candidate.id, Candidate.extracted_skills, Candidate.extracted_experience)
+            .where(Candidate.id.in_(candidate_ids))
+        )
+        rows = {str(row.id): row for row in result.all()}
+        
+        skills, years = [], []
+        for candidate_id in candidate_ids:
+            row = rows.get(str(candidate_id))
+            skills.append(row.extracted_skills if row else None)
+            years.append(estimate_years(row.extracted_experience) if row else 0.0)
+        
+        prefilter = SkillPrefilter()
+        scores = prefilter.score(
+            skills,
+            years,
+            requirements.get("required_skills") or [],
+            requirements.get("min_years_experience") or 0
+        )
+        return prefilter.select(candidate_ids, scores, top_k=top_k, min_score=min_score)
+    
     async def batch_analyze(
         self,
         candidate_ids: List[str],
         job_id: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        rate_limiter=None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None,
+        top_k: Optional[int] = None,
+        min_prefilter_score: Optional[float] = None,
+        ip_address: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Analiza múltiples candidatos contra un job.
+        Analiza múltiples candidatos contra un job de forma concurrente.
+        
+        Como máximo `concurrency` análisis corren a la vez, por lo que el
+        tiempo total es aproximadamente ceil(N / concurrency) × latencia del LLM.
+        
+        El job se carga una sola vez y los candidatos con sus CVs en bloque,
+        con un número constante de queries por batch.
+        
+        Si hay más candidatos que `top_k` (o se pide un score mínimo), un
+        pre-filtro vectorizado de skills/experiencia elige cuáles pasan al
+        LLM; el resto se devuelve con `skipped=True` y su `prefilter_score`.
         
         Args:
             candidate_ids: Lista de IDs de candidatos
             job_id: ID del job
             user_id: ID del usuario que solicita el análisis
+            concurrency: Análisis simultáneos (default: settings.MATCHING_BATCH_CONCURRENCY)
+            item_timeout: Timeout en segundos de la llamada al LLM de cada candidato
+                (default: settings.MATCHING_BATCH_ITEM_TIMEOUT)
+            rate_limiter: LLMRateLimiter que se consume en cada llamada al LLM y
+                cuyo presupuesto por minuto acota la concurrencia
+            on_result: Callback async invocado con (posición, item) a medida que
+                cada candidato termina, para streaming de resultados parciales
+            top_k: Máximo de candidatos que pasan al LLM
+                (default: settings.MATCHING_PREFILTER_TOP_K, 0 = sin pre-filtro)
+            min_prefilter_score: Score mínimo del pre-filtro
+                (default: settings.MATCHING_PREFILTER_MIN_SCORE)
+            ip_address: IP del request (para rate limiting y auditoría)
             
         Returns:
-            Lista de resultados de matching
+            Lista de resultados de matching, en el mismo orden que candidate_ids
         """
-        results = []
+        from app.core.config import settings
         
-        for candidate_id in candidate_ids:
+        timeout = item_timeout or settings.MATCHING_BATCH_ITEM_TIMEOUT
+        semaphore = asyncio.Semaphore(
+            self._resolve_batch_concurrency(concurrency, rate_limiter)
+        )
+        results: List[Optional[Dict[str, Any]]] = [None] * len(candidate_ids)
+        
+        top_k = settings.MATCHING_PREFILTER_TOP_K if top_k is None else top_k
+        min_score = (
+            settings.MATCHING_PREFILTER_MIN_SCORE
+            if min_prefilter_score is None else min_prefilter_score
+        )
+        
+        # Datos compartidos por todo el batch
+        load_error: Optional[str] = None
+        job_data = None
+        try:
+            async with self._db_lock:
+                job_data = await self._get_job_with_requirements(job_id)
+        except Exception as e:
+            load_error = str(e)
+        
+        selected = set(candidate_ids)
+        prefilter_scores: Dict[str, float] = {}
+        if job_data and ((top_k and len(candidate_ids) > top_k) or min_score > 0):
             try:
-                result = await self.analyze_match(
-                    candidate_id=candidate_id,
-                    job_id=job_id,
-                    user_id=user_id
+                async with self._db_lock:
+                    kept, prefilter_scores = await self._prefilter_candidates(
+                        candidate_ids, job_data[1], top_k, min_score
+                    )
+                selected = set(kept)
+                logger.info(
+                    f"Batch prefilter for job {job_id}: "
+                    f"{len(selected)}/{len(candidate_ids)} candidates sent to LLM"
                 )
-                results.append({
+            except Exception as e:
+                # Sin pre-filtro se analiza todo, como antes
+                logger.warning(f"Batch prefilter failed for job {job_id}: {e}")
+        
+        candidates: Dict[str, Tuple[Any, str]] = {}
+        if job_data:
+            try:
+                async with self._db_lock:
+                    candidates = await self._get_candidates_with_cv(
+                        list(dict.fromkeys(c for c in candidate_ids if c in selected))
+                    )
+            except Exception as e:
+                load_error = str(e)
+        
+        async def finish(position: int, item: Dict[str, Any]):
+            results[position] = item
+            if on_result:
+                try:
+                    await on_result(position, item)
+                except Exception as e:
+                    logger.warning(f"Error in batch on_result callback: {e}")
+        
+        async def run_one(position: int, candidate_id: str):
+            if candidate_id not in selected:
+                score = prefilter_scores.get(candidate_id, 0.0)
+                await finish(position, {
                     "candidate_id": candidate_id,
-                    "success": True,
-                    "result": result
+                    "success": False,
+                    "skipped": True,
+                    "prefilter_score": score,
+                    "error": f"Descartado por pre-filtro (score {score})"
                 })
-            except Exception as e:
-                results.append({
+                return
+            
+            if load_error or str(candidate_id) not in candidates:
+                await finish(position, {
                     "candidate_id": candidate_id,
                     "success": False,
-                    "error": str(e)
+                    "error": load_error or f"Candidato {candidate_id} no encontrado"
                 })
+                return
+            
+            async with semaphore:
+                try:
+                    # El timeout cubre solo la llamada al LLM: cancelar mientras
+                    # se espera o se usa la sesión compartida la dejaría a medias.
+                    result = await self.analyze_match(
+                        candidate_id=candidate_id,
+                        job_id=job_id,
+                        user_id=user_id,
+                        ip_address=ip_address,
+                        candidate_data=candidates[str(candidate_id)],
+                        job_data=job_data,
+                        rate_limiter=rate_limiter,
+                        llm_timeout=timeout
+                    )
+                    item = {
+                        "candidate_id": candidate_id,
+                        "success": True,
+                        "result": result
+                    }
+                except Exception as e:
+                    item = {
+                        "candidate_id": candidate_id,
+                        "success": False,
+                        "error": str(e)
+                    }
+            
+            if candidate_id in prefilter_scores:
+                item["prefilter_score"] = prefilter_scores[candidate_id]
+            await finish(position, item)
+        
+        await asyncio.gather(*(
+            run_one(position, candidate_id)
+            for position, candidate_id in enumerate(candidate_ids)
+        ))
         
         return results
@@ -0,0 +1,281 @@
+"""
+Estadísticas precalculadas del pipeline.
+
+Los dashboards (métricas por vacante, stats de clientes y submissions)
+contaban y promediaban filas crudas en cada request. Aquí se mantienen dos
+tablas de agregados:
+
+- hh_role_stage_stats (HHRoleStageStats): por vacante y etapa, conteo de
+  aplicaciones, contratados, suma/conteo de scores y días de contratación.
+- rhtools_submission_stats (SubmissionStats): submissions por cliente,
+  posición y estado.
+
+Cada cambio de etapa/decisión/score aplica un delta con un único
+INSERT ... ON CONFLICT DO UPDATE (atómico frente a escrituras concurrentes)
+dentro de la misma transacción que el cambio. `reconcile()` recalcula
+todo desde las tablas crudas; la tarea periódica de Celery corrige así la
+deriva de escrituras que no pasan por aquí (sincronizaciones, SQL
+manual).
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, cast, delete, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core_ats import ApplicationStage, HHApplication, HHRole, HHRoleStageStats
+from app.models.rhtools import Submission, SubmissionStats
+from app.models.rhtools.submission import SubmissionStatus
+
+logger = logging.getLogger(__name__)
+
+ROLE_COUNTERS = (
+    "application_count", "hired_count", "score_sum", "score_count",
+    "hire_days_sum", "hire_days_count",
+)
+
+
+@dataclass(frozen=True)
+class ApplicationStatsEntry:
+    """Aporte de una aplicación a los agregados de su (vacante, etapa)."""
+    stage: ApplicationStage
+    hired: bool = False
+    overall_score: Optional[Decimal] = None
+    hire_days: Optional[int] = None
+
+    @classmethod
+    def of(cls, application) -> "ApplicationStatsEntry":
+        """Toma el snapshot de una aplicación (antes o después de un cambio)."""
+        hire_days = None
+        if application.hired and application.decision_date and application.created_at:
+            days = (application.decision_date - application.created_at.date()).days
+            if days >= 0:
+                hire_days = days
+
+        score = application.overall_score
+        return cls(
+            stage=ApplicationStage(application.stage),
+            hired=bool(application.hired),
+            overall_score=Decimal(str(score)) if score is not None else None,
+            hire_days=hire_days,
+        )
+
+    def deltas(self, sign: int) -> Dict[str, Any]:
+        """Contadores a sumar (+1) o restar (-1) en la fila de su etapa."""
+        has_score = self.overall_score is not None
+        has_days = self.hire_days is not None
+        return {
+            "application_count": sign,
+            "hired_count": sign if self.hired else 0,
+            "score_sum": sign * self.overall_score if has_score else Decimal(0),
+            "score_count": sign if has_score else 0,
+            "hire_days_sum": sign * self.hire_days if has_days else 0,
+            "hire_days_count": sign if has_days else 0,
+        }
+
+
+def merge_deltas(
+    changes: Iterable[Tuple[Any, Dict[str, Any]]]
+) -> Dict[Any, Dict[str, Any]]:
+    """Suma deltas por clave y descarta las claves que quedan en cero.
+
+    Un mismo INSERT ... ON CONFLICT no puede tocar dos veces la misma fila,
+    así que los deltas de "antes" y "después" se combinan por clave.
+    """
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for key, deltas in changes:
+        row = merged.setdefault(key, dict.fromkeys(deltas, 0))
+        for name, value in deltas.items():
+            row[name] += value
+    return {key: row for key, row in merged.items() if any(row.values())}
+
+
+class PipelineStatsService:
+    """Mantiene y lee las tablas de estadísticas precalculadas."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # =========================================================================
+    # CORE ATS: VACANTES
+    # =========================================================================
+
+    async def record_application(
+        self,
+        role_id: UUID,
+        before: Optional[ApplicationStatsEntry],
+        after: Optional[ApplicationStatsEntry]
+    ) -> None:
+        """Aplica el cambio de una aplicación a hh_role_stage_stats.
+
+        Args:
+            role_id: Vacante de la aplicación
+            before: Snapshot previo (None si la aplicación es nueva)
+            after: Snapshot posterior (None si se elimina)
+
+        No hace commit: el delta queda en la transacción del cambio.
+        """
+        changes = []
+        if before is not None:
+            changes.append((before.stage, before.deltas(-1)))
+        if after is not None:
+            changes.append((after.stage, after.deltas(1)))
+
+        rows = merge_deltas(changes)
+        if not rows:
+            return
+
+        client_id = select(HHRole.client_id).where(HHRole.role_id == role_id).scalar_subquery()
+        stmt = insert(HHRoleStageStats).values([
+            {"role_id": role_id, "stage": stage, "client_id": client_id, **deltas}
+            for stage, deltas in rows.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HHRoleStageStats.role_id, HHRoleStageStats.stage],
+            set_={
+                **{
+                    name: getattr(HHRoleStageStats, name) + getattr(stmt.excluded, name)
+                    for name in ROLE_COUNTERS
+                },
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        await self.db.execute(stmt)
+
+    # =========================================================================
+    # RHTOOLS: SUBMISSIONS
+    # =========================================================================
+
+    async def record_submission(
+        self,
+        client_id: UUID,
+        job_opening_id: UUID,
+        old_status: Optional[str],
+        new_status: Optional[str]
+    ) -> None:
+        """Mueve una submission entre estados en rhtools_submission_stats.
+
+        Args:
+            old_status: Estado previo (None si la submission es nueva)
+            new_status: Estado nuevo (None si se elimina)
+        """
+        changes = []
+        if old_status is not None:
+            changes.append((old_status, {"submission_count": -1}))
+        if new_status is not None:
+            changes.append((new_status, {"submission_count": 1}))
+
+        rows = merge_deltas(changes)
+        if not rows:
+            return
+
+        stmt = insert(SubmissionStats).values([
+            {
+                "client_id": client_id,
+                "job_opening_id": job_opening_id,
+                "status": status,
+                **deltas,
+            }
+            for status, deltas in rows.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                SubmissionStats.client_id, SubmissionStats.job_opening_id, SubmissionStats.status
+            ],
+            set_={
+                "submission_count": SubmissionStats.submission_count + stmt.excluded.submission_count,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def submission_stats(self, client_id: Optional[UUID] = None) -> Dict[str, Any]:
+        """Total y conteo por estado de submissions (opcionalmente de un cliente)."""
+        query = select(
+            SubmissionStats.status,
+            func.sum(SubmissionStats.submission_count).label("count"),
+        ).group_by(SubmissionStats.status)
+        if client_id:
+            query = query.where(SubmissionStats.client_id == client_id)
+
+        result = await self.db.execute(query)
+        counts = {row.status: int(row.count) for row in result.all()}
+
+        by_status = {status.value: counts.get(status.value, 0) for status in SubmissionStatus}
+        return {
+            "total": sum(counts.values()),
+            "by_status": by_status,
+        }
+
+    # =========================================================================
+    # RECONCILIACIÓN
+    # =========================================================================
+
+    async def reconcile(self) -> Dict[str, int]:
+        """Recalcula ambas tablas desde los datos crudos y hace commit.
+
+        El lock EXCLUSIVE bloquea los deltas concurrentes (no las lecturas)
+        hasta el commit, así ningún cambio se pierde ni se cuenta dos veces.
+
+        Returns:
+            Filas escritas por tabla
+        """
+        await self.db.execute(text(
+            f"LOCK TABLE {HHRoleStageStats.__tablename__}, "
+            f"{SubmissionStats.__tablename__} IN EXCLUSIVE MODE"
+        ))
+        counts = {
+            HHRoleStageStats.__tablename__: await self.rebuild_role_stats(),
+            SubmissionStats.__tablename__: await self.rebuild_submission_stats(),
+        }
+        await self.db.commit()
+
+        logger.info(f"Estadísticas del pipeline reconciliadas: {counts}")
+        return counts
+
+    async def rebuild_role_stats(self) -> int:
+        """Reescribe hh_role_stage_stats desde hh_applications (sin commit)."""
+        days_to_hire = HHApplication.decision_date - cast(HHApplication.created_at, Date)
+        valid_hire = HHApplication.hired.is_(True) & (days_to_hire >= 0)
+        rows = (
+            select(
+                HHApplication.role_id,
+                HHApplication.stage,
+                HHRole.client_id,
+                func.count(),
+                func.count().filter(HHApplication.hired.is_(True)),
+                func.coalesce(func.sum(HHApplication.overall_score), 0),
+                func.count(HHApplication.overall_score),
+                func.coalesce(func.sum(days_to_hire).filter(valid_hire), 0),
+                func.count().filter(valid_hire),
+            )
+            .join(HHRole, HHRole.role_id == HHApplication.role_id)
+            .group_by(HHApplication.role_id, HHApplication.stage, HHRole.client_id)
+        )
+        await self.db.execute(delete(HHRoleStageStats))
+        result = await self.db.execute(
+            insert(HHRoleStageStats).from_select(
+                ["role_id", "stage", "client_id", *ROLE_COUNTERS], rows
+            )
+        )
+        return result.rowcount
+
+    async def rebuild_submission_stats(self) -> int:
+        """Reescribe rhtools_submission_stats desde rhtools_submissions (sin commit)."""
+        status = func.coalesce(Submission.status, literal_column(f"'{SubmissionStatus.ACTIVE.value}'"))
+        rows = (
+            select(Submission.client_id, Submission.job_opening_id, status, func.count())
+            .group_by(Submission.client_id, Submission.job_opening_id, status)
+        )
+        await self.db.execute(delete(SubmissionStats))
+        result = await self.db.execute(
+            insert(SubmissionStats).from_select(
+                ["client_id", "job_opening_id", "status", "submission_count"], rows
+            )
+        )
+        return result.rowcount
@@ -0,0 +1,184 @@
+"""
+Pre-filtro vectorizado de candidatos antes del matching con LLM.
+
+Promueve el matching simple de skills de `_fallback_analysis` a un ranker
+de primera pasada: puntúa todos los candidatos de una vacante con NumPy
+(cobertura de skills requeridas + años de experiencia) y solo los top-K
+pasan a la evaluación con LLM. Screening de miles de postulantes pasa a
+costar milisegundos en lugar de miles de llamadas al LLM.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Score neutral cuando la vacante no define skills requeridas
+# (mismo criterio que _fallback_analysis)
+NEUTRAL_SKILL_SCORE = 50.0
+
+
+def normalize_skill(skill: Any) -> str:
+    """Normaliza un skill (str o dict con 'name') para comparación."""
+    if isinstance(skill, dict):
+        skill = skill.get("name")
+    if skill is None:
+        return ""
+    return " ".join(str(skill).lower().split())
+
+
+def estimate_years(experience: Any) -> float:
+    """
+    Estima años de experiencia a partir de los distintos formatos guardados.
+
+    Acepta un número, un dict con years/total_years/years_experience o una
+    lista de experiencias (≈2 años por experiencia, igual que el fallback
+    del scoring service).
+    """
+    if experience is None or isinstance(experience, bool):
+        return 0.0
+    if isinstance(experience, (int, float)):
+        return max(float(experience), 0.0)
+    if isinstance(experience, str):
+        try:
+            return max(float(experience), 0.0)
+        except ValueError:
+            return 0.0
+    if isinstance(experience, dict):
+        for key in ("years", "total_years", "years_experience"):
+            if experience.get(key) is not None:
+                return estimate_years(experience[key])
+        return 0.0
+    if isinstance(experience, list):
+        return float(len(experience) * 2)
+    return 0.0
+
+
+class SkillPrefilter:
+    """
+    Scorer barato de skills/experiencia sobre una matriz de candidatos.
+
+    El matching de skills usa la misma semántica que `_fallback_analysis`
+    (substring en ambos sentidos, sin distinguir mayúsculas), pero se evalúa
+    una sola vez por skill distinto del vocabulario y se propaga a todos los
+    candidatos con un producto de matrices.
+    """
+
+    def __init__(self, skill_weight: Optional[float] = None):
+        weight = settings.MATCHING_PREFILTER_SKILL_WEIGHT if skill_weight is None else skill_weight
+        self.skill_weight = min(max(weight, 0.0), 1.0)
+
+    def score(
+        self,
+        candidate_skills: Sequence[Optional[Sequence[Any]]],
+        candidate_years: Sequence[float],
+        required_skills: Sequence[Any],
+        min_years_experience: float = 0
+    ) -> np.ndarray:
+        """
+        Calcula el score (0-100) de cada candidato.
+
+        Args:
+            candidate_skills: Skills de cada candidato (una lista por candidato)
+            candidate_years: Años de experiencia de cada candidato
+            required_skills: Skills requeridas por la vacante
+            min_years_experience: Años mínimos requeridos
+
+        Returns:
+            Array float de tamaño len(candidate_skills)
+        """
+        n = len(candidate_skills)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        skill_scores = self._skill_scores(candidate_skills, required_skills)
+        experience_scores = self._experience_scores(candidate_years, min_years_experience)
+
+        return (
+            self.skill_weight * skill_scores
+            + (1.0 - self.skill_weight) * experience_scores
+        ).astype(np.float32)
+
+    def _skill_scores(
+        self,
+        candidate_skills: Sequence[Optional[Sequence[Any]]],
+        required_skills: Sequence[Any]
+    ) -> np.ndarray:
+        """Porcentaje de skills requeridas cubiertas por cada candidato."""
+        n = len(candidate_skills)
+        required = [s for s in dict.fromkeys(normalize_skill(s) for s in required_skills) if s]
+        if not required:
+            return np.full(n, NEUTRAL_SKILL_SCORE, dtype=np.float32)
+
+        # Vocabulario de skills distintos entre todos los candidatos
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, skills in enumerate(candidate_skills):
+            for skill in skills or []:
+                name = normalize_skill(skill)
+                if not name:
+                    continue
+                rows.append(row)
+                cols.append(vocabulary.setdefault(name, len(vocabulary)))
+
+        if not vocabulary:
+            return np.zeros(n, dtype=np.float32)
+
+        # candidatos × vocabulario
+        has_skill = np.zeros((n, len(vocabulary)), dtype=np.float32)
+        has_skill[rows, cols] = 1.0
+
+        # vocabulario × requeridas: una comparación por skill distinto
+        matches = np.array([
+            [req in name or name in req for req in required]
+            for name in vocabulary
+        ], dtype=np.float32)
+
+        covered = (has_skill @ matches) > 0
+        return covered.mean(axis=1).astype(np.float32) * 100.0
+
+    def _experience_scores(
+        self,
+        candidate_years: Sequence[float],
+        min_years_experience: float
+    ) -> np.ndarray:
+        """Cumplimiento de años mínimos, acotado a 100."""
+        years = np.asarray(candidate_years, dtype=np.float32)
+        if not min_years_experience or min_years_experience <= 0:
+            return np.full(len(years), 100.0, dtype=np.float32)
+        return np.minimum(years / float(min_years_experience), 1.0) * 100.0
+
+    def select(
+        self,
+        ids: Sequence[str],
+        scores: np.ndarray,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Elige los candidatos que pasan al LLM.
+
+        Args:
+            ids: IDs en el mismo orden que scores
+            scores: Scores de `score()`
+            top_k: Máximo de candidatos a conservar (0/None = sin límite)
+            min_score: Score mínimo para conservar un candidato
+
+        Returns:
+            Tupla (ids seleccionados en orden de score, {id: score} de todos)
+        """
+        scores = np.asarray(scores, dtype=np.float32)
+        # Orden estable: a igual score se respeta el orden original
+        order = np.argsort(-scores, kind="stable")
+        if min_score:
+            order = order[scores[order] >= min_score]
+        if top_k and top_k > 0:
+            order = order[:top_k]
+
+        selected = [ids[i] for i in order]
+        all_scores = {cid: round(float(s), 2) for cid, s in zip(ids, scores)}
+        return selected, all_scores
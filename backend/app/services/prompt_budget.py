@@ -0,0 +1,266 @@
+"""Presupuesto de tokens para prompts de LLM (matching y scoring).
+
+Antes de enviar un CV al LLM se mide localmente su tamaño en tokens y se
+comprime hasta caber en el presupuesto configurado:
+
+1. Se eliminan líneas de boilerplate (números de página, "Curriculum Vitae",
+   encabezados/pies repetidos en cada página).
+2. Se divide el texto en secciones con la detección de CVExtractor.
+3. Se conservan primero las secciones más útiles para evaluar (skills,
+   experiencia, resumen...) y, dentro de cada una, las líneas que mencionan
+   las keywords del puesto. El texto resultante mantiene el orden original.
+
+Los tokens se cuentan con tiktoken si está instalado; si no, con una
+aproximación por palabras (~4 caracteres por token) suficiente para
+dimensionar el prompt.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from app.services.extraction.cv_extractor import CVExtractor
+from app.services.prefilter import normalize_skill
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Orden de preferencia al recortar; las secciones no listadas van al final
+SECTION_PRIORITY = {
+    "skills": 0,
+    "experience": 1,
+    "header": 2,
+    "summary": 3,
+    "education": 4,
+    "languages": 5,
+}
+OTHER_SECTION_PRIORITY = 6
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+_BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"^(p[aá]gina|page|p[aá]g\.?)\s*\d+(\s*(de|of|/)\s*\d+)?$",
+        r"^[-–\s]*\d+\s*((de|of|/)\s*\d+)?[-–\s]*$",
+        r"^(curriculum\s+vitae|curr[ií]culum|resume|résumé|cv|hoja\s+de\s+vida)$",
+        r"^(confidencial|confidential)$",
+    )
+]
+
+_encoding = None
+
+
+def _get_encoding():
+    """Encoding de tiktoken compartido (None si no está disponible)."""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken encoding not available, using estimate: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Cuenta (o estima) los tokens de un texto."""
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+
+    return sum(
+        max(1, (len(word) + 3) // 4)
+        for word in _WORD_RE.findall(text)
+    ) + text.count("\n")
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Corta un texto para que no supere max_tokens."""
+    if max_tokens <= 0 or not text:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    used = 0
+    end = 0
+    for match in re.finditer(r"\w+|[^\w\s]|\n", text, re.UNICODE):
+        word = match.group()
+        cost = 1 if word == "\n" else max(1, (len(word) + 3) // 4)
+        if used + cost > max_tokens:
+            return text[:end].rstrip()
+        used += cost
+        end = match.end()
+    return text
+
+
+def _normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def remove_boilerplate(text: str) -> str:
+    """Quita líneas de boilerplate, duplicadas y blancos consecutivos.
+
+    Las líneas repetidas (encabezados/pies de página con nombre y contacto)
+    se conservan solo la primera vez. Los encabezados de sección y las
+    etiquetas cortas terminadas en ":" no se deduplican.
+    """
+    seen = set()
+    lines: List[str] = []
+
+    for raw_line in (text or "").splitlines():
+        line = _normalize_line(raw_line)
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+
+        if any(p.match(line) for p in _BOILERPLATE_PATTERNS):
+            continue
+
+        key = line.lower()
+        is_label = line.endswith(":") or CVExtractor.detect_section_header(line)
+        if not is_label:
+            if key in seen:
+                continue
+            seen.add(key)
+
+        lines.append(line)
+
+    return "\n".join(lines).strip()
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Divide el texto en secciones usando la detección de CVExtractor.
+
+    Returns:
+        Lista de (tipo de sección, líneas). Lo anterior al primer encabezado
+        es la sección "header" (nombre, título, contacto).
+    """
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+
+    for line in text.splitlines():
+        section_type = CVExtractor.detect_section_header(line)
+        if section_type:
+            sections.append((section_type, [line]))
+        else:
+            sections[-1][1].append(line)
+
+    return [(kind, lines) for kind, lines in sections if any(lines)]
+
+
+def _mentions(line: str, keywords: List[str]) -> bool:
+    lowered = line.lower()
+    return any(keyword in lowered for keyword in keywords)
+
+
+@dataclass
+class BudgetedText:
+    """Texto ajustado al presupuesto y sus métricas de tokens."""
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+def fit_to_budget(
+    text: str,
+    max_tokens: int,
+    keywords: Optional[Iterable] = None
+) -> BudgetedText:
+    """Comprime un texto de CV hasta caber en max_tokens.
+
+    Args:
+        text: Texto del CV
+        max_tokens: Presupuesto de tokens (0 o negativo = sin límite, solo
+            se limpia el boilerplate)
+        keywords: Skills/términos del puesto; las líneas que los mencionan
+            tienen preferencia dentro de cada sección
+
+    Returns:
+        BudgetedText con el texto resultante
+    """
+    original_tokens = count_tokens(text)
+    cleaned = remove_boilerplate(text)
+    cleaned_tokens = count_tokens(cleaned)
+
+    if max_tokens <= 0 or cleaned_tokens <= max_tokens:
+        return BudgetedText(cleaned, original_tokens, cleaned_tokens)
+
+    terms = [normalize_skill(k) for k in (keywords or [])]
+    terms = [t for t in terms if t]
+
+    sections = split_sections(cleaned)
+    order = sorted(
+        range(len(sections)),
+        key=lambda i: SECTION_PRIORITY.get(sections[i][0], OTHER_SECTION_PRIORITY)
+    )
+
+    remaining = max_tokens
+    kept: List[List[int]] = [[] for _ in sections]
+
+    for index in order:
+        section_type, lines = sections[index]
+        # Encabezado primero, luego líneas relevantes, luego el resto en orden
+        candidates = sorted(
+            range(len(lines)),
+            key=lambda j: (
+                0 if j == 0 and section_type != "header" else 1,
+                0 if _mentions(lines[j], terms) else 1,
+                j,
+            )
+        )
+        spent = 0
+        for j in candidates:
+            if not lines[j]:
+                continue
+            cost = count_tokens(lines[j]) + 1
+            if cost > remaining - spent:
+                if j == 0 and section_type != "header":
+                    break
+                continue
+            kept[index].append(j)
+            spent += cost
+
+        # Un encabezado de sección sin contenido no aporta nada
+        if section_type != "header" and kept[index] == [0] and len(lines) > 1:
+            kept[index] = []
+            spent = 0
+        remaining -= spent
+
+    parts = []
+    for (_, lines), indexes in zip(sections, kept):
+        parts.extend(lines[j] for j in sorted(indexes))
+
+    result = "\n".join(parts).strip()
+    tokens = count_tokens(result)
+    if tokens > max_tokens:
+        # El recuento por líneas es aproximado con tiktoken; corte final
+        result = truncate_to_tokens(result, max_tokens)
+        tokens = count_tokens(result)
+
+    return BudgetedText(result, original_tokens, tokens)
+
+
+def usage_tokens(response) -> Tuple[int, int]:
+    """Tokens (prompt, completion) reportados por una respuesta de OpenAI."""
+    usage = getattr(response, "usage", None)
+    prompt = getattr(usage, "prompt_tokens", 0)
+    completion = getattr(usage, "completion_tokens", 0)
+    return (
+        prompt if isinstance(prompt, int) else 0,
+        completion if isinstance(completion, int) else 0,
+    )
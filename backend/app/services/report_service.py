@@ -0,0 +1,332 @@
+"""
+Reportes del Core ATS en una sola query por reporte.
+
+Los reportes de /reports cargaban la vacante, las aplicaciones y sus
+relaciones con varias queries ORM y agregaban en Python (conteos de flags,
+promedios, días de contratación). Aquí cada reporte es un único SELECT
+async: los conteos se resuelven en SQL (GROUP BY + FILTER), los resúmenes
+anidados con json_object_agg y las métricas por vacante se leen de los
+agregados precalculados de hh_role_stage_stats.
+
+Nota: las columnas SQLEnum guardan el NOMBRE del enum ('HIRED'), por lo que
+las claves que vuelven dentro de JSON se traducen a su valor en Python.
+"""
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Optional, Type
+from uuid import UUID
+
+from sqlalchemy import JSON, desc, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core_ats import (
+    ApplicationStage, AssessmentType, FlagSeverity, HHApplication,
+    HHAssessment, HHAssessmentScore, HHCandidate, HHClient, HHFlag,
+    HHInterview, HHRole, HHRoleStageStats
+)
+from app.schemas.core_ats import (
+    CandidateHistoryApplication, CandidateHistoryResponse,
+    RoleAnalyticsMetrics, RoleAnalyticsResponse,
+    TernaCandidateComparison, TernaReportResponse
+)
+
+# Máximo de candidatos comparados en una terna
+TERNA_LIMIT = 5
+
+# Etapas consideradas para la terna cuando no se indican candidatos
+TERNA_STAGES = [
+    ApplicationStage.TERNA,
+    ApplicationStage.INTERVIEW,
+    ApplicationStage.INTERVIEW_SCHEDULED,
+    ApplicationStage.INTERVIEW_DONE,
+    ApplicationStage.OFFER_SENT,
+    ApplicationStage.OFFER_ACCEPTED,
+    ApplicationStage.HIRED,
+]
+
+
+class ReportNotFoundError(Exception):
+    """La entidad base del reporte no existe o no hay datos que reportar."""
+    pass
+
+
+def _enum_value(enum_cls: Type[Enum], key: Any) -> str:
+    """Traduce un nombre de enum (como viene en JSON) a su valor."""
+    if isinstance(key, Enum):
+        return key.value
+    try:
+        return enum_cls[key].value
+    except KeyError:
+        return key
+
+
+def _to_float(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class ReportService:
+    """Reportes de vacantes y candidatos, un SELECT por reporte."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # =========================================================================
+    # TERNA
+    # =========================================================================
+
+    def terna_query(self, role_id: UUID, candidate_ids: Optional[List[UUID]] = None):
+        """Construye el SELECT del reporte de terna.
+
+        Vacante LEFT JOIN LATERAL (top N aplicaciones) con sus flags contados
+        por severidad y los scores de assessments agregados a JSON. Si la
+        vacante existe pero no tiene aplicaciones, vuelve una fila con
+        application_id nulo.
+        """
+        if candidate_ids:
+            selection = HHApplication.candidate_id.in_(candidate_ids)
+        else:
+            selection = HHApplication.stage.in_(TERNA_STAGES)
+
+        apps = (
+            select(
+                HHApplication.application_id,
+                HHApplication.candidate_id,
+                HHApplication.overall_score,
+                HHApplication.stage,
+            )
+            .where(HHApplication.role_id == HHRole.role_id, selection)
+            .order_by(desc(HHApplication.overall_score).nullslast())
+            .limit(TERNA_LIMIT)
+            .lateral("apps")
+        )
+
+        flags = (
+            select(
+                func.count().filter(HHFlag.severity == FlagSeverity.HIGH).label("high"),
+                func.count().filter(HHFlag.severity == FlagSeverity.MEDIUM).label("medium"),
+                func.count().filter(HHFlag.severity == FlagSeverity.LOW).label("low"),
+            )
+            .where(HHFlag.application_id == apps.c.application_id)
+            .lateral("flags")
+        )
+
+        # Un registro por assessment con sus dimensiones como objeto JSON
+        assessments = (
+            select(
+                HHAssessment.assessment_type.label("assessment_type"),
+                func.coalesce(
+                    func.json_object_agg(
+                        HHAssessmentScore.dimension, HHAssessmentScore.value
+                    ).filter(HHAssessmentScore.dimension.isnot(None)),
+                    func.json_build_object(),
+                ).label("scores"),
+            )
+            .outerjoin(HHAssessmentScore, HHAssessmentScore.assessment_id == HHAssessment.assessment_id)
+            .where(HHAssessment.application_id == apps.c.application_id)
+            .group_by(HHAssessment.assessment_id, HHAssessment.assessment_type)
+            .lateral("assessments")
+        )
+
+        interview_count = (
+            select(func.count())
+            .where(HHInterview.application_id == apps.c.application_id)
+            .scalar_subquery()
+        )
+
+        return (
+            select(
+                HHRole.role_title,
+                apps.c.application_id,
+                apps.c.candidate_id,
+                apps.c.overall_score,
+                apps.c.stage,
+                HHCandidate.full_name,
+                flags.c.high,
+                flags.c.medium,
+                flags.c.low,
+                func.json_object_agg(
+                    assessments.c.assessment_type, assessments.c.scores, type_=JSON
+                ).filter(assessments.c.assessment_type.isnot(None)).label("assessments_summary"),
+                interview_count.label("interview_count"),
+            )
+            .select_from(HHRole)
+            .outerjoin(apps, true())
+            .outerjoin(HHCandidate, HHCandidate.candidate_id == apps.c.candidate_id)
+            .outerjoin(flags, true())
+            .outerjoin(assessments, true())
+            .where(HHRole.role_id == role_id)
+            .group_by(
+                HHRole.role_id,
+                apps.c.application_id,
+                apps.c.candidate_id,
+                apps.c.overall_score,
+                apps.c.stage,
+                HHCandidate.full_name,
+                flags.c.high,
+                flags.c.medium,
+                flags.c.low,
+            )
+            .order_by(desc(apps.c.overall_score).nullslast())
+        )
+
+    async def terna_report(
+        self,
+        role_id: UUID,
+        candidate_ids: Optional[List[UUID]] = None
+    ) -> TernaReportResponse:
+        """Compara hasta TERNA_LIMIT candidatos de una misma vacante."""
+        result = await self.db.execute(self.terna_query(role_id, candidate_ids))
+        rows = result.all()
+
+        if not rows:
+            raise ReportNotFoundError("Vacante no encontrada")
+        if rows[0].application_id is None:
+            raise ReportNotFoundError("No se encontraron aplicaciones para comparar")
+
+        candidates = []
+        for row in rows:
+            assessments_summary = {
+                _enum_value(AssessmentType, assessment_type): {
+                    dimension: float(value) for dimension, value in scores.items()
+                }
+                for assessment_type, scores in (row.assessments_summary or {}).items()
+            }
+            candidates.append(TernaCandidateComparison(
+                candidate_id=row.candidate_id,
+                full_name=row.full_name,
+                overall_score=_to_float(row.overall_score),
+                stage=_enum_value(ApplicationStage, row.stage),
+                assessments_summary=assessments_summary,
+                flags_summary={'high': row.high, 'medium': row.medium, 'low': row.low},
+                interview_count=row.interview_count,
+            ))
+
+        return TernaReportResponse(
+            role_id=role_id,
+            role_title=rows[0].role_title,
+            candidates=candidates
+        )
+
+    # =========================================================================
+    # ROLE ANALYTICS
+    # =========================================================================
+
+    def role_analytics_query(self, role_id: UUID):
+        """Construye el SELECT de métricas de una vacante.
+
+        Lee los agregados precalculados de hh_role_stage_stats (a lo sumo
+        una fila por etapa, ver PipelineStatsService) y los pliega a una
+        fila por vacante.
+        """
+        stats = HHRoleStageStats
+        return (
+            select(
+                HHRole.role_title,
+                func.json_object_agg(stats.stage, stats.application_count, type_=JSON)
+                .filter(stats.application_count > 0)
+                .label("by_stage"),
+                func.sum(stats.score_sum).label("score_sum"),
+                func.sum(stats.score_count).label("score_count"),
+                func.sum(stats.hire_days_sum).label("days_sum"),
+                func.sum(stats.hire_days_count).label("days_count"),
+            )
+            .select_from(HHRole)
+            .outerjoin(stats, stats.role_id == HHRole.role_id)
+            .where(HHRole.role_id == role_id)
+            .group_by(HHRole.role_id)
+        )
+
+    async def role_analytics(self, role_id: UUID) -> RoleAnalyticsResponse:
+        """Métricas de pipeline de una vacante."""
+        result = await self.db.execute(self.role_analytics_query(role_id))
+        row = result.one_or_none()
+        if row is None:
+            raise ReportNotFoundError("Vacante no encontrada")
+
+        by_stage = {
+            _enum_value(ApplicationStage, stage): count
+            for stage, count in (row.by_stage or {}).items()
+        }
+
+        avg_score = None
+        if row.score_count:
+            avg_score = float(Decimal(row.score_sum) / Decimal(row.score_count))
+
+        avg_days = None
+        if row.days_count:
+            avg_days = int(row.days_sum) // int(row.days_count)
+
+        metrics = RoleAnalyticsMetrics(
+            total_applications=sum(by_stage.values()),
+            by_stage=by_stage,
+            hired_count=by_stage.get(ApplicationStage.HIRED.value, 0),
+            rejected_count=by_stage.get('rejected', 0),
+            avg_overall_score=avg_score,
+            avg_time_to_hire_days=avg_days
+        )
+
+        return RoleAnalyticsResponse(
+            role_id=role_id,
+            role_title=row.role_title,
+            metrics=metrics
+        )
+
+    # =========================================================================
+    # CANDIDATE HISTORY
+    # =========================================================================
+
+    def candidate_history_query(self, candidate_id: UUID):
+        """Construye el SELECT del historial de un candidato.
+
+        Candidato LEFT JOIN aplicaciones, vacante y cliente: una fila por
+        aplicación, o una sola fila con application_id nulo si no tiene.
+        """
+        return (
+            select(
+                HHCandidate.full_name,
+                HHApplication.application_id,
+                HHApplication.stage,
+                HHApplication.hired,
+                HHApplication.decision_date,
+                HHApplication.overall_score,
+                HHApplication.created_at,
+                HHRole.role_title,
+                HHClient.client_name,
+            )
+            .select_from(HHCandidate)
+            .outerjoin(HHApplication, HHApplication.candidate_id == HHCandidate.candidate_id)
+            .outerjoin(HHRole, HHRole.role_id == HHApplication.role_id)
+            .outerjoin(HHClient, HHClient.client_id == HHRole.client_id)
+            .where(HHCandidate.candidate_id == candidate_id)
+            .order_by(desc(HHApplication.created_at))
+        )
+
+    async def candidate_history(self, candidate_id: UUID) -> CandidateHistoryResponse:
+        """Historial completo de aplicaciones de un candidato."""
+        result = await self.db.execute(self.candidate_history_query(candidate_id))
+        rows = result.all()
+        if not rows:
+            raise ReportNotFoundError("Candidato no encontrado")
+
+        applications = [
+            CandidateHistoryApplication(
+                application_id=row.application_id,
+                role_title=row.role_title or "N/A",
+                client_name=row.client_name or "N/A",
+                stage=_enum_value(ApplicationStage, row.stage),
+                hired=bool(row.hired),
+                decision_date=row.decision_date,
+                overall_score=_to_float(row.overall_score),
+                created_at=row.created_at
+            )
+            for row in rows
+            if row.application_id is not None
+        ]
+
+        return CandidateHistoryResponse(
+            candidate_id=candidate_id,
+            full_name=rows[0].full_name,
+            total_applications=len(applications),
+            hired_count=sum(1 for a in applications if a.hired),
+            applications=applications
+        )
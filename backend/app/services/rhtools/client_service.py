@@ -161,13 +161,12 @@ class ClientService:
     
     async def get_client_stats(self, client_id: str) -> Dict[str, Any]:
         """Obtener estadísticas de un cliente."""
-        from app.models.rhtools import Submission, PipelineTemplate
+        from app.models.rhtools import PipelineTemplate
+        from app.services.pipeline_stats import PipelineStatsService
         
-        # Contar submissions
-        submissions_result = await self.db.execute(
-            select(func.count()).where(Submission.client_id == client_id)
-        )
-        total_submissions = submissions_result.scalar()
+        # Contar submissions (agregados precalculados)
+        submission_stats = await PipelineStatsService(self.db).submission_stats(client_id)
+        total_submissions = submission_stats["total"]
         
         # Contar pipelines
         pipelines_result = await self.db.execute(
@@ -1,17 +1,22 @@
 """Servicio de procesamiento de documentos - Extracción de texto."""
+import asyncio
 import io
 import logging
 import mimetypes
 import os
 import tempfile
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
 
 import httpx
 
 from app.core.config import settings
+from app.core.extraction_cache import extraction_cache, file_sha256
+from app.core.extraction_pool import run_extraction
 from app.models.rhtools import Document, DocumentTextExtraction, DocumentStatus, DocumentType
+from app.services.embedding_index import refresh_embeddings
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +39,9 @@ class ExtractionError(DocumentProcessorError):
 class DocumentProcessor:
     """Procesador de documentos para extracción de texto."""
     
+    # Versión de la extracción de texto (parte de la clave del cache de extracción)
+    VERSION = "1.0.0"
+    
     # MIME types soportados
     SUPPORTED_MIME_TYPES = {
         # PDFs
@@ -206,18 +214,29 @@ class DocumentProcessor:
         start_time = time.time()
         
         try:
-            # Descargar archivo de S3 o filesystem
-            file_path = await self._get_document_file(document)
-            
-            # Detectar tipo
-            mime_type = document.mime_type or self.detect_mime_type(file_path, document.original_filename)
-            file_type = self.get_file_type(mime_type)
-            
-            if not self.is_supported(mime_type):
-                raise UnsupportedFileError(f"Unsupported file type: {mime_type}")
-            
-            # Extraer texto según tipo
-            extraction_result = await self._extract_by_type(file_path, file_type)
+            # Con checksum, un archivo ya extraído ni siquiera se descarga
+            file_hash = document.checksum
+            extraction_result = await extraction_cache.get("text", self.VERSION, file_hash)
+            
+            if extraction_result is None:
+                # Descargar archivo de S3 o filesystem
+                file_path = await self._get_document_file(document)
+                
+                # Detectar tipo
+                mime_type = document.mime_type or self.detect_mime_type(file_path, document.original_filename)
+                file_type = self.get_file_type(mime_type)
+                
+                if not self.is_supported(mime_type):
+                    raise UnsupportedFileError(f"Unsupported file type: {mime_type}")
+                
+                if not file_hash:
+                    file_hash = await asyncio.to_thread(file_sha256, file_path)
+                    extraction_result = await extraction_cache.get("text", self.VERSION, file_hash)
+                
+                if extraction_result is None:
+                    # Extraer texto según tipo
+                    extraction_result = await self._extract_by_type(file_path, file_type)
+                    await extraction_cache.set("text", self.VERSION, file_hash, extraction_result)
             
             duration_ms = int((time.time() - start_time) * 1000)
             
@@ -240,6 +259,9 @@ class DocumentProcessor:
             await self.db.commit()
             await self.db.refresh(extraction)
             
+            # Mantener al día el índice de candidatos/jobs sugeridos
+            await refresh_embeddings(self.db, document_id=document.id)
+            
             logger.info(
                 f"Extracted {len(extraction_result['text'])} chars from "
                 f"document {document_id} in {duration_ms}ms"
@@ -320,89 +342,21 @@ class DocumentProcessor:
             raise UnsupportedFileError(f"Extraction not implemented for type: {file_type}")
     
     async def _extract_pdf(self, file_path: str) -> Dict[str, Any]:
-        """Extrae texto de un PDF."""
+        """Extrae texto de un PDF (en el pool de extracción)."""
         extractor = self._get_pdf_extractor()
-        
-        if extractor == 'pdfplumber':
-            import pdfplumber
-            
-            text_parts = []
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-            
-            return {
-                'text': '\n\n'.join(text_parts),
-                'method': 'pdfplumber'
-            }
-        else:
-            import PyPDF2
-            
-            text_parts = []
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text_parts.append(page.extract_text())
-            
-            return {
-                'text': '\n\n'.join(text_parts),
-                'method': 'pypdf2'
-            }
+        return await run_extraction(_read_pdf, file_path, extractor)
     
     async def _extract_docx(self, file_path: str) -> Dict[str, Any]:
-        """Extrae texto de un documento Word."""
+        """Extrae texto de un documento Word (en el pool de extracción)."""
         self._get_docx_extractor()
-        import docx
-        
-        doc = docx.Document(file_path)
-        text_parts = []
-        
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text)
-        
-        # También extraer texto de tablas
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    if cell.text.strip():
-                        row_text.append(cell.text.strip())
-                if row_text:
-                    text_parts.append(' | '.join(row_text))
-        
-        return {
-            'text': '\n\n'.join(text_parts),
-            'method': 'python-docx'
-        }
+        return await run_extraction(_read_docx, file_path)
     
     async def _extract_image(self, file_path: str) -> Dict[str, Any]:
-        """Extrae texto de una imagen usando OCR."""
+        """Extrae texto de una imagen usando OCR (Tesseract en el pool de extracción)."""
         ocr_engine = self._get_ocr_engine()
         
         if ocr_engine == 'tesseract':
-            import pytesseract
-            from PIL import Image
-            
-            image = Image.open(file_path)
-            
-            # Configurar para mejorar OCR de documentos
-            custom_config = r'--oem 3 --psm 6'
-            text = pytesseract.image_to_string(image, config=custom_config)
-            
-            # Obtener confianza
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
-            return {
-                'text': text,
-                'method': 'tesseract',
-                'ocr_confidence': avg_confidence / 100,  # Normalizar a 0-1
-                'ocr_engine': 'tesseract'
-            }
+            return await run_extraction(_ocr_image, file_path)
         else:
             # Fallback a AWS Textract
             return await self._extract_with_textract(file_path)
@@ -415,7 +369,9 @@ class DocumentProcessor:
             client = boto3.client('textract')
             
             with open(file_path, 'rb') as f:
-                response = client.detect_document_text(
+                # Llamada HTTP bloqueante de boto3: fuera del event loop
+                response = await asyncio.to_thread(
+                    client.detect_document_text,
                     Document={'Bytes': f.read()}
                 )
             
@@ -494,3 +450,87 @@ class DocumentProcessor:
             
         finally:
             os.unlink(tmp_path)
+
+
+# Extracción bloqueante: se ejecuta en el pool de procesos (app/core/extraction_pool.py)
+
+def _read_pdf(file_path: str, extractor: str) -> Dict[str, Any]:
+    """Texto de un PDF con pdfplumber o PyPDF2."""
+    if extractor == 'pdfplumber':
+        import pdfplumber
+        
+        text_parts = []
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    text_parts.append(page_text)
+        
+        return {
+            'text': '\n\n'.join(text_parts),
+            'method': 'pdfplumber'
+        }
+    else:
+        import PyPDF2
+        
+        text_parts = []
+        with open(file_path, 'rb') as f:
+            reader = PyPDF2.PdfReader(f)
+            for page in reader.pages:
+                text_parts.append(page.extract_text())
+        
+        return {
+            'text': '\n\n'.join(text_parts),
+            'method': 'pypdf2'
+        }
+
+
+def _read_docx(file_path: str) -> Dict[str, Any]:
+    """Texto de un DOCX con python-docx (párrafos y filas de tablas)."""
+    import docx
+    
+    doc = docx.Document(file_path)
+    text_parts = []
+    
+    for para in doc.paragraphs:
+        if para.text.strip():
+            text_parts.append(para.text)
+    
+    # También extraer texto de tablas
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = []
+            for cell in row.cells:
+                if cell.text.strip():
+                    row_text.append(cell.text.strip())
+            if row_text:
+                text_parts.append(' | '.join(row_text))
+    
+    return {
+        'text': '\n\n'.join(text_parts),
+        'method': 'python-docx'
+    }
+
+
+def _ocr_image(file_path: str) -> Dict[str, Any]:
+    """Texto y confianza media de una imagen con Tesseract."""
+    import pytesseract
+    from PIL import Image
+    
+    image = Image.open(file_path)
+    
+    # Configurar para mejorar OCR de documentos
+    custom_config = r'--oem 3 --psm 6'
+    text = pytesseract.image_to_string(image, config=custom_config)
+    
+    # Obtener confianza
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    
+    return {
+        'text': text,
+        'method': 'tesseract',
+        'ocr_confidence': avg_confidence / 100,  # Normalizar a 0-1
+        'ocr_engine': 'tesseract'
+    }
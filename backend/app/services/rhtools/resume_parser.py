@@ -1,4 +1,5 @@
 """Servicio de parsing de CVs usando IA (OpenAI)."""
+import hashlib
 import json
 import logging
 import re
@@ -10,6 +11,7 @@ import httpx
 from pydantic import ValidationError
 
 from app.core.config import settings
+from app.core.extraction_cache import extraction_cache
 from app.models.rhtools import ResumeParse, Document, DocumentStatus
 
 logger = logging.getLogger(__name__)
@@ -23,21 +25,47 @@ class ResumeParserError(Exception):
 class ResumeParser:
     """Parser de CVs usando OpenAI GPT-4."""
     
+    # Versión del prompt/esquema de salida; junto con el modelo forma la
+    # versión del cache de extracción
+    PROMPT_VERSION = "1"
+    
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY if hasattr(settings, 'OPENAI_API_KEY') else None
         self.model = "gpt-4o-mini"  # Modelo por defecto
         
-    async def parse_resume(self, document_id: str, extracted_text: str) -> Dict[str, Any]:
+    async def parse_resume(
+        self,
+        document_id: str,
+        extracted_text: str,
+        file_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Parsear un CV usando OpenAI.
         
+        El resultado se cachea por hash del archivo (o del texto si no se
+        pasa): re-subir el mismo CV no vuelve a llamar al LLM.
+        
         Args:
             document_id: ID del documento
             extracted_text: Texto extraído del CV
+            file_hash: SHA-256 del archivo original (opcional)
             
         Returns:
             Dict con los datos estructurados del CV
         """
+        version = f"{self.PROMPT_VERSION}:{self.model}"
+        cache_hash = file_hash or hashlib.sha256(extracted_text.encode('utf-8')).hexdigest()
+        cached = await extraction_cache.get("resume", version, cache_hash)
+        if cached is not None:
+            # No se consumieron tokens en esta llamada
+            return {**cached, "tokens_used": 0, "cached": True}
+        
+        result = await self._call_openai(extracted_text)
+        await extraction_cache.set("resume", version, cache_hash, result)
+        return result
+    
+    async def _call_openai(self, extracted_text: str) -> Dict[str, Any]:
+        """Parsea el texto de un CV con la API de OpenAI."""
         if not self.api_key:
             raise ResumeParserError("OpenAI API key not configured")
         
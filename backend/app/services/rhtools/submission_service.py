@@ -8,6 +8,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models.rhtools import Submission, SubmissionStageHistory, PipelineStage
 from app.schemas import SubmissionCreate, SubmissionUpdate, ChangeStageRequest
+from app.services.pipeline_stats import PipelineStatsService
 from app.services.rhtools.pipeline_service import PipelineService
 
 
@@ -17,6 +18,7 @@ class SubmissionService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.pipeline_service = PipelineService(db)
+        self.stats_service = PipelineStatsService(db)
     
     async def get_by_id(self, submission_id: str) -> Optional[Submission]:
         """Obtener submission por ID."""
@@ -119,6 +121,9 @@ class SubmissionService:
         
         self.db.add(submission)
         await self.db.flush()
+        await self.stats_service.record_submission(
+            submission.client_id, submission.job_opening_id, None, submission.status
+        )
         
         # Crear entrada en historial si hay stage inicial
         if current_stage_id:
@@ -148,6 +153,8 @@ class SubmissionService:
         if not submission:
             return None
         
+        old_status = submission.status
+        
         # Actualizar campos
         if data.priority is not None:
             submission.priority = data.priority
@@ -172,6 +179,9 @@ class SubmissionService:
             submission.owner_user_id = data.owner_user_id
         
         submission.updated_at = datetime.utcnow()
+        await self.stats_service.record_submission(
+            submission.client_id, submission.job_opening_id, old_status, submission.status
+        )
         await self.db.flush()
         await self.db.refresh(submission)
         
@@ -235,6 +245,7 @@ class SubmissionService:
         
         # Actualizar submission
         old_stage_id = submission.current_stage_id
+        old_status = submission.status
         submission.current_stage_id = data.stage_id
         submission.updated_at = datetime.utcnow()
         
@@ -252,6 +263,9 @@ class SubmissionService:
                     submission.status = "rejected"
                     submission.rejected_at = datetime.utcnow()
         
+        await self.stats_service.record_submission(
+            submission.client_id, submission.job_opening_id, old_status, submission.status
+        )
         await self.db.flush()
         await self.db.refresh(submission)
         
@@ -298,33 +312,5 @@ class SubmissionService:
         return True, None
     
     async def get_submission_stats(self, client_id: Optional[str] = None) -> Dict[str, Any]:
-        """Obtener estadísticas de submissions."""
-        query = select(Submission)
-        if client_id:
-            query = query.where(Submission.client_id == client_id)
-        
-        # Total
-        total_result = await self.db.execute(
-            select(func.count()).select_from(query.subquery())
-        )
-        total = total_result.scalar()
-        
-        # Por estado
-        status_counts = {}
-        for status in ["active", "on_hold", "withdrawn", "hired", "rejected"]:
-            count_result = await self.db.execute(
-                select(func.count())
-                .select_from(Submission)
-                .where(
-                    and_(
-                        Submission.status == status,
-                        Submission.client_id == client_id if client_id else True
-                    )
-                )
-            )
-            status_counts[status] = count_result.scalar()
-        
-        return {
-            "total": total,
-            "by_status": status_counts,
-        }
+        """Obtener estadísticas de submissions (desde rhtools_submission_stats)."""
+        return await self.stats_service.submission_stats(client_id)
@@ -4,9 +4,12 @@ Scoring Service - Evaluación de compatibilidad candidato-vacante usando IA.
 Este servicio utiliza LLM (OpenAI/Claude) para evaluar la compatibilidad
 entre un CV de candidato y los requisitos de una vacante.
 """
+import hashlib
 import json
 import os
-from typing import Optional, Dict, Any
+import re
+import time
+from typing import Optional, Dict, Any, List, Tuple
 from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,10 +20,26 @@ from app.models.core_ats import (
     HHApplication, HHCandidate, HHRole, HHClient,
     HHCVExtraction, HHDocument, HHAuditLog, ScoringStatus
 )
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.single_flight import get_single_flight
+from app.integrations.llm import FieldCallback, LLMClient
+from app.metrics import track_llm_request
+from app.schemas import LLMConfig
+from app.services.pipeline_stats import ApplicationStatsEntry, PipelineStatsService
+from app.services.prompt_budget import BudgetedText, fit_to_budget, usage_tokens
 
 logger = get_logger(__name__)
 
+SYSTEM_MESSAGE = (
+    "Eres un experto en reclutamiento y selección de talento. Tu tarea es evaluar "
+    "la compatibilidad entre candidatos y vacantes de manera objetiva y profesional. "
+    "Responde únicamente en formato JSON válido."
+)
+
+# Palabras del título de la vacante que no sirven como keyword
+_KEYWORD_STOPWORDS = {"para", "con", "the", "and", "del", "los", "las", "sr", "jr"}
+
 
 class ScoringResult:
     """Resultado de la evaluación de compatibilidad."""
@@ -54,7 +73,8 @@ class ScoringService:
         self,
         application_id: str,
         db: AsyncSession,
-        current_user: Optional[str] = None
+        current_user: Optional[str] = None,
+        on_field: Optional[FieldCallback] = None
     ) -> ScoringResult:
         """
         Evalúa la compatibilidad entre un candidato y una vacante.
@@ -63,6 +83,8 @@ class ScoringService:
             application_id: ID de la aplicación
             db: Sesión de base de datos
             current_user: Usuario que ejecuta la acción
+            on_field: Si se indica, el LLM se llama en streaming y cada campo
+                (score, justification, ...) se notifica apenas se genera
             
         Returns:
             ScoringResult con el score y justificación
@@ -100,13 +122,18 @@ class ScoringService:
                 cv_data=cv_data,
                 role_data=role_data,
                 candidate=candidate,
-                role=role
+                role=role,
+                on_field=on_field
             )
             
             # 5. Guardar el score en la aplicación
+            before = ApplicationStatsEntry.of(application)
             application.overall_score = Decimal(str(scoring_result.score))
             application.scoring_status = ScoringStatus.COMPLETED
             application.scoring_error = None
+            await PipelineStatsService(db).record_application(
+                application.role_id, before, ApplicationStatsEntry.of(application)
+            )
             await db.commit()
             
             # 6. Crear registro de auditoría
@@ -127,6 +154,81 @@ class ScoringService:
             await db.commit()
             raise
     
+    async def prefilter_role_applications(
+        self,
+        role_id: str,
+        db: AsyncSession,
+        required_skills: List[str],
+        min_years_experience: float = 0,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+        include_scored: bool = False
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Rankea las aplicaciones de una vacante sin llamar al LLM.
+        
+        Usa la última extracción de CV de cada candidato (skills y años de
+        experiencia) y el SkillPrefilter vectorizado, de modo que solo las
+        mejores aplicaciones pasan a `score_application`.
+        
+        Args:
+            role_id: ID de la vacante
+            db: Sesión de base de datos
+            required_skills: Skills requeridas por la vacante
+            min_years_experience: Años mínimos requeridos
+            top_k: Máximo de aplicaciones seleccionadas
+                (default: settings.MATCHING_PREFILTER_TOP_K, 0 = todas)
+            min_score: Score mínimo del pre-filtro
+                (default: settings.MATCHING_PREFILTER_MIN_SCORE)
+            include_scored: Incluir aplicaciones que ya tienen score
+            
+        Returns:
+            Tupla (application_ids seleccionados por score, {application_id: score})
+        """
+        from app.core.config import settings
+        from app.services.prefilter import SkillPrefilter, estimate_years
+        
+        query = select(HHApplication.application_id, HHApplication.candidate_id).filter(
+            HHApplication.role_id == role_id
+        )
+        if not include_scored:
+            query = query.filter(HHApplication.overall_score.is_(None))
+        applications = (await db.execute(query)).all()
+        if not applications:
+            return [], {}
+        
+        # Última extracción de CV por candidato, en una sola query
+        result = await db.execute(self._latest_extractions_query(role_id))
+        extractions = {row.candidate_id: row.extracted_json or {} for row in result.all()}
+        
+        skills, years = [], []
+        for application in applications:
+            structured = extractions.get(application.candidate_id, {})
+            skills.append(structured.get("skills") or [])
+            years.append(estimate_years(
+                structured.get("years_experience") or structured.get("experiences")
+            ))
+        
+        prefilter = SkillPrefilter()
+        scores = prefilter.score(skills, years, required_skills, min_years_experience)
+        return prefilter.select(
+            [str(application.application_id) for application in applications],
+            scores,
+            top_k=settings.MATCHING_PREFILTER_TOP_K if top_k is None else top_k,
+            min_score=settings.MATCHING_PREFILTER_MIN_SCORE if min_score is None else min_score
+        )
+    
+    @staticmethod
+    def _latest_extractions_query(role_id: str):
+        """Última extracción de CV (extracted_json) de cada candidato de la vacante."""
+        return (
+            select(HHCVExtraction.candidate_id, HHCVExtraction.extracted_json)
+            .join(HHApplication, HHApplication.candidate_id == HHCVExtraction.candidate_id)
+            .filter(HHApplication.role_id == role_id)
+            .distinct(HHCVExtraction.candidate_id)
+            .order_by(HHCVExtraction.candidate_id, HHCVExtraction.created_at.desc())
+        )
+    
     async def _get_cv_data(
         self,
         candidate_id: str,
@@ -143,12 +245,7 @@ class ScoringService:
         extraction = result.scalar_one_or_none()
         
         if extraction and extraction.extracted_json:
-            return {
-                "raw_text": extraction.raw_text or "",
-                "structured_data": extraction.extracted_json,
-                "extraction_confidence": float(extraction.confidence_score) if extraction.confidence_score else None,
-                "source": "cv_extraction"
-            }
+            return self._extraction_cv_data(extraction)
         
         # Si no hay extracción, buscar en documentos
         result = await db.execute(
@@ -175,6 +272,21 @@ class ScoringService:
         )
         candidate = result.scalar_one()
         
+        return self._basic_cv_data(candidate)
+    
+    @staticmethod
+    def _extraction_cv_data(extraction: HHCVExtraction) -> Dict[str, Any]:
+        """Datos del CV a partir de una extracción."""
+        return {
+            "raw_text": extraction.raw_text or "",
+            "structured_data": extraction.extracted_json,
+            "extraction_confidence": float(extraction.confidence_score) if extraction.confidence_score else None,
+            "source": "cv_extraction"
+        }
+    
+    @staticmethod
+    def _basic_cv_data(candidate: HHCandidate) -> Dict[str, Any]:
+        """Datos básicos del candidato cuando no hay CV extraído."""
         return {
             "full_name": candidate.full_name,
             "email": candidate.email,
@@ -184,13 +296,10 @@ class ScoringService:
             "source": "basic_info"
         }
     
-    async def _get_role_data(
-        self,
-        role: HHRole,
-        db: AsyncSession
-    ) -> Dict[str, Any]:
-        """Obtiene los datos de la vacante."""
-        role_data = {
+    @staticmethod
+    def _base_role_data(role: HHRole) -> Dict[str, Any]:
+        """Datos de la vacante usados en el prompt (sin consultas adicionales)."""
+        return {
             "role_id": str(role.role_id),
             "title": role.role_title,
             "location": role.location,
@@ -198,6 +307,14 @@ class ScoringService:
             "client": role.client.client_name if role.client else None,
             "industry": role.client.industry if role.client else None,
         }
+    
+    async def _get_role_data(
+        self,
+        role: HHRole,
+        db: AsyncSession
+    ) -> Dict[str, Any]:
+        """Obtiene los datos de la vacante."""
+        role_data = self._base_role_data(role)
         
         # Si hay un documento de descripción del rol, intentar obtenerlo
         if role.role_description_doc_id:
@@ -217,68 +334,144 @@ class ScoringService:
         cv_data: Dict[str, Any],
         role_data: Dict[str, Any],
         candidate: HHCandidate,
-        role: HHRole
+        role: HHRole,
+        on_field: Optional[FieldCallback] = None
     ) -> ScoringResult:
         """Evalúa la compatibilidad usando LLM."""
         
-        # Construir el prompt
-        prompt = self._build_scoring_prompt(cv_data, role_data, candidate, role)
+        # Construir el prompt con el CV ajustado al presupuesto de tokens
+        cv_budgeted = self._build_cv_text(cv_data, role_data, role)
+        prompt = self._build_scoring_prompt(cv_budgeted.text, role_data, candidate, role)
         
-        # Llamar a la API de OpenAI
+        # Llamar a la API de OpenAI (una sola llamada por prompt idéntico en vuelo)
         try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=self.openai_api_key)
+            if on_field is not None:
+                # Streaming: cada consumidor necesita su propio stream
+                result = await self._stream_llm(prompt, on_field, tokens_saved=cv_budgeted.tokens_saved)
+            else:
+                flight_key = hashlib.sha256(f"{self.model}:{prompt}".encode()).hexdigest()
+                result = await get_single_flight().do(
+                    flight_key,
+                    lambda: self._call_llm(prompt, tokens_saved=cv_budgeted.tokens_saved)
+                )
             
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un experto en reclutamiento y selección de talento. Tu tarea es evaluar la compatibilidad entre candidatos y vacantes de manera objetiva y profesional. Responde únicamente en formato JSON válido."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000,
-                response_format={"type": "json_object"}
-            )
+            return self._parse_result(result)
+            
+        except Exception as e:
+            # Fallback: evaluación básica si falla la IA
+            return await self._fallback_evaluation(cv_data, role_data, candidate, role, str(e))
+    
+    @staticmethod
+    def _parse_result(result: Dict[str, Any]) -> ScoringResult:
+        """Convierte la respuesta JSON del LLM en ScoringResult."""
+        return ScoringResult(
+            score=float(result.get("score", 0)),
+            justification=result.get("justification", "Sin justificación"),
+            skill_match=result.get("skill_match", {}),
+            experience_match=result.get("experience_match", {}),
+            seniority_match=result.get("seniority_match", {}),
+            industry_match=result.get("industry_match"),
+            recommendations=result.get("recommendations", [])
+        )
+    
+    def _chat_request_body(self, prompt: str) -> Dict[str, Any]:
+        """Parámetros de la chat completion de scoring (también usados en Batch API)."""
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_MESSAGE
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.3,
+            "max_tokens": 2000,
+            "response_format": {"type": "json_object"}
+        }
+    
+    async def _call_llm(self, prompt: str, tokens_saved: int = 0) -> Dict[str, Any]:
+        """Llama a OpenAI y devuelve la respuesta JSON parseada."""
+        import openai
+        client = openai.AsyncOpenAI(api_key=self.openai_api_key)
+        
+        start_time = time.time()
+        response = None
+        success = False
+        try:
+            response = await client.chat.completions.create(**self._chat_request_body(prompt))
             
             # Parsear la respuesta
             content = response.choices[0].message.content
             result = json.loads(content)
-            
-            return ScoringResult(
-                score=float(result.get("score", 0)),
-                justification=result.get("justification", "Sin justificación"),
-                skill_match=result.get("skill_match", {}),
-                experience_match=result.get("experience_match", {}),
-                seniority_match=result.get("seniority_match", {}),
-                industry_match=result.get("industry_match"),
-                recommendations=result.get("recommendations", [])
+            success = True
+            return result
+        finally:
+            tokens_prompt, tokens_completion = usage_tokens(response)
+            track_llm_request(
+                model=self.model,
+                operation="scoring",
+                duration=time.time() - start_time,
+                tokens_prompt=tokens_prompt,
+                tokens_completion=tokens_completion,
+                success=success,
+                tokens_saved=tokens_saved
             )
-            
-        except Exception as e:
-            # Fallback: evaluación básica si falla la IA
-            return await self._fallback_evaluation(cv_data, role_data, candidate, role, str(e))
     
-    def _build_scoring_prompt(
+    async def _stream_llm(
+        self,
+        prompt: str,
+        on_field: FieldCallback,
+        tokens_saved: int = 0
+    ) -> Dict[str, Any]:
+        """Como _call_llm, pero en streaming notificando cada campo del JSON."""
+        client = LLMClient(LLMConfig(
+            provider=LLMClient.PROVIDER_OPENAI,
+            api_key=self.openai_api_key,
+            model=self.model,
+            temperature=0.3,
+            max_tokens=2000
+        ))
+        
+        start_time = time.time()
+        streamed = None
+        success = False
+        try:
+            await client.initialize()
+            streamed = await client.stream_json(prompt, on_field, system=SYSTEM_MESSAGE)
+            success = True
+            return streamed.data
+        finally:
+            await client.close()
+            track_llm_request(
+                model=self.model,
+                operation="scoring",
+                duration=time.time() - start_time,
+                tokens_prompt=streamed.tokens_prompt if streamed else 0,
+                tokens_completion=streamed.tokens_completion if streamed else 0,
+                success=success,
+                tokens_saved=tokens_saved
+            )
+    
+    def _build_cv_text(
         self,
         cv_data: Dict[str, Any],
         role_data: Dict[str, Any],
-        candidate: HHCandidate,
         role: HHRole
-    ) -> str:
-        """Construye el prompt para la evaluación de IA."""
+    ) -> BudgetedText:
+        """Construye el texto del CV para el prompt, ajustado a SCORING_CV_TOKEN_BUDGET.
         
-        # Extraer información del CV
+        El título de la vacante y la industria se usan como keywords para
+        conservar las líneas relevantes del CV al recortar.
+        """
         cv_text = ""
         structured = cv_data.get("structured_data", {})
         
         if cv_data.get("raw_text"):
-            cv_text = cv_data["raw_text"][:3000]  # Limitar a 3000 chars
+            cv_text = cv_data["raw_text"]
         elif structured:
             # Construir texto desde datos estructurados
             cv_parts = []
@@ -310,6 +503,21 @@ class ScoringService:
             
             cv_text = "\n".join(cv_parts)
         
+        keywords = [
+            term for term in re.findall(r"\w{3,}", f"{role.role_title or ''} {role_data.get('industry') or ''}")
+            if term.lower() not in _KEYWORD_STOPWORDS
+        ]
+        return fit_to_budget(cv_text, settings.SCORING_CV_TOKEN_BUDGET, keywords=keywords)
+    
+    def _build_scoring_prompt(
+        self,
+        cv_text: str,
+        role_data: Dict[str, Any],
+        candidate: HHCandidate,
+        role: HHRole
+    ) -> str:
+        """Construye el prompt para la evaluación de IA."""
+        
         # Información básica del candidato
         candidate_info = f"""
 CANDIDATO:
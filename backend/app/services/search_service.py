@@ -0,0 +1,113 @@
+"""
+Búsqueda unificada de candidatos, vacantes y ofertas.
+
+Una sola sentencia (UNION ALL de un SELECT por tipo) sobre las columnas
+search_text con índice GIN pg_trgm (ver app/core/search.py). Cada rama
+filtra por "contiene todos los términos" o por similitud de palabras
+(tolera errores de tipeo), trae sus mejores N por word_similarity y el
+resultado final se ordena por esa relevancia.
+"""
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import String, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.search import fuzzy_matches, matches, rank, search_terms
+from app.models.core_ats import HHCandidate, HHRole
+from app.models.job import JobOpening
+from app.schemas.core_ats import SearchResultItem
+
+# Resultados máximos por búsqueda
+DEFAULT_SEARCH_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    """Entidad buscable: su columna search_text y qué mostrar del resultado."""
+    model: Any
+    id: Any
+    title: Any
+    subtitle: Any
+
+
+SEARCH_TARGETS = {
+    "candidate": SearchTarget(HHCandidate, HHCandidate.candidate_id, HHCandidate.full_name, HHCandidate.location),
+    "role": SearchTarget(HHRole, HHRole.role_id, HHRole.role_title, HHRole.location),
+    "job": SearchTarget(JobOpening, JobOpening.id, JobOpening.title, JobOpening.department),
+}
+
+
+class SearchService:
+    """Búsqueda rankeada sobre los índices trigram."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def search_query(
+        self,
+        query: str,
+        types: Optional[Iterable[str]] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT
+    ):
+        """Construye el UNION ALL de la búsqueda.
+
+        Args:
+            query: Texto a buscar
+            types: Tipos a incluir (claves de SEARCH_TARGETS); todos si es None
+            limit: Resultados máximos (también por tipo)
+        """
+        branches = []
+        for name in types or SEARCH_TARGETS:
+            target = SEARCH_TARGETS[name]
+            search_text = target.model.search_text
+            score = rank(search_text, query)
+            branches.append(
+                select(
+                    literal(name, String).label("type"),
+                    target.id.label("id"),
+                    target.title.label("title"),
+                    target.subtitle.label("subtitle"),
+                    score.label("score"),
+                )
+                .where(or_(matches(search_text, query), fuzzy_matches(search_text, query)))
+                .order_by(score.desc(), target.id)
+                .limit(limit)
+            )
+
+        results = union_all(*branches).subquery("results")
+        return (
+            select(results)
+            .order_by(results.c.score.desc(), results.c.type, results.c.id)
+            .limit(limit)
+        )
+
+    async def search(
+        self,
+        query: str,
+        types: Optional[Iterable[str]] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[SearchResultItem]:
+        """Busca en las entidades indicadas y devuelve resultados rankeados.
+
+        Raises:
+            ValueError: Si algún tipo no es buscable
+        """
+        types = list(types) if types else None
+        unknown = set(types or ()) - set(SEARCH_TARGETS)
+        if unknown:
+            raise ValueError(f"Tipos de búsqueda inválidos: {', '.join(sorted(unknown))}")
+        if not search_terms(query):
+            return []
+
+        result = await self.db.execute(self.search_query(query, types, limit))
+        return [
+            SearchResultItem(
+                type=row.type,
+                id=row.id,
+                title=row.title,
+                subtitle=row.subtitle,
+                score=min(float(row.score or 0), 1.0),
+            )
+            for row in result.all()
+        ]
@@ -18,7 +18,7 @@ from celery import chain, group
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import cache
+from app.core.cache import cache, invalidate_candidate_cache
 from app.core.database import async_session_maker
 from app.integrations import (
     BaseConnector,
@@ -27,8 +27,10 @@ from app.integrations import (
     LinkedInConnector,
     SyncResult,
 )
+from app.integrations.delta import DeltaEngine
 from app.models import Candidate, JobOpening, Configuration
 from app.schemas import ZohoConfig, OdooConfig
+from app.services.embedding_index import refresh_embeddings, remove_embeddings
 from app.tasks import celery_app
 
 logger = logging.getLogger(__name__)
@@ -292,6 +294,10 @@ class DuplicateDetector:
             dup.duplicate_of_id = primary.id
         
         await self.db.commit()
+        # Los duplicados dejan de sugerirse; el primario pudo heredar skills
+        await remove_embeddings(candidate_ids=[dup.id for dup in duplicates])
+        await refresh_embeddings(self.db, candidate_id=primary.id)
+        await invalidate_candidate_cache()
         return primary
 
 
@@ -301,6 +307,11 @@ class SyncService:
     # Alertar si fallan N sincronizaciones seguidas
     FAILURE_THRESHOLD = 3
     
+    # Con huellas (app/integrations/delta.py), re-leer registros ya
+    # sincronizados cuesta poco: la ventana incremental se amplía para
+    # cubrir el desfase de reloj con el origen
+    DELTA_OVERLAP = timedelta(minutes=10)
+    
     def __init__(self):
         self._connectors: Dict[SyncSource, Type[BaseConnector]] = {
             SyncSource.ZOHO: ZohoRecruitConnector,
@@ -314,16 +325,22 @@ class SyncService:
         full_sync: bool = False,
         sync_jobs: bool = True,
         sync_candidates: bool = True,
-        job_opening_id: Optional[str] = None
+        job_opening_id: Optional[str] = None,
+        detect_deletes: bool = True
     ) -> SyncResult:
         """Sincronizar desde una fuente externa.
         
+        En Zoho y Odoo los registros cuya huella no cambió se saltan, así
+        que una full_sync sólo escribe lo que cambió.
+        
         Args:
             source: Fuente de sincronización
             full_sync: Si True, sincroniza todo
             sync_jobs: Sincronizar puestos
             sync_candidates: Sincronizar candidatos
             job_opening_id: ID específico de job (opcional)
+            detect_deletes: Marcar como borrados los registros que ya no
+                existen en el origen (diff de IDs contra las huellas)
             
         Returns:
             Resultado de la sincronización
@@ -342,34 +359,72 @@ class SyncService:
                 )
             
             async with connector:
+                # Huellas por entidad (sólo conectores con claves de upsert)
+                deltas = await self._load_deltas(connector, db)
+                
                 # Calcular fecha de última sincronización
                 modified_since = None
                 if not full_sync:
                     modified_since = await self._get_last_sync_time(source)
+                    if modified_since and deltas:
+                        modified_since -= self.DELTA_OVERLAP
+                
+                # Zoho guarda un checkpoint por página: una sync interrumpida
+                # se reanuda desde la última página escrita
+                resumable = source == SyncSource.ZOHO
                 
                 try:
                     if sync_jobs:
+                        job_kwargs = {}
+                        if resumable:
+                            job_kwargs["checkpoint"] = self._checkpoint(source, "jobs")
+                        if "jobs" in deltas:
+                            job_kwargs["delta"] = deltas["jobs"]
                         job_result = await connector.sync_jobs(
-                            modified_since=modified_since,
-                            full_sync=full_sync
+                            modified_since=await self._resume_from(source, "jobs", modified_since, resumable),
+                            full_sync=full_sync,
+                            **job_kwargs
                         )
                         result = result.merge(job_result)
                     
                     if sync_candidates:
+                        candidate_kwargs = {}
+                        if resumable:
+                            candidate_kwargs["checkpoint"] = self._checkpoint(source, "candidates")
+                        if "candidates" in deltas:
+                            candidate_kwargs["delta"] = deltas["candidates"]
+                        if job_opening_id:
+                            candidate_kwargs["job_opening_id"] = job_opening_id
                         candidate_result = await connector.sync_candidates(
-                            modified_since=modified_since,
+                            modified_since=await self._resume_from(source, "candidates", modified_since, resumable),
                             full_sync=full_sync,
-                            job_opening_id=job_opening_id
+                            **candidate_kwargs
                         )
                         result = result.merge(candidate_result)
                     
+                    # Borrados remotos: sólo tras una sync completa sin errores
+                    if detect_deletes and result.success:
+                        synced = {"jobs": sync_jobs, "candidates": sync_candidates}
+                        for entity, delta in deltas.items():
+                            if synced[entity]:
+                                result = result.merge(await self._sync_deletes(
+                                    connector, db, delta,
+                                    listed=full_sync and not (entity == "candidates" and job_opening_id)
+                                ))
+                    
                     # Detectar y resolver duplicados
                     if result.items_created > 0:
                         await self._resolve_duplicates(db)
                     
+                    # Totales cacheados del listado de candidatos
+                    if sync_candidates:
+                        await invalidate_candidate_cache()
+                    
                     # Guardar timestamp de sincronización exitosa
                     if result.success:
                         await self._set_last_sync_time(source, start_time)
+                        if resumable:
+                            await self._clear_checkpoints(source)
                     
                 except Exception as e:
                     logger.error(f"Sync from {source.value} failed: {e}")
@@ -398,7 +453,8 @@ class SyncService:
         if source == SyncSource.ZOHO:
             config = await config_service.get_zoho_config()
             if config:
-                return ZohoRecruitConnector(db, config)
+                # Sesión propia por página para escribir páginas en paralelo
+                return ZohoRecruitConnector(db, config, session_factory=async_session_maker)
         
         elif source == SyncSource.ODOO:
             config = await config_service.get_odoo_config()
@@ -420,6 +476,32 @@ class SyncService:
         
         return None
     
+    async def _load_deltas(self, connector: BaseConnector, db: AsyncSession) -> Dict[str, DeltaEngine]:
+        """Huellas conocidas por entidad para los conectores que las soportan."""
+        keys = getattr(connector, "SYNC_KEYS", None) or {}
+        return {
+            entity: await DeltaEngine(entity, key).load(db)
+            for entity, key in keys.items()
+        }
+    
+    async def _sync_deletes(
+        self,
+        connector: BaseConnector,
+        db: AsyncSession,
+        delta: DeltaEngine,
+        listed: bool
+    ) -> SyncResult:
+        """Aplicar borrados remotos de una entidad.
+        
+        Args:
+            listed: La sync recorrió la entidad completa, así que los IDs
+                vistos bastan; si no, se listan sólo los IDs del origen
+        """
+        if not delta.known:
+            return SyncResult(success=True)
+        remote_ids = None if listed else await connector.list_remote_ids(delta.entity)
+        return await delta.apply_deletes(db, remote_ids)
+    
     async def _resolve_duplicates(self, db: AsyncSession):
         """Detectar y resolver duplicados después de sync."""
         detector = DuplicateDetector(db)
@@ -429,18 +511,66 @@ class SyncService:
             await detector.merge_candidates(primary, dups)
             logger.info(f"Merged {len(dups)} duplicates into candidate {primary.id}")
     
-    async def _get_last_sync_time(self, source: SyncSource) -> Optional[datetime]:
-        """Obtener timestamp de última sincronización exitosa."""
+    def _last_sync_key(self, source: SyncSource, entity: Optional[str] = None) -> str:
         cache_key = f"sync:last:{source.value}"
-        cached = await cache.get(cache_key)
+        return f"{cache_key}:{entity}" if entity else cache_key
+    
+    async def _get_last_sync_time(
+        self,
+        source: SyncSource,
+        entity: Optional[str] = None
+    ) -> Optional[datetime]:
+        """Obtener timestamp de última sincronización exitosa.
+        
+        Con entity ("jobs", "candidates"), el checkpoint por página de una
+        sync en curso o interrumpida.
+        """
+        cached = await cache.get(self._last_sync_key(source, entity))
         if cached:
             return datetime.fromisoformat(cached)
         return None
     
-    async def _set_last_sync_time(self, source: SyncSource, sync_time: datetime):
+    async def _set_last_sync_time(
+        self,
+        source: SyncSource,
+        sync_time: datetime,
+        entity: Optional[str] = None
+    ):
         """Guardar timestamp de sincronización."""
-        cache_key = f"sync:last:{source.value}"
-        await cache.set(cache_key, sync_time.isoformat(), ttl=86400 * 30)  # 30 días
+        await cache.set(
+            self._last_sync_key(source, entity),
+            sync_time.isoformat(),
+            ttl=86400 * 30  # 30 días
+        )
+    
+    def _checkpoint(self, source: SyncSource, entity: str):
+        """Callback de checkpoint por página para el conector."""
+        async def save(sync_time: datetime):
+            await self._set_last_sync_time(source, sync_time, entity)
+        return save
+    
+    async def _resume_from(
+        self,
+        source: SyncSource,
+        entity: str,
+        modified_since: Optional[datetime],
+        resumable: bool
+    ) -> Optional[datetime]:
+        """modified_since para una entidad: el checkpoint si quedó más adelante.
+        
+        Una full_sync ignora modified_since, así que siempre empieza de cero.
+        """
+        if not resumable:
+            return modified_since
+        checkpoint = await self._get_last_sync_time(source, entity)
+        if checkpoint and (modified_since is None or checkpoint > modified_since):
+            return checkpoint
+        return modified_since
+    
+    async def _clear_checkpoints(self, source: SyncSource):
+        """Descartar checkpoints por página tras una sync completa."""
+        for entity in ("jobs", "candidates"):
+            await cache.delete(self._last_sync_key(source, entity))
     
     async def _record_sync_failure(self, source: SyncSource, error: str):
         """Registrar fallo de sincronización."""
@@ -489,6 +619,8 @@ class SyncService:
             "items_processed": result.items_processed,
             "items_created": result.items_created,
             "items_updated": result.items_updated,
+            "items_unchanged": result.items_unchanged,
+            "items_deleted": result.items_deleted,
             "items_failed": result.items_failed,
             "errors": result.errors,
             "warnings": result.warnings,
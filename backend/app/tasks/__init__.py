@@ -1,5 +1,6 @@
 """Celery configuration and tasks."""
 from celery import Celery
+from celery.schedules import crontab
 from celery.signals import task_failure
 import logging
 
@@ -16,6 +17,7 @@ celery_app = Celery(
         "app.tasks.notifications",
         "app.tasks.sync",
         "app.tasks.rhtools",
+        "app.tasks.stats",
     ],
 )
 
@@ -39,8 +41,22 @@ celery_app.conf.task_routes = {
     "app.tasks.notifications.*": {"queue": "notifications"},
     "app.tasks.sync.*": {"queue": "sync"},
     "app.tasks.rhtools.*": {"queue": "cv_processing"},
+    "app.tasks.stats.*": {"queue": "sync"},
 }
 
+# Tareas periódicas (celery beat)
+celery_app.conf.beat_schedule = {}
+if settings.BATCH_SCORING_ENABLED:
+    celery_app.conf.beat_schedule["nightly-batch-scoring"] = {
+        "task": "app.tasks.evaluation.submit_batch_scoring",
+        "schedule": crontab(hour=settings.BATCH_SCORING_HOUR_UTC, minute=0),
+    }
+if settings.PIPELINE_STATS_RECONCILE_MINUTES > 0:
+    celery_app.conf.beat_schedule["reconcile-pipeline-stats"] = {
+        "task": "app.tasks.stats.reconcile_pipeline_stats",
+        "schedule": settings.PIPELINE_STATS_RECONCILE_MINUTES * 60,
+    }
+
 # Retry configuration
 celery_app.conf.task_default_retry_delay = 60  # 1 minute
 celery_app.conf.task_max_retries = 3
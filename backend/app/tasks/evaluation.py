@@ -14,3 +14,80 @@ def evaluate_candidate(self, candidate_id: str, job_id: str):
         return {"status": "completed", "candidate_id": candidate_id}
     except Exception as exc:
         self.retry(exc=exc, countdown=60)
+
+
+@celery_app.task
+def submit_batch_scoring(role_ids: list = None):
+    """Envía el re-scoring de las aplicaciones abiertas como un batch job.
+
+    Programada cada noche (ver beat_schedule); encola poll_batch_scoring
+    para escribir los resultados cuando el proveedor termine.
+
+    Args:
+        role_ids: Limitar a estas vacantes (default: todas las abiertas)
+    """
+    import asyncio
+
+    from app.core.config import settings
+    from app.core.database import async_session_maker
+
+    async def _submit():
+        from app.services.batch_scoring import BatchScoringService
+
+        service = BatchScoringService()
+        try:
+            async with async_session_maker() as db:
+                job, application_ids = await service.submit(db, role_ids=role_ids)
+        finally:
+            await service.provider.close()
+
+        if job is None:
+            return {"status": "nothing_to_score"}
+
+        poll_batch_scoring.apply_async(
+            (job.batch_id, application_ids),
+            countdown=settings.BATCH_SCORING_POLL_INTERVAL
+        )
+        return {
+            "status": "submitted",
+            "batch_id": job.batch_id,
+            "applications": len(application_ids)
+        }
+
+    return asyncio.run(_submit())
+
+
+@celery_app.task(bind=True, max_retries=None)
+def poll_batch_scoring(self, batch_id: str, application_ids: list):
+    """Consulta un batch de scoring y, al terminar, escribe los resultados en bloque.
+
+    Args:
+        batch_id: ID del batch en el proveedor
+        application_ids: Aplicaciones incluidas en el batch
+    """
+    import asyncio
+
+    from app.core.config import settings
+    from app.core.database import async_session_maker
+    from app.tasks.stats import reconcile_pipeline_stats
+
+    async def _poll():
+        from app.services.batch_scoring import BatchScoringService
+
+        service = BatchScoringService()
+        try:
+            job = await service.provider.get(batch_id)
+            if not job.finished:
+                return None
+            async with async_session_maker() as db:
+                counts = await service.apply_results(db, job, application_ids)
+            # Los scores se escribieron en bloque, sin deltas de estadísticas
+            reconcile_pipeline_stats.delay()
+            return {"status": job.status, "batch_id": batch_id, **counts}
+        finally:
+            await service.provider.close()
+
+    result = asyncio.run(_poll())
+    if result is None:
+        raise self.retry(countdown=settings.BATCH_SCORING_POLL_INTERVAL)
+    return result
@@ -259,6 +259,29 @@ def cleanup_old_extractions(days: int = 30):
     return asyncio.run(_cleanup())
 
 
+@celery_app.task
+def rebuild_embedding_index(batch_size: int = 500):
+    """Reconstruye el índice vectorial de candidatos y jobs desde la BD.
+
+    Las actualizaciones normales son incrementales (al procesar documentos o
+    editar jobs); esta tarea es para el arranque inicial o tras cambiar
+    EMBEDDING_INDEX_DIM.
+
+    Args:
+        batch_size: Items indexados por query
+    """
+    import asyncio
+
+    async def _rebuild():
+        from app.services.embedding_index import EmbeddingIndexService
+
+        async with async_session_maker() as db:
+            counts = await EmbeddingIndexService(db).rebuild(batch_size=batch_size)
+            return {"status": "completed", **counts}
+
+    return asyncio.run(_rebuild())
+
+
 # Crear cadena de tareas para procesamiento completo
 def create_document_processing_chain(document_id: str):
     """Crea una cadena de tareas para procesar un documento completo.
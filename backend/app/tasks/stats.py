@@ -0,0 +1,25 @@
+"""Tareas de mantenimiento de estadísticas precalculadas."""
+from app.tasks import celery_app
+
+
+@celery_app.task(bind=True, max_retries=3)
+def reconcile_pipeline_stats(self):
+    """Recalcula hh_role_stage_stats y rhtools_submission_stats desde cero.
+
+    Programada cada PIPELINE_STATS_RECONCILE_MINUTES (ver beat_schedule);
+    corrige la deriva de escrituras que no aplican deltas incrementales.
+    """
+    import asyncio
+
+    from app.core.database import async_session_maker
+
+    async def _reconcile():
+        from app.services.pipeline_stats import PipelineStatsService
+
+        async with async_session_maker() as db:
+            return await PipelineStatsService(db).reconcile()
+
+    try:
+        return {"status": "completed", "rows": asyncio.run(_reconcile())}
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=60)
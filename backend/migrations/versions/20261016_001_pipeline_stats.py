@@ -0,0 +1,101 @@
+"""
+Pipeline Stats Migration
+Revision ID: 20261016_001_pipeline_stats
+Revises: 20260217_1520_cv_extractions_table
+Create Date: 2026-10-16 09:00:00
+
+Tablas de estadísticas precalculadas para dashboards:
+
+- hh_role_stage_stats: agregados por vacante y etapa (conteo, contratados,
+  suma/conteo de scores y días de contratación), con client_id para las
+  métricas por cliente.
+- rhtools_submission_stats: conteo de submissions por cliente, posición y
+  estado.
+
+Se pueblan desde los datos existentes; luego las mantiene
+PipelineStatsService (incremental + reconciliación periódica).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_001_pipeline_stats'
+down_revision = '20260217_1520_cv_extractions_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # =============================================================================
+    # TABLA: HH_ROLE_STAGE_STATS
+    # =============================================================================
+    op.create_table(
+        'hh_role_stage_stats',
+        sa.Column('role_id', sa.UUID(), nullable=False),
+        sa.Column('stage', postgresql.ENUM(name='applicationstage', create_type=False), nullable=False),
+        sa.Column('client_id', sa.UUID(), nullable=False),
+        sa.Column('application_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('hired_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('score_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('hire_days_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('hire_days_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('role_id', 'stage'),
+        sa.ForeignKeyConstraint(['role_id'], ['hh_roles.role_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['client_id'], ['hh_clients.client_id'], ondelete='CASCADE'),
+    )
+    op.create_index('idx_hh_role_stage_stats_client', 'hh_role_stage_stats', ['client_id'])
+
+    # =============================================================================
+    # TABLA: RHTOOLS_SUBMISSION_STATS
+    # =============================================================================
+    op.create_table(
+        'rhtools_submission_stats',
+        sa.Column('client_id', sa.UUID(), nullable=False),
+        sa.Column('job_opening_id', sa.UUID(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('submission_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('client_id', 'job_opening_id', 'status'),
+        sa.ForeignKeyConstraint(['client_id'], ['rhtools_clients.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['job_opening_id'], ['job_openings.id'], ondelete='CASCADE'),
+    )
+    op.create_index('idx_rhtools_submission_stats_client', 'rhtools_submission_stats', ['client_id'])
+
+    # =============================================================================
+    # CARGA INICIAL
+    # =============================================================================
+    op.execute("""
+        INSERT INTO hh_role_stage_stats (
+            role_id, stage, client_id, application_count, hired_count,
+            score_sum, score_count, hire_days_sum, hire_days_count
+        )
+        SELECT
+            a.role_id, a.stage, r.client_id,
+            count(*),
+            count(*) FILTER (WHERE a.hired),
+            coalesce(sum(a.overall_score), 0),
+            count(a.overall_score),
+            coalesce(sum(a.decision_date - a.created_at::date) FILTER (
+                WHERE a.hired AND a.decision_date >= a.created_at::date
+            ), 0),
+            count(*) FILTER (WHERE a.hired AND a.decision_date >= a.created_at::date)
+        FROM hh_applications a
+        JOIN hh_roles r ON r.role_id = a.role_id
+        GROUP BY a.role_id, a.stage, r.client_id
+    """)
+    op.execute("""
+        INSERT INTO rhtools_submission_stats (client_id, job_opening_id, status, submission_count)
+        SELECT client_id, job_opening_id, coalesce(status, 'active'), count(*)
+        FROM rhtools_submissions
+        GROUP BY client_id, job_opening_id, coalesce(status, 'active')
+    """)
+
+
+def downgrade():
+    op.drop_index('idx_rhtools_submission_stats_client', table_name='rhtools_submission_stats')
+    op.drop_table('rhtools_submission_stats')
+    op.drop_index('idx_hh_role_stage_stats_client', table_name='hh_role_stage_stats')
+    op.drop_table('hh_role_stage_stats')
@@ -0,0 +1,64 @@
+"""
+Keyset Pagination Indexes Migration
+Revision ID: 20261016_002_keyset_indexes
+Revises: 20261016_001_pipeline_stats
+Create Date: 2026-10-16 12:00:00
+
+Índices compuestos (clave de orden, pk) para la paginación por cursor
+(app/core/pagination.py). Los índices de una sola columna de fecha se
+reemplazan por su versión con la pk, que sirve igual a las queries que solo
+filtran por fecha.
+
+- hh_applications: (created_at, application_id) y
+  (role_id, overall_score DESC NULLS LAST, application_id DESC) para el
+  listado por vacante ordenado por score.
+- hh_candidates, candidates, job_openings, communications, hh_audit_log:
+  (created_at | changed_at, pk).
+- candidates.created_at y job_openings.created_at pasan a NOT NULL (los NULL
+  se rellenan con updated_at o now()): con una clave nullable el orden
+  necesitaría NULLS LAST y un OR que el índice (created_at, pk) no resuelve.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261016_002_keyset_indexes'
+down_revision = '20261016_001_pipeline_stats'
+branch_labels = None
+depends_on = None
+
+
+# (índice, tabla, columnas nuevas, columnas previas o None si el índice es nuevo)
+KEYSET_INDEXES = [
+    ('idx_hh_applications_created', 'hh_applications', 'created_at, application_id', None),
+    ('idx_hh_applications_role_score', 'hh_applications',
+     'role_id, overall_score DESC NULLS LAST, application_id DESC', None),
+    ('idx_hh_candidates_created', 'hh_candidates', 'created_at, candidate_id', 'created_at'),
+    ('idx_candidates_created_at', 'candidates', 'created_at, id', 'created_at'),
+    ('idx_job_openings_created', 'job_openings', 'created_at, id', None),
+    ('idx_communications_created', 'communications', 'created_at, communication_id', 'created_at'),
+    ('idx_hh_audit_changed_at', 'hh_audit_log', 'changed_at, audit_id', 'changed_at'),
+]
+
+
+# Tablas cuya fecha de alta era nullable
+NOT_NULL_CREATED_AT = ['candidates', 'job_openings']
+
+
+def upgrade():
+    for table in NOT_NULL_CREATED_AT:
+        op.execute(f"UPDATE {table} SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL")
+        op.alter_column(table, 'created_at', nullable=False)
+
+    for name, table, columns, _ in KEYSET_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def downgrade():
+    for name, table, _, previous in reversed(KEYSET_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        if previous:
+            op.execute(f"CREATE INDEX {name} ON {table} ({previous})")
+
+    for table in NOT_NULL_CREATED_AT:
+        op.alter_column(table, 'created_at', nullable=True)
@@ -0,0 +1,59 @@
+"""
+Search Text Migration
+Revision ID: 20261016_003_search_text
+Revises: 20261016_002_keyset_indexes
+Create Date: 2026-10-16 15:00:00
+
+Columna search_text (texto normalizado, sin PII cifrada) con índice GIN
+pg_trgm en las entidades buscables:
+
+- hh_candidates: full_name, location
+- hh_roles: role_title, location, seniority
+- job_openings: title, department, location
+- candidates: full_name
+
+Se puebla con lower(unaccent(...)), equivalente a normalize_search_text
+(app/core/search.py), que la mantiene luego desde el ORM.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_003_search_text'
+down_revision = '20261016_002_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (tabla, índice, columnas fuente)
+SEARCH_TABLES = [
+    ('hh_candidates', 'idx_hh_candidates_search', ['full_name', 'location']),
+    ('hh_roles', 'idx_hh_roles_search', ['role_title', 'location', 'seniority']),
+    ('job_openings', 'idx_job_openings_search', ['title', 'department', 'location']),
+    ('candidates', 'idx_candidates_search', ['full_name']),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    for table, index, columns in SEARCH_TABLES:
+        op.add_column(table, sa.Column('search_text', sa.Text(), nullable=True))
+        op.execute(f"""
+            UPDATE {table}
+            SET search_text = nullif(trim(
+                regexp_replace(lower(unaccent(concat_ws(' ', {', '.join(columns)}))), '\\s+', ' ', 'g')
+            ), '')
+        """)
+        op.create_index(
+            index, table, ['search_text'],
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    for table, index, _ in reversed(SEARCH_TABLES):
+        op.drop_index(index, table_name=table)
+        op.drop_column(table, 'search_text')
@@ -0,0 +1,134 @@
+"""
+Blind Index Migration
+Revision ID: 20261016_004_blind_index
+Revises: 20261016_003_search_text
+Create Date: 2026-10-16 16:00:00
+
+Blind index (HMAC-SHA256) de las columnas cifradas buscables de
+hh_candidates (ver app/core/blind_index.py):
+
+- national_id_bidx: único (reemplaza la restricción sobre el texto cifrado,
+  inútil con Fernet aleatorizado)
+- email_bidx + email_bidx_prefixes (GIN, búsqueda por prefijo)
+- phone_bidx
+
+El backfill descifra en Python con la misma clave y normalización que usa
+el ORM, por lo que debe correr con BLIND_INDEX_KEY/ENCRYPTION_KEY de
+producción configuradas.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_004_blind_index'
+down_revision = '20261016_003_search_text'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _decrypt(value):
+    from app.core.security import encryption_manager
+
+    if value is None:
+        return None
+    try:
+        return encryption_manager.decrypt(value)
+    except Exception:
+        # Valor plano de datos anteriores al cifrado
+        return value
+
+
+def _backfill(bind):
+    from app.core.blind_index import blind_index_values
+    from app.models.core_ats import HHCandidate
+
+    table = sa.table(
+        'hh_candidates',
+        sa.column('candidate_id', postgresql.UUID(as_uuid=True)),
+        sa.column('national_id', sa.Text()),
+        sa.column('email', sa.Text()),
+        sa.column('phone', sa.Text()),
+        sa.column('national_id_bidx', sa.String(64)),
+        sa.column('email_bidx', sa.String(64)),
+        sa.column('email_bidx_prefixes', postgresql.ARRAY(sa.String(64))),
+        sa.column('phone_bidx', sa.String(64)),
+    )
+    update = (
+        table.update()
+        .where(table.c.candidate_id == sa.bindparam('_id'))
+        .values(
+            national_id_bidx=sa.bindparam('national_id_bidx'),
+            email_bidx=sa.bindparam('email_bidx'),
+            email_bidx_prefixes=sa.bindparam('email_bidx_prefixes'),
+            phone_bidx=sa.bindparam('phone_bidx'),
+        )
+    )
+
+    rows = bind.execute(
+        sa.select(table.c.candidate_id, table.c.national_id, table.c.email, table.c.phone)
+    ).fetchall()
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        params = []
+        for row in rows[start:start + BACKFILL_BATCH_SIZE]:
+            values = blind_index_values(HHCandidate, {
+                'national_id': _decrypt(row.national_id),
+                'email': _decrypt(row.email),
+                'phone': _decrypt(row.phone),
+            })
+            params.append({'_id': row.candidate_id, **values})
+        if params:
+            bind.execute(update, params)
+
+
+def upgrade():
+    op.add_column('hh_candidates', sa.Column('national_id_bidx', sa.String(64), nullable=True))
+    op.add_column('hh_candidates', sa.Column('email_bidx', sa.String(64), nullable=True))
+    op.add_column('hh_candidates', sa.Column('email_bidx_prefixes', postgresql.ARRAY(sa.String(64)), nullable=True))
+    op.add_column('hh_candidates', sa.Column('phone_bidx', sa.String(64), nullable=True))
+
+    bind = op.get_bind()
+    _backfill(bind)
+
+    duplicates = bind.execute(sa.text("""
+        SELECT count(*) FROM (
+            SELECT national_id_bidx FROM hh_candidates
+            WHERE national_id_bidx IS NOT NULL
+            GROUP BY national_id_bidx HAVING count(*) > 1
+        ) d
+    """)).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} cédulas repetidas en hh_candidates (tras normalizar); "
+            "fusionar los candidatos duplicados antes de migrar"
+        )
+
+    op.execute("DROP INDEX IF EXISTS idx_hh_candidates_email")
+    op.execute("DROP INDEX IF EXISTS idx_hh_candidates_national_id")
+    op.execute("ALTER TABLE hh_candidates DROP CONSTRAINT IF EXISTS uix_hh_candidates_national_id")
+
+    op.create_unique_constraint('uix_hh_candidates_national_id', 'hh_candidates', ['national_id_bidx'])
+    op.create_index('idx_hh_candidates_email', 'hh_candidates', ['email_bidx'])
+    op.create_index('idx_hh_candidates_phone', 'hh_candidates', ['phone_bidx'])
+    op.create_index(
+        'idx_hh_candidates_email_prefix', 'hh_candidates', ['email_bidx_prefixes'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade():
+    op.drop_index('idx_hh_candidates_email_prefix', table_name='hh_candidates')
+    op.drop_index('idx_hh_candidates_phone', table_name='hh_candidates')
+    op.drop_index('idx_hh_candidates_email', table_name='hh_candidates')
+    op.drop_constraint('uix_hh_candidates_national_id', 'hh_candidates', type_='unique')
+
+    op.create_unique_constraint('uix_hh_candidates_national_id', 'hh_candidates', ['national_id'])
+    op.create_index('idx_hh_candidates_national_id', 'hh_candidates', ['national_id'])
+    op.create_index('idx_hh_candidates_email', 'hh_candidates', ['email'])
+
+    op.drop_column('hh_candidates', 'phone_bidx')
+    op.drop_column('hh_candidates', 'email_bidx_prefixes')
+    op.drop_column('hh_candidates', 'email_bidx')
+    op.drop_column('hh_candidates', 'national_id_bidx')
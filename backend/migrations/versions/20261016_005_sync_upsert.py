@@ -0,0 +1,80 @@
+"""
+Sync Upsert Migration
+Revision ID: 20261016_005_sync_upsert
+Revises: 20261016_004_blind_index
+Create Date: 2026-10-16 17:00:00
+
+Claves del upsert por página de la sincronización Zoho/Odoo
+(app/integrations/upsert.py):
+
+- sync_hash en candidates y job_openings (hash del último registro externo)
+- índices únicos parciales por origen: (zoho_*_id) WHERE source = 'zoho' y
+  (external_id) WHERE source = 'odoo'
+
+Antes de crearlos se corrige `source` de registros ya sincronizados: los
+jobs de Zoho se creaban con source 'manual' y los candidatos de Zoho
+guardaban en source el campo "Source" de Zoho.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_005_sync_upsert'
+down_revision = '20261016_004_blind_index'
+branch_labels = None
+depends_on = None
+
+
+# (tabla, índice, columna, source)
+UPSERT_KEYS = [
+    ('candidates', 'uix_candidates_zoho_id', 'zoho_candidate_id', 'zoho'),
+    ('candidates', 'uix_candidates_odoo_id', 'external_id', 'odoo'),
+    ('job_openings', 'uix_job_openings_zoho_id', 'zoho_job_id', 'zoho'),
+    ('job_openings', 'uix_job_openings_odoo_id', 'external_id', 'odoo'),
+]
+
+
+def upgrade():
+    op.add_column('candidates', sa.Column('sync_hash', sa.String(64), nullable=True))
+    op.add_column('job_openings', sa.Column('sync_hash', sa.String(64), nullable=True))
+
+    # Registros con ID de Zoho que no vienen de Odoo son de Zoho
+    op.execute("""
+        UPDATE candidates SET source = 'zoho'
+        WHERE zoho_candidate_id IS NOT NULL AND source IS DISTINCT FROM 'odoo'
+    """)
+    op.execute("""
+        UPDATE job_openings SET source = 'zoho'
+        WHERE zoho_job_id IS NOT NULL AND source IS DISTINCT FROM 'odoo'
+    """)
+    # Jobs creados aquí y enviados a Odoo (push_job_to_odoo no marcaba source)
+    op.execute("""
+        UPDATE job_openings SET source = 'odoo'
+        WHERE external_id IS NOT NULL AND zoho_job_id IS NULL AND source = 'manual'
+    """)
+
+    bind = op.get_bind()
+    for table, index, column, source in UPSERT_KEYS:
+        duplicates = bind.execute(sa.text(f"""
+            SELECT count(*) FROM (
+                SELECT {column} FROM {table}
+                WHERE source = '{source}' AND {column} IS NOT NULL
+                GROUP BY {column} HAVING count(*) > 1
+            ) d
+        """)).scalar()
+        if duplicates:
+            raise RuntimeError(
+                f"{duplicates} valores de {table}.{column} repetidos con source '{source}'; "
+                "fusionar los registros duplicados antes de migrar"
+            )
+        op.create_index(
+            index, table, [column], unique=True,
+            postgresql_where=sa.text(f"source = '{source}'"),
+        )
+
+
+def downgrade():
+    for table, index, _, _ in reversed(UPSERT_KEYS):
+        op.drop_index(index, table_name=table)
+    op.drop_column('job_openings', 'sync_hash')
+    op.drop_column('candidates', 'sync_hash')
@@ -0,0 +1,38 @@
+"""
+Sync Fingerprints Migration
+Revision ID: 20261016_006_sync_fingerprints
+Revises: 20261016_005_sync_upsert
+Create Date: 2026-10-16 18:00:00
+
+Huellas por registro externo para la sync delta
+(app/integrations/delta.py): una fila por (source, entity, external_id)
+con la fecha de modificación en el origen y el hash de los campos mapeados.
+
+La tabla arranca vacía: la primera sync de cada origen procesa todo y deja
+las huellas; las siguientes sólo escriben lo que cambió.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_006_sync_fingerprints'
+down_revision = '20261016_005_sync_upsert'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_fingerprints',
+        sa.Column('source', sa.String(50), nullable=False),
+        sa.Column('entity', sa.String(50), nullable=False),
+        sa.Column('external_id', sa.String(255), nullable=False),
+        sa.Column('modified_at', sa.DateTime(), nullable=True),
+        sa.Column('content_hash', sa.String(64), nullable=False),
+        sa.Column('synced_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('source', 'entity', 'external_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('sync_fingerprints')
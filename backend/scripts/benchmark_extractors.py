@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los extractores de CVs, assessments y entrevistas.
+
+Mide el tiempo de extracción por documento (sin parseo de PDF/DOCX) sobre
+un corpus de textos: archivos .txt de un directorio o CVs sintéticos.
+
+Uso (desde backend/):
+    python scripts/benchmark_extractors.py
+    python scripts/benchmark_extractors.py --corpus /ruta/a/cvs_txt --repeat 10
+    python scripts/benchmark_extractors.py --synthetic 500 --extractors cv
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.services.extraction.assessment_extractor import AssessmentExtractor  # noqa: E402
+from app.services.extraction.cv_extractor import CVExtractor  # noqa: E402
+from app.services.extraction.interview_extractor import InterviewExtractor  # noqa: E402
+
+NAMES = ["Ana Pérez Gómez", "Juan Carlos Ruiz", "María López Díaz", "Pedro Sánchez Mora", "Laura Torres Vega"]
+TITLES = ["Senior Developer", "Data Engineer", "Tech Lead", "Backend Engineer", "DevOps Engineer", "Analista de Datos"]
+COMPANIES = ["TechCorp", "CloudTech Inc.", "StartupXYZ", "Banco Nacional", "Retail Group", "Consultora Andina"]
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "Java", "Go", "React", "Node.js", "Django", "FastAPI", "AWS",
+    "Docker", "Kubernetes", "Terraform", "CI/CD", "PostgreSQL", "MongoDB", "Redis", "Machine Learning",
+    "SQL", "Excel", "Scrum", "Power BI", "Liderazgo", "Comunicación",
+]
+BULLETS = [
+    "Desarrollo de microservicios y APIs REST para productos internos",
+    "Liderazgo técnico de un equipo de {n} desarrolladores",
+    "Implementación de pipelines de integración y despliegue continuo",
+    "Migración de infraestructura on-premise a la nube",
+    "Reducción de costos operativos en un {n}0% mediante automatización",
+    "Diseño de modelos de datos y reportes para el área comercial",
+]
+DIMENSIONS = ["Egocentrismo", "Volatilidad", "Sicopatía", "Narcisismo", "Openness", "Dominance", "Planeación"]
+INTERVIEW_SENTENCES = [
+    "El candidato mostró liderazgo y buena comunicación con el equipo.",
+    "Mencionó un conflicto con su jefe anterior que se resolvió con diálogo.",
+    "Tiene logros concretos en proyectos de innovación.",
+    "Se observa falta de experiencia en negociación con clientes grandes.",
+    "Describe una situación de trabajo en equipo bajo presión con resultados positivos.",
+    "Hay dudas sobre su disponibilidad para viajar.",
+]
+
+
+def synthetic_cv(rnd: random.Random) -> str:
+    """Genera un CV de texto con las secciones habituales."""
+    lines = [rnd.choice(NAMES).upper(), "", "Email: candidato@example.com", "Teléfono: +52 55 1234 5678",
+             "Ubicación: Ciudad de México", "", "RESUMEN",
+             "Profesional con experiencia en desarrollo de software y análisis de datos.", "",
+             "EXPERIENCIA LABORAL", ""]
+    year = 2024
+    for _ in range(rnd.randint(2, 6)):
+        start = year - rnd.randint(1, 4)
+        lines += [f"{rnd.choice(TITLES)} en {rnd.choice(COMPANIES)}", f"Enero {start} - Diciembre {year}"]
+        lines += [f"- {rnd.choice(BULLETS).format(n=rnd.randint(2, 9))}" for _ in range(rnd.randint(2, 6))]
+        lines.append("")
+        year = start
+    lines += ["EDUCACIÓN", "", "Ingeniería en Sistemas en Universidad Nacional", f"{year - 5} - {year - 1}", ""]
+    lines += ["HABILIDADES", "", ", ".join(rnd.sample(SKILLS, rnd.randint(6, 14))), ""]
+    lines += ["IDIOMAS", "", "Español (nativo), Inglés (avanzado)", ""]
+    lines += ["CERTIFICACIONES", "AWS Certified Solutions Architect", "Scrum Master Certificado", ""]
+    return "\n".join(lines)
+
+
+def synthetic_assessment(rnd: random.Random) -> str:
+    """Genera un reporte de prueba psicométrica."""
+    lines = ["Factor Oscuro de la Personalidad - Reporte Individual", "",
+             f"Candidato: {rnd.choice(NAMES)}", "Fecha: 15/01/2024", "", "Resultados por Dimensión:", ""]
+    lines += [f"{dimension}: {rnd.uniform(10, 90):.1f}" for dimension in DIMENSIONS]
+    lines += ["", f"Sinceridad: {rnd.randint(60, 99)}", "", "Interpretación: Perfil dentro de rangos normales."]
+    return "\n".join(lines)
+
+
+def synthetic_interview(rnd: random.Random) -> str:
+    """Genera notas de una entrevista."""
+    return " ".join(rnd.choice(INTERVIEW_SENTENCES) for _ in range(rnd.randint(10, 40)))
+
+
+def load_corpus(directory: Path) -> List[str]:
+    """Lee los .txt del directorio (recursivo)."""
+    return [
+        path.read_text(encoding="utf-8", errors="ignore")
+        for path in sorted(directory.rglob("*.txt"))
+    ]
+
+
+async def time_extractor(extract: Callable, texts: List[str], repeat: int) -> List[float]:
+    """Milisegundos por documento de cada extracción."""
+    timings = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            await extract(text)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> None:
+    rnd = random.Random(args.seed)
+    corpora: Dict[str, List[str]] = {}
+
+    if args.corpus:
+        texts = load_corpus(Path(args.corpus))
+        if not texts:
+            print(f"❌ No hay archivos .txt en {args.corpus}")
+            sys.exit(1)
+        corpora["cv"] = texts
+    else:
+        corpora["cv"] = [synthetic_cv(rnd) for _ in range(args.synthetic)]
+    corpora["assessment"] = [synthetic_assessment(rnd) for _ in range(args.synthetic)]
+    corpora["interview"] = [synthetic_interview(rnd) for _ in range(args.synthetic)]
+
+    extractors = {
+        "cv": CVExtractor().extract_from_text,
+        "assessment": AssessmentExtractor().extract_from_text,
+        "interview": InterviewExtractor().extract_from_text,
+    }
+
+    print(f"{'extractor':<12} {'docs':>6} {'KB/doc':>8} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'docs/s':>8}")
+    for name in args.extractors:
+        texts = corpora[name]
+        # Calentamiento: compilación de regex y caches de Python
+        await time_extractor(extractors[name], texts[:5], 1)
+        timings = await time_extractor(extractors[name], texts, args.repeat)
+        mean = statistics.mean(timings)
+        size_kb = sum(len(text) for text in texts) / len(texts) / 1024
+        print(
+            f"{name:<12} {len(texts):>6} {size_kb:>8.1f} {mean:>9.3f} "
+            f"{percentile(timings, 50):>8.3f} {percentile(timings, 95):>8.3f} {1000 / mean:>8.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extractores de documentos")
+    parser.add_argument("--corpus", help="Directorio con CVs en .txt (por defecto, CVs sintéticos)")
+    parser.add_argument("--synthetic", type=int, default=200, help="Documentos sintéticos por extractor")
+    parser.add_argument("--repeat", type=int, default=5, help="Pasadas sobre el corpus")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del corpus sintético")
+    parser.add_argument(
+        "--extractors",
+        type=lambda value: value.split(","),
+        default=["cv", "assessment", "interview"],
+        help="Lista separada por comas: cv,assessment,interview"
+    )
+    args = parser.parse_args()
+
+    # Los extractores registran un log por documento
+    logging.disable(logging.INFO)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Tests para el scoring masivo vía Batch API (con el proveedor local)."""
+import json
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.config import settings
+from app.models.core_ats import ApplicationStage, ScoringStatus
+from app.services.batch_scoring import (
+    BatchJob,
+    BatchScoringService,
+    LocalBatchProvider,
+    parse_output_line,
+)
+
+
+def make_application():
+    application = Mock()
+    application.application_id = uuid.uuid4()
+    application.candidate_id = uuid.uuid4()
+    application.candidate = Mock(full_name="Ana", location="Santiago", linkedin_url=None)
+    application.role = Mock(
+        role_id=uuid.uuid4(), role_title="Backend Developer", location="Remoto",
+        seniority="Senior", client=Mock(client_name="Acme", industry="Software"),
+        role_description_doc_id=None,
+    )
+    return application
+
+
+def make_extraction(candidate_id):
+    return Mock(
+        candidate_id=candidate_id,
+        raw_text="Experiencia laboral\nPython y Django en Acme",
+        extracted_json={"skills": [{"name": "Python"}]},
+        confidence_score=0.9,
+    )
+
+
+class TestParseOutputLine:
+    """Tests para el parseo del output JSONL."""
+
+    def test_success(self):
+        item = parse_output_line(json.dumps({
+            "custom_id": "a1",
+            "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"content": '{"score": 80}'}}],
+                "usage": {"prompt_tokens": 900, "completion_tokens": 120},
+            }},
+            "error": None,
+        }))
+
+        assert (item.custom_id, item.content, item.error) == ("a1", '{"score": 80}', None)
+        assert (item.tokens_prompt, item.tokens_completion) == (900, 120)
+
+    def test_errors(self):
+        http_error = parse_output_line(json.dumps({
+            "custom_id": "a2",
+            "response": {"status_code": 400, "body": {"error": {"message": "bad request"}}},
+            "error": None,
+        }))
+        line_error = parse_output_line(json.dumps({
+            "custom_id": "a3", "response": None, "error": {"message": "expired"},
+        }))
+
+        assert http_error.error == "bad request"
+        assert line_error.error == "expired"
+
+
+class TestLocalBatchProvider:
+    """Tests del stand-in local de la Batch API."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        async def handler(body):
+            if "fail" in body["messages"][-1]["content"]:
+                raise RuntimeError("boom")
+            return json.dumps({"score": 77})
+
+        provider = LocalBatchProvider(directory=str(tmp_path), handler=handler)
+        job = await provider.submit([
+            {"custom_id": "ok", "method": "POST", "url": "/v1/chat/completions",
+             "body": {"messages": [{"role": "user", "content": "hola"}]}},
+            {"custom_id": "ko", "method": "POST", "url": "/v1/chat/completions",
+             "body": {"messages": [{"role": "user", "content": "fail"}]}},
+        ])
+        assert job.status == "in_progress"
+
+        job = await provider.get(job.batch_id)
+        assert job.finished
+        assert job.request_counts == {"total": 2, "completed": 1, "failed": 1}
+
+        items = {item.custom_id: item for item in await provider.results(job)}
+        assert json.loads(items["ok"].content) == {"score": 77}
+        assert items["ko"].error == "boom"
+
+
+class TestBatchScoringService:
+    """Tests del envío y la escritura en bloque de resultados."""
+
+    @pytest.mark.asyncio
+    async def test_build_requests_uses_scoring_prompt(self, tmp_path):
+        applications = [make_application(), make_application()]
+        # Misma vacante, con documento de descripción
+        applications[1].role = applications[0].role
+        applications[0].role.role_description_doc_id = uuid.uuid4()
+        extractions = Mock()
+        extractions.scalars.return_value.all.return_value = [
+            make_extraction(applications[0].candidate_id)
+        ]
+        role_doc = Mock()
+        role_doc.scalar_one_or_none.return_value = Mock(original_filename="jd.pdf")
+        db = AsyncMock()
+        db.execute.side_effect = [extractions, role_doc]
+
+        service = BatchScoringService(provider=LocalBatchProvider(directory=str(tmp_path)))
+        service.scoring._build_scoring_prompt = Mock(wraps=service.scoring._build_scoring_prompt)
+        requests, _ = await service.build_requests(db, applications)
+
+        # Una query para las extracciones de todos los candidatos y una por vacante
+        assert db.execute.await_count == 2
+        role_data = service.scoring._build_scoring_prompt.call_args.args[1]
+        assert role_data["description_doc"] == "jd.pdf"
+        assert [r["custom_id"] for r in requests] == [str(a.application_id) for a in applications]
+        assert requests[0]["url"] == "/v1/chat/completions"
+        assert requests[0]["body"]["response_format"] == {"type": "json_object"}
+        assert "Python y Django" in requests[0]["body"]["messages"][-1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_build_requests_caps_cv_to_scoring_budget(self, tmp_path):
+        application = make_application()
+        extraction = make_extraction(application.candidate_id)
+        extraction.raw_text = "\n".join(f"Proyecto {i}: Python, Django y APIs REST" for i in range(500))
+        extractions = Mock()
+        extractions.scalars.return_value.all.return_value = [extraction]
+        db = AsyncMock()
+        db.execute.return_value = extractions
+
+        service = BatchScoringService(provider=LocalBatchProvider(directory=str(tmp_path)))
+        _, tokens_saved = await service.build_requests(db, [application])
+
+        cv_text = service.scoring._build_cv_text(
+            service.scoring._extraction_cv_data(extraction), {}, application.role
+        ).text
+        assert tokens_saved > 0
+        assert settings.SCORING_CV_TOKEN_BUDGET < settings.LLM_CV_TOKEN_BUDGET
+        assert len(cv_text) <= 3000
+
+    @pytest.mark.asyncio
+    async def test_apply_results_in_bulk(self, tmp_path):
+        ok, bad, missing = (str(uuid.uuid4()) for _ in range(3))
+
+        async def handler(body):
+            return "no es json"
+
+        provider = LocalBatchProvider(directory=str(tmp_path), handler=handler)
+        job = await provider.submit([
+            {"custom_id": bad, "method": "POST", "url": "/v1/chat/completions", "body": {"messages": []}},
+        ])
+        # Agregar a mano el resultado válido al output del stand-in
+        job = await provider.get(job.batch_id)
+        with open(tmp_path / job.output_file_id, "a") as f:
+            f.write(json.dumps({
+                "custom_id": ok,
+                "response": {"status_code": 200, "body": {
+                    "choices": [{"message": {"content": json.dumps({"score": 140, "justification": "Top"})}}],
+                }},
+                "error": None,
+            }) + "\n")
+
+        snapshots = Mock()
+        snapshots.all.return_value = [Mock(
+            application_id=uuid.UUID(ok), role_id=uuid.uuid4(), stage=ApplicationStage.TERNA,
+            hired=False, overall_score=None, decision_date=None, created_at=None,
+        )]
+        db = AsyncMock()
+        db.execute.side_effect = [snapshots, Mock(), Mock(), Mock()]
+        db.add_all = Mock()
+        service = BatchScoringService(provider=provider)
+
+        counts = await service.apply_results(db, job, [ok, bad, missing])
+
+        assert counts == {"completed": 1, "failed": 2}
+        # Snapshots previos, delta de stats, un UPDATE executemany por grupo
+        # (completadas / fallidas) y un commit
+        assert db.execute.await_count == 4
+        stats_sql = str(db.execute.await_args_list[1].args[0])
+        assert "hh_role_stage_stats" in stats_sql
+        completed_rows = db.execute.await_args_list[2].args[1]
+        failed_rows = db.execute.await_args_list[3].args[1]
+        assert completed_rows[0]["overall_score"] == 100  # Acotado a 0-100
+        assert completed_rows[0]["scoring_status"] == ScoringStatus.COMPLETED
+        assert {r["scoring_status"] for r in failed_rows} == {ScoringStatus.FAILED}
+        assert "Sin resultado" in failed_rows[1]["scoring_error"]
+        assert len(db.add_all.call_args.args[0]) == 1
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_submit_nothing_to_score(self, tmp_path):
+        service = BatchScoringService(provider=LocalBatchProvider(directory=str(tmp_path)))
+        service.collect_applications = AsyncMock(return_value=[])
+
+        assert await service.submit(AsyncMock()) == (None, [])
+
+    def test_batch_job_finished(self):
+        assert not BatchJob("b", "in_progress").finished
+        assert BatchJob("b", "expired").finished
@@ -120,6 +120,16 @@ class TestCVExtractor:
         assert "Docker" in skills
         assert "PostgreSQL" in skills
     
+    @pytest.mark.asyncio
+    async def test_extract_technical_skills_custom_dictionary(self):
+        """Test diccionario de tecnologías configurable."""
+        extractor = CVExtractor(tech_skills={"k8s": "Kubernetes", "Kubernetes": "Kubernetes", "SAP": "SAP"})
+        
+        skills = extractor._extract_technical_skills("SAP FI, k8s y Kubernetes; Python")
+        
+        assert skills == ["SAP", "Kubernetes"]
+        assert CVExtractor()._extract_technical_skills("JavaScript, C++ y Go") == ["JavaScript", "C++", "Go"]
+    
     @pytest.mark.asyncio
     async def test_extract_from_complete_cv(self, extractor):
         """Test extracción de CV completo."""
@@ -1,9 +1,12 @@
 """Tests para el DocumentParser."""
 import pytest
 import pytest_asyncio
+import asyncio
 import tempfile
 import os
+from unittest.mock import patch
 
+from app.services.extraction import document_parser
 from app.services.extraction.document_parser import DocumentParser
 from app.services.extraction.models import DocumentType
 
@@ -172,3 +175,66 @@ class TestDocumentParser:
         
         assert result.status.value == "error"
         assert "no encontrado" in result.error_message.lower() or "not found" in result.error_message.lower()
+
+
+class TestPdfPageSharding:
+    """Tests de la extracción de PDFs por rangos de páginas."""
+    
+    @staticmethod
+    def fake_pool(page_count, empty_pages=(), delays=None):
+        """run_extraction falso: registra los rangos pedidos y el máximo en vuelo."""
+        calls = {'shards': [], 'in_flight': 0, 'max_in_flight': 0}
+        
+        async def run(func, *args, **kwargs):
+            if func is document_parser._read_pdf_info:
+                return page_count, {'author': 'RRHH'}
+            _, start, end, ocr_empty = args
+            calls['shards'].append((start, end))
+            calls['in_flight'] += 1
+            calls['max_in_flight'] = max(calls['max_in_flight'], calls['in_flight'])
+            await asyncio.sleep((delays or {}).get(start, 0))
+            calls['in_flight'] -= 1
+            pages = []
+            for number in range(start + 1, end + 1):
+                ocr = ocr_empty and number in empty_pages
+                pages.append((number, f"ocr {number}" if ocr else f"página {number}", ocr))
+            return {'pages': pages, 'has_images': bool(empty_pages)}
+        
+        return run, calls
+    
+    @pytest.mark.asyncio
+    async def test_pages_stream_in_order_across_shards(self):
+        run, calls = self.fake_pool(7, delays={0: 0.02})
+        parser = DocumentParser()
+        seen = []
+        
+        async def on_page(number, text):
+            seen.append(number)
+        
+        with patch.object(document_parser, 'run_extraction', run), \
+                patch.object(document_parser.settings, 'PDF_PAGES_PER_SHARD', 3), \
+                patch.object(document_parser.settings, 'EXTRACTION_POOL_ENABLED', False):
+            text, metadata = await parser._extract_pdf('/tmp/doc.pdf', on_page)
+        
+        assert calls['shards'] == [(0, 3), (3, 6), (6, 7)]
+        assert calls['max_in_flight'] == 1
+        assert seen == [1, 2, 3, 4, 5, 6, 7]
+        assert text.split('\n\n')[0] == 'página 1'
+        assert metadata['pages'] == 7 and metadata['author'] == 'RRHH'
+        assert metadata['ocr_pages'] == [] and 'likely_scanned' not in metadata
+    
+    @pytest.mark.asyncio
+    async def test_only_empty_pages_are_ocred(self):
+        run, _ = self.fake_pool(4, empty_pages={2, 3, 4})
+        parser = DocumentParser()
+        
+        with patch.object(document_parser, 'run_extraction', run), \
+                patch.object(document_parser.settings, 'PDF_PAGES_PER_SHARD', 2), \
+                patch.object(document_parser.settings, 'PDF_OCR_EMPTY_PAGES', True), \
+                patch.object(document_parser.settings, 'EXTRACTION_POOL_ENABLED', False):
+            text, metadata = await parser._extract_pdf('/tmp/doc.pdf')
+        
+        assert 'página 1' in text and 'ocr 4' in text
+        assert metadata['ocr_pages'] == [2, 3, 4]
+        assert metadata['extraction_method'] == 'pdfplumber+ocr'
+        assert metadata['likely_scanned'] and metadata['has_images']
@@ -0,0 +1,200 @@
+"""Tests para el índice vectorial de candidatos/jobs sugeridos."""
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from app.services.embedding_index import (
+    EmbeddingIndexService,
+    HashedTfidfIndex,
+    IndexWriter,
+    embed_text,
+    tokenize,
+)
+
+DIM = 256
+
+
+def vec(text, skills=()):
+    return embed_text(text, skills=skills, dim=DIM)
+
+
+class TestEmbedText:
+    """Tests para la vectorización TF hasheada."""
+
+    def test_tokenize_unigrams_and_bigrams(self):
+        assert tokenize("Machine Learning, C++ y Node.js.") == [
+            "machine", "learning", "c++", "node.js",
+            "machine learning", "learning c++", "c++ node.js",
+        ]
+
+    def test_vector_is_normalized_and_deterministic(self):
+        a = vec("Python developer", ["Django"])
+        b = vec("Python developer", ["Django"])
+
+        assert a.shape == (DIM,)
+        assert np.linalg.norm(a) == pytest.approx(1.0, rel=1e-5)
+        np.testing.assert_array_equal(a, b)
+
+    def test_skill_phrase_matches_text_bigram(self):
+        job = vec("Buscamos experiencia en machine learning")
+        with_skill = vec("", ["Machine Learning"])
+        unrelated = vec("", ["Contabilidad"])
+
+        assert float(job @ with_skill) > float(job @ unrelated)
+
+    def test_empty_text(self):
+        assert not vec("").any()
+
+
+class TestHashedTfidfIndex:
+    """Tests para HashedTfidfIndex."""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = HashedTfidfIndex("candidates", directory=str(tmp_path), dim=DIM)
+        index.upsert("python", vec("Senior Python developer Django APIs", ["Python", "Django"]))
+        index.upsert("finance", vec("Contador con experiencia en finanzas", ["Excel"]))
+        index.upsert("ml", vec("Machine learning engineer", ["Python", "PyTorch"]))
+        return index
+
+    def test_search_ranks_by_similarity(self, index):
+        hits = index.search(vec("Backend Python developer", ["Python"]), top_k=2)
+
+        assert [item_id for item_id, _ in hits] == ["python", "ml"]
+        assert 0 < hits[1][1] < hits[0][1] <= 1
+
+    def test_search_exclude_and_min_similarity(self, index):
+        query = vec("Python", ["Python"])
+
+        hits = index.search(query, top_k=5, exclude=["python"])
+        assert [item_id for item_id, _ in hits] == ["ml"]
+
+        assert index.search(vec("", ["Kubernetes"]), top_k=5) == []
+
+    def test_upsert_replaces_vector_and_document_frequency(self, index):
+        df_before = index._df.copy()
+        index.upsert("finance", vec("Contador con experiencia en finanzas", ["Excel"]))
+
+        np.testing.assert_array_equal(index._df, df_before)
+        assert len(index) == 3
+
+    def test_remove_reuses_row(self, index):
+        assert index.remove("finance") is True
+        assert "finance" not in index
+        assert index.remove("finance") is False
+
+        index.upsert("new", vec("Data analyst", ["SQL"]))
+        assert index._ids.index("new") == 1
+        assert len(index) == 3
+
+    def test_persistence_across_instances(self, index, tmp_path):
+        other = HashedTfidfIndex("candidates", directory=str(tmp_path), dim=DIM)
+        assert len(other) == 3
+        np.testing.assert_allclose(
+            other.get_vector("ml"), index.get_vector("ml"), atol=1e-3
+        )
+
+        # Las escrituras de un proceso se ven en el otro
+        index.upsert("devops", vec("DevOps", ["Kubernetes"]))
+        assert "devops" in other
+        assert other.search(vec("", ["Kubernetes"]), top_k=1)[0][0] == "devops"
+
+    def test_grows_beyond_initial_capacity(self, tmp_path):
+        index = HashedTfidfIndex("jobs", directory=str(tmp_path), dim=DIM)
+        index.upsert_many((f"job-{i}", vec(f"role number {i}", [f"skill{i}"])) for i in range(300))
+
+        assert len(index) == 300
+        assert index._capacity >= 300
+        hits = index.search(index.get_vector("job-123"), top_k=1)
+        assert hits[0][0] == "job-123"
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-2)
+
+    def test_clear(self, index):
+        index.clear()
+
+        assert len(index) == 0
+        assert index.search(vec("Python"), top_k=3) == []
+
+
+class TestIndexWriter:
+    """Tests para las escrituras agrupadas fuera del event loop."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_manifest_saves(self, tmp_path):
+        index = HashedTfidfIndex("candidates", directory=str(tmp_path), dim=DIM)
+        batches = []
+        release = threading.Event()
+        apply = index.apply
+
+        def slow_apply(changes):
+            batches.append(sorted(changes))
+            release.wait(timeout=5)
+            return apply(changes)
+
+        index.apply = slow_apply
+        writer = IndexWriter(index)
+
+        first = asyncio.ensure_future(writer.write([("c-0", vec("Python", ["Python"]))]))
+        while not batches:
+            await asyncio.sleep(0.01)
+        # Mientras se escribe el primer lote, el resto se acumula en uno solo
+        rest = [
+            asyncio.ensure_future(writer.write([(f"c-{i}", vec("SQL", ["SQL"]))]))
+            for i in range(1, 4)
+        ]
+        rest.append(asyncio.ensure_future(writer.write([("c-0", None)])))
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(first, *rest)
+
+        assert batches == [["c-0"], ["c-0", "c-1", "c-2", "c-3"]]
+        assert sorted(index._rows) == ["c-1", "c-2", "c-3"]
+
+    @pytest.mark.asyncio
+    async def test_write_error_reaches_caller(self, tmp_path):
+        index = HashedTfidfIndex("jobs", directory=str(tmp_path), dim=DIM)
+        index.apply = Mock(side_effect=OSError("disk full"))
+
+        with pytest.raises(OSError):
+            await IndexWriter(index).write([("job-1", vec("Python"))])
+
+
+class TestEmbeddingIndexService:
+    """Tests para EmbeddingIndexService."""
+
+    @pytest.mark.asyncio
+    async def test_suggest_candidates_for_job(self, tmp_path, monkeypatch):
+        from app.services import embedding_index
+
+        monkeypatch.setattr(embedding_index, "_indexes", {
+            "candidates": HashedTfidfIndex("candidates", directory=str(tmp_path), dim=DIM),
+            "jobs": HashedTfidfIndex("jobs", directory=str(tmp_path), dim=DIM),
+        })
+        db = AsyncMock()
+        service = EmbeddingIndexService(db)
+        service.jobs.upsert("job-1", vec("Python developer", ["Python"]))
+        service.candidates.upsert("c-1", vec("", ["Python", "Django"]))
+        service.candidates.upsert("c-2", vec("", ["Excel"]))
+        service.candidates.upsert("c-stale", vec("", ["Python"]))
+
+        candidates = Mock()
+        candidates.all.return_value = [Mock(id="c-1", full_name="Ana", email="ana@example.com")]
+        matches = Mock()
+        matches.all.return_value = [Mock(candidate_id="c-1", score=82.0, recommendation="PROCEED")]
+        db.execute.side_effect = [candidates, matches]
+
+        suggestions = await service.suggest_candidates_for_job("job-1", limit=5)
+
+        # c-2 no comparte términos y c-stale ya no existe en BD
+        assert suggestions == [{
+            "candidate_id": "c-1",
+            "full_name": "Ana",
+            "email": "ana@example.com",
+            "similarity": suggestions[0]["similarity"],
+            "match_score": 82.0,
+            "recommendation": "PROCEED",
+        }]
+        assert suggestions[0]["similarity"] > 0
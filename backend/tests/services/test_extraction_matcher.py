@@ -0,0 +1,69 @@
+"""Tests de los matchers precompilados de los extractores."""
+import re
+
+from app.services.extraction.matcher import KeywordMatcher, PatternSet
+
+
+class TestKeywordMatcher:
+    """Tests de KeywordMatcher."""
+
+    def test_longest_keyword_wins(self):
+        matcher = KeywordMatcher(["Java", "JavaScript", "C", "C++", "C#"], ignore_case=False)
+
+        assert matcher.find_all("JavaScript, Java, C#, C++ y C") == ["JavaScript", "Java", "C#", "C++", "C"]
+
+    def test_whole_words(self):
+        matcher = KeywordMatcher(["Go", "AI"], ignore_case=False)
+
+        assert matcher.find_all("Google, Go y AI (no AIX)") == ["Go", "AI"]
+        assert KeywordMatcher(["risk"], whole_words=False).find_all("riskier") == ["risk"]
+
+    def test_mapping_values_and_case(self):
+        matcher = KeywordMatcher({"k8s": "Kubernetes", "kubernetes": "Kubernetes", "machine learning": "ML"})
+
+        assert matcher.find_all("K8S, kubernetes y Machine\n  Learning") == ["Kubernetes", "ML"]
+        match = matcher.search("uso machine learning")
+        assert (match.value, match.keyword, match.start, match.end) == ("ML", "machine learning", 4, 20)
+
+    def test_matches_same_as_alternation(self):
+        keywords = ["dark", "dark factor", "dark triad", "disc", "dfi"]
+        text = "Dark Factor, dark triad, DISC, dfi, darker, dark"
+        matcher = KeywordMatcher(keywords)
+        alternation = re.compile(
+            r"\b(?:" + "|".join(sorted(map(re.escape, keywords), key=len, reverse=True)) + r")\b",
+            re.IGNORECASE
+        )
+
+        assert [m.keyword for m in matcher.finditer(text)] == [
+            m.group(0).lower() for m in alternation.finditer(text)
+        ]
+
+    def test_prefixes(self):
+        matcher = KeywordMatcher({"perfil": "perfil", "perfil disc": "disc", "skills": "competencias"})
+
+        assert matcher.prefixes("Perfil DISC del cargo") == ["perfil", "disc"]
+        assert matcher.prefixes("sin encabezado") == []
+
+    def test_empty_dictionary(self):
+        assert KeywordMatcher([]).find_all("Python") == []
+
+
+class TestPatternSet:
+    """Tests de PatternSet."""
+
+    def test_group_and_priority(self):
+        patterns = PatternSet({
+            "skills": [r"\bskills\b", r"\btechnical\s+skills\b"],
+            "languages": [r"\bidiomas\b"],
+        }, re.IGNORECASE)
+
+        matches = patterns.finditer("Technical Skills e IDIOMAS")
+
+        assert [(m.name, m.priority) for m in matches] == [("skills", 1), ("languages", 0)]
+        assert patterns.order == {"skills": 0, "languages": 1}
+
+    def test_search_from_position(self):
+        patterns = PatternSet({"a": [r"\bfoo\b"], "b": [r"\bbar\b"]})
+
+        assert patterns.search("foo bar", 1).name == "b"
+        assert patterns.search("nada") is None
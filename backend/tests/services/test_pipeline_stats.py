@@ -0,0 +1,166 @@
+"""Tests para las estadísticas precalculadas del pipeline."""
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.core_ats import ApplicationStage
+from app.services.pipeline_stats import (
+    ApplicationStatsEntry,
+    PipelineStatsService,
+    merge_deltas,
+)
+
+
+def make_application(**overrides):
+    application = dict(
+        stage=ApplicationStage.SOURCING,
+        hired=False,
+        overall_score=None,
+        decision_date=None,
+        created_at=datetime(2024, 3, 1, 10, 30),
+    )
+    application.update(overrides)
+    return SimpleNamespace(**application)
+
+
+def compiled_params(db):
+    statement = db.execute.await_args.args[0]
+    return statement.compile(dialect=postgresql.dialect()).params
+
+
+class TestApplicationStatsEntry:
+    """Tests del aporte de una aplicación a los agregados."""
+
+    def test_of(self):
+        entry = ApplicationStatsEntry.of(make_application(
+            stage="hired", hired=True, overall_score=81.5, decision_date=date(2024, 3, 31)
+        ))
+
+        assert entry.stage == ApplicationStage.HIRED
+        assert entry.overall_score == Decimal("81.5")
+        assert entry.hire_days == 30
+        assert entry.deltas(-1) == {
+            "application_count": -1, "hired_count": -1,
+            "score_sum": Decimal("-81.5"), "score_count": -1,
+            "hire_days_sum": -30, "hire_days_count": -1,
+        }
+
+    def test_decision_before_creation_is_ignored(self):
+        entry = ApplicationStatsEntry.of(make_application(hired=True, decision_date=date(2024, 2, 1)))
+
+        assert entry.hire_days is None
+
+    def test_merge_deltas_drops_unchanged_keys(self):
+        entry = ApplicationStatsEntry(ApplicationStage.TERNA, overall_score=Decimal("70"))
+
+        assert merge_deltas([(entry.stage, entry.deltas(-1)), (entry.stage, entry.deltas(1))]) == {}
+
+
+class TestRecordApplication:
+    """Tests de los deltas incrementales por vacante."""
+
+    @pytest.mark.asyncio
+    async def test_stage_change_is_one_upsert(self):
+        db = AsyncMock()
+        before = ApplicationStatsEntry(ApplicationStage.SOURCING, overall_score=Decimal("60"))
+        after = ApplicationStatsEntry(ApplicationStage.TERNA, overall_score=Decimal("60"))
+
+        await PipelineStatsService(db).record_application(uuid.uuid4(), before, after)
+
+        assert db.execute.await_count == 1
+        params = compiled_params(db)
+        assert (params["stage_m0"], params["application_count_m0"]) == (ApplicationStage.SOURCING, -1)
+        assert (params["stage_m1"], params["application_count_m1"]) == (ApplicationStage.TERNA, 1)
+        assert params["score_sum_m1"] == Decimal("60")
+
+    @pytest.mark.asyncio
+    async def test_no_change_skips_write(self):
+        db = AsyncMock()
+        entry = ApplicationStatsEntry(ApplicationStage.TERNA)
+
+        await PipelineStatsService(db).record_application(uuid.uuid4(), entry, entry)
+
+        db.execute.assert_not_awaited()
+
+
+class TestEndpointsRecordStats:
+    """Tests de que los endpoints que cambian la etapa actualizan los agregados."""
+
+    @pytest.mark.asyncio
+    async def test_send_message_first_contact_records_delta(self):
+        from app.api.v1 import applications
+        from app.schemas.core_ats import SendMessageRequest
+
+        role_id = uuid.uuid4()
+        application = make_application(
+            stage=ApplicationStage.CONTACT_PENDING,
+            role_id=role_id,
+            initial_contact_date=None,
+            candidate=SimpleNamespace(candidate_id=uuid.uuid4(), email="ana@example.com", phone=None),
+        )
+        result = Mock()
+        result.scalar_one_or_none.return_value = application
+        db = AsyncMock()
+        db.add = Mock()
+        db.execute.return_value = result
+
+        with patch.object(applications, "PipelineStatsService") as stats_service:
+            stats_service.return_value.record_application = AsyncMock()
+            await applications.send_message_to_candidate(
+                uuid.uuid4(), SendMessageRequest(template_id="t1", channel="email"), db, Mock()
+            )
+
+        role, before, after = stats_service.return_value.record_application.await_args.args
+        assert role == role_id
+        assert before.stage == ApplicationStage.CONTACT_PENDING
+        assert after.stage == ApplicationStage.CONTACTED
+
+
+class TestSubmissionStats:
+    """Tests de los conteos de submissions."""
+
+    @pytest.mark.asyncio
+    async def test_record_status_change(self):
+        db = AsyncMock()
+
+        await PipelineStatsService(db).record_submission(uuid.uuid4(), uuid.uuid4(), "active", "hired")
+
+        params = compiled_params(db)
+        assert {params["status_m0"]: params["submission_count_m0"],
+                params["status_m1"]: params["submission_count_m1"]} == {"active": -1, "hired": 1}
+
+    @pytest.mark.asyncio
+    async def test_submission_stats_reads_aggregates(self):
+        result = Mock()
+        result.all.return_value = [
+            SimpleNamespace(status="active", count=7),
+            SimpleNamespace(status="hired", count=2),
+        ]
+        db = AsyncMock()
+        db.execute.return_value = result
+
+        stats = await PipelineStatsService(db).submission_stats(uuid.uuid4())
+
+        assert db.execute.await_count == 1
+        assert stats["total"] == 9
+        assert stats["by_status"] == {
+            "active": 7, "on_hold": 0, "withdrawn": 0, "hired": 2, "rejected": 0
+        }
+
+    @pytest.mark.asyncio
+    async def test_reconcile_rebuilds_and_commits(self):
+        db = AsyncMock()
+        db.execute.return_value = Mock(rowcount=3)
+
+        counts = await PipelineStatsService(db).reconcile()
+
+        assert counts == {"hh_role_stage_stats": 3, "rhtools_submission_stats": 3}
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert statements[0].startswith("LOCK TABLE")
+        assert sum(s.startswith("DELETE") for s in statements) == 2
+        db.commit.assert_awaited_once()
@@ -0,0 +1,224 @@
+"""Tests para el pre-filtro vectorizado de matching."""
+import os
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.prefilter import SkillPrefilter, estimate_years, normalize_skill
+from app.services.scoring_service import ScoringService
+
+
+class TestSkillPrefilter:
+    """Tests para SkillPrefilter."""
+
+    @pytest.fixture
+    def prefilter(self):
+        return SkillPrefilter(skill_weight=1.0)
+
+    def test_skill_coverage_matches_fallback_semantics(self, prefilter):
+        """Substring en ambos sentidos y sin mayúsculas, como _fallback_analysis."""
+        scores = prefilter.score(
+            candidate_skills=[
+                ["Python 3", "ReactJS"],
+                ["py"],
+                [],
+                None,
+            ],
+            candidate_years=[0, 0, 0, 0],
+            required_skills=["python", "React", "AWS", "Python"],
+        )
+
+        # Skills requeridas se deduplican: python, react, aws
+        np.testing.assert_allclose(scores, [200 / 3, 100 / 3, 0, 0], rtol=1e-5)
+
+    def test_skills_as_dicts(self, prefilter):
+        """Acepta skills en formato {'name': ...} de las extracciones de CV."""
+        scores = prefilter.score(
+            candidate_skills=[[{"name": "SQL"}, {"level": "alto"}]],
+            candidate_years=[0],
+            required_skills=["sql"],
+        )
+
+        assert scores[0] == pytest.approx(100.0)
+
+    def test_no_required_skills_is_neutral(self, prefilter):
+        scores = prefilter.score([["Python"], []], [0, 0], required_skills=[])
+
+        np.testing.assert_allclose(scores, [50.0, 50.0])
+
+    def test_experience_weight(self):
+        prefilter = SkillPrefilter(skill_weight=0.5)
+
+        scores = prefilter.score(
+            candidate_skills=[["Python"], ["Python"]],
+            candidate_years=[2, 8],
+            required_skills=["Python"],
+            min_years_experience=4,
+        )
+
+        np.testing.assert_allclose(scores, [75.0, 100.0])
+
+    def test_select_top_k_and_min_score(self, prefilter):
+        ids = ["a", "b", "c", "d"]
+        scores = np.array([10.0, 90.0, 50.0, 90.0])
+
+        selected, all_scores = prefilter.select(ids, scores, top_k=3)
+        assert selected == ["b", "d", "c"]
+        assert all_scores == {"a": 10.0, "b": 90.0, "c": 50.0, "d": 90.0}
+
+        selected, _ = prefilter.select(ids, scores, top_k=0, min_score=50)
+        assert selected == ["b", "d", "c"]
+
+    def test_empty_input(self, prefilter):
+        scores = prefilter.score([], [], required_skills=["Python"])
+
+        assert scores.shape == (0,)
+        assert prefilter.select([], scores, top_k=5) == ([], {})
+
+
+class TestPrefilterHelpers:
+    """Tests para normalización de skills y años."""
+
+    def test_normalize_skill(self):
+        assert normalize_skill("  Machine   Learning ") == "machine learning"
+        assert normalize_skill({"name": "AWS"}) == "aws"
+        assert normalize_skill(None) == ""
+
+    @pytest.mark.parametrize("value, expected", [
+        (None, 0.0),
+        (7, 7.0),
+        ("3.5", 3.5),
+        ("n/a", 0.0),
+        ({"total_years": 4}, 4.0),
+        ([{"title": "Dev"}, {"title": "Lead"}], 4.0),
+        (-2, 0.0),
+    ])
+    def test_estimate_years(self, value, expected):
+        assert estimate_years(value) == expected
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class TestPrefilterRoleApplications:
+    """Tests de ScoringService.prefilter_role_applications."""
+
+    def test_latest_extractions_query_compiles(self):
+        query = ScoringService._latest_extractions_query(str(uuid.uuid4()))
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert "DISTINCT ON (hh_cv_extractions.candidate_id)" in sql
+        assert "extracted_json" in sql
+
+    @pytest.mark.asyncio
+    async def test_years_from_extracted_json(self):
+        with_cv, without_cv = uuid.uuid4(), uuid.uuid4()
+        applications = Mock()
+        applications.all.return_value = [
+            SimpleNamespace(application_id="a1", candidate_id=with_cv),
+            SimpleNamespace(application_id="a2", candidate_id=without_cv),
+        ]
+        extractions = Mock()
+        extractions.all.return_value = [SimpleNamespace(
+            candidate_id=with_cv,
+            extracted_json={"skills": ["Python", "SQL"], "years_experience": 6},
+        )]
+        db = AsyncMock()
+        db.execute.side_effect = [applications, extractions]
+
+        selected, scores = await ScoringService().prefilter_role_applications(
+            str(uuid.uuid4()), db, ["python", "sql"], min_years_experience=5, top_k=0
+        )
+
+        assert selected == ["a1", "a2"]
+        assert scores["a1"] > scores["a2"]
+
+    @pytest.mark.asyncio
+    async def test_role_scoring_runs_as_background_task(self):
+        from fastapi import BackgroundTasks
+
+        from app.api.v1 import applications
+
+        ok, broken = str(uuid.uuid4()), str(uuid.uuid4())
+        role = Mock()
+        role.scalar_one_or_none.return_value = Mock()
+        db = AsyncMock()
+        db.execute.return_value = role
+        background_tasks = BackgroundTasks()
+
+        with patch.object(applications, "scoring_service") as scoring, \
+                patch.object(applications, "async_session_maker", MagicMock()), \
+                patch.object(applications, "logger") as logger:
+            scoring.prefilter_role_applications = AsyncMock(return_value=([ok, broken], {ok: 90.0, broken: 80.0}))
+            scoring.score_application = AsyncMock(side_effect=[None, RuntimeError("boom")])
+
+            response = await applications.score_role_applications(
+                uuid.uuid4(), applications.RoleScoringRequest(), background_tasks, db, Mock()
+            )
+            # La respuesta no espera al scoring: queda en BackgroundTasks
+            scoring.score_application.assert_not_awaited()
+            await background_tasks()
+
+        assert len(response.selected) == 2
+        assert scoring.score_application.await_count == 2
+        logger.exception.assert_called_once()
+        assert broken in logger.exception.call_args.args[0]
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL no configurada")
+@pytest.mark.asyncio
+async def test_prefilter_role_applications_against_postgres():
+    """Ejecuta las queries reales (transacción revertida al final)."""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.models.core_ats import (
+        Base, HHApplication, HHCandidate, HHClient, HHCVExtraction, HHRole,
+    )
+
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                await conn.run_sync(Base.metadata.create_all)
+                db = AsyncSession(bind=conn)
+
+                client = HHClient(client_name="Cliente")
+                db.add(client)
+                await db.flush()
+                role = HHRole(client_id=client.client_id, role_title="Backend")
+                senior = HHCandidate(full_name="Ana Senior")
+                junior = HHCandidate(full_name="Pedro Junior")
+                db.add_all([role, senior, junior])
+                await db.flush()
+                db.add_all([
+                    HHApplication(candidate_id=senior.candidate_id, role_id=role.role_id),
+                    HHApplication(candidate_id=junior.candidate_id, role_id=role.role_id),
+                    HHCVExtraction(
+                        candidate_id=senior.candidate_id, filename="ana.pdf", file_hash="a" * 64,
+                        extracted_json={"skills": ["Python"], "years_experience": 8},
+                    ),
+                    HHCVExtraction(
+                        candidate_id=junior.candidate_id, filename="pedro.pdf", file_hash="b" * 64,
+                        extracted_json={"skills": ["Excel"], "years_experience": 1},
+                    ),
+                ])
+                await db.flush()
+
+                selected, scores = await ScoringService().prefilter_role_applications(
+                    str(role.role_id), db, ["Python"], min_years_experience=5, top_k=1
+                )
+
+                assert len(selected) == 1
+                assert scores[selected[0]] == max(scores.values())
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,114 @@
+"""Tests para el presupuesto de tokens de prompts LLM."""
+from unittest.mock import Mock
+
+from app.services.prompt_budget import (
+    count_tokens,
+    fit_to_budget,
+    remove_boilerplate,
+    split_sections,
+    truncate_to_tokens,
+    usage_tokens,
+)
+
+CV = """Ana Pérez
+Backend Engineer - ana@example.com
+Página 1 de 2
+
+Resumen profesional
+Ingeniera con 8 años construyendo APIs y plataformas de datos.
+
+Experiencia laboral
+Acme Corp - Senior Backend Engineer (2019-2024)
+Diseñé microservicios en Python y Django con PostgreSQL.
+Organicé eventos internos y el club de lectura de la oficina.
+Beta SA - Developer (2016-2019)
+Mantenimiento de aplicaciones PHP y soporte a usuarios.
+
+Ana Pérez
+Backend Engineer - ana@example.com
+Página 2 de 2
+
+Educación
+Ingeniería Informática, Universidad de Chile
+
+Habilidades
+Python, Django, PostgreSQL, Docker, AWS
+"""
+
+
+class TestTokenCounting:
+    """Tests para el conteo y corte de tokens."""
+
+    def test_count_tokens(self):
+        assert count_tokens("") == 0
+        assert count_tokens("Python") > 0
+        assert count_tokens(CV) > count_tokens(CV[:200])
+
+    def test_truncate_to_tokens(self):
+        truncated = truncate_to_tokens(CV, 20)
+
+        assert CV.startswith(truncated)
+        assert count_tokens(truncated) <= 20
+        assert truncate_to_tokens("corto", 50) == "corto"
+
+    def test_usage_tokens(self):
+        response = Mock()
+        response.usage.prompt_tokens = 120
+        response.usage.completion_tokens = 30
+
+        assert usage_tokens(response) == (120, 30)
+        assert usage_tokens(None) == (0, 0)
+        # Respuestas sin usage real (mocks) no rompen las métricas
+        assert usage_tokens(Mock()) == (0, 0)
+
+
+class TestBoilerplate:
+    """Tests para la limpieza de boilerplate y la división en secciones."""
+
+    def test_remove_boilerplate(self):
+        cleaned = remove_boilerplate(CV)
+
+        assert "Página" not in cleaned
+        assert cleaned.count("ana@example.com") == 1
+        assert "\n\n\n" not in cleaned
+
+    def test_split_sections(self):
+        sections = split_sections(remove_boilerplate(CV))
+
+        assert [kind for kind, _ in sections] == [
+            "header", "summary", "experience", "education", "skills"
+        ]
+        assert sections[-1][1] == ["Habilidades", "Python, Django, PostgreSQL, Docker, AWS"]
+
+
+class TestFitToBudget:
+    """Tests para fit_to_budget."""
+
+    def test_within_budget_only_cleans(self):
+        result = fit_to_budget(CV, 5000)
+
+        assert result.text == remove_boilerplate(CV)
+        assert result.tokens_saved == result.original_tokens - result.tokens > 0
+
+    def test_fits_budget_keeping_relevant_lines(self):
+        budget = 60
+        result = fit_to_budget(CV, budget, keywords=["Python", {"name": "Django"}])
+
+        assert result.tokens <= budget
+        assert result.tokens_saved > 0
+        # Skills y la experiencia relevante se conservan; el relleno no
+        assert "Python, Django, PostgreSQL, Docker, AWS" in result.text
+        assert "Diseñé microservicios en Python y Django con PostgreSQL." in result.text
+        assert "club de lectura" not in result.text
+
+    def test_keeps_original_order(self):
+        budget = count_tokens(remove_boilerplate(CV)) - 5
+        lines = fit_to_budget(CV, budget, keywords=["Python"]).text.splitlines()
+        positions = [CV.index(line) for line in lines if line]
+
+        assert positions == sorted(positions)
+
+    def test_unbounded_budget(self):
+        result = fit_to_budget(CV, 0)
+
+        assert result.text == remove_boilerplate(CV)
@@ -0,0 +1,259 @@
+"""Tests para los reportes de una sola query (ReportService)."""
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.dialects import postgresql
+
+from app.models.core_ats import (
+    ApplicationStage, AssessmentType, FlagSeverity, FlagSource, HHApplication,
+    HHAssessment, HHAssessmentScore, HHCandidate, HHClient, HHDocument, HHFlag,
+    HHInterview, HHRole, HHRoleStageStats
+)
+from app.services.pipeline_stats import PipelineStatsService
+from app.services.report_service import ReportNotFoundError, ReportService
+
+
+def make_db(rows=None, one=None):
+    result = Mock()
+    result.all.return_value = rows or []
+    result.one_or_none.return_value = one
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+def terna_row(**overrides):
+    row = dict(
+        role_title="Gerente Comercial",
+        application_id=uuid.uuid4(),
+        candidate_id=uuid.uuid4(),
+        overall_score=Decimal("87.50"),
+        stage=ApplicationStage.TERNA,
+        full_name="Ana Pérez",
+        high=1, medium=0, low=2,
+        assessments_summary={"FACTOR_OSCURO": {"Egocentrismo": 35.5}},
+        interview_count=2,
+    )
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+class TestTernaReport:
+    """Tests del reporte de terna."""
+
+    @pytest.mark.asyncio
+    async def test_single_query(self):
+        db = make_db(rows=[terna_row(), terna_row(overall_score=None, assessments_summary=None)])
+
+        report = await ReportService(db).terna_report(uuid.uuid4())
+
+        assert db.execute.await_count == 1
+        first = report.candidates[0]
+        assert report.role_title == "Gerente Comercial"
+        assert first.stage == "terna"
+        assert first.overall_score == 87.5
+        assert first.assessments_summary == {"factor_oscuro": {"Egocentrismo": 35.5}}
+        assert first.flags_summary == {"high": 1, "medium": 0, "low": 2}
+        assert report.candidates[1].assessments_summary == {}
+
+    @pytest.mark.asyncio
+    async def test_not_found(self):
+        with pytest.raises(ReportNotFoundError, match="Vacante"):
+            await ReportService(make_db(rows=[])).terna_report(uuid.uuid4())
+
+        empty_role = terna_row(application_id=None, candidate_id=None)
+        with pytest.raises(ReportNotFoundError, match="aplicaciones"):
+            await ReportService(make_db(rows=[empty_role])).terna_report(uuid.uuid4())
+
+    def test_query_uses_valid_stages(self):
+        sql = str(ReportService(None).terna_query(uuid.uuid4()).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}
+        ))
+
+        assert "LATERAL" in sql
+        assert "'offer'" not in sql
+
+
+class TestRoleAnalytics:
+    """Tests de las métricas por vacante."""
+
+    @pytest.mark.asyncio
+    async def test_aggregates_from_one_row(self):
+        row = SimpleNamespace(
+            role_title="Analista", by_stage={"SOURCING": 3, "HIRED": 1},
+            score_sum=Decimal("300"), score_count=Decimal("4"),
+            days_sum=Decimal("45"), days_count=Decimal("2"),
+        )
+        db = make_db(one=row)
+
+        report = await ReportService(db).role_analytics(uuid.uuid4())
+
+        assert db.execute.await_count == 1
+        assert report.metrics.by_stage == {"sourcing": 3, "hired": 1}
+        assert report.metrics.total_applications == 4
+        assert report.metrics.hired_count == 1
+        assert report.metrics.avg_overall_score == 75.0
+        assert report.metrics.avg_time_to_hire_days == 22
+
+    @pytest.mark.asyncio
+    async def test_role_without_applications(self):
+        row = SimpleNamespace(
+            role_title="Analista", by_stage=None,
+            score_sum=None, score_count=None, days_sum=None, days_count=None,
+        )
+
+        report = await ReportService(make_db(one=row)).role_analytics(uuid.uuid4())
+
+        assert report.metrics.total_applications == 0
+        assert report.metrics.avg_overall_score is None
+        assert report.metrics.avg_time_to_hire_days is None
+
+    @pytest.mark.asyncio
+    async def test_not_found(self):
+        with pytest.raises(ReportNotFoundError):
+            await ReportService(make_db(one=None)).role_analytics(uuid.uuid4())
+
+
+class TestCandidateHistory:
+    """Tests del historial de un candidato."""
+
+    @pytest.mark.asyncio
+    async def test_history(self):
+        common = dict(full_name="Ana Pérez", decision_date=None, created_at=datetime(2024, 1, 1))
+        rows = [
+            SimpleNamespace(application_id=uuid.uuid4(), stage=ApplicationStage.HIRED, hired=True,
+                            overall_score=Decimal("90"), role_title="CFO", client_name="Acme", **common),
+            SimpleNamespace(application_id=uuid.uuid4(), stage=ApplicationStage.DISCARDED, hired=False,
+                            overall_score=None, role_title=None, client_name=None, **common),
+        ]
+        db = make_db(rows=rows)
+
+        history = await ReportService(db).candidate_history(uuid.uuid4())
+
+        assert db.execute.await_count == 1
+        assert (history.total_applications, history.hired_count) == (2, 1)
+        assert history.applications[1].role_title == "N/A"
+
+    @pytest.mark.asyncio
+    async def test_candidate_without_applications(self):
+        row = SimpleNamespace(
+            full_name="Ana Pérez", application_id=None, stage=None, hired=None,
+            decision_date=None, overall_score=None, created_at=None,
+            role_title=None, client_name=None,
+        )
+
+        history = await ReportService(make_db(rows=[row])).candidate_history(uuid.uuid4())
+
+        assert history.total_applications == 0
+        assert history.applications == []
+
+
+# =============================================================================
+# BENCHMARK (requiere PostgreSQL)
+# =============================================================================
+
+BENCHMARK_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+BENCHMARK_APPLICATIONS = int(os.getenv("REPORT_BENCHMARK_APPLICATIONS", "2000"))
+# Latencia máxima aceptable por reporte (ms)
+BENCHMARK_MAX_MS = float(os.getenv("REPORT_BENCHMARK_MAX_MS", "250"))
+
+BENCHMARK_TABLES = [
+    HHClient.__table__, HHRole.__table__, HHCandidate.__table__, HHDocument.__table__,
+    HHApplication.__table__, HHInterview.__table__, HHAssessment.__table__,
+    HHAssessmentScore.__table__, HHFlag.__table__, HHRoleStageStats.__table__,
+]
+
+
+async def seed_role(session, applications):
+    """Crea una vacante con `applications` aplicaciones y sus relaciones."""
+    now = datetime.utcnow()
+    client_id, role_id = uuid.uuid4(), uuid.uuid4()
+    await session.execute(insert(HHClient).values(client_id=client_id, client_name="Acme"))
+    await session.execute(insert(HHRole).values(role_id=role_id, client_id=client_id, role_title="CFO"))
+
+    stages = list(ApplicationStage)
+    candidates, apps, flags, interviews, assessments, scores = [], [], [], [], [], []
+    for i in range(applications):
+        candidate_id, application_id, assessment_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        stage = stages[i % len(stages)]
+        candidates.append({"candidate_id": candidate_id, "full_name": f"Candidato {i}"})
+        apps.append({
+            "application_id": application_id, "candidate_id": candidate_id, "role_id": role_id,
+            "stage": stage, "hired": stage == ApplicationStage.HIRED,
+            "decision_date": date.today() if stage == ApplicationStage.HIRED else None,
+            "overall_score": i % 100, "created_at": now - timedelta(days=i % 60),
+        })
+        flags.extend({
+            "application_id": application_id, "category": "riesgo", "source": FlagSource.CV,
+            "severity": severity,
+        } for severity in FlagSeverity)
+        interviews.append({"application_id": application_id})
+        assessments.append({
+            "assessment_id": assessment_id, "application_id": application_id,
+            "assessment_type": AssessmentType.FACTOR_OSCURO,
+        })
+        scores.extend({"assessment_id": assessment_id, "dimension": f"D{d}", "value": d * 10} for d in range(5))
+
+    for model, rows in (
+        (HHCandidate, candidates), (HHApplication, apps), (HHFlag, flags),
+        (HHInterview, interviews), (HHAssessment, assessments), (HHAssessmentScore, scores),
+    ):
+        await session.execute(insert(model), rows)
+    await session.flush()
+    return role_id, candidates[0]["candidate_id"]
+
+
+@pytest.mark.slow
+@pytest.mark.integration
+@pytest.mark.skipif(not BENCHMARK_DATABASE_URL, reason="TEST_DATABASE_URL no configurada")
+@pytest.mark.asyncio
+async def test_report_benchmark():
+    """Latencia y número de sentencias por reporte sobre datos sembrados.
+
+    Todo corre dentro de una transacción que se revierte al final (el DDL
+    de PostgreSQL es transaccional), así que no deja rastro en la BD.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    engine = create_async_engine(BENCHMARK_DATABASE_URL)
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                await conn.run_sync(lambda sync: HHClient.metadata.create_all(sync, tables=BENCHMARK_TABLES))
+                session = AsyncSession(bind=conn)
+                role_id, candidate_id = await seed_role(session, BENCHMARK_APPLICATIONS)
+                await PipelineStatsService(session).rebuild_role_stats()
+                service = ReportService(session)
+
+                for name, run in (
+                    ("terna", lambda: service.terna_report(role_id)),
+                    ("role_analytics", lambda: service.role_analytics(role_id)),
+                    ("candidate_history", lambda: service.candidate_history(candidate_id)),
+                ):
+                    await run()  # Calentamiento (planes y caché de sentencias)
+                    statements.clear()
+                    start = time.perf_counter()
+                    await run()
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+
+                    print(f"{name}: {elapsed_ms:.1f} ms ({BENCHMARK_APPLICATIONS} aplicaciones)")
+                    assert len(statements) == 1, name
+                    assert elapsed_ms < BENCHMARK_MAX_MS, name
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
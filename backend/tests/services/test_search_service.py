@@ -0,0 +1,142 @@
+"""Tests para la búsqueda unificada (SearchService) y search_text."""
+import os
+import time
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql
+
+from app.core.search import matches, normalize_search_text, search_terms
+from app.models.core_ats import HHCandidate
+from app.models.job import JobOpening
+from app.services.search_service import SearchService
+
+
+def compile_sql(clause):
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+class TestSearchText:
+    """Tests de la normalización de search_text."""
+
+    def test_normalize(self):
+        assert normalize_search_text("  José  PÉREZ ", None, "Viña del Mar") == "jose perez vina del mar"
+        assert normalize_search_text(None, "") is None
+
+    def test_terms_escape_like_wildcards(self):
+        clause = matches(JobOpening.search_text, "100% Ñuñoa")
+
+        assert search_terms("100% Ñuñoa") == ["100%", "nunoa"]
+        assert clause.compile().params == {"search_text_1": "%100\\%%", "search_text_2": "%nunoa%"}
+
+    def test_orm_keeps_search_text_updated(self):
+        candidate = HHCandidate(full_name="Ana María Núñez", location="Santiago")
+
+        HHCandidate.__mapper__.dispatch.before_insert(HHCandidate.__mapper__, None, inspect(candidate))
+
+        assert candidate.search_text == "ana maria nunez santiago"
+
+
+class TestSearchService:
+    """Tests de la búsqueda rankeada."""
+
+    def test_single_union_query(self):
+        sql = compile_sql(SearchService(None).search_query("ana", ["candidate", "role"]))
+
+        assert sql.count("UNION ALL") == 1
+        assert "word_similarity" in sql
+        assert "<%%" in sql
+
+    @pytest.mark.asyncio
+    async def test_search(self):
+        row = SimpleNamespace(
+            type="candidate", id=uuid.uuid4(), title="Ana Pérez",
+            subtitle="Santiago", score=Decimal("0.8"),
+        )
+        result = Mock()
+        result.all.return_value = [row]
+        db = AsyncMock()
+        db.execute.return_value = result
+
+        items = await SearchService(db).search("ana perez")
+
+        assert db.execute.await_count == 1
+        assert items[0].type == "candidate"
+        assert items[0].score == 0.8
+
+    @pytest.mark.asyncio
+    async def test_blank_query_skips_database(self):
+        db = AsyncMock()
+
+        assert await SearchService(db).search("   ") == []
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_type(self):
+        with pytest.raises(ValueError, match="client"):
+            await SearchService(AsyncMock()).search("ana", ["client"])
+
+
+# =============================================================================
+# BENCHMARK (requiere PostgreSQL con pg_trgm)
+# =============================================================================
+
+BENCHMARK_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+BENCHMARK_CANDIDATES = int(os.getenv("SEARCH_BENCHMARK_CANDIDATES", "200000"))
+# p95 máximo aceptable por búsqueda (ms)
+BENCHMARK_P95_MS = float(os.getenv("SEARCH_BENCHMARK_P95_MS", "50"))
+
+BENCHMARK_QUERIES = ["gonzalez", "maria jose", "ingeniero", "vina del mar", "rodirguez", "ana 1234"]
+
+
+@pytest.mark.slow
+@pytest.mark.integration
+@pytest.mark.skipif(not BENCHMARK_DATABASE_URL, reason="TEST_DATABASE_URL no configurada")
+@pytest.mark.asyncio
+async def test_search_benchmark():
+    """p95 de /search sobre candidatos sembrados (transacción revertida al final)."""
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    engine = create_async_engine(BENCHMARK_DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                await conn.run_sync(lambda sync: HHCandidate.metadata.create_all(
+                    sync, tables=[HHCandidate.__table__]
+                ))
+                await conn.execute(text("""
+                    INSERT INTO hh_candidates (candidate_id, full_name, location, search_text, created_at, updated_at)
+                    SELECT gen_random_uuid(), name, city,
+                           translate(lower(name || ' ' || city), 'áéíóúñ', 'aeioun'), now(), now()
+                    FROM (
+                        SELECT
+                            (ARRAY['Ana','María José','Pedro','Juan','Camila'])[1 + i % 5] || ' ' ||
+                            (ARRAY['González','Rodríguez','Muñoz','Rojas','Díaz'])[1 + (i / 5) % 5] || ' ' || i AS name,
+                            (ARRAY['Santiago','Viña del Mar','Concepción','Temuco'])[1 + i % 4] AS city
+                        FROM generate_series(1, :rows) AS i
+                    ) seed
+                """), {"rows": BENCHMARK_CANDIDATES})
+                await conn.execute(text("ANALYZE hh_candidates"))
+
+                service = SearchService(AsyncSession(bind=conn))
+                timings = []
+                for _ in range(5):
+                    for query in BENCHMARK_QUERIES:
+                        start = time.perf_counter()
+                        await service.search(query, ["candidate"])
+                        timings.append((time.perf_counter() - start) * 1000)
+
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(f"search p95: {p95:.1f} ms ({BENCHMARK_CANDIDATES} candidatos)")
+                assert p95 < BENCHMARK_P95_MS
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,84 @@
+"""Tests para los blind index de columnas cifradas."""
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+from app.core.blind_index import (
+    blind_equals,
+    blind_index_values,
+    blind_prefix,
+    compute_blind_index,
+    get_blind_index,
+    normalize_national_id,
+)
+from app.models.core_ats import HHCandidate
+
+
+def compile_sql(clause):
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+class TestBlindIndex:
+    """Tests del cálculo de tokens."""
+
+    def test_normalized_values_share_token(self):
+        phone = get_blind_index(HHCandidate, "phone")
+        email = get_blind_index(HHCandidate, "email")
+
+        assert phone.token("+56 9 1234 5678") == phone.token("912345678")
+        assert email.token(" Ana@Example.COM ") == email.token("ana@example.com")
+        assert normalize_national_id("12.345.678-k") == "12345678K"
+
+    def test_tokens_are_scoped_per_field(self):
+        assert compute_blind_index("hh_candidates.email", "x") != compute_blind_index("hh_candidates.phone", "x")
+        assert get_blind_index(HHCandidate, "email").token("a@b.cl") != "a@b.cl"
+
+    def test_empty_values(self):
+        phone = get_blind_index(HHCandidate, "phone")
+
+        assert phone.token(None) is None
+        assert phone.token("sin número") is None
+
+    def test_prefix_tokens(self):
+        email = get_blind_index(HHCandidate, "email")
+        tokens = email.prefix_tokens("ana@b.cl")
+
+        assert len(tokens) == len("ana@b.cl") - 2
+        assert email.prefix_token("ANA@") in tokens
+        assert email.prefix_token("an") is None
+
+    def test_unregistered_field(self):
+        with pytest.raises(ValueError, match="full_name"):
+            get_blind_index(HHCandidate, "full_name")
+
+
+class TestBlindIndexQueries:
+    """Tests de los predicados y el mantenimiento desde el ORM."""
+
+    def test_equals_uses_hash_column(self):
+        clause = blind_equals(HHCandidate, "email", "Ana@Example.com")
+
+        assert "hh_candidates.email_bidx = " in compile_sql(clause)
+        assert clause.right.value == get_blind_index(HHCandidate, "email").token("ana@example.com")
+
+    def test_prefix_uses_array_containment(self):
+        assert "email_bidx_prefixes @>" in compile_sql(blind_prefix(HHCandidate, "email", "ana@"))
+
+    def test_no_token_matches_nothing(self):
+        assert compile_sql(blind_equals(HHCandidate, "phone", "---")) == "false"
+        assert compile_sql(blind_prefix(HHCandidate, "email", "a")) == "false"
+
+    def test_orm_keeps_blind_index_updated(self):
+        candidate = HHCandidate(full_name="Ana", email="ana@b.cl", phone="+56912345678", national_id=None)
+
+        HHCandidate.__mapper__.dispatch.before_insert(HHCandidate.__mapper__, None, inspect(candidate))
+
+        assert candidate.email_bidx == get_blind_index(HHCandidate, "email").token("ana@b.cl")
+        assert candidate.phone_bidx == get_blind_index(HHCandidate, "phone").token("912345678")
+        assert candidate.email_bidx_prefixes
+        assert candidate.national_id_bidx is None
+
+    def test_values_for_core_insert(self):
+        values = blind_index_values(HHCandidate, {"email": "ana@b.cl", "full_name": "Ana"})
+
+        assert set(values) == {"email_bidx", "email_bidx_prefixes"}
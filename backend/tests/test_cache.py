@@ -0,0 +1,294 @@
+"""Tests del cache de dos niveles (L1 en memoria + Redis)."""
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.local_cache import LocalCache, InvalidationBus, MISSING
+
+
+class TestLocalCache:
+    """Tests para el LRU en memoria."""
+
+    def test_get_set(self):
+        l1 = LocalCache("test", max_entries=10, default_ttl=30)
+        assert l1.get("a") is MISSING
+
+        l1.set("a", {"score": 80})
+        assert l1.get("a") == {"score": 80}
+
+    def test_returns_copy_of_containers(self):
+        l1 = LocalCache("test")
+        l1.set("a", {"score": 80})
+
+        value = l1.get("a")
+        value["_cached"] = True
+
+        assert l1.get("a") == {"score": 80}
+
+    def test_lru_eviction(self):
+        l1 = LocalCache("test", max_entries=2)
+        l1.set("a", 1)
+        l1.set("b", 2)
+        l1.get("a")  # "a" pasa a ser la más reciente
+        l1.set("c", 3)
+
+        assert l1.get("b") is MISSING
+        assert l1.get("a") == 1
+        assert l1.get("c") == 3
+
+    def test_ttl_expiration(self):
+        l1 = LocalCache("test", default_ttl=30)
+        l1.set("a", 1, ttl=5)
+
+        with patch("app.core.local_cache.time.monotonic", return_value=time.monotonic() + 6):
+            assert l1.get("a") is MISSING
+        assert len(l1) == 0
+
+    def test_ttl_capped_by_default(self):
+        l1 = LocalCache("test", default_ttl=1)
+        l1.set("a", 1, ttl=86400)
+
+        with patch("app.core.local_cache.time.monotonic", return_value=time.monotonic() + 2):
+            assert l1.get("a") is MISSING
+
+    def test_delete_pattern(self):
+        l1 = LocalCache("test")
+        l1.set("jobs:list:1", 1)
+        l1.set("jobs:list:2", 2)
+        l1.set("job:1", 3)
+
+        assert l1.delete_pattern("jobs:list:*") == 2
+        assert l1.get("job:1") == 3
+
+
+class TestInvalidationBus:
+    """Tests para la propagación de invalidaciones entre workers."""
+
+    def test_remote_message_invalidates(self):
+        bus = InvalidationBus(redis_url="redis://localhost:6379/0")
+        l1 = LocalCache("app")
+        bus.register(l1)
+        l1.set("k", 1)
+
+        remote = InvalidationBus(redis_url="redis://localhost:6379/0")
+        assert bus.apply(remote.message("app", "key", "k")) is True
+        assert l1.get("k") is MISSING
+
+    def test_own_messages_ignored(self):
+        bus = InvalidationBus(redis_url="redis://localhost:6379/0")
+        l1 = LocalCache("app")
+        bus.register(l1)
+        l1.set("k", 1)
+
+        assert bus.apply(bus.message("app", "key", "k")) is False
+        assert l1.get("k") == 1
+
+    def test_pattern_and_clear(self):
+        bus = InvalidationBus(redis_url="redis://localhost:6379/0")
+        l1 = LocalCache("app")
+        bus.register(l1)
+        l1.set("candidates:list:1", 1)
+        l1.set("candidate:1", 2)
+
+        remote = InvalidationBus(redis_url="redis://localhost:6379/0")
+        bus.apply(remote.message("app", "pattern", "candidates:list:*"))
+        assert l1.get("candidates:list:1") is MISSING
+        assert l1.get("candidate:1") == 2
+
+        bus.apply(remote.message("app", "clear"))
+        assert len(l1) == 0
+
+    def test_invalid_message(self):
+        bus = InvalidationBus(redis_url="redis://localhost:6379/0")
+        assert bus.apply("not json") is False
+
+
+class TestTwoLevelCache:
+    """Tests del Cache con L1 delante de Redis."""
+
+    @pytest.fixture
+    def redis_mock(self):
+        r = MagicMock()
+        r.get = AsyncMock(return_value=json.dumps({"score": 80}))
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, 1])
+        pipe.publish = AsyncMock()
+        r.pipeline.return_value = pipe
+        r.publish = AsyncMock()
+        return r
+
+    @pytest.fixture
+    def two_level_cache(self, redis_mock):
+        from app.core.cache import Cache
+
+        c = Cache(name="test-two-level")
+        c._redis = redis_mock
+        return c
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self, two_level_cache, redis_mock):
+        assert await two_level_cache.get("matching:c:j") == {"score": 80}
+        assert await two_level_cache.get("matching:c:j") == {"score": 80}
+
+        assert redis_mock.get.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_set_populates_l1_and_publishes(self, two_level_cache, redis_mock):
+        await two_level_cache.set("k", {"score": 90}, ttl=60)
+
+        pipe = redis_mock.pipeline.return_value
+        pipe.set.assert_called_once()
+        pipe.publish.assert_awaited_once()
+        assert await two_level_cache.get("k") == {"score": 90}
+        redis_mock.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_delete_drops_l1(self, two_level_cache, redis_mock):
+        await two_level_cache.get("k")
+        await two_level_cache.delete("k")
+        await two_level_cache.get("k")
+
+        assert redis_mock.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hit_miss_metrics(self, two_level_cache):
+        from app.metrics import cache_requests_total
+
+        def count(tier, result):
+            return cache_requests_total.labels(
+                cache="test-two-level", tier=tier, result=result
+            )._value.get()
+
+        before = {k: count(*k) for k in [("l1", "miss"), ("l1", "hit"), ("redis", "hit")]}
+
+        await two_level_cache.get("m")
+        await two_level_cache.get("m")
+
+        assert count("l1", "miss") - before[("l1", "miss")] == 1
+        assert count("redis", "hit") - before[("redis", "hit")] == 1
+        assert count("l1", "hit") - before[("l1", "hit")] == 1
+
+
+class FakeRedis:
+    """Redis en memoria con los comandos que usa Cache para tags."""
+
+    def __init__(self):
+        self.data = {}
+        self.keys_calls = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def expire(self, key, seconds, nx=False, gt=False):
+        return key in self.data
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def rename(self, src, dst):
+        from redis.exceptions import ResponseError
+
+        if src not in self.data:
+            raise ResponseError("no such key")
+        self.data[dst] = self.data.pop(src)
+        return True
+
+    async def sscan_iter(self, key, count=None):
+        for member in list(self.data.get(key, ())):
+            yield member
+
+    async def scan_iter(self, match=None, count=None):
+        import fnmatch
+
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def keys(self, pattern):
+        self.keys_calls += 1
+        raise AssertionError("KEYS no debe usarse")
+
+    async def unlink(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, r):
+        self.r = r
+        self.calls = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return command
+
+    def __await__(self):
+        async def _self():
+            return self
+        return _self().__await__()
+
+    async def execute(self):
+        results = [await getattr(self.r, name)(*a, **kw) for name, a, kw in self.calls]
+        self.calls = []
+        return results
+
+
+class TestTagInvalidation:
+    """Tests de invalidación por tags (sin KEYS)."""
+
+    @pytest.fixture
+    def tagged_cache(self):
+        from app.core.cache import Cache
+
+        c = Cache(name="test-tags")
+        c._redis = FakeRedis()
+        return c
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags_only_touches_tagged_keys(self, tagged_cache):
+        await tagged_cache.set("candidates:list:1", [1], tags=["candidates:list"])
+        await tagged_cache.set("candidates:list:2", [2], tags=["candidates:list"])
+        await tagged_cache.set("candidate:1", {"id": 1})
+
+        deleted = await tagged_cache.invalidate_tags("candidates:list")
+
+        assert deleted == 2
+        assert await tagged_cache.get("candidates:list:1") is None
+        assert await tagged_cache.get("candidate:1") == {"id": 1}
+        assert not any(k.startswith("cache:tag:candidates:list") for k in tagged_cache._redis.data)
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags_in_batches(self, tagged_cache):
+        tagged_cache.INVALIDATION_BATCH_SIZE = 3
+        for i in range(7):
+            await tagged_cache.set(f"jobs:list:{i}", i, tags=["jobs:list"])
+
+        assert await tagged_cache.invalidate_tags("jobs:list") == 7
+
+    @pytest.mark.asyncio
+    async def test_invalidate_missing_tag(self, tagged_cache):
+        assert await tagged_cache.invalidate_tags("nope") == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_pattern_uses_scan(self, tagged_cache):
+        await tagged_cache.set("jobs:list:1", 1)
+        await tagged_cache.set("jobs:list:2", 2)
+
+        assert await tagged_cache.delete_pattern("jobs:list:*") == 2
+        assert tagged_cache._redis.keys_calls == 0
@@ -0,0 +1,100 @@
+"""Tests para el descifrado diferido de columnas EncryptedType."""
+import copy
+
+from prometheus_client import REGISTRY
+from sqlalchemy import inspect
+
+from app.core.database import EncryptedType
+from app.core.decryption import (
+    LazyDecrypted,
+    decrypt_many,
+    decryption_scope,
+    deferred_decryption,
+    reveal_all,
+)
+from app.core.security import encryption_manager
+from app.models.core_ats import HHCandidate
+from app.schemas.core_ats import CandidateBase
+
+
+def decryptions(mode, result="decrypted"):
+    return REGISTRY.get_sample_value(
+        "ats_decryptions_total", {"mode": mode, "result": result}
+    ) or 0
+
+
+class TestEncryptedType:
+    """Tests de la carga eager/diferida."""
+
+    def test_eager_by_default(self):
+        ciphertext = encryption_manager.encrypt("ana@b.cl")
+
+        assert EncryptedType().process_result_value(ciphertext, None) == "ana@b.cl"
+
+    def test_deferred_decrypts_on_first_access(self):
+        ciphertext = encryption_manager.encrypt("ana@b.cl")
+        with deferred_decryption():
+            value = EncryptedType().process_result_value(ciphertext, None)
+        before = decryptions("lazy")
+
+        assert isinstance(value, LazyDecrypted)
+        assert value and not value.is_decrypted
+        assert value == "ana@b.cl"
+        assert value.upper() == "ANA@B.CL"
+        assert decryptions("lazy") == before + 1
+        assert "ana" not in repr(value)
+
+    def test_unchanged_lazy_value_keeps_ciphertext(self):
+        value = LazyDecrypted(encryption_manager.encrypt("912345678"))
+
+        assert EncryptedType().process_bind_param(value, None) == value.ciphertext
+        assert not value.is_decrypted
+
+    def test_plain_legacy_value(self):
+        assert LazyDecrypted("sin cifrar") == "sin cifrar"
+
+    def test_copy(self):
+        value = LazyDecrypted(encryption_manager.encrypt("x"))
+
+        assert copy.deepcopy(value) == "x"
+
+
+class TestDecryptionCache:
+    """Tests del cache por request y el descifrado en bloque."""
+
+    def test_scope_caches_ciphertext(self):
+        ciphertext = encryption_manager.encrypt("ana@b.cl")
+        before = decryptions("eager")
+        with decryption_scope():
+            EncryptedType().process_result_value(ciphertext, None)
+            EncryptedType().process_result_value(ciphertext, None)
+
+        assert decryptions("eager") == before + 1
+        EncryptedType().process_result_value(ciphertext, None)
+        assert decryptions("eager") == before + 2
+
+    def test_decrypt_many(self):
+        a = encryption_manager.encrypt("a")
+        before = decryptions("bulk")
+
+        assert decrypt_many([a, None, a]) == ["a", None, "a"]
+        assert decryptions("bulk") == before + 1
+
+    def test_reveal_all_sets_committed_plaintext(self):
+        candidate = HHCandidate(full_name="Ana")
+        state = inspect(candidate)
+        candidate.__dict__["email"] = LazyDecrypted(encryption_manager.encrypt("ana@b.cl"))
+        candidate.__dict__["phone"] = LazyDecrypted(encryption_manager.encrypt("912345678"))
+        candidate.__dict__["national_id"] = LazyDecrypted(encryption_manager.encrypt("12345678K"))
+
+        reveal_all([candidate, None], "email", "phone")
+
+        assert candidate.email == "ana@b.cl" and type(candidate.email) is str
+        assert type(candidate.phone) is str
+        assert isinstance(candidate.national_id, LazyDecrypted)
+        assert not state.attrs.email.history.has_changes()
+
+    def test_schema_accepts_lazy_value(self):
+        data = CandidateBase(full_name="Ana", email=LazyDecrypted(encryption_manager.encrypt("ana@b.cl")))
+
+        assert data.email == "ana@b.cl"
@@ -0,0 +1,126 @@
+"""Tests del cache de extracción por hash de archivo."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.core.extraction_cache import ExtractionCache, file_sha256
+from app.pipeline.document_pipeline import DocumentPipeline
+from app.services.extraction.models import DocumentType, ExtractionResult
+from app.services.rhtools.resume_parser import ResumeParser
+
+FILE_HASH = "a" * 64
+
+
+class FakeCache:
+    """app.core.cache.cache en memoria."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=300, nx=False, tags=None):
+        self.data[key] = value
+        return True
+
+
+@pytest.fixture
+def fake_cache():
+    fake = FakeCache()
+    with patch("app.core.extraction_cache.cache", fake):
+        yield fake
+
+
+class TestExtractionCache:
+    """Tests de claves y versiones."""
+
+    @pytest.mark.asyncio
+    async def test_version_change_misses(self, fake_cache):
+        store = ExtractionCache()
+        await store.set("text", "1.0.0", FILE_HASH, {"text": "hola"})
+
+        assert await store.get("text", "1.0.0", FILE_HASH) == {"text": "hola"}
+        assert await store.get("text", "1.1.0", FILE_HASH) is None
+        assert await store.get("text", "1.0.0", "b" * 64) is None
+
+    @pytest.mark.asyncio
+    async def test_global_version_invalidates_everything(self, fake_cache):
+        store = ExtractionCache()
+        await store.set("parse", "2.0.0", FILE_HASH, {"text": "hola"})
+
+        with patch.object(settings, "EXTRACTION_CACHE_VERSION", "2"):
+            assert await store.get("parse", "2.0.0", FILE_HASH) is None
+
+    @pytest.mark.asyncio
+    async def test_without_hash_or_disabled_is_noop(self, fake_cache):
+        store = ExtractionCache()
+
+        assert not await store.set("text", "1.0.0", None, {"text": "hola"})
+        with patch.object(settings, "EXTRACTION_CACHE_ENABLED", False):
+            assert not await store.set("text", "1.0.0", FILE_HASH, {"text": "hola"})
+        assert fake_cache.data == {}
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_without_tags(self, fake_cache):
+        store = ExtractionCache()
+        fake_cache.set = AsyncMock(return_value=True)
+
+        await store.set("data:cv", "v", FILE_HASH, {"a": 1})
+
+        assert fake_cache.set.await_args.kwargs == {"ttl": settings.EXTRACTION_CACHE_TTL_SECONDS}
+        assert settings.EXTRACTION_CACHE_TTL_SECONDS <= 86400
+
+    def test_file_sha256(self, tmp_path):
+        path = tmp_path / "cv.txt"
+        path.write_bytes(b"hola")
+
+        assert file_sha256(str(path)) == (
+            "b221d9dbb083a7f33428d7c2a3c3198ae925614d70210e28716ccaa7cd4ddb79"
+        )
+
+
+class TestShortCircuit:
+    """Los servicios no re-extraen en un hit."""
+
+    @pytest.mark.asyncio
+    async def test_resume_parse_hit_skips_llm(self, fake_cache):
+        parser = ResumeParser()
+        parser.api_key = "sk-test"
+        result = {"parsed_data": {"name": "Ana"}, "confidence_score": 0.2,
+                  "model_used": parser.model, "tokens_used": 900}
+        parser._call_openai = AsyncMock(return_value=result)
+
+        first = await parser.parse_resume("doc-1", "texto del cv", file_hash=FILE_HASH)
+        second = await parser.parse_resume("doc-2", "otro texto", file_hash=FILE_HASH)
+
+        parser._call_openai.assert_awaited_once()
+        assert first == result
+        assert second["parsed_data"] == {"name": "Ana"}
+        assert second["tokens_used"] == 0 and second["cached"]
+
+    @pytest.mark.asyncio
+    async def test_pipeline_extraction_hit_skips_extractor(self, fake_cache):
+        pipeline = DocumentPipeline(MagicMock())
+        extracted = ExtractionResult(document_type=DocumentType.CV, confidence=0.8, data={"full_name": "Ana"})
+        pipeline._extract_data = AsyncMock(return_value=extracted)
+
+        first = await pipeline._extract_data_cached(DocumentType.CV, "texto", "doc-1", FILE_HASH)
+        second = await pipeline._extract_data_cached(DocumentType.CV, "texto", "doc-2", FILE_HASH)
+
+        pipeline._extract_data.assert_awaited_once()
+        assert second.data == first.data == {"full_name": "Ana"}
+        assert second.extractor_version == pipeline._extractor_version(DocumentType.CV)
+
+    @pytest.mark.asyncio
+    async def test_pipeline_extractor_bump_misses(self, fake_cache):
+        pipeline = DocumentPipeline(MagicMock())
+        extracted = ExtractionResult(document_type=DocumentType.CV, confidence=0.8)
+        pipeline._extract_data = AsyncMock(return_value=extracted)
+
+        await pipeline._extract_data_cached(DocumentType.CV, "texto", "doc-1", FILE_HASH)
+        pipeline.cv_extractor.VERSION = "9.9.9"
+        await pipeline._extract_data_cached(DocumentType.CV, "texto", "doc-1", FILE_HASH)
+
+        assert pipeline._extract_data.await_count == 2
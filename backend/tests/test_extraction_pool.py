@@ -0,0 +1,67 @@
+"""Tests para el pool de procesos de extracción de texto."""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.extraction_pool import ExtractionPool, ExtractionTimeoutError, run_extraction
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=1, timeout=10, memory_limit_mb=0, max_tasks_per_child=2)
+    yield pool
+    pool.shutdown()
+
+
+class TestExtractionPool:
+    """Tests del ExtractionPool."""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_process(self, pool):
+        assert await pool.run(pow, 2, 10) == 1024
+
+    @pytest.mark.asyncio
+    async def test_recycled_workers_keep_serving(self, pool):
+        # max_tasks_per_child=2: el worker se reemplaza entre llamadas
+        results = [await pool.run(pow, 2, n) for n in range(5)]
+
+        assert results == [1, 2, 4, 8, 16]
+
+    @pytest.mark.asyncio
+    async def test_timeout_interrupts_document_without_breaking_pool(self, pool):
+        executor = pool._get_executor()
+
+        with pytest.raises(ExtractionTimeoutError):
+            await pool.run(time.sleep, 5, timeout=0.3)
+
+        # El worker fue interrumpido por SIGALRM, no reemplazado
+        assert pool._executor is executor
+        assert await pool.run(pow, 3, 2) == 9
+
+    @pytest.mark.asyncio
+    async def test_queued_time_does_not_count_as_hang(self, pool):
+        executor = pool._get_executor()
+
+        # Con un solo worker, el segundo trabajo espera ~0.4 s antes de empezar
+        with patch("app.core.extraction_pool._HANG_GRACE_SECONDS", 0.2):
+            await asyncio.gather(
+                pool.run(time.sleep, 0.4, timeout=0.5),
+                pool.run(time.sleep, 0.4, timeout=0.5),
+            )
+
+        assert pool._executor is executor
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_propagate(self, pool):
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(divmod, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_runs_in_thread():
+    with patch("app.core.extraction_pool.settings") as mock_settings:
+        mock_settings.EXTRACTION_POOL_ENABLED = False
+
+        assert await run_extraction(pow, 2, 3) == 8
@@ -0,0 +1,143 @@
+"""Tests del modo streaming del LLM y su emisión por server-sent events."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.sse import field_events, sse_event
+from app.integrations.llm import IncrementalJSONParser, LLMClient
+from app.schemas import LLMConfig
+
+RESPONSE = (
+    '```json\n{"score": 82.5, "recommendation": "PROCEED", '
+    '"strengths": ["Python", "dice \\"hola\\""], '
+    '"skills_match": {"matched_skills": ["Django"], "nested": [1, {"a": 2}]}, '
+    '"red_flags": [], "ok": true}\n```'
+)
+
+
+def feed_in_chunks(parser, text, size):
+    fields = []
+    for i in range(0, len(text), size):
+        fields.extend(parser.feed(text[i:i + size]))
+    return fields
+
+
+class TestIncrementalJSONParser:
+    """Tests del parser incremental de JSON."""
+
+    @pytest.mark.parametrize("size", [1, 3, 17, len(RESPONSE)])
+    def test_emits_all_fields_for_any_chunking(self, size):
+        parser = IncrementalJSONParser()
+        fields = feed_in_chunks(parser, RESPONSE, size)
+
+        assert fields == list(json.loads(RESPONSE.strip("`json\n")).items())
+        assert parser.done
+
+    def test_score_available_before_object_closes(self):
+        parser = IncrementalJSONParser()
+
+        assert parser.feed('{"score": 71, "reco') == [("score", 71)]
+        assert parser.feed('mmendation": "REV') == []
+        assert parser.feed('IEW", "reasoning": "...') == [("recommendation", "REVIEW")]
+        assert not parser.done
+
+
+def sse_body(lines):
+    return "".join(f"data: {line}\n\n" for line in lines).encode()
+
+
+class TestLLMClientStreaming:
+    """Tests de LLMClient.stream_json contra respuestas SSE simuladas."""
+
+    async def stream(self, provider, body):
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, content=body)
+
+        client = LLMClient(LLMConfig(provider=provider, api_key="test"))
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client._initialized = True
+
+        seen = []
+
+        async def on_field(name, value):
+            seen.append((name, value))
+
+        try:
+            streamed = await client.stream_json("prompt", on_field, system="sys")
+        finally:
+            await client.close()
+        return streamed, seen, requests[0]
+
+    @pytest.mark.asyncio
+    async def test_openai(self):
+        text = '{"score": 90, "recommendation": "PROCEED"}'
+        body = sse_body(
+            [json.dumps({"choices": [{"delta": {"content": text[i:i + 5]}}]}) for i in range(0, len(text), 5)]
+            + [json.dumps({"choices": [], "usage": {"prompt_tokens": 120, "completion_tokens": 14}}), "[DONE]"]
+        )
+
+        streamed, seen, payload = await self.stream("openai", body)
+
+        assert seen == [("score", 90), ("recommendation", "PROCEED")]
+        assert streamed.data == {"score": 90, "recommendation": "PROCEED"}
+        assert (streamed.tokens_prompt, streamed.tokens_completion) == (120, 14)
+        assert payload["stream"] is True
+        assert payload["messages"][0] == {"role": "system", "content": "sys"}
+
+    @pytest.mark.asyncio
+    async def test_anthropic(self):
+        body = sse_body([
+            json.dumps({"type": "message_start", "message": {"usage": {"input_tokens": 50}}}),
+            json.dumps({"type": "content_block_delta", "delta": {"type": "text_delta", "text": '{"score": 4'}}),
+            json.dumps({"type": "content_block_delta", "delta": {"type": "text_delta", "text": '0}'}}),
+            json.dumps({"type": "message_delta", "usage": {"output_tokens": 6}}),
+            json.dumps({"type": "message_stop"}),
+        ])
+
+        streamed, seen, payload = await self.stream("anthropic", body)
+
+        assert seen == [("score", 40)]
+        assert (streamed.tokens_prompt, streamed.tokens_completion) == (50, 6)
+        assert payload["system"] == "sys"
+
+
+class TestFieldEvents:
+    """Tests de la conversión de callbacks a eventos SSE."""
+
+    @pytest.mark.asyncio
+    async def test_fields_then_result(self):
+        async def run(on_field):
+            await on_field("score", 80)
+            await asyncio.sleep(0)
+            await on_field("recommendation", "PROCEED")
+            return {"score": 80.0}
+
+        events = [event async for event in field_events(run)]
+
+        assert events == [
+            ("field", {"field": "score", "value": 80}),
+            ("field", {"field": "recommendation", "value": "PROCEED"}),
+            ("result", {"score": 80.0}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_error_propagates(self):
+        async def run(on_field):
+            await on_field("score", 10)
+            raise ValueError("boom")
+
+        events = []
+        with pytest.raises(ValueError):
+            async for event in field_events(run):
+                events.append(event)
+        assert events == [("field", {"field": "score", "value": 10})]
+
+    def test_sse_event_format(self):
+        assert sse_event("field", {"field": "score", "value": 1}) == (
+            'event: field\ndata: {"field": "score", "value": 1}\n\n'
+        )
@@ -72,8 +72,22 @@ class TestMatchingService:
         job.location = "Remote"
         job.employment_type = "full-time"
         job.job_description_document = None
+        job.job_description_file_id = None
         return job
     
+    @pytest_asyncio.fixture
+    def batch_service(self, matching_service, sample_job):
+        """MatchingService con los loaders en bloque del batch resueltos en memoria."""
+        matching_service._get_job_with_requirements = AsyncMock(
+            return_value=(sample_job, {"requirements": sample_job.requirements})
+        )
+        
+        async def load_candidates(candidate_ids):
+            return {str(cid): (Mock(extracted_skills=[]), "cv text") for cid in candidate_ids}
+        
+        matching_service._get_candidates_with_cv = AsyncMock(side_effect=load_candidates)
+        return matching_service
+    
     async def test_sanitize_input(self, matching_service):
         """Test de sanitización de inputs."""
         # Test normal text
@@ -227,6 +241,25 @@ class TestMatchingService:
         assert result["score"] == 85.0
         assert result["recommendation"] == "PROCEED"
     
+    async def test_call_openai_tracks_tokens_saved(self, matching_service):
+        """Test de métricas de tokens (incluidos los ahorrados por el presupuesto)."""
+        mock_client = AsyncMock()
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content=json.dumps({"score": 70.0})))]
+        mock_response.usage = Mock(prompt_tokens=900, completion_tokens=150)
+        mock_client.chat.completions.create.return_value = mock_response
+        matching_service._openai_client = mock_client
+        
+        with patch("app.metrics.track_llm_request") as track:
+            await matching_service._call_openai("test prompt", tokens_saved=420)
+        
+        kwargs = track.call_args.kwargs
+        assert kwargs["operation"] == "matching"
+        assert kwargs["tokens_prompt"] == 900
+        assert kwargs["tokens_completion"] == 150
+        assert kwargs["tokens_saved"] == 420
+        assert kwargs["success"] is True
+    
     async def test_call_openai_invalid_json(self, matching_service):
         """Test de error cuando OpenAI retorna JSON inválido."""
         from app.services.matching_service import OpenAIError
@@ -241,15 +274,15 @@ class TestMatchingService:
         with pytest.raises(OpenAIError):
             await matching_service._call_openai("test prompt")
     
-    async def test_batch_analyze(self, matching_service, sample_candidate, sample_job):
+    async def test_batch_analyze(self, batch_service, sample_candidate, sample_job):
         """Test de análisis batch."""
         # Mock analyze_match to avoid DB calls
-        matching_service.analyze_match = AsyncMock(return_value={
+        batch_service.analyze_match = AsyncMock(return_value={
             "score": 80.0,
             "recommendation": "PROCEED"
         })
         
-        results = await matching_service.batch_analyze(
+        results = await batch_service.batch_analyze(
             candidate_ids=[str(sample_candidate.id), str(uuid4())],
             job_id=str(sample_job.id),
             user_id=str(uuid4())
@@ -258,6 +291,277 @@ class TestMatchingService:
         assert len(results) == 2
         assert all("candidate_id" in r for r in results)
         assert all("success" in r for r in results)
+    
+    async def test_batch_analyze_preserves_order(self, batch_service):
+        """Test de que los resultados respetan el orden del request."""
+        import asyncio
+        
+        delays = {"c1": 0.03, "c2": 0.0, "c3": 0.01}
+        
+        async def fake_analyze(candidate_id, job_id, user_id=None, **kwargs):
+            await asyncio.sleep(delays[candidate_id])
+            return {"score": 80.0, "candidate_id": candidate_id}
+        
+        batch_service.analyze_match = fake_analyze
+        completed = []
+        
+        async def on_result(position, item):
+            completed.append(position)
+        
+        results = await batch_service.batch_analyze(
+            candidate_ids=["c1", "c2", "c3"],
+            job_id="j1",
+            concurrency=3,
+            on_result=on_result
+        )
+        
+        assert [r["candidate_id"] for r in results] == ["c1", "c2", "c3"]
+        # Los resultados parciales llegan en orden de finalización
+        assert completed == [1, 2, 0]
+    
+    async def test_batch_analyze_respects_concurrency(self, batch_service):
+        """Test de que nunca corren más análisis que el límite configurado."""
+        import asyncio
+        
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def fake_analyze(candidate_id, job_id, user_id=None, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"score": 80.0}
+        
+        batch_service.analyze_match = fake_analyze
+        
+        results = await batch_service.batch_analyze(
+            candidate_ids=[f"c{i}" for i in range(10)],
+            job_id="j1",
+            concurrency=3
+        )
+        
+        assert len(results) == 10
+        assert all(r["success"] for r in results)
+        assert max_in_flight == 3
+    
+    async def test_batch_analyze_concurrency_capped_by_rate_limiter(self, matching_service):
+        """Test de que la concurrencia no supera el presupuesto del LLMRateLimiter."""
+        limiter = Mock(requests_per_minute=2)
+        
+        assert matching_service._resolve_batch_concurrency(10, limiter) == 2
+        assert matching_service._resolve_batch_concurrency(1, limiter) == 1
+        assert matching_service._resolve_batch_concurrency(4) == 4
+    
+    async def test_batch_analyze_item_timeout(self, batch_service):
+        """Test de que el timeout y el rate limiter llegan a la llamada al LLM de cada candidato."""
+        seen = {}
+        
+        async def fake_analyze(candidate_id, job_id, user_id=None, **kwargs):
+            seen[candidate_id] = kwargs
+            if candidate_id == "broken":
+                raise ValueError("boom")
+            return {"score": 80.0}
+        
+        batch_service.analyze_match = fake_analyze
+        limiter = Mock(requests_per_minute=5)
+        
+        results = await batch_service.batch_analyze(
+            candidate_ids=["ok", "broken"],
+            job_id="j1",
+            item_timeout=0.05,
+            rate_limiter=limiter,
+            ip_address="10.0.0.1"
+        )
+        
+        assert results[0]["success"] is True
+        assert results[1] == {"candidate_id": "broken", "success": False, "error": "boom"}
+        assert seen["ok"]["llm_timeout"] == 0.05
+        assert seen["ok"]["rate_limiter"] is limiter
+        assert seen["ok"]["ip_address"] == "10.0.0.1"
+    
+    async def test_default_prompt_template_formats(self, matching_service):
+        """Test de que el template por defecto acepta los campos del prompt."""
+        prompt = matching_service._prompt_template.format(
+            cv_text="CV de prueba",
+            job_title="Backend Dev",
+            job_description="Descripción",
+            job_requirements="{}"
+        )
+
+        assert "CV de prueba" in prompt
+        assert "Título: Backend Dev" in prompt
+        assert '"score": 85.5' in prompt
+
+    async def test_analyze_match_timeout_and_rate_limit_cover_llm_call(self, matching_service, mock_cache):
+        """Test de que el timeout cubre solo la llamada al LLM y cada llamada consume el rate limiter."""
+        import asyncio
+        from app.services.matching_service import OpenAIError, RateLimitError
+        
+        async def slow_call(prompt, tokens_saved=0):
+            await asyncio.sleep(1)
+        
+        async def slow_cache_lookup(*args):
+            # Espera por BD/cache: no cuenta para el timeout
+            await asyncio.sleep(0.1)
+            return None
+        
+        matching_service._openai_client = Mock()
+        matching_service._call_openai = slow_call
+        matching_service._get_cached_result = slow_cache_lookup
+        matching_service._log_audit = AsyncMock()
+        budgeted = Mock(text="texto", tokens_saved=0)
+        matching_service._fit_prompt_inputs = Mock(return_value=(budgeted, budgeted))
+        limiter = Mock(check_rate_limit=AsyncMock(return_value={"allowed": True}))
+        kwargs = {
+            "candidate_data": (Mock(extracted_skills=[]), "cv text"),
+            "job_data": (Mock(), {"title": "Dev", "requirements": {}}),
+            "rate_limiter": limiter,
+            "ip_address": "10.0.0.1",
+        }
+        
+        with patch("app.core.single_flight.get_single_flight") as get_single_flight:
+            get_single_flight.return_value.do = lambda key, fn: fn()
+            
+            with pytest.raises(OpenAIError, match="Timeout tras 0.05s"):
+                await matching_service.analyze_match("c1", "j1", user_id="u1", llm_timeout=0.05, **kwargs)
+            limiter.check_rate_limit.assert_awaited_once_with("u1", "10.0.0.1")
+            
+            limiter.check_rate_limit.return_value = {"allowed": False, "violated": "minute", "retry_after": 60}
+            with pytest.raises(RateLimitError):
+                await matching_service.analyze_match("c1", "j1", user_id="u1", llm_timeout=0.05, **kwargs)
+
+    async def test_batch_analyze_prefilter_top_k(self, batch_service, mock_db):
+        """Test de que solo los top-K del pre-filtro llegan al LLM."""
+        rows = [
+            Mock(id="c1", extracted_skills=["Excel"], extracted_experience=1),
+            Mock(id="c2", extracted_skills=["Python", "React"], extracted_experience=5),
+            Mock(id="c3", extracted_skills=["python"], extracted_experience=[{}, {}]),
+        ]
+        db_result = Mock()
+        db_result.all.return_value = rows
+        mock_db.execute.return_value = db_result
+
+        analyzed = []
+
+        async def fake_analyze(candidate_id, job_id, user_id=None, **kwargs):
+            analyzed.append(candidate_id)
+            return {"score": 80.0}
+
+        batch_service.analyze_match = fake_analyze
+
+        results = await batch_service.batch_analyze(
+            candidate_ids=["c1", "c2", "c3"],
+            job_id="j1",
+            top_k=2
+        )
+
+        assert sorted(analyzed) == ["c2", "c3"]
+        assert results[0]["skipped"] is True
+        assert results[0]["success"] is False
+        assert results[1]["success"] is True
+        assert results[1]["prefilter_score"] == 100.0
+        assert results[1]["prefilter_score"] > results[2]["prefilter_score"] > results[0]["prefilter_score"]
+
+    async def test_batch_analyze_prefilter_disabled_for_small_batches(self, batch_service, mock_db):
+        """Test de que no se corre el pre-filtro si el batch cabe en top_k."""
+        batch_service.analyze_match = AsyncMock(return_value={"score": 80.0})
+
+        results = await batch_service.batch_analyze(
+            candidate_ids=["c1", "c2"],
+            job_id="j1",
+            top_k=5
+        )
+
+        assert all(r["success"] for r in results)
+        assert all("prefilter_score" not in r for r in results)
+        mock_db.execute.assert_not_called()
+
+    async def test_batch_analyze_prefilter_off_by_default(self, batch_service, mock_db):
+        """Test de que sin top_k en el request se analizan todos los candidatos."""
+        batch_service.analyze_match = AsyncMock(return_value={"score": 80.0})
+
+        results = await batch_service.batch_analyze(
+            candidate_ids=[f"c{i}" for i in range(40)],
+            job_id="j1"
+        )
+
+        assert len(results) == 40
+        assert all(r["success"] for r in results)
+        mock_db.execute.assert_not_called()
+
+    async def test_batch_analyze_loads_job_and_candidates_once(self, batch_service, sample_job):
+        """Test de que el batch carga el job y los candidatos una sola vez."""
+        batch_service.analyze_match = AsyncMock(return_value={"score": 80.0})
+
+        results = await batch_service.batch_analyze(
+            candidate_ids=["c1", "c2", "c3", "c1"],
+            job_id="j1",
+            top_k=0
+        )
+
+        assert all(r["success"] for r in results)
+        batch_service._get_job_with_requirements.assert_awaited_once_with("j1")
+        batch_service._get_candidates_with_cv.assert_awaited_once_with(["c1", "c2", "c3"])
+        for call in batch_service.analyze_match.await_args_list:
+            assert call.kwargs["job_data"][0] is sample_job
+            assert call.kwargs["candidate_data"][1] == "cv text"
+
+    async def test_batch_analyze_missing_candidate_and_job(self, batch_service):
+        """Test de candidatos inexistentes y job inexistente sin llamar al LLM."""
+        from app.services.matching_service import JobNotFoundError
+
+        batch_service.analyze_match = AsyncMock(return_value={"score": 80.0})
+        batch_service._get_candidates_with_cv.side_effect = None
+        batch_service._get_candidates_with_cv.return_value = {"c1": (Mock(), "cv")}
+
+        results = await batch_service.batch_analyze(candidate_ids=["c1", "c2"], job_id="j1")
+
+        assert results[0]["success"] is True
+        assert results[1] == {"candidate_id": "c2", "success": False, "error": "Candidato c2 no encontrado"}
+
+        batch_service._get_job_with_requirements.side_effect = JobNotFoundError("Job j1 no encontrado")
+        results = await batch_service.batch_analyze(candidate_ids=["c1", "c2"], job_id="j1")
+
+        assert [r["error"] for r in results] == ["Job j1 no encontrado"] * 2
+        assert batch_service.analyze_match.await_count == 1
+
+    async def test_get_candidates_with_cv_constant_queries(self, matching_service, mock_db):
+        """Test de carga en bloque: queries constantes sin importar documentos."""
+        doc_ids = [uuid4() for _ in range(4)]
+        with_cv = Mock(
+            id="c1", raw_data={"name": "Ana"},
+            documents=[
+                Mock(id=doc_ids[0], document_type="cover_letter"),
+                Mock(id=doc_ids[1], document_type="cv"),
+                Mock(id=doc_ids[2], document_type="resume"),
+            ]
+        )
+        without_docs = Mock(
+            id="c2", raw_data=None, documents=[], full_name="Luis",
+            extracted_skills=["SQL"], extracted_experience=None, extracted_education=None
+        )
+        no_extraction = Mock(
+            id="c3", raw_data={"name": "Eva"},
+            documents=[Mock(id=doc_ids[3], document_type="cv")]
+        )
+
+        candidates_result = Mock()
+        candidates_result.scalars.return_value.all.return_value = [with_cv, without_docs, no_extraction]
+        extractions_result = Mock()
+        extractions_result.all.return_value = [
+            Mock(document_id=doc_ids[2], extracted_text="Resume text"),
+            Mock(document_id=doc_ids[2], extracted_text="Older resume text"),
+        ]
+        mock_db.execute.side_effect = [candidates_result, extractions_result]
+
+        loaded = await matching_service._get_candidates_with_cv(["c1", "c2", "c3"])
+
+        assert mock_db.execute.await_count == 2
+        assert loaded["c1"][1] == "Resume text"
+        assert loaded["c2"][1] == "Nombre: Luis\nSkills: SQL"
+        assert loaded["c3"][1] == json.dumps({"name": "Eva"})
 
 
 class TestMatchingAPI:
@@ -310,6 +614,45 @@ class TestMatchingAPI:
                 job_id=str(uuid4())
             )
 
+    async def test_stream_batch_items_never_hangs(self):
+        """Test de que el stream emite un error si un item no se puede construir o el batch falla."""
+        from app.api.matching import stream_batch_items
+        
+        async def run_batch(on_result):
+            await on_result(0, {"candidate_id": "c1", "success": True, "result": {"bogus": 1}})
+            raise RuntimeError("boom")
+        
+        items = []
+        with pytest.raises(RuntimeError):
+            async for item in stream_batch_items(run_batch, 2):
+                items.append(item)
+        
+        assert len(items) == 1
+        assert items[0].success is False
+        assert items[0].candidate_id == "c1"
+        assert "Resultado inválido" in items[0].error
+    
+    async def test_stream_batch_items_cancels_batch_on_close(self):
+        """Test de que cerrar el stream (cliente desconectado) cancela el batch."""
+        import asyncio
+        from app.api.matching import stream_batch_items
+        
+        cancelled = asyncio.Event()
+        
+        async def run_batch(on_result):
+            await on_result(0, {"candidate_id": "c1", "success": False, "error": "x"})
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        stream = stream_batch_items(run_batch, 2)
+        assert (await stream.__anext__()).candidate_id == "c1"
+        await stream.aclose()
+        
+        assert cancelled.is_set()
+
 
 class TestMatchingIntegration:
     """Tests de integración para el flujo completo de matching."""
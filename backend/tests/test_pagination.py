@@ -0,0 +1,190 @@
+"""Tests de la paginación keyset (app.core.pagination)."""
+import base64
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import (
+    InvalidCursorError, Keyset, decode_cursor, encode_cursor, estimate_count
+)
+from app.models.core_ats import HHApplication, HHAuditLog
+
+SCORE = Keyset("score", HHApplication.overall_score, HHApplication.application_id)
+DATE = Keyset("date", HHApplication.created_at, HHApplication.application_id)
+
+
+def compile_sql(clause):
+    return str(clause.compile(dialect=postgresql.dialect())).replace("\n", " ")
+
+
+def make_application(score, created_at=datetime(2024, 5, 1)):
+    return SimpleNamespace(
+        application_id=uuid.uuid4(), overall_score=score, created_at=created_at
+    )
+
+
+def make_db(items=None, scalar=None):
+    result = Mock()
+    result.scalars.return_value.all.return_value = items or []
+    result.unique.return_value = result
+    result.scalar.return_value = scalar
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+class TestCursor:
+    """Tests del formato de cursor."""
+
+    def test_round_trip_keeps_types(self):
+        values = [datetime(2024, 5, 1, 12, 30), uuid.uuid4(), Decimal("87.50"), None]
+
+        assert decode_cursor(encode_cursor("date", values), "date") == values
+
+    def test_rejects_cursor_of_other_sort(self):
+        cursor = encode_cursor("score", [Decimal("80"), uuid.uuid4()])
+
+        with pytest.raises(InvalidCursorError, match="ordenamiento"):
+            decode_cursor(cursor, "date")
+
+    def test_rejects_garbage(self):
+        for cursor in ("no-es-un-cursor", "e30", encode_cursor("date", [{"zz": 1}])):
+            with pytest.raises(InvalidCursorError):
+                decode_cursor(cursor, "date")
+
+
+class TestKeyset:
+    """Tests del orden y el predicado de continuación."""
+
+    def test_non_nullable_key_uses_row_comparison(self):
+        sql = compile_sql(DATE.after(datetime(2024, 5, 1), uuid.uuid4()))
+
+        assert sql.startswith("(hh_applications.created_at, hh_applications.application_id) <")
+
+    def test_candidate_and_job_keysets_match_their_index(self):
+        from app.services.candidate_service import CANDIDATES_KEYSET
+        from app.services.job_service import JOBS_KEYSET
+
+        for keyset, table in ((CANDIDATES_KEYSET, "candidates"), (JOBS_KEYSET, "job_openings")):
+            order = [compile_sql(clause) for clause in keyset.order_by()]
+            sql = compile_sql(keyset.after(datetime(2024, 5, 1), uuid.uuid4()))
+
+            assert order == [f"{table}.created_at DESC", f"{table}.id DESC"]
+            assert sql.startswith(f"({table}.created_at, {table}.id) <")
+
+    @pytest.mark.asyncio
+    async def test_job_list_rejects_stale_cursor(self):
+        from app.services.job_service import JobService
+
+        # Formato previo a Keyset: {"created_at": "..."}
+        legacy = base64.urlsafe_b64encode(json.dumps({"created_at": "2024-05-01T00:00:00"}).encode()).decode()
+        service = JobService(make_db())
+
+        with pytest.raises(InvalidCursorError):
+            await service.list_jobs_cursor(cursor=legacy)
+
+    def test_nullable_key_puts_nulls_last(self):
+        order = [compile_sql(clause) for clause in SCORE.order_by()]
+        sql = compile_sql(SCORE.after(Decimal("80"), uuid.uuid4()))
+
+        assert order == [
+            "hh_applications.overall_score DESC NULLS LAST",
+            "hh_applications.application_id DESC",
+        ]
+        assert "hh_applications.overall_score IS NULL" in sql
+        assert " OR " in sql
+
+    def test_after_null_key_only_walks_nulls(self):
+        sql = compile_sql(SCORE.after(None, uuid.uuid4()))
+
+        assert sql == (
+            "hh_applications.overall_score IS NULL AND "
+            "hh_applications.application_id < %(application_id_1)s::UUID"
+        )
+
+    def test_apply_replaces_previous_order(self):
+        query = select(HHApplication).order_by(HHApplication.stage)
+
+        sql = compile_sql(DATE.apply(query, None, 20))
+
+        assert "ORDER BY hh_applications.created_at DESC, hh_applications.application_id DESC" in sql
+        assert "stage" not in sql.split("ORDER BY")[1]
+
+    @pytest.mark.asyncio
+    async def test_fetch_cursor_points_at_last_returned_item(self):
+        items = [make_application(Decimal(s)) for s in ("90", "85", "85")]
+        db = make_db(items)
+
+        page = await SCORE.fetch(db, select(HHApplication), None, limit=2)
+
+        assert page.items == items[:2]
+        assert decode_cursor(page.next_cursor, "score") == [
+            Decimal("85"), items[1].application_id
+        ]
+
+    @pytest.mark.asyncio
+    async def test_fetch_last_page_has_no_cursor(self):
+        page = await SCORE.fetch(make_db([make_application(None)]), select(HHApplication), None, limit=2)
+
+        assert page.next_cursor is None
+        assert not page.has_next
+
+    def test_next_cursor_for_list_results(self):
+        items = [make_application(Decimal("70")) for _ in range(3)]
+
+        assert SCORE.next_cursor(items, 3) == SCORE.cursor_for(items[-1])
+        assert SCORE.next_cursor(items[:2], 3) is None
+
+
+class TestEstimateCount:
+    """Tests del total estimado."""
+
+    @pytest.mark.asyncio
+    async def test_unfiltered_uses_planner_estimate(self):
+        db = make_db(scalar=125000)
+
+        assert await estimate_count(db, select(HHAuditLog)) == 125000
+        assert "pg_class" in str(db.execute.await_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_filtered_count_is_cached(self):
+        db = make_db(scalar=42)
+        query = select(HHAuditLog).where(HHAuditLog.entity_type == "application")
+
+        with patch("app.core.pagination.cache") as cache:
+            cache.get = AsyncMock(return_value=None)
+            cache.set = AsyncMock()
+            assert await estimate_count(db, query) == 42
+            key = cache.set.await_args.args[0]
+
+            cache.get = AsyncMock(return_value=42)
+            assert await estimate_count(db, query) == 42
+
+        assert key.startswith("count:")
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_candidate_list_total_is_tagged(self):
+        from app.core.cache import CANDIDATES_LIST_TAG, invalidate_candidate_cache
+
+        db = make_db(scalar=7)
+        query = select(HHAuditLog).where(HHAuditLog.entity_type == "candidate")
+
+        with patch("app.core.pagination.cache") as cache:
+            cache.get = AsyncMock(return_value=None)
+            cache.set = AsyncMock()
+            await estimate_count(db, query, tags=[CANDIDATES_LIST_TAG])
+
+        assert cache.set.await_args.kwargs["tags"] == [CANDIDATES_LIST_TAG]
+        with patch("app.core.cache.cache") as cache:
+            cache.delete = AsyncMock()
+            cache.invalidate_tags = AsyncMock()
+            await invalidate_candidate_cache("c-1")
+        cache.invalidate_tags.assert_awaited_once_with(CANDIDATES_LIST_TAG)
@@ -0,0 +1,100 @@
+"""Tests para el ruteo de lecturas a réplicas."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.database import Replica, ReplicaRouter, async_session_maker, get_read_db
+
+
+def make_replica(name):
+    engine = create_async_engine(f"postgresql+asyncpg://user:pass@{name}/ats_db")
+    return Replica(name, engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+
+
+def make_router(lags, max_lag=5.0, check_interval=60.0):
+    """Router con réplicas cuyo lag (o excepción) viene de `lags`."""
+    replicas = [make_replica(name) for name in lags]
+    by_engine = {replica.engine: lags[replica.name] for replica in replicas}
+    calls = []
+
+    async def probe(engine):
+        calls.append(engine)
+        lag = by_engine[engine]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    router = ReplicaRouter(replicas, max_lag=max_lag, check_interval=check_interval, probe=probe)
+    return router, replicas, calls
+
+
+class TestReplicaRouter:
+    """Tests de la elección de réplica."""
+
+    @pytest.mark.asyncio
+    async def test_round_robin_over_healthy_replicas(self):
+        router, replicas, _ = make_router({"r1": 0.5, "r2": 1.0})
+
+        makers = [await router.session_maker() for _ in range(4)]
+
+        assert makers == [replicas[0].session_maker, replicas[1].session_maker] * 2
+
+    @pytest.mark.asyncio
+    async def test_skips_lagging_and_unreachable_replicas(self):
+        router, replicas, _ = make_router({"r1": 30.0, "r2": ConnectionRefusedError(), "r3": 0.0})
+
+        assert await router.session_maker() is replicas[2].session_maker
+        assert replicas[1].lag is None
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_primary(self):
+        router, _, _ = make_router({"r1": 30.0})
+
+        assert await router.session_maker() is async_session_maker
+        assert await ReplicaRouter([], 5.0, 5.0).session_maker() is async_session_maker
+
+    @pytest.mark.asyncio
+    async def test_lag_is_checked_once_per_interval(self):
+        router, replicas, calls = make_router({"r1": 0.0})
+
+        for _ in range(3):
+            await router.session_maker()
+        assert len(calls) == 1
+
+        router.check_interval = 0
+        await router.session_maker()
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_probe_times_out(self):
+        router, replicas, _ = make_router({"r1": 0.0})
+
+        async def hang(engine):
+            await asyncio.sleep(10)
+
+        router._probe = hang
+        with patch.object(database, "REPLICA_CHECK_TIMEOUT", 0.01):
+            assert await router.session_maker() is async_session_maker
+
+
+class TestGetReadDb:
+    """Tests de la dependency de sólo lectura."""
+
+    @pytest.mark.asyncio
+    async def test_session_is_bound_to_replica(self):
+        router, replicas, _ = make_router({"r1": 0.0})
+
+        with patch.object(database, "read_router", router):
+            dependency = get_read_db()
+            session = await dependency.__anext__()
+            assert session.bind is replicas[0].engine
+            await dependency.aclose()
+
+    def test_replica_urls_setting(self):
+        settings = database.settings.model_copy(update={"DATABASE_REPLICA_URLS": " postgresql://a/db, ,postgresql://b/db"})
+
+        assert settings.get_replica_urls() == ["postgresql://a/db", "postgresql://b/db"]
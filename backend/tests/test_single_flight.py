@@ -0,0 +1,190 @@
+"""Tests de coalescencia de llamadas LLM en vuelo (single-flight)."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+class FakePubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.queue = asyncio.Queue()
+        self.channels = set()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self.broker.subscribers.append(self)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def close(self):
+        if self in self.broker.subscribers:
+            self.broker.subscribers.remove(self)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FakeRedis:
+    """Redis en memoria compartido entre 'workers' del test."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def publish(self, channel, message):
+        for sub in list(self.subscribers):
+            if channel in sub.channels:
+                sub.queue.put_nowait({"type": "message", "data": message})
+        return 1
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipe:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                def command(*args, **kwargs):
+                    self.calls.append((name, args, kwargs))
+                    return self
+                return command
+
+            async def execute(self):
+                return [await getattr(redis, n)(*a, **kw) for n, a, kw in self.calls]
+
+        return Pipe()
+
+
+def make_flight(redis):
+    flight = SingleFlight(redis_url="redis://test", lock_ttl=30, wait_timeout=5, poll_interval=0.01)
+    flight._redis = redis
+    return flight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_in_process_share_one_call():
+    flight = make_flight(FakeRedis())
+    calls = 0
+
+    async def llm_call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"score": 80}
+
+    results = await asyncio.gather(*(flight.do("k", llm_call) for _ in range(5)))
+
+    assert calls == 1
+    assert all(r == {"score": 80} for r in results)
+    # Cada caller recibe su propia copia
+    results[1]["score"] = 0
+    assert results[2]["score"] == 80
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_across_workers_share_one_call():
+    redis = FakeRedis()
+    worker_a, worker_b = make_flight(redis), make_flight(redis)
+    calls = 0
+
+    async def llm_call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"score": 72}
+
+    result_a, result_b = await asyncio.gather(
+        worker_a.do("k", llm_call),
+        worker_b.do("k", llm_call),
+    )
+
+    assert calls == 1
+    assert result_a == result_b == {"score": 72}
+    assert "singleflight:lock:k" not in redis.data
+
+
+@pytest.mark.asyncio
+async def test_followers_run_call_when_leader_fails():
+    redis = FakeRedis()
+    worker_a, worker_b = make_flight(redis), make_flight(redis)
+    attempts = []
+
+    async def failing_call():
+        attempts.append("a")
+        await asyncio.sleep(0.02)
+        raise RuntimeError("OpenAI down")
+
+    async def ok_call():
+        attempts.append("b")
+        return {"score": 60}
+
+    results = await asyncio.gather(
+        worker_a.do("k", failing_call),
+        worker_b.do("k", ok_call),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == {"score": 60}
+    assert attempts == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable_runs_directly():
+    flight = make_flight(FakeRedis())
+
+    async def broken_set(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    flight._redis.set = broken_set
+
+    async def llm_call():
+        return {"score": 50}
+
+    assert await flight.do("k", llm_call) == {"score": 50}
+
+
+@pytest.mark.asyncio
+async def test_disabled_bypasses_coalescing():
+    flight = make_flight(FakeRedis())
+    calls = 0
+
+    async def llm_call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {}
+
+    with patch("app.core.single_flight.settings.SINGLE_FLIGHT_ENABLED", False):
+        await asyncio.gather(flight.do("k", llm_call), flight.do("k", llm_call))
+
+    assert calls == 2
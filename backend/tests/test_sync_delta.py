@@ -0,0 +1,165 @@
+"""Tests para la sync delta por huellas de registro."""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.integrations.base import SyncResult
+from app.integrations.delta import DeltaEngine
+from app.integrations.odoo_connector import OdooConnector
+from app.integrations.upsert import ExternalKey, content_hash
+from app.integrations.zoho_recruit import ZohoRecruitConnector
+from app.schemas import OdooConfig, ZohoConfig
+
+KEY = ExternalKey("zoho_candidate_id", "zoho")
+
+
+def mock_db():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+def engine_with(known, key=KEY, entity="candidates"):
+    engine = DeltaEngine(entity, key)
+    engine.known = dict(known)
+    return engine
+
+
+class TestDeltaEngine:
+    """Tests del motor de huellas."""
+
+    def test_unchanged_record_is_skipped(self):
+        record = {"zoho_candidate_id": "z1", "full_name": "Ana"}
+        engine = engine_with({"z1": (None, content_hash(record))})
+
+        assert engine.is_unchanged(dict(record))
+        assert not engine.is_unchanged({"zoho_candidate_id": "z1", "full_name": "Ana María"})
+        assert not engine.is_unchanged({"zoho_candidate_id": "z2", "full_name": "Luis"})
+        assert engine.seen == {"z1", "z2"}
+
+    def test_record_without_id_is_never_skipped(self):
+        engine = engine_with({})
+
+        assert not engine.is_unchanged({"full_name": "Sin ID"})
+        assert engine.seen == set()
+
+    def test_stale_ids_compare_modified_time(self):
+        engine = engine_with({
+            "1": (datetime(2026, 10, 1, 10), "h1"),
+            "2": (datetime(2026, 10, 1, 10), "h2"),
+        })
+
+        stale = engine.stale_ids([
+            (1, "2026-10-01 10:00:00"),
+            (2, "2026-10-02 09:00:00"),
+            (3, "2026-10-02 09:00:00"),
+        ])
+
+        assert stale == ["2", "3"]
+        assert engine.seen == {"1", "2", "3"}
+
+    @pytest.mark.asyncio
+    async def test_save_writes_pending_fingerprints(self):
+        engine = engine_with({})
+        record = {"zoho_candidate_id": "z1", "full_name": "Ana", "updated_at": "2026-10-01T10:00:00+00:00"}
+        engine.is_unchanged(record)
+        db = mock_db()
+
+        await engine.save(db, [record, {"full_name": "Sin ID"}])
+
+        rows = db.execute.await_args.args[1]
+        assert rows == [{
+            "source": "zoho",
+            "entity": "candidates",
+            "external_id": "z1",
+            "modified_at": datetime(2026, 10, 1, 10),
+            "content_hash": content_hash(record),
+            "synced_at": rows[0]["synced_at"],
+        }]
+        db.commit.assert_awaited_once()
+        assert engine.is_unchanged(record)
+
+    @pytest.mark.asyncio
+    async def test_save_failure_is_not_fatal(self):
+        engine = engine_with({})
+        record = {"zoho_candidate_id": "z1"}
+        engine.is_unchanged(record)
+        db = mock_db()
+        db.execute.side_effect = RuntimeError("db down")
+
+        await engine.save(db, [record])
+
+        db.rollback.assert_awaited_once()
+        assert "z1" not in engine.known
+
+    @pytest.mark.asyncio
+    async def test_deletes_are_id_set_diff(self):
+        engine = engine_with({"z1": (None, "h"), "z2": (None, "h"), "z3": (None, "h")})
+        db = mock_db()
+
+        result = await engine.apply_deletes(db, ["z1", "z2", "z9"])
+
+        assert result.items_deleted == 1
+        assert set(engine.known) == {"z1", "z2"}
+        # UPDATE del registro + DELETE de la huella
+        assert db.execute.await_count == 2
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_suspicious_listing_is_not_applied(self):
+        engine = engine_with({f"z{i}": (None, "h") for i in range(40)})
+        db = mock_db()
+
+        empty = await engine.apply_deletes(db, [])
+        partial = await engine.apply_deletes(db, ["z1", "z2"])
+
+        assert empty.items_deleted == partial.items_deleted == 0
+        assert empty.warnings and partial.warnings
+        db.execute.assert_not_awaited()
+        assert len(engine.known) == 40
+
+
+class TestConnectorDelta:
+    """Tests de los conectores con huellas."""
+
+    @pytest.mark.asyncio
+    async def test_zoho_batch_skips_unchanged_before_db(self):
+        connector = ZohoRecruitConnector(MagicMock(), ZohoConfig(client_id="id", client_secret="s", refresh_token="t"))
+        page = [{"id": "1", "First_Name": "Ana"}, {"id": "2", "First_Name": "Luis"}]
+        unchanged = connector._map_candidate_fields(page[0])
+        unchanged["zoho_candidate_id"] = "1"
+        engine = engine_with({"1": (None, content_hash(unchanged))})
+        engine.save = AsyncMock()
+
+        with patch("app.integrations.zoho_recruit.lookup_ids", AsyncMock(return_value={})) as lookup, \
+                patch("app.integrations.zoho_recruit.upsert_page",
+                      AsyncMock(return_value=SyncResult(success=True, items_processed=1))) as upsert:
+            result = await connector._process_candidates_batch(page, MagicMock(), engine)
+
+        written = upsert.await_args.args[2]
+        assert [record["zoho_candidate_id"] for record in written] == ["2"]
+        assert result.items_unchanged == 1 and result.items_processed == 1
+        engine.save.assert_awaited_once()
+        assert list(lookup.await_args.args[2]) == [None]
+
+    @pytest.mark.asyncio
+    async def test_odoo_reads_only_modified_ids(self):
+        config = OdooConfig(url="https://odoo.test", database="db", username="sync@example.com", api_key="k")
+        connector = OdooConnector(MagicMock(), config)
+        engine = engine_with({"1": (datetime(2026, 10, 1, 10), "h")}, ExternalKey("external_id", "odoo"), "jobs")
+        listing = [
+            {"id": 1, "write_date": "2026-10-01 10:00:00"},
+            {"id": 2, "write_date": "2026-10-02 10:00:00"},
+        ]
+        connector._execute_kw = AsyncMock(side_effect=[listing, [{"id": 2, "name": "Backend"}]])
+        connector._process_jobs_batch = AsyncMock(return_value=SyncResult(success=True, items_processed=1))
+
+        result = await connector.sync_jobs(full_sync=True, delta=engine)
+
+        assert connector._execute_kw.await_args_list[0].args[1] == "search_read"
+        assert connector._execute_kw.await_args_list[1].args[2] == [[2]]
+        assert result.items_unchanged == 1 and result.items_processed == 1
+        assert engine.seen == {"1", "2"}
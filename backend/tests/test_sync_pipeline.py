@@ -0,0 +1,191 @@
+"""Tests para el pipeline de páginas de la sincronización externa."""
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.integrations.base import SyncResult
+from app.integrations.pipeline import run_page_pipeline
+from app.integrations.zoho_recruit import ZohoRecruitConnector
+from app.schemas import ZohoConfig
+from app.services.sync_service import SyncService, SyncSource
+
+
+def pages_of(*sizes):
+    """fetch_page que devuelve páginas con los tamaños dados y registra las llamadas."""
+    calls = []
+
+    async def fetch(number):
+        calls.append(number)
+        await asyncio.sleep(0)
+        if number > len(sizes):
+            return []
+        return [{"page": number, "i": i} for i in range(sizes[number - 1])]
+
+    return fetch, calls
+
+
+def processed(delays=None):
+    """process_page que tarda delays[página] y cuenta un registro procesado por fila."""
+    async def process(records):
+        await asyncio.sleep((delays or {}).get(records[0]["page"], 0))
+        return SyncResult(success=True, items_processed=len(records))
+    return process
+
+
+class TestRunPagePipeline:
+    """Tests del productor/consumidor."""
+
+    @pytest.mark.asyncio
+    async def test_processes_all_pages(self):
+        fetch, calls = pages_of(2, 2, 1)
+
+        result = await run_page_pipeline(fetch, processed(), per_page=2, consumers=2)
+
+        assert result.success
+        assert result.items_processed == 5
+        assert result.metadata["pages"] == 3
+        assert calls == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_fetch_overlaps_processing(self):
+        fetch, calls = pages_of(2, 2, 2, 1)
+        fetched_while_processing = []
+
+        async def process(records):
+            await asyncio.sleep(0.01)
+            fetched_while_processing.append(len(calls))
+            return SyncResult(success=True)
+
+        await run_page_pipeline(fetch, process, per_page=2, prefetch=2)
+
+        # Al terminar la página 1 ya se habían descargado las siguientes
+        assert fetched_while_processing[0] > 1
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_follow_page_order(self):
+        fetch, _ = pages_of(2, 2, 2, 1)
+        saved = []
+
+        async def checkpoint(records):
+            saved.append(records[0]["page"])
+
+        # La página 1 termina última
+        await run_page_pipeline(
+            fetch, processed({1: 0.03}), per_page=2, prefetch=3, consumers=3, checkpoint=checkpoint
+        )
+
+        assert saved == [1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_stop_at_failed_page(self):
+        fetch, _ = pages_of(1, 1, 1, 1)
+        saved = []
+
+        async def process(records):
+            page = records[0]["page"]
+            await asyncio.sleep(0.01 if page == 4 else 0)
+            return SyncResult(success=page != 2, items_processed=1)
+
+        async def checkpoint(records):
+            saved.append(records[0]["page"])
+
+        result = await run_page_pipeline(
+            fetch, process, per_page=1, prefetch=3, consumers=2, checkpoint=checkpoint
+        )
+
+        assert not result.success
+        assert result.items_processed == 4
+        assert saved == [1]
+
+    @pytest.mark.asyncio
+    async def test_fetch_error_keeps_fetched_pages(self):
+        async def fetch(number):
+            if number == 3:
+                raise ConnectionError("timeout")
+            return [{"page": number}]
+
+        saved = []
+
+        async def checkpoint(records):
+            saved.append(records[0]["page"])
+
+        result = await run_page_pipeline(fetch, processed(), per_page=1, checkpoint=checkpoint)
+
+        assert not result.success
+        assert result.items_processed == 2
+        assert result.errors == ["timeout"]
+        assert saved == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_consumer_error_stops_producer(self):
+        fetch, calls = pages_of(*[1] * 50)
+
+        async def process(records):
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await run_page_pipeline(fetch, process, per_page=1, prefetch=1)
+
+        assert len(calls) < 50
+
+
+class TestZohoPipeline:
+    """Tests de la sync de Zoho sobre el pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_pages_use_own_sessions_and_checkpoint(self):
+        config = ZohoConfig(client_id="id", client_secret="secret", refresh_token="token")
+        sessions = []
+
+        def session_factory():
+            session = MagicMock()
+            session.__aenter__ = AsyncMock(return_value=session)
+            session.__aexit__ = AsyncMock(return_value=False)
+            sessions.append(session)
+            return session
+
+        connector = ZohoRecruitConnector(MagicMock(), config, session_factory=session_factory)
+        page = [
+            {"id": "1", "Modified_Time": "2026-10-01T10:00:00+00:00"},
+            {"id": "2", "Modified_Time": "2026-10-01T12:00:00+00:00"},
+        ]
+        checkpoint = AsyncMock()
+
+        with patch.object(connector, "_fetch_jobs_page", AsyncMock(side_effect=[page, []])), \
+                patch.object(connector, "_process_jobs_batch", AsyncMock(return_value=SyncResult(success=True, items_processed=2))) as process:
+            result = await connector.sync_jobs(checkpoint=checkpoint)
+
+        assert result.success and result.items_processed == 2
+        assert process.await_args.args[1] is sessions[0]
+        checkpoint.assert_awaited_once_with(datetime(2026, 10, 1, 11, 59, 59))
+
+
+class TestResume:
+    """Tests de la reanudación desde checkpoints."""
+
+    @pytest.mark.asyncio
+    async def test_resume_from_later_checkpoint(self):
+        service = SyncService()
+        last_sync = datetime(2026, 10, 1)
+        checkpoint = datetime(2026, 10, 2)
+
+        with patch("app.services.sync_service.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=checkpoint.isoformat())
+
+            assert await service._resume_from(SyncSource.ZOHO, "jobs", last_sync, True) == checkpoint
+            assert await service._resume_from(SyncSource.ZOHO, "jobs", None, True) == checkpoint
+            assert await service._resume_from(SyncSource.ODOO, "jobs", last_sync, False) == last_sync
+            mock_cache.get.assert_awaited_with("sync:last:zoho:jobs")
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_callback_stores_per_entity(self):
+        service = SyncService()
+
+        with patch("app.services.sync_service.cache") as mock_cache:
+            mock_cache.set = AsyncMock()
+
+            await service._checkpoint(SyncSource.ZOHO, "candidates")(datetime(2026, 10, 2))
+
+            assert mock_cache.set.await_args.args[:2] == ("sync:last:zoho:candidates", "2026-10-02T00:00:00")
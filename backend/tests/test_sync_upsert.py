@@ -0,0 +1,217 @@
+"""Tests para el upsert por página de la sincronización Zoho/Odoo."""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.integrations.base import SyncResult
+from app.integrations.odoo_connector import OdooConnector
+from app.integrations.upsert import (
+    ExternalKey,
+    content_hash,
+    lookup_ids,
+    prepare_rows,
+    upsert_page,
+    upsert_statement,
+)
+from app.models.candidate import Candidate
+from app.models.job import JobOpening
+from app.schemas import OdooConfig
+
+KEY = ExternalKey("zoho_candidate_id", "zoho")
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def mock_db(*pages):
+    """AsyncSession cuyo execute devuelve, por llamada, los flags RETURNING indicados."""
+    db = MagicMock()
+    results = []
+    for flags in pages:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = flags
+        result.all.return_value = flags
+        results.append(result)
+    db.execute = AsyncMock(side_effect=results)
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+class TestPrepareRows:
+    """Tests del armado de filas."""
+
+    def test_filters_unknown_fields_and_sets_computed(self):
+        rows = prepare_rows(Candidate, [{
+            "zoho_candidate_id": "z1",
+            "full_name": "Ana Pérez",
+            "email": "ana@b.cl",
+            "mobile": "+56 9",
+            "source": "LinkedIn",
+            "created_at": "2026-01-02T10:00:00+03:00",
+        }], KEY)
+
+        row = rows[0]
+        assert "mobile" not in row
+        assert row["source"] == "zoho"
+        assert row["created_at"].isoformat() == "2026-01-02T07:00:00"
+        assert len(row["sync_hash"]) == 64
+        assert "ana" in row["search_text"]
+        assert row["updated_at"] is not None
+
+    def test_last_record_wins_per_external_id(self):
+        rows = prepare_rows(Candidate, [
+            {"zoho_candidate_id": "z1", "full_name": "Ana"},
+            {"zoho_candidate_id": "z2", "full_name": "Luis"},
+            {"zoho_candidate_id": "z1", "full_name": "Ana María"},
+            {"full_name": "Sin ID"},
+        ], KEY)
+
+        assert [(r["zoho_candidate_id"], r["full_name"]) for r in rows] == [
+            ("z1", "Ana María"), ("z2", "Luis"),
+        ]
+
+    def test_hash_ignores_key_order_and_timestamps(self):
+        a = prepare_rows(Candidate, [{"zoho_candidate_id": "z1", "full_name": "Ana", "email": "a@b.cl"}], KEY)
+        b = prepare_rows(Candidate, [{"email": "a@b.cl", "full_name": "Ana", "zoho_candidate_id": "z1"}], KEY)
+
+        assert a[0]["sync_hash"] == b[0]["sync_hash"]
+        assert content_hash({"x": 1}) != content_hash({"x": 2})
+
+
+class TestUpsertStatement:
+    """Tests del SQL generado."""
+
+    def test_conflict_target_is_partial_index(self):
+        sql = compiled(upsert_statement(Candidate, ["zoho_candidate_id", "full_name", "source", "sync_hash", "updated_at"], KEY))
+
+        assert "ON CONFLICT (zoho_candidate_id) WHERE source = 'zoho'" in sql
+        assert "full_name = coalesce(excluded.full_name, candidates.full_name)" in sql
+        assert "source = coalesce" not in sql
+        assert "candidates.sync_hash IS DISTINCT FROM excluded.sync_hash" in sql
+        assert "RETURNING xmax = 0 AS inserted" in sql
+
+    def test_incomplete_search_fields_keep_search_text(self):
+        columns = ["zoho_candidate_id", "full_name", "search_text", "source", "sync_hash", "updated_at"]
+
+        assert "search_text = coalesce" in compiled(upsert_statement(Candidate, columns, KEY))
+        assert "search_text = coalesce" not in compiled(
+            upsert_statement(Candidate, columns, KEY, update_search_text=False)
+        )
+
+    def test_models_declare_partial_indexes(self):
+        for model, column, source in [
+            (Candidate, "zoho_candidate_id", "zoho"),
+            (Candidate, "external_id", "odoo"),
+            (JobOpening, "zoho_job_id", "zoho"),
+            (JobOpening, "external_id", "odoo"),
+        ]:
+            index = next(
+                index for index in model.__table__.indexes
+                if index.unique and [c.name for c in index.columns] == [column]
+            )
+            assert str(index.dialect_options["postgresql"]["where"]) == f"source = '{source}'"
+
+
+class TestUpsertPage:
+    """Tests de los conteos de la página."""
+
+    @pytest.mark.asyncio
+    async def test_counts_created_updated_unchanged(self):
+        db = mock_db([True, False])
+        records = [{"zoho_candidate_id": f"z{i}", "full_name": "Ana"} for i in range(3)]
+
+        result = await upsert_page(db, Candidate, records + [{"full_name": "Sin ID"}], KEY)
+
+        assert db.execute.await_count == 1
+        assert len(db.execute.await_args.args[1]) == 3
+        db.commit.assert_awaited_once()
+        assert (result.items_processed, result.items_created, result.items_updated,
+                result.items_unchanged, result.items_failed) == (3, 1, 1, 1, 1)
+        assert result.success
+
+    @pytest.mark.asyncio
+    async def test_one_statement_per_column_set(self):
+        db = mock_db([True], [True])
+        records = [
+            {"zoho_candidate_id": "z1", "full_name": "Ana"},
+            {"zoho_candidate_id": "z2", "full_name": "Luis", "email": "l@b.cl"},
+        ]
+
+        result = await upsert_page(db, Candidate, records, KEY)
+
+        assert db.execute.await_count == 2
+        assert result.items_created == 2
+
+    @pytest.mark.asyncio
+    async def test_rows_without_search_fields_go_apart(self):
+        db = mock_db([False], [False])
+        records = [
+            {"zoho_candidate_id": "z1", "full_name": "Ana"},
+            {"zoho_candidate_id": "z2", "full_name": None},
+        ]
+
+        await upsert_page(db, Candidate, records, KEY)
+
+        statements = [compiled(call.args[0]) for call in db.execute.await_args_list]
+        assert ["search_text = coalesce" in sql for sql in statements] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_failed_page_marks_result_failed(self):
+        db = mock_db()
+        db.execute = AsyncMock(side_effect=RuntimeError("deadlock"))
+
+        result = await upsert_page(db, Candidate, [{"zoho_candidate_id": "z1"}], KEY)
+
+        db.rollback.assert_awaited_once()
+        assert not result.success
+        assert not SyncResult(success=True).merge(result).success
+        assert result.items_failed == 1 and result.items_processed == 0
+        assert result.errors == ["deadlock"]
+
+
+class TestLookupIds:
+    """Tests de la resolución de IDs externos."""
+
+    @pytest.mark.asyncio
+    async def test_first_column_wins(self):
+        db = mock_db([(1, "10", None), (2, None, "10"), (3, None, "20")])
+
+        ids = await lookup_ids(db, JobOpening, ["10", "20", None], JobOpening.external_id, JobOpening.zoho_job_id)
+
+        assert ids == {"10": 1, "20": 3}
+
+    @pytest.mark.asyncio
+    async def test_no_values_skips_query(self):
+        db = mock_db()
+
+        assert await lookup_ids(db, JobOpening, [None], JobOpening.external_id) == {}
+        db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_odoo_applicant_updates_linked_zoho_candidate():
+    db = mock_db(["z1"], [True], [False])
+    config = OdooConfig(url="https://test.odoo.com", database="db", username="admin@test.com", api_key="key")
+    applicants = [
+        {"id": 1, "partner_name": "Ana", "x_zoho_candidate_id": "z1"},
+        {"id": 2, "partner_name": "Luis", "x_zoho_candidate_id": False},
+    ]
+
+    result = await OdooConnector(db, config)._process_candidates_batch(applicants)
+
+    _, odoo_call, zoho_call = db.execute.await_args_list
+    assert "WHERE source = 'odoo'" in compiled(odoo_call.args[0])
+    assert [row["external_id"] for row in odoo_call.args[1]] == ["2"]
+    assert "ON CONFLICT (zoho_candidate_id) WHERE source = 'zoho'" in compiled(zoho_call.args[0])
+    assert [(row["zoho_candidate_id"], row["external_id"]) for row in zoho_call.args[1]] == [("z1", "1")]
+    assert (result.items_created, result.items_updated) == (1, 1)
+
+
+def test_odoo_id_formats():
+    assert OdooConnector._odoo_id({"id": 7}) == "7"
+    assert OdooConnector._odoo_id([7, "Backend"]) == "7"
+    assert OdooConnector._odoo_id(False) is None
+    assert OdooConnector._odoo_id(7) == "7"
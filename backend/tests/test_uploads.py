@@ -0,0 +1,69 @@
+"""Tests de la recepción de uploads en streaming."""
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+from fastapi import UploadFile
+
+from app.core import uploads
+from app.core.uploads import UploadSink, UploadTooLargeError, sniff_mime
+
+PDF = b"%PDF-1.4\n" + b"contenido del documento " * 200
+
+
+def make_upload(data: bytes, filename: str = "cv.pdf") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+class TestUploadSink:
+    """Tests de UploadSink."""
+
+    @pytest.mark.asyncio
+    async def test_hash_size_and_mime_in_one_pass(self, tmp_path):
+        with patch.object(uploads, "UPLOAD_CHUNK_SIZE", 512):
+            async with UploadSink(tmp_path, max_size=1024 * 1024, suffix=".pdf") as sink:
+                await sink.receive(make_upload(PDF))
+                path = sink.persist("cv.pdf")
+
+        assert sink.sha256 == hashlib.sha256(PDF).hexdigest()
+        assert sink.size == len(PDF)
+        assert sink.mime_type == "application/pdf"
+        assert path.read_bytes() == PDF
+        assert [p.name for p in tmp_path.iterdir()] == ["cv.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_too_large_aborts_and_cleans_up(self, tmp_path):
+        with patch.object(uploads, "UPLOAD_CHUNK_SIZE", 512):
+            with pytest.raises(UploadTooLargeError):
+                async with UploadSink(tmp_path, max_size=1000) as sink:
+                    await sink.receive(make_upload(PDF))
+
+        assert sink.size <= 1000 + 512
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_not_persisted_is_discarded(self, tmp_path):
+        async with UploadSink(tmp_path) as sink:
+            await sink.receive(make_upload(PDF))
+            assert sink.temp_path.exists()
+
+        assert sink.path is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSniffMime:
+    """Tests de detección de MIME por contenido."""
+
+    def test_signatures(self):
+        with patch.dict("sys.modules", {"magic": None}):
+            assert sniff_mime(b"%PDF-1.7") == "application/pdf"
+            assert sniff_mime(b"PK\x03\x04 [Content_Types].xml word/document.xml").endswith(
+                "wordprocessingml.document"
+            )
+            assert sniff_mime(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1") == "application/msword"
+            assert sniff_mime(b"Perfil del puesto", "jd.txt") == "text/plain"
+
+    def test_content_wins_over_declared_type(self):
+        with patch.dict("sys.modules", {"magic": None}):
+            assert sniff_mime(b"%PDF-1.7", "cv.docx", "application/msword") == "application/pdf"